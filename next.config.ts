@@ -4,6 +4,34 @@ const nextConfig: NextConfig = {
   // Remove static export for now - we have dynamic Stripe routes
   // output: 'export',
   trailingSlash: true,
+  // Product and image-map shards are read with computed paths, which file tracing can't see.
+  // Only the routes that render product images (src/lib/image-map.ts) get the image-map
+  // shards; the monolithic image-map.json is a dev/build-time fallback and isn't shipped.
+  outputFileTracingIncludes: {
+    '/api/checkout': ['./public/products-data/by-slug/**'],
+    '/': ['./public/image-map/**'],
+    '/shop': ['./public/image-map/**'],
+    '/shop/page/[pageNumber]': ['./public/image-map/**'],
+    '/shop/[slug]': ['./public/image-map/**'],
+    '/posters': ['./public/image-map/**'],
+    '/posters/page/[pageNumber]': ['./public/image-map/**'],
+    '/category/[slug]': ['./public/image-map/**'],
+    '/category/[slug]/page/[pageNumber]': ['./public/image-map/**'],
+    '/shows/[slug]': ['./public/image-map/**'],
+  },
+  // Product images are saved as image-<n>.<content hash>.<ext> by sync-images.js and
+  // the publishing tool (tools/publishing/hashed_assets.py), so a URL never changes
+  // contents. This is the only copy of the rule; vercel.json doesn't repeat it.
+  async headers() {
+    return [
+      {
+        source: '/products/:slug/:file([^/]+\\.[0-9a-f]{10}\\.(?:png|jpe?g|gif|webp))',
+        headers: [
+          { key: 'Cache-Control', value: 'public, max-age=31536000, immutable' },
+        ],
+      },
+    ];
+  },
   images: {
     remotePatterns: [
       {
@@ -9,6 +9,7 @@ const https = require('https');
 const http = require('http');
 const fs = require('fs');
 const path = require('path');
+const { writeProductShards } = require('./write-product-shards');
 
 const STRAPI_URL = process.env.NEXT_PUBLIC_STRAPI_URL || 'http://localhost:1339';
 const STRAPI_TOKEN = process.env.STRAPI_API_TOKEN;
@@ -113,6 +114,17 @@ async function main() {
     fs.writeFileSync(OUTPUT_FILE, JSON.stringify({}, null, 2));
   }
 
+  // The storefront reads these shards before products-data.json, so they are
+  // rebuilt from whatever was just written
+  try {
+    const shards = writeProductShards();
+    console.log(`✅ Product shards: ${shards.changed} written, ${shards.removed} removed (${shards.files} total)`);
+  } catch (error) {
+    console.error('❌ Failed to write product shards:', error.message);
+    console.warn('⚠️  Removing product shards so products-data.json is used');
+    fs.rmSync(path.join(__dirname, '..', 'public', 'products-data'), { recursive: true, force: true });
+  }
+
   // Export global site settings (posterPrice, etc.)
   try {
     const globalData = await fetchGlobalSettings();
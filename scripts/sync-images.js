@@ -1,13 +1,16 @@
 #!/usr/bin/env node
 
+const crypto = require('crypto');
 const https = require('https');
 const http = require('http');
 const fs = require('fs');
 const path = require('path');
 const { promisify } = require('util');
+const { writeImageMapShards } = require('./write-image-map-shards');
 
 const writeFile = promisify(fs.writeFile);
 const readFile = promisify(fs.readFile);
+const rename = promisify(fs.rename);
 const mkdir = promisify(fs.mkdir);
 const readdir = promisify(fs.readdir);
 const stat = promisify(fs.stat);
@@ -25,6 +28,11 @@ const IMAGE_MAP_FILE = path.join(PUBLIC_DIR, 'image-map.json');
 // Timeout for HTTP requests
 const REQUEST_TIMEOUT = 15000; // Reduced timeout for faster failure detection
 
+// Images are saved as image-<n>.<first HASH_LENGTH hex digits of their SHA-256>.<ext>,
+// the same names tools/publishing/hashed_assets.py gives them, so next.config.ts can
+// serve them as immutable and a sync never undoes the publishing tool's hashing
+const HASH_LENGTH = 10;
+
 console.log('🎨 Starting image sync process...');
 console.log(`📡 Strapi URL: ${STRAPI_URL}`);
 
@@ -137,6 +145,40 @@ async function downloadImage(imageUrl, filePath) {
   });
 }
 
+// Move a finished download to its content-hashed name; returns that name
+async function storeHashed(tmpPath, productDir, fileName) {
+  const digest = crypto.createHash('sha256').update(await readFile(tmpPath)).digest('hex');
+  const ext = path.extname(fileName);
+  const hashedName = `${path.basename(fileName, ext)}.${digest.slice(0, HASH_LENGTH)}${ext}`;
+  const hashedPath = path.join(productDir, hashedName);
+  if (fs.existsSync(hashedPath)) {
+    // Same bytes as the copy from an earlier sync
+    await unlink(tmpPath);
+  } else {
+    await rename(tmpPath, hashedPath);
+  }
+  return hashedName;
+}
+
+// Drop files in a product directory the new map doesn't reference (old versions, stray downloads)
+async function removeUnreferenced(productDir, keep) {
+  for (const file of await readdir(productDir)) {
+    const filePath = path.join(productDir, file);
+    if (!keep.has(file) && (await stat(filePath)).isFile()) {
+      await unlink(filePath);
+    }
+  }
+}
+
+// Previous public/image-map.json, for carrying blur placeholders over
+async function readPreviousMap() {
+  try {
+    return JSON.parse(await readFile(IMAGE_MAP_FILE, 'utf8'));
+  } catch {
+    return {};
+  }
+}
+
 // Get file extension from URL
 function getImageExtension(url) {
   try {
@@ -200,8 +242,27 @@ async function cleanOldProducts(currentSlugs) {
   }
 }
 
+// Rewrite public/image-map/ so src/lib/image-map.ts never reads shards older than the map
+function refreshImageShards() {
+  try {
+    const result = writeImageMapShards(PUBLIC_DIR);
+    if (!result.skipped) {
+      console.log(`✅ Image map shards: ${result.changed} written, ${result.removed} removed (${result.products} products)`);
+    }
+  } catch (error) {
+    console.warn('⚠️  Could not write image map shards:', error.message);
+  }
+}
+
 // Fallback: Use existing images and image map
 async function useFallbackImages() {
+  await keepExistingImages();
+  refreshImageShards();
+  return true;
+}
+
+// Keep (or create) the image map when Strapi can't be synced
+async function keepExistingImages() {
   const existingCount = await getExistingImageCount();
 
   console.log('\n⚠️  Strapi unavailable - using existing images');
@@ -277,6 +338,7 @@ async function syncImages() {
     await mkdir(PUBLIC_DIR, { recursive: true });
     await mkdir(PRODUCTS_DIR, { recursive: true });
 
+    const previousMap = await readPreviousMap();
     const imageMap = {};
     const currentSlugs = [];
     let totalDownloaded = 0;
@@ -298,45 +360,61 @@ async function syncImages() {
 
       const images = product.images || [];
       const localImages = [];
+      const previousImages = previousMap[slug] || [];
+      const keep = new Set();
+      let productErrors = 0;
 
       if (images.length === 0) {
         console.log('  📭 No images found for this product');
         imageMap[slug] = [];
+        await removeUnreferenced(productDir, keep);
         continue;
       }
 
-      // Download each image (always overwrite existing)
+      // Download each image (always re-download; unchanged bytes keep their hashed file)
       for (let i = 0; i < images.length; i++) {
         const image = images[i];
+        const fileName = `image-${i + 1}${getImageExtension(image.url)}`;
+        const tmpPath = path.join(productDir, `.${fileName}.${process.pid}.tmp`);
 
         try {
           const imageUrl = image.url;
-          const extension = getImageExtension(imageUrl);
-          const fileName = `image-${i + 1}${extension}`;
-          const filePath = path.join(productDir, fileName);
-          const publicPath = `/products/${slug}/${fileName}`;
 
           console.log(`  📥 Downloading: ${path.basename(imageUrl)}`);
-          await downloadImage(imageUrl, filePath);
-          console.log(`  ✅ Saved: ${fileName}`);
+          await downloadImage(imageUrl, tmpPath);
+          const hashedName = await storeHashed(tmpPath, productDir, fileName);
+          keep.add(hashedName);
+          console.log(`  ✅ Saved: ${hashedName}`);
 
-          localImages.push({
+          const localImage = {
             id: image.id,
-            url: publicPath,
+            url: `/products/${slug}/${hashedName}`,
             alternativeText: image.alternativeText || '',
             width: image.width || 800,
             height: image.height || 600,
             originalUrl: imageUrl
-          });
+          };
+          // Same URL means the same bytes, so the placeholder from the last sync still fits
+          const previous = previousImages.find((entry) => entry.url === localImage.url);
+          if (previous && previous.blurDataURL) {
+            localImage.blurDataURL = previous.blurDataURL;
+            localImage.blurhash = previous.blurhash;
+          }
+          localImages.push(localImage);
 
           totalDownloaded++;
 
         } catch (error) {
           totalErrors++;
+          productErrors++;
+          fs.rmSync(tmpPath, { force: true });
           console.error(`  ❌ Failed to download image ${i + 1}: ${error.message}`);
         }
       }
 
+      if (productErrors === 0) {
+        await removeUnreferenced(productDir, keep);
+      }
       imageMap[slug] = localImages;
       console.log(`  ✅ Downloaded ${localImages.length}/${images.length} images`);
     }
@@ -385,6 +463,7 @@ async function syncImages() {
     // Write new image map only if we successfully processed products
     console.log('\n📝 Writing image map...');
     await writeFile(IMAGE_MAP_FILE, JSON.stringify(imageMap, null, 2));
+    refreshImageShards();
 
     console.log(`\n🎉 Image sync complete!`);
     console.log(`   📊 Processed ${products.length} products`);
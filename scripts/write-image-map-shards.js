@@ -0,0 +1,81 @@
+#!/usr/bin/env node
+
+/**
+ * Split public/image-map.json into public/image-map/<slug>.json shards
+ *
+ * src/lib/image-map.ts reads the shard for the product it renders and only
+ * falls back to the monolithic map when a shard is missing, so the shards
+ * must be rewritten whenever the map is. The publishing tool does this in
+ * Python (tools/publishing/image_shards.py); sync-images.js calls this copy
+ * so `npm run sync-images`, dev:fresh and prebuild keep them current too.
+ * The manifest records the map's SHA-256, so either writer skips work the
+ * other already did. tools/tests/test_image_shards.py checks both produce
+ * the same files.
+ */
+
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+const { writeIfChanged, removeStale, dump, SAFE_SLUG } = require('./write-product-shards');
+
+const PUBLIC_DIR = path.join(__dirname, '..', 'public');
+const SHARD_DIR_NAME = 'image-map';
+
+const sha256 = (data) => crypto.createHash('sha256').update(data).digest('hex');
+
+function loadManifest(shardDir) {
+  try {
+    return JSON.parse(fs.readFileSync(path.join(shardDir, 'manifest.json'), 'utf-8'));
+  } catch {
+    return null;
+  }
+}
+
+function writeImageMapShards(publicDir = PUBLIC_DIR, force = false) {
+  const shardDir = path.join(publicDir, SHARD_DIR_NAME);
+  const source = fs.readFileSync(path.join(publicDir, 'image-map.json'));
+  const sourceHash = sha256(source);
+
+  const manifest = loadManifest(shardDir);
+  if (!force && manifest && manifest.source === sourceHash) {
+    return { products: Object.keys(manifest.products || {}).length, changed: 0, removed: 0, skipped: true };
+  }
+
+  const imageMap = JSON.parse(source.toString('utf-8'));
+  const written = new Set();
+  let changed = 0;
+  const entries = {};
+  for (const slug of Object.keys(imageMap).sort()) {
+    if (!SAFE_SLUG.test(slug)) {
+      console.warn(`⚠️  Skipping image shard for unsafe slug: ${slug}`);
+      continue;
+    }
+    const text = dump(imageMap[slug]);
+    changed += writeIfChanged(path.join(shardDir, `${slug}.json`), text, written);
+    entries[slug] = { hash: sha256(Buffer.from(text, 'utf-8')), images: imageMap[slug].length };
+  }
+
+  writeIfChanged(path.join(shardDir, 'manifest.json'),
+    dump({ version: 1, source: sourceHash, products: entries }), written);
+  const removed = removeStale(shardDir, written);
+
+  return { products: Object.keys(entries).length, changed, removed, skipped: false };
+}
+
+module.exports = { writeImageMapShards };
+
+if (require.main === module) {
+  try {
+    const args = process.argv.slice(2);
+    const publicDir = args.find((arg) => arg !== '--force') || PUBLIC_DIR;
+    const result = writeImageMapShards(publicDir, args.includes('--force'));
+    if (result.skipped) {
+      console.log(`✅ Image map shards already current (${result.products} products)`);
+    } else {
+      console.log(`✅ Image map shards: ${result.changed} written, ${result.removed} removed (${result.products} products)`);
+    }
+  } catch (error) {
+    console.error('❌ Failed to write image map shards:', error.message);
+    process.exit(1);
+  }
+}
@@ -0,0 +1,162 @@
+#!/usr/bin/env node
+
+/**
+ * Rebuild public/products-data/ from public/products-data.json
+ *
+ * src/lib/api.ts and the checkout route read these shards before the
+ * monolithic file, so they must never be older than it. The publishing tool
+ * writes them in Python (tools/publishing/shards.py); this is the same
+ * layout for the Node export that runs in prebuild. tools/tests/test_shards.py
+ * runs both on one catalog and fails if any file differs.
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+const PUBLIC_DIR = path.join(__dirname, '..', 'public');
+
+// Every paginated route in src/app uses 16 products per page
+const PAGE_SIZE = 16;
+
+// Slugs that are safe to use as file names (Strapi uid characters)
+const SAFE_SLUG = /^[A-Za-z0-9_~-][A-Za-z0-9._~-]*$/;
+
+const dump = (data) => JSON.stringify(data, null, 2);
+
+// Unchanged files keep their mtime, so git and the CDN don't see churn
+function writeIfChanged(filePath, text, written) {
+  written.add(filePath);
+  try {
+    if (fs.readFileSync(filePath, 'utf-8') === text) {
+      return 0;
+    }
+  } catch {
+    // Missing: write it
+  }
+  fs.mkdirSync(path.dirname(filePath), { recursive: true });
+  const tmp = path.join(path.dirname(filePath), `.${path.basename(filePath)}.${process.pid}.tmp`);
+  fs.writeFileSync(tmp, text);
+  fs.renameSync(tmp, filePath);
+  return 1;
+}
+
+function writePages(listingDir, slugs, bySlug, written) {
+  const total = slugs.length;
+  const pageCount = Math.ceil(total / PAGE_SIZE);
+  let changed = 0;
+  for (let page = 1; page <= pageCount; page++) {
+    const products = slugs.slice((page - 1) * PAGE_SIZE, page * PAGE_SIZE).map((slug) => bySlug[slug]);
+    changed += writeIfChanged(path.join(listingDir, `page-${page}.json`), dump({
+      products,
+      pagination: { page, pageSize: PAGE_SIZE, pageCount, total },
+    }), written);
+  }
+  return [{ pageCount, total }, changed];
+}
+
+// Delete shard files nobody wrote this time, then empty directories
+function removeStale(dir, written) {
+  let removed = 0;
+  if (!fs.existsSync(dir)) {
+    return removed;
+  }
+  for (const entry of fs.readdirSync(dir, { withFileTypes: true })) {
+    const entryPath = path.join(dir, entry.name);
+    if (entry.isDirectory()) {
+      removed += removeStale(entryPath, written);
+      if (fs.readdirSync(entryPath).length === 0) {
+        fs.rmdirSync(entryPath);
+      }
+    } else if (entry.name.endsWith('.json') && !written.has(entryPath)) {
+      fs.unlinkSync(entryPath);
+      removed++;
+    }
+  }
+  return removed;
+}
+
+function writeProductShards(publicDir = PUBLIC_DIR) {
+  const shardDir = path.join(publicDir, 'products-data');
+  const productsBySlug = JSON.parse(fs.readFileSync(path.join(publicDir, 'products-data.json'), 'utf-8'));
+  const written = new Set();
+  let changed = 0;
+
+  const index = {};
+  const bySlug = {};
+  for (const product of Object.values(productsBySlug)) {
+    const slug = product.slug;
+    if (!slug) {
+      continue;
+    }
+    if (!SAFE_SLUG.test(slug)) {
+      console.warn(`⚠️  Skipping shard for unsafe slug: ${slug}`);
+      continue;
+    }
+    changed += writeIfChanged(path.join(shardDir, 'by-slug', `${slug}.json`), dump(product), written);
+    bySlug[slug] = product;
+    const category = product.category || {};
+    const show = product.currentShow || {};
+    index[slug] = {
+      id: product.id ?? null,
+      title: product.title ?? null,
+      price: product.price ?? null,
+      category: category.slug ?? null,
+      show: show.slug ?? null,
+      hasPoster: product.hasPoster === true,
+      featured: product.featured === true,
+      sold: product.sold === true,
+      createdAt: product.createdAt ?? null,
+      updatedAt: product.updatedAt ?? null,
+    };
+  }
+
+  // Newest first; Array.sort is stable so ties keep export order
+  const newestFirst = Object.keys(index).sort((a, b) => {
+    const left = index[a].createdAt || '';
+    const right = index[b].createdAt || '';
+    return left < right ? 1 : left > right ? -1 : 0;
+  });
+
+  const manifest = { pageSize: PAGE_SIZE, products: newestFirst.length, categories: {} };
+  let n;
+  [manifest.shop, n] = writePages(path.join(shardDir, 'shop'), newestFirst, bySlug, written);
+  changed += n;
+
+  const posters = newestFirst.filter((slug) => index[slug].hasPoster);
+  [manifest.posters, n] = writePages(path.join(shardDir, 'posters'), posters, bySlug, written);
+  changed += n;
+
+  const categories = {};
+  for (const slug of newestFirst) {
+    if (index[slug].category) {
+      (categories[index[slug].category] = categories[index[slug].category] || []).push(slug);
+    }
+  }
+  for (const category of Object.keys(categories).sort()) {
+    if (!SAFE_SLUG.test(category)) {
+      console.warn(`⚠️  Skipping shards for unsafe category slug: ${category}`);
+      continue;
+    }
+    [manifest.categories[category], n] = writePages(
+      path.join(shardDir, 'category', category), categories[category], bySlug, written);
+    changed += n;
+  }
+
+  changed += writeIfChanged(path.join(shardDir, 'index.json'), dump(index), written);
+  changed += writeIfChanged(path.join(shardDir, 'manifest.json'), dump(manifest), written);
+  const removed = removeStale(shardDir, written);
+
+  return { files: written.size, changed, removed };
+}
+
+module.exports = { writeProductShards, writeIfChanged, removeStale, dump, SAFE_SLUG };
+
+if (require.main === module) {
+  try {
+    const result = writeProductShards(process.argv[2] || PUBLIC_DIR);
+    console.log(`✅ Product shards: ${result.changed} written, ${result.removed} removed (${result.files} total)`);
+  } catch (error) {
+    console.error('❌ Failed to write product shards:', error.message);
+    process.exit(1);
+  }
+}
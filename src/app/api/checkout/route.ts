@@ -2,19 +2,26 @@ import { NextRequest, NextResponse } from 'next/server';
 import Stripe from 'stripe';
 import fs from 'fs';
 import path from 'path';
-import { type Product } from '@/lib/api';
+import { type Product, loadStaticProduct } from '@/lib/api';
+import { stripeClientOptions } from '@/lib/stripe';
 
 function initializeStripe() {
   const secretKey = process.env.STRIPE_SECRET_KEY;
   if (!secretKey) {
     throw new Error('STRIPE_SECRET_KEY environment variable is not set');
   }
-  return new Stripe(secretKey, {
-    apiVersion: '2025-08-27.basil',
-  });
+  return new Stripe(secretKey, stripeClientOptions());
 }
 
 function getProductBySlug(slug: string): Product | null {
+  // Per-product shard written at export time - avoids parsing the whole catalog
+  if (typeof slug === 'string') {
+    const product = loadStaticProduct(slug);
+    if (product) {
+      return product;
+    }
+  }
+
   try {
     const productsPath = path.join(process.cwd(), 'public', 'products-data.json');
     const productsData = fs.readFileSync(productsPath, 'utf-8');
@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import Stripe from 'stripe';
 import { headers } from 'next/headers';
+import { stripeClientOptions } from '@/lib/stripe';
 import nodemailer from 'nodemailer';
 import { writeFile, mkdir } from 'fs/promises';
 import { existsSync } from 'fs';
@@ -11,9 +12,7 @@ function initializeStripe() {
   if (!secretKey) {
     throw new Error('STRIPE_SECRET_KEY environment variable is not set');
   }
-  return new Stripe(secretKey, {
-    apiVersion: '2025-08-27.basil',
-  });
+  return new Stripe(secretKey, stripeClientOptions());
 }
 
 function getWebhookSecret() {
@@ -78,8 +77,9 @@ interface OrderData {
 // Save order to local JSON file (fallback logging)
 async function saveOrderToLocalFile(orderData: OrderData) {
   try {
-    const ordersDir = '/tmp';
-    const ordersFile = path.join(ordersDir, 'orders.json');
+    // ORDERS_FILE lets local benches keep their orders out of /tmp/orders.json
+    const ordersFile = process.env.ORDERS_FILE || path.join('/tmp', 'orders.json');
+    const ordersDir = path.dirname(ordersFile);
 
     // Create tmp directory if it doesn't exist
     if (!existsSync(ordersDir)) {
@@ -1,15 +1,20 @@
 import { NextRequest, NextResponse } from 'next/server';
 import Stripe from 'stripe';
 import { headers } from 'next/headers';
+import { stripeClientOptions } from '@/lib/stripe';
 
 function initializeStripe() {
   const secretKey = process.env.STRIPE_SECRET_KEY;
   if (!secretKey) {
     throw new Error('STRIPE_SECRET_KEY environment variable is not set');
   }
-  return new Stripe(secretKey, {
-    apiVersion: '2025-08-27.basil',
-  });
+  return new Stripe(secretKey, stripeClientOptions());
+}
+
+// NEXT_PUBLIC_ variables are inlined at build time; STRAPI_URL is read at
+// runtime, so a local run can point this route at a stand-in without rebuilding
+function getStrapiUrl() {
+  return process.env.STRAPI_URL || process.env.NEXT_PUBLIC_STRAPI_URL;
 }
 
 function getWebhookSecret() {
@@ -101,7 +106,7 @@ async function saveOrderToStrapi(session: Stripe.Checkout.Session) {
   if (productSlug) {
     try {
       const productResponse = await fetch(
-        `${process.env.NEXT_PUBLIC_STRAPI_URL}/api/products?filters[slug][$eq]=${productSlug}`,
+        `${getStrapiUrl()}/api/products?filters[slug][$eq]=${productSlug}`,
         {
           headers: {
             'Authorization': `Bearer ${process.env.STRAPI_API_TOKEN}`, // Add this to your .env
@@ -149,7 +154,7 @@ async function saveOrderToStrapi(session: Stripe.Checkout.Session) {
   };
 
   // Save to Strapi
-  const strapiResponse = await fetch(`${process.env.NEXT_PUBLIC_STRAPI_URL}/api/orders`, {
+  const strapiResponse = await fetch(`${getStrapiUrl()}/api/orders`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
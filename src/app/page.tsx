@@ -14,6 +14,7 @@ import {
   type Show
 } from '@/lib/api';
 import { getLogoUrl } from '@/lib/images';
+import { getFirstProductImage, getFirstProductImages } from '@/lib/image-map';
 // Trigger Vercel deployment with static site generation fixes
 
 // Static export - no revalidation needed
@@ -102,7 +103,7 @@ export default async function Home() {
 
       {/* Featured Show Banner - Only shows if there's a show that started in the last 10 days */}
       {recentShow && recentShowProducts.length > 0 && (
-        <FeaturedShowBanner show={recentShow} products={recentShowProducts} />
+        <FeaturedShowBanner show={recentShow} products={recentShowProducts} images={getFirstProductImages(recentShowProducts)} />
       )}
 
       {/* Featured Products Section */}
@@ -128,11 +129,11 @@ export default async function Home() {
               </Link>
             </div>
           ) : featuredProducts.length > 3 ? (
-            <FeaturedCarousel products={featuredProducts} />
+            <FeaturedCarousel products={featuredProducts} images={getFirstProductImages(featuredProducts)} />
           ) : (
             <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-8 max-w-6xl mx-auto">
               {featuredProducts.map((product: Product) => (
-                <ProductCard key={product.id} product={product} featured={true} />
+                <ProductCard key={product.id} product={product} image={getFirstProductImage(product.slug)} featured={true} />
               ))}
             </div>
           )}
@@ -6,7 +6,7 @@ import { fetchProductBySlug, fetchProductSlugs, fetchCategoriesWithProducts, fet
 import BuyButton from '@/components/BuyButton';
 import ImageGallery from '@/components/ImageGallery';
 import ProductNavigation from '@/components/ProductNavigation';
-import { getProductImages } from '@/lib/images';
+import { getProductImages } from '@/lib/image-map';
 import { marked } from 'marked';
 
 // Helper function to check if a show is currently active
@@ -160,9 +160,8 @@ export default async function ProductPage({ params }: ProductPageProps) {
             {/* Product Images */}
             <div>
               <ImageGallery
-                images={product.images || []}
+                images={getProductImages(product.slug, product.images || [])}
                 productTitle={product.title}
-                productSlug={product.slug}
                 sold={product.sold}
               />
             </div>
@@ -9,7 +9,8 @@ import {
   fetchCategoriesWithProducts,
   fetchProductsByShow
 } from '@/lib/api';
-import { getStaticAssetUrl, getProductImages } from '@/lib/images';
+import { getStaticAssetUrl } from '@/lib/images';
+import { getProductImages } from '@/lib/image-map';
 
 interface ShowPageProps {
   params: Promise<{
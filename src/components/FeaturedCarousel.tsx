@@ -5,12 +5,15 @@ import useEmblaCarousel from 'embla-carousel-react';
 import Autoplay from 'embla-carousel-autoplay';
 import ProductCard from './ProductCard';
 import { Product } from '@/lib/api';
+import type { ProductImage } from '@/lib/image-map';
 
 interface FeaturedCarouselProps {
   products: Product[];
+  // First image per product slug, from getFirstProductImages()
+  images: Record<string, ProductImage>;
 }
 
-export default function FeaturedCarousel({ products }: FeaturedCarouselProps) {
+export default function FeaturedCarousel({ products, images }: FeaturedCarouselProps) {
   const [selectedIndex, setSelectedIndex] = useState(0);
 
   // Create autoplay plugin with ref to persist across renders
@@ -64,7 +67,7 @@ export default function FeaturedCarousel({ products }: FeaturedCarouselProps) {
               key={product.id}
               className="flex-[0_0_100%] sm:flex-[0_0_calc(50%-16px)] lg:flex-[0_0_calc(33.333%-22px)] min-w-0"
             >
-              <ProductCard product={product} featured={true} />
+              <ProductCard product={product} image={images[product.slug]} featured={true} />
             </div>
           ))}
         </div>
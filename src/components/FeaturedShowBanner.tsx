@@ -4,14 +4,17 @@ import { useState, useEffect } from 'react';
 import Link from 'next/link';
 import Image from 'next/image';
 import type { Show, Product } from '@/lib/api';
-import { getStaticAssetUrl, getProductImageUrl } from '@/lib/images';
+import type { ProductImage } from '@/lib/image-map';
+import { getStaticAssetUrl } from '@/lib/images';
 
 interface FeaturedShowBannerProps {
   show: Show;
   products: Product[];
+  // First image per product slug, from getFirstProductImages()
+  images: Record<string, ProductImage>;
 }
 
-export default function FeaturedShowBanner({ show, products }: FeaturedShowBannerProps) {
+export default function FeaturedShowBanner({ show, products, images }: FeaturedShowBannerProps) {
   const [currentImageIndex, setCurrentImageIndex] = useState(0);
 
   // Auto-advance the gallery every 3 seconds
@@ -127,9 +130,11 @@ export default function FeaturedShowBanner({ show, products }: FeaturedShowBanne
                           }`}
                         >
                           <Image
-                            src={getProductImageUrl(product.slug, firstImage, 0)}
+                            src={images[product.slug]?.src || '/images/placeholder.jpg'}
                             alt={product.title}
                             fill
+                            placeholder={images[product.slug]?.blurDataURL ? 'blur' : 'empty'}
+                            blurDataURL={images[product.slug]?.blurDataURL}
                             className="object-contain p-2"
                           />
                         </div>
@@ -6,22 +6,20 @@ import Lightbox from 'yet-another-react-lightbox';
 import Thumbnails from 'yet-another-react-lightbox/plugins/thumbnails';
 import 'yet-another-react-lightbox/styles.css';
 import 'yet-another-react-lightbox/plugins/thumbnails.css';
-import { StrapiImage } from '@/lib/api';
-import { getProductImages } from '@/lib/images';
+import type { ProductImage } from '@/lib/image-map';
 
 interface ImageGalleryProps {
-  images: StrapiImage[];
+  // Resolved on the server with getProductImages()
+  images: ProductImage[];
   productTitle: string;
-  productSlug: string;
   sold?: boolean;
 }
 
-export default function ImageGallery({ images, productTitle, productSlug, sold = false }: ImageGalleryProps) {
+export default function ImageGallery({ images, productTitle, sold = false }: ImageGalleryProps) {
   const [selectedImageIndex, setSelectedImageIndex] = useState(0);
   const [lightboxOpen, setLightboxOpen] = useState(false);
 
-  // Get processed images (static or Strapi fallback)
-  const processedImages = getProductImages(productSlug, images);
+  const processedImages = images;
 
   if (!processedImages || processedImages.length === 0) {
     return (
@@ -54,6 +52,8 @@ export default function ImageGallery({ images, productTitle, productSlug, sold =
             objectFit: 'contain'
           }}
           className="rounded-lg transition-opacity group-hover:opacity-90"
+          placeholder={selectedImage.blurDataURL ? 'blur' : 'empty'}
+          blurDataURL={selectedImage.blurDataURL}
           priority={selectedImageIndex === 0}
         />
 
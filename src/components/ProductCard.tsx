@@ -1,10 +1,12 @@
 import Link from 'next/link';
 import Image from 'next/image';
 import { type Product, type Show } from '@/lib/api';
-import { getProductImageUrl } from '@/lib/images';
+import type { ProductImage } from '@/lib/image-map';
 
 interface ProductCardProps {
   product: Product;
+  // First static image, resolved on the server with getFirstProductImage()
+  image?: ProductImage;
   featured?: boolean;
 }
 
@@ -15,7 +17,7 @@ function isShowActive(show: Show): boolean {
   return endDate >= now;
 }
 
-export default function ProductCard({ product, featured = false }: ProductCardProps) {
+export default function ProductCard({ product, image, featured = false }: ProductCardProps) {
   // Check if the show is still active
   const showIsActive = product.currentShow ? isShowActive(product.currentShow) : false;
   return (
@@ -25,9 +27,11 @@ export default function ProductCard({ product, featured = false }: ProductCardPr
           <div className="aspect-square relative bg-muted">
             {product.images && product.images.length > 0 ? (
               <Image
-                src={getProductImageUrl(product.slug, product.images[0], 0)}
+                src={image?.src || '/images/placeholder.jpg'}
                 alt={product.images[0].alternativeText || product.title}
                 fill
+                placeholder={image?.blurDataURL ? 'blur' : 'empty'}
+                blurDataURL={image?.blurDataURL}
                 className="object-cover transition-transform duration-300 group-hover:scale-105"
               />
             ) : (
@@ -1,6 +1,7 @@
 import Link from 'next/link';
 import ProductCard from './ProductCard';
 import { type Product } from '@/lib/api';
+import { getFirstProductImage } from '@/lib/image-map';
 
 interface ProductGridProps {
   products: Product[];
@@ -21,7 +22,7 @@ export default function ProductGrid({ products }: ProductGridProps) {
   return (
     <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
       {products.map((product: Product) => (
-        <ProductCard key={product.id} product={product} />
+        <ProductCard key={product.id} product={product} image={getFirstProductImage(product.slug)} />
       ))}
     </div>
   );
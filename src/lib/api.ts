@@ -43,6 +43,47 @@ function loadStaticProducts(): Record<string, Product> {
   }
 }
 
+// Precomputed slices of products-data.json written by the publishing tool
+// (tools/publishing/shards.py). Each reader falls back to the monolithic file
+// or Strapi when a shard is missing.
+const SHARD_DIR = 'products-data';
+const SAFE_SLUG = /^[A-Za-z0-9_~-][A-Za-z0-9._~-]*$/;
+
+type ProductPage = { products: Product[], pagination: { page: number, pageSize: number, pageCount: number, total: number } };
+
+function loadShard<T>(...segments: string[]): T | null {
+  if (typeof window !== 'undefined') {
+    return null;
+  }
+  try {
+    const shardPath = path.join(process.cwd(), 'public', SHARD_DIR, ...segments);
+    return JSON.parse(fs.readFileSync(shardPath, 'utf-8')) as T;
+  } catch {
+    return null;
+  }
+}
+
+// Load one product without parsing the whole catalog
+export function loadStaticProduct(slug: string): Product | null {
+  if (!SAFE_SLUG.test(slug)) {
+    return null;
+  }
+  return loadShard<Product>('by-slug', `${slug}.json`);
+}
+
+// Load one page of a listing ('shop', 'posters' or 'category/<slug>')
+function loadStaticPage(listing: string, page: number, limit: number): ProductPage | null {
+  if (!Number.isInteger(page) || page < 1) {
+    return null;
+  }
+  const shard = loadShard<ProductPage>(...listing.split('/'), `page-${page}.json`);
+  // Shards are cut at a fixed page size; ignore them for any other size
+  if (!shard || shard.pagination.pageSize !== limit) {
+    return null;
+  }
+  return shard;
+}
+
 export interface StrapiImage {
   id: number;
   url: string;
@@ -183,6 +224,12 @@ export async function fetchProducts(): Promise<Product[]> {
 }
 
 export async function fetchProductsPaginated(page: number = 1, limit: number = 16): Promise<{ products: Product[], pagination: { page: number, pageSize: number, pageCount: number, total: number } }> {
+  // Try the precomputed page first
+  const staticPage = loadStaticPage('shop', page, limit);
+  if (staticPage) {
+    return staticPage;
+  }
+
   try {
     const response = await fetchWithTimeout(`${STRAPI_URL}/api/products?populate=*&pagination[page]=${page}&pagination[pageSize]=${limit}&sort[0]=createdAt:desc`);
 
@@ -210,6 +257,11 @@ export async function fetchProductsPaginated(page: number = 1, limit: number = 1
 
 export async function fetchProductBySlug(slug: string): Promise<Product | null> {
   // Try to load from static data first (for production runtime when Strapi is not available)
+  const staticProduct = loadStaticProduct(slug);
+  if (staticProduct) {
+    return staticProduct;
+  }
+
   try {
     const staticProducts = loadStaticProducts();
     if (staticProducts[slug]) {
@@ -244,6 +296,11 @@ export async function fetchProductBySlug(slug: string): Promise<Product | null>
 
 export async function fetchProductSlugs(): Promise<string[]> {
   // Try to load from static data first (for build time when Strapi may not be available)
+  const slugIndex = loadShard<Record<string, unknown>>('index.json');
+  if (slugIndex && Object.keys(slugIndex).length > 0) {
+    return Object.keys(slugIndex);
+  }
+
   try {
     const staticProducts = loadStaticProducts();
     const slugs = Object.keys(staticProducts);
@@ -379,6 +436,14 @@ export async function fetchProductsByCategory(categorySlug: string): Promise<Pro
 }
 
 export async function fetchProductsByCategoryPaginated(categorySlug: string, page: number = 1, limit: number = 16): Promise<{ products: Product[], pagination: { page: number, pageSize: number, pageCount: number, total: number } }> {
+  // Try the precomputed page first
+  if (SAFE_SLUG.test(categorySlug)) {
+    const staticPage = loadStaticPage(`category/${categorySlug}`, page, limit);
+    if (staticPage) {
+      return staticPage;
+    }
+  }
+
   try {
     const response = await fetchWithTimeout(`${STRAPI_URL}/api/products?populate=*&filters[category][slug][$eq]=${categorySlug}&pagination[page]=${page}&pagination[pageSize]=${limit}&sort[0]=createdAt:desc`);
 
@@ -511,7 +576,13 @@ export async function fetchPosterProducts(): Promise<Product[]> {
 }
 
 export async function fetchPosterProductsPaginated(page: number = 1, limit: number = 16): Promise<{ products: Product[], pagination: { page: number, pageSize: number, pageCount: number, total: number } }> {
-  // Try to load from static data first
+  // Try the precomputed page first
+  const staticPage = loadStaticPage('posters', page, limit);
+  if (staticPage) {
+    return staticPage;
+  }
+
+  // Then the full static data
   try {
     const staticProducts = loadStaticProducts();
     const allProducts = Object.values(staticProducts)
@@ -0,0 +1,125 @@
+import fs from 'fs';
+import path from 'path';
+import type { Product, StrapiImage } from './api';
+
+// Server-only lookups into the image map generated by sync-images.
+// Reads the per-product shards in public/image-map/, which sync-images.js
+// (scripts/write-image-map-shards.js) and the publishing tool
+// (tools/publishing/image_shards.py) rewrite with the map, so a page only parses
+// the entries it renders. Falls back to the monolithic public/image-map.json when a shard is
+// missing; that file is only traced into dev and build, not deployed functions
+// (see next.config.ts). Client components get resolved URLs through props instead.
+
+interface LocalImage {
+  id: number;
+  url: string;
+  alternativeText: string;
+  width: number;
+  height: number;
+  originalUrl: string;
+  // Added by tools/publishing/placeholders.py
+  blurDataURL?: string;
+  blurhash?: string;
+}
+
+export interface ProductImage {
+  src: string;
+  alt: string;
+  width?: number;
+  height?: number;
+  blurDataURL?: string;
+}
+
+const PLACEHOLDER = '/images/placeholder.jpg';
+const SAFE_SLUG = /^[A-Za-z0-9_~-][A-Za-z0-9._~-]*$/;
+
+const shardCache = new Map<string, LocalImage[] | null>();
+let fullMap: Record<string, LocalImage[]> | null = null;
+
+function loadFullMap(): Record<string, LocalImage[]> {
+  if (fullMap === null) {
+    try {
+      const mapPath = path.join(process.cwd(), 'public', 'image-map.json');
+      fullMap = JSON.parse(fs.readFileSync(mapPath, 'utf-8'));
+    } catch {
+      fullMap = {};
+    }
+  }
+  return fullMap as Record<string, LocalImage[]>;
+}
+
+function loadProductImages(productSlug: string): LocalImage[] | null {
+  const cached = shardCache.get(productSlug);
+  if (cached !== undefined) {
+    return cached;
+  }
+
+  let images: LocalImage[] | null = null;
+  if (SAFE_SLUG.test(productSlug)) {
+    try {
+      const shardPath = path.join(process.cwd(), 'public', 'image-map', `${productSlug}.json`);
+      images = JSON.parse(fs.readFileSync(shardPath, 'utf-8'));
+    } catch {
+      images = loadFullMap()[productSlug] || null;
+    }
+  }
+  shardCache.set(productSlug, images);
+  return images;
+}
+
+/**
+ * Get static image URL for a product image
+ * Uses only static images - no Strapi fallback for fully static site
+ */
+export function getProductImageUrl(productSlug: string, _strapiImage?: StrapiImage, index = 0): string {
+  const productImages = loadProductImages(productSlug);
+  if (productImages && productImages[index]) {
+    return productImages[index].url;
+  }
+
+  // Return placeholder if image not found in static files
+  return PLACEHOLDER;
+}
+
+/**
+ * Get all static images for a product
+ * Uses only static images - no Strapi fallback for fully static site
+ */
+export function getProductImages(productSlug: string, _strapiImages: StrapiImage[] = []): ProductImage[] {
+  const productImages = loadProductImages(productSlug);
+
+  if (productImages && productImages.length > 0) {
+    return productImages.map((img: LocalImage) => ({
+      src: img.url,
+      alt: img.alternativeText,
+      width: img.width,
+      height: img.height,
+      blurDataURL: img.blurDataURL
+    }));
+  }
+
+  // Return empty array if images not found in static files
+  return [];
+}
+
+/**
+ * First static image of a product, with its blur placeholder
+ */
+export function getFirstProductImage(productSlug: string): ProductImage | undefined {
+  return getProductImages(productSlug)[0];
+}
+
+/**
+ * First image of each product, keyed by slug
+ * For passing to client components such as FeaturedCarousel
+ */
+export function getFirstProductImages(products: Product[]): Record<string, ProductImage> {
+  const images: Record<string, ProductImage> = {};
+  for (const product of products) {
+    const image = getFirstProductImage(product.slug);
+    if (image) {
+      images[product.slug] = image;
+    }
+  }
+  return images;
+}
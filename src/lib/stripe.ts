@@ -0,0 +1,16 @@
+import type Stripe from 'stripe';
+
+// Shared by every server-side Stripe client.
+// STRIPE_API_BASE points the SDK at a local stub for load tests and
+// webhook benches (tools/publishing/stripe_stub.py). It is never set on Vercel.
+export function stripeClientOptions(): Stripe.StripeConfig {
+  const stubUrl = process.env.STRIPE_API_BASE ? new URL(process.env.STRIPE_API_BASE) : null;
+  return {
+    apiVersion: '2025-08-27.basil',
+    ...(stubUrl && {
+      host: stubUrl.hostname,
+      port: stubUrl.port,
+      protocol: stubUrl.protocol === 'http:' ? 'http' : 'https',
+    }),
+  };
+}
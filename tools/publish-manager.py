@@ -9,6 +9,9 @@ from tkinter import ttk, scrolledtext, messagebox
 import subprocess
 import threading
 import os
+import sys
+import secrets
+import tempfile
 import json
 import requests
 import time
@@ -25,6 +28,7 @@ class PublishManager:
         self.project_dir = Path(__file__).parent.parent.parent
         self.frontend_dir = self.project_dir / "frontend"
         self.backend_dir = self.project_dir / "backend"
+        self.strapi_url = "http://localhost:1339"
 
         # Process tracking
         self.strapi_process = None
@@ -34,6 +38,23 @@ class PublishManager:
         self.tunnel_url = None
         self.config_file = self.project_dir / ".publish-manager.json"
 
+        # .env.local is parsed once and re-read only when it changes
+        from publishing.envstore import env_store
+        self.env_store = env_store(self.frontend_dir / ".env.local")
+
+        # Vercel env listing is cached; Refresh only calls Vercel once it's stale
+        from publishing.vercel_env import EnvSnapshotCache
+        self.env_snapshot_cache = EnvSnapshotCache(self.frontend_dir / ".publish-cache" / "vercel-env.json")
+
+        # Deploy hook calls wait for a quiet window so bursts become one build
+        from publishing.scheduler import DEFAULT_QUIET_SECONDS, DeployScheduler
+        self.deploy_quiet_var = tk.IntVar(value=DEFAULT_QUIET_SECONDS)
+        self.deploy_scheduler = DeployScheduler(self.run_scheduled_deploy, log=self.log)
+        self.publish_started = {}
+
+        # Keeps the Images tab's stats current from filesystem events (started in load_config)
+        self.catalog_watcher = None
+
         self.setup_ui()
         self.load_config()
 
@@ -74,6 +95,7 @@ class PublishManager:
         # Create notebook for tabs
         notebook = ttk.Notebook(self.root)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.notebook = notebook
 
         # Services Tab
         services_frame = ttk.Frame(notebook)
@@ -85,6 +107,11 @@ class PublishManager:
         notebook.add(images_frame, text="Images")
         self.setup_images_tab(images_frame)
 
+        # Upload Tab
+        self.upload_tab = ttk.Frame(notebook)
+        notebook.add(self.upload_tab, text="Upload")
+        self.setup_upload_tab(self.upload_tab)
+
         # Deploy Tab
         deploy_frame = ttk.Frame(notebook)
         notebook.add(deploy_frame, text="Deploy")
@@ -116,6 +143,7 @@ class PublishManager:
         ttk.Button(strapi_frame, text="Stop Strapi", command=self.stop_strapi).grid(row=2, column=1, pady=5)
         ttk.Button(strapi_frame, text="Open Admin", command=self.open_strapi_admin).grid(row=2, column=2, pady=5)
         ttk.Button(strapi_frame, text="💾 Backup Database", command=self.backup_database).grid(row=3, column=0, columnspan=3, pady=5, sticky=tk.EW)
+        ttk.Button(strapi_frame, text="🔍 Verify Latest Backup", command=self.verify_backup).grid(row=4, column=0, columnspan=3, pady=(0, 5), sticky=tk.EW)
 
         # Tunnel Section
         tunnel_frame = ttk.LabelFrame(parent, text="Cloudflare Tunnel", padding=10)
@@ -162,7 +190,7 @@ class PublishManager:
         uploader_frame = ttk.LabelFrame(parent, text="Bulk Image Uploader", padding=10)
         uploader_frame.pack(fill=tk.X, pady=5)
 
-        ttk.Button(uploader_frame, text="📸 Launch Bulk Image Uploader",
+        ttk.Button(uploader_frame, text="📸 Open Bulk Image Uploader",
                   command=self.launch_bulk_uploader).pack(pady=5)
 
     def setup_images_tab(self, parent):
@@ -176,16 +204,78 @@ class PublishManager:
 
         ttk.Button(sync_frame, text="Sync All Images", command=self.sync_images).grid(row=1, column=0, pady=5)
         ttk.Button(sync_frame, text="View Image Map", command=self.view_image_map).grid(row=1, column=1, pady=5)
+        ttk.Button(sync_frame, text="Export Products", command=self.export_products).grid(row=1, column=2, pady=5)
+
+        # Strapi webhook listener: targeted syncs as content is edited
+        from publishing.strapi_webhooks import DEFAULT_PORT
+        webhook_frame = ttk.Frame(sync_frame)
+        webhook_frame.grid(row=2, column=0, columnspan=3, sticky=tk.W, pady=(5, 0))
+        self.webhook_listener = None
+        self.webhook_listen_var = tk.BooleanVar(value=False)
+        self.webhook_port_var = tk.IntVar(value=DEFAULT_PORT)
+        self.webhook_status = tk.StringVar(value="Off")
+        ttk.Checkbutton(webhook_frame, text="Listen for Strapi webhooks on port", variable=self.webhook_listen_var,
+                        command=self.toggle_webhook_listener).pack(side=tk.LEFT)
+        ttk.Spinbox(webhook_frame, from_=1024, to=65535, width=6,
+                    textvariable=self.webhook_port_var).pack(side=tk.LEFT, padx=5)
+        ttk.Label(webhook_frame, textvariable=self.webhook_status).pack(side=tk.LEFT, padx=5)
 
         # Statistics Section
         stats_frame = ttk.LabelFrame(parent, text="Image Statistics", padding=10)
         stats_frame.pack(fill=tk.X, pady=5)
 
-        self.stats_text = tk.Text(stats_frame, height=8, width=60)
+        self.stats_text = tk.Text(stats_frame, height=14, width=60)
         self.stats_text.pack(fill=tk.BOTH, expand=True)
 
+        # Near-duplicate Section
+        dup_frame = ttk.LabelFrame(parent, text="Near-Duplicate Images", padding=10)
+        dup_frame.pack(fill=tk.X, pady=5)
+
+        ttk.Button(dup_frame, text="Find Near-Duplicates", command=self.find_duplicates).pack(anchor=tk.W, pady=(0, 5))
+        self.duplicates_text = tk.Text(dup_frame, height=8, width=60)
+        self.duplicates_text.pack(fill=tk.BOTH, expand=True)
+
         self.update_image_stats()
 
+    def setup_upload_tab(self, parent):
+        from publishing.uploader import DEFAULT_CONCURRENCY, DEFAULT_MAX_EDGE
+
+        upload_frame = ttk.LabelFrame(parent, text="Bulk Upload to Strapi Media Library", padding=10)
+        upload_frame.pack(fill=tk.X, pady=5)
+
+        self.upload_folder_var = tk.StringVar(value="")
+        ttk.Label(upload_frame, text="Folder:").grid(row=0, column=0, sticky=tk.W)
+        ttk.Entry(upload_frame, textvariable=self.upload_folder_var, width=50).grid(row=0, column=1, columnspan=3, sticky=tk.EW, padx=5)
+        ttk.Button(upload_frame, text="Browse...", command=self.choose_upload_folder).grid(row=0, column=4)
+
+        self.upload_max_edge_var = tk.IntVar(value=DEFAULT_MAX_EDGE)
+        self.upload_concurrency_var = tk.IntVar(value=DEFAULT_CONCURRENCY)
+        self.upload_alt_var = tk.BooleanVar(value=True)
+        ttk.Label(upload_frame, text="Longest side (px):").grid(row=1, column=0, sticky=tk.W, pady=5)
+        ttk.Spinbox(upload_frame, from_=800, to=8000, increment=100, width=6,
+                    textvariable=self.upload_max_edge_var).grid(row=1, column=1, sticky=tk.W, padx=5)
+        ttk.Label(upload_frame, text="Parallel uploads:").grid(row=1, column=2, sticky=tk.W)
+        ttk.Spinbox(upload_frame, from_=1, to=16, width=4,
+                    textvariable=self.upload_concurrency_var).grid(row=1, column=3, sticky=tk.W, padx=5)
+        ttk.Checkbutton(upload_frame, text="Alt text from file names",
+                        variable=self.upload_alt_var).grid(row=2, column=0, columnspan=2, sticky=tk.W)
+
+        button_frame = ttk.Frame(upload_frame)
+        button_frame.grid(row=3, column=0, columnspan=5, sticky=tk.W, pady=5)
+        self.upload_start_button = ttk.Button(button_frame, text="⬆️ Resize & Upload", command=self.start_bulk_upload)
+        self.upload_start_button.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="⏹ Stop", command=self.stop_bulk_upload).pack(side=tk.LEFT)
+
+        self.upload_progress = ttk.Progressbar(upload_frame, mode='determinate')
+        self.upload_progress.grid(row=4, column=0, columnspan=5, sticky=tk.EW)
+        self.upload_status = tk.StringVar(value="Choose a folder of artwork to upload")
+        ttk.Label(upload_frame, textvariable=self.upload_status).grid(row=5, column=0, columnspan=5, sticky=tk.W)
+        upload_frame.columnconfigure(1, weight=1)
+
+        ttk.Label(parent, text="Interrupted uploads resume where they stopped: files already in Strapi are skipped.",
+                  foreground="gray").pack(anchor=tk.W, padx=5)
+        self.upload_stop = None
+
     def setup_deploy_tab(self, parent):
         # Current Branch Indicator
         branch_frame = ttk.Frame(parent, padding=5)
@@ -210,6 +300,7 @@ class PublishManager:
 
         ttk.Button(button_frame, text="Git Status", command=self.git_status).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Commit & Push", command=self.commit_and_push).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="✈️ Preflight", command=self.preflight).pack(side=tk.LEFT, padx=5)
 
         # Deployment Section
         deploy_frame = ttk.LabelFrame(parent, text="Deployment", padding=10)
@@ -234,6 +325,20 @@ class PublishManager:
                   command=self.promote_to_production,
                   style="Accent.TButton").pack(side=tk.LEFT)
 
+        # Deploy queue: hook calls wait until no new trigger arrives for the quiet window
+        queue_frame = ttk.Frame(deploy_frame)
+        queue_frame.grid(row=2, column=0, columnspan=2, sticky=tk.W)
+
+        ttk.Label(queue_frame, text="Quiet window (s):").pack(side=tk.LEFT)
+        ttk.Spinbox(queue_frame, from_=0, to=1800, increment=15, width=6,
+                    textvariable=self.deploy_quiet_var, command=self.save_config).pack(side=tk.LEFT, padx=5)
+        ttk.Button(queue_frame, text="⏩ Deploy Queued Now",
+                  command=self.deploy_queued_now).pack(side=tk.LEFT, padx=5)
+        ttk.Button(queue_frame, text="🛑 Cancel Queued",
+                  command=self.cancel_queued_deploys).pack(side=tk.LEFT)
+        ttk.Button(queue_frame, text="🔥 Warm Cache",
+                  command=self.warm_cache).pack(side=tk.LEFT, padx=5)
+
         # Quick Actions
         actions_frame = ttk.LabelFrame(parent, text="Quick Actions", padding=10)
         actions_frame.pack(fill=tk.X, pady=5)
@@ -250,6 +355,11 @@ class PublishManager:
         ttk.Button(workflow_frame, text="🚀 Full Production Pipeline",
                   command=self.production_pipeline).pack(side=tk.LEFT)
 
+        ttk.Button(actions_frame, text="🏋️ Load Test Local Build",
+                  command=self.load_test).pack(anchor=tk.W, pady=(10, 0))
+        ttk.Button(actions_frame, text="🪝 Webhook Bench Local Build",
+                  command=self.webhook_bench).pack(anchor=tk.W, pady=(5, 0))
+
         # Legacy option (smaller, less prominent)
         ttk.Label(actions_frame, text="Legacy:", font=("Arial", 8)).pack(anchor=tk.W, pady=(15, 0))
         ttk.Button(actions_frame, text="Old Full Workflow (Deprecated)",
@@ -277,10 +387,16 @@ class PublishManager:
         self.env_selector.pack(side=tk.LEFT, padx=(0, 10))
 
         ttk.Button(selector_frame, text="🔄 Refresh", command=self.refresh_vercel_env).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(selector_frame, text="⟳ Fetch Now",
+                  command=lambda: self.refresh_vercel_env(force=True)).pack(side=tk.LEFT, padx=(0, 5))
 
         # Env vars display
         self.env_vars_text = scrolledtext.ScrolledText(env_frame, height=10, width=70, font=("Courier", 9))
         self.env_vars_text.pack(fill=tk.BOTH, expand=True, pady=10)
+        self.env_vars_text.tag_config('differs', foreground="#b36b00")
+        self.env_vars_text.tag_config('unknown', foreground="#777777")
+        self.env_vars_text.tag_config('missing-left', foreground="#c62828")
+        self.env_vars_text.tag_config('missing-right', foreground="#c62828")
 
         # Key Update Section
         update_frame = ttk.LabelFrame(parent, text="Update Environment Variable", padding=10)
@@ -322,7 +438,11 @@ class PublishManager:
                        command=self.toggle_value_visibility).pack(side=tk.LEFT)
 
         # Update button
-        ttk.Button(update_frame, text="🔑 Update Key on Vercel", command=self.update_vercel_key).pack(pady=10)
+        update_buttons = ttk.Frame(update_frame)
+        update_buttons.pack(pady=10)
+        ttk.Button(update_buttons, text="🔑 Update Key on Vercel", command=self.update_vercel_key).pack(side=tk.LEFT, padx=5)
+        ttk.Button(update_buttons, text="📦 Bulk Rotate from File...",
+                  command=self.bulk_rotate_env).pack(side=tk.LEFT, padx=5)
 
         # Quick Links Section
         links_frame = ttk.LabelFrame(parent, text="Quick Links - Where to Get New Keys", padding=10)
@@ -517,11 +637,14 @@ class PublishManager:
             )
             return
 
+        backup_store = self.backend_dir / "backups" / "store"
+
         # Confirm backup
         if not messagebox.askyesno(
             "Backup Database",
-            "This will create a backup of all Strapi collections.\n\n" +
-            "Backup will be saved to:\nbackend/backups/[date]/\n\n" +
+            "This will snapshot all Strapi collections and uploads.\n\n" +
+            "Only entries and files changed since the last snapshot are stored, in:\n" +
+            "backend/backups/store/\n\n" +
             "Continue?"
         ):
             return
@@ -530,64 +653,68 @@ class PublishManager:
 
         # Run backup in a separate thread to avoid blocking UI
         def run_backup():
-            try:
-                # Run the backup script with UTF-8 encoding
-                result = subprocess.run(
-                    ["node", "scripts/backup.js"],
-                    cwd=self.backend_dir,
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',  # Replace invalid characters instead of failing
-                    timeout=60
-                )
-
-                # Display output in logs
-                output = result.stdout
-                self.root.after(0, lambda o=output: self.log(o))
+            from publishing.backup import create_snapshot, format_snapshot_summary
+            from publishing.strapi import StrapiError
 
-                if result.returncode == 0:
-                    # Parse the output to find backup location
-                    backup_path = None
-                    for line in output.split('\n'):
-                        if 'Backup directory:' in line:
-                            backup_path = line.split('Backup directory:')[1].strip()
-                            break
-
-                    success_msg = "✅ Database backup completed successfully!"
-                    if backup_path:
-                        success_msg += f"\n\nLocation: {backup_path}"
-
-                    self.root.after(0, lambda msg=success_msg: messagebox.showinfo(
-                        "Backup Complete",
-                        msg
-                    ))
-                else:
-                    error_msg = result.stderr if result.stderr else "Unknown error"
-                    self.root.after(0, lambda err=error_msg: self.log(f"❌ Backup failed: {err}"))
-                    self.root.after(0, lambda err=error_msg: messagebox.showerror(
-                        "Backup Failed",
-                        f"Backup failed with error:\n{err}"
-                    ))
-
-            except subprocess.TimeoutExpired:
-                self.root.after(0, lambda: self.log("❌ Backup timed out after 60 seconds"))
-                self.root.after(0, lambda: messagebox.showerror(
-                    "Backup Timeout",
-                    "Backup process timed out. This may indicate a large database or connection issues."
-                ))
-            except Exception as e:
+            try:
+                manifest = create_snapshot(self.strapi_url, backup_store,
+                                           token=self.get_local_env_value('STRAPI_API_TOKEN'), log=self.log)
+            except (StrapiError, OSError) as e:
                 error_str = str(e)
-                self.root.after(0, lambda err=error_str: self.log(f"❌ Backup error: {err}"))
+                self.root.after(0, lambda err=error_str: self.log(f"❌ Backup failed: {err}"))
                 self.root.after(0, lambda err=error_str: messagebox.showerror(
-                    "Backup Error",
-                    f"An error occurred during backup:\n{err}"
+                    "Backup Failed",
+                    f"Backup failed with error:\n{err}"
                 ))
+                return
+
+            summary = format_snapshot_summary(manifest)
+            self.root.after(0, lambda o=summary: self.log(o))
+            self.check_backup(backup_store, manifest['id'])
+            if manifest['partial']:
+                failed_msg = (f"❌ Database backup is incomplete!\n\n"
+                              f"Not backed up: {', '.join(manifest['errors'])} (see log)\n\n"
+                              f"Snapshot {manifest['id']} keeps the rest, but the next backup "
+                              f"will build on the last complete one.")
+                self.root.after(0, lambda msg=failed_msg: messagebox.showerror(
+                    "Backup Incomplete",
+                    msg
+                ))
+                return
+            success_msg = (f"✅ Database backup completed successfully!\n\n"
+                           f"Snapshot: {manifest['id']}\nLocation: {backup_store}")
+            self.root.after(0, lambda msg=success_msg: messagebox.showinfo(
+                "Backup Complete",
+                msg
+            ))
 
         # Start backup thread
         backup_thread = threading.Thread(target=run_backup, daemon=True)
         backup_thread.start()
 
+    def check_backup(self, backup_store, snapshot='latest'):
+        """Verify a snapshot and log what changed since the one before it; returns True if restorable"""
+        from publishing.backup import BackupStore
+        from publishing.backup_verify import (diff_snapshots, format_snapshot_diff, format_verify_report,
+                                              verify_snapshot)
+
+        try:
+            report = verify_snapshot(backup_store, snapshot)
+            self.log(format_verify_report(report))
+            earlier = [snap_id for snap_id in BackupStore(backup_store).snapshots() if snap_id < report['id']]
+            if earlier:
+                self.log(format_snapshot_diff(diff_snapshots(backup_store, earlier[-1], report['id'])))
+            return report['ok']
+        except (OSError, ValueError) as e:
+            self.log(f"❌ Could not verify backup: {e}")
+            return False
+
+    def verify_backup(self):
+        """Verify the newest backup snapshot in the background"""
+        backup_store = self.backend_dir / "backups" / "store"
+        self.log("🔍 Verifying latest backup...")
+        threading.Thread(target=self.check_backup, args=(backup_store,), daemon=True).start()
+
     def start_tunnel(self):
         """Start Cloudflare tunnel"""
         if self.tunnel_process is None or self.tunnel_process.poll() is not None:
@@ -665,8 +792,7 @@ class PublishManager:
         self.log("Starting image synchronization...")
 
         def sync_thread():
-            result = self.run_command("npm run sync-images")
-            if result and result.returncode == 0:
+            if self.run_image_sync():
                 self.sync_status.set("Complete")
                 self.log("Image sync completed successfully")
                 self.update_image_stats()
@@ -676,6 +802,144 @@ class PublishManager:
 
         threading.Thread(target=sync_thread, daemon=True).start()
 
+    def run_image_sync(self):
+        """Run sync-images and split the image map into per-product shards (blocking)"""
+        result = self.run_command("npm run sync-images")
+        if not result or result.returncode != 0:
+            return False
+
+        from publishing.hashed_assets import hash_image_filenames, write_legacy_image_map
+        from publishing.image_shards import write_image_map_shards
+        from publishing.placeholders import add_placeholders
+
+        public_dir = self.frontend_dir / "public"
+        image_cache = self.frontend_dir / ".publish-cache" / "images"
+
+        try:
+            hashed = hash_image_filenames(public_dir, image_cache, log=self.log)
+            self.log(f"✅ Hashed image names: {hashed['renamed']} new, {hashed['unchanged']} unchanged, "
+                     f"{hashed['removed']} old files removed")
+            with open(public_dir / "image-map.json", 'r', encoding='utf-8') as f:
+                write_legacy_image_map(self.frontend_dir / "image-map.json", json.load(f))
+        except (OSError, ValueError) as e:
+            self.log(f"⚠️ Could not hash image filenames: {e}")
+
+        try:
+            placeholders = add_placeholders(public_dir, image_cache, log=self.log)
+            self.log(f"✅ Blur placeholders: {placeholders['computed']} generated, "
+                     f"{placeholders['cached']} cached")
+        except (OSError, ValueError) as e:
+            self.log(f"⚠️ Could not generate blur placeholders: {e}")
+
+        try:
+            shards = write_image_map_shards(public_dir, log=self.log)
+            if not shards['skipped']:
+                self.log(f"✅ Image map shards: {shards['changed']} written, {shards['removed']} removed "
+                         f"({shards['products']} products)")
+        except (OSError, ValueError) as e:
+            self.log(f"⚠️ Could not write image map shards: {e}")
+        return True
+
+    def toggle_webhook_listener(self):
+        """Start or stop the local Strapi webhook listener"""
+        from publishing.strapi_webhooks import StrapiWebhookListener
+
+        if not self.webhook_listen_var.get():
+            if self.webhook_listener:
+                self.webhook_listener.stop()
+                self.webhook_listener = None
+                self.log("🪝 Stopped listening for Strapi webhooks")
+            self.webhook_status.set("Off")
+            return
+
+        secret = self.get_local_env_value('STRAPI_WEBHOOK_SECRET')
+        if not secret:
+            # The listener deletes product folders, so it never runs unauthenticated
+            secret = secrets.token_urlsafe(32)
+            try:
+                self.env_store.set('STRAPI_WEBHOOK_SECRET', secret)
+            except OSError as e:
+                self.webhook_listen_var.set(False)
+                self.log(f"❌ Could not save STRAPI_WEBHOOK_SECRET to .env.local: {e}")
+                return
+            self.log("🔑 Generated STRAPI_WEBHOOK_SECRET in .env.local - add it to the Strapi webhook "
+                     "as an Authorization header")
+
+        try:
+            self.webhook_listener = StrapiWebhookListener(
+                self.run_targeted_sync,
+                self.frontend_dir / "public",
+                secret=secret,
+                port=self.webhook_port_var.get(),
+                log=self.log,
+            ).start()
+        except (OSError, ValueError, tk.TclError) as e:
+            self.webhook_listen_var.set(False)
+            self.log(f"❌ Could not start webhook listener: {e}")
+            return
+        self.webhook_status.set("✅ Listening")
+        self.save_config()
+        self.log(f"🪝 Listening for Strapi webhooks at {self.webhook_listener.url}")
+        self.log("💡 Add it in Strapi under Settings > Webhooks (entry and media events), with an "
+                 "Authorization header set to STRAPI_WEBHOOK_SECRET")
+
+    def run_targeted_sync(self, slugs, export, full_export):
+        """Sync just the products a batch of webhooks touched (runs on the listener's thread)"""
+        from publishing.strapi_webhooks import format_sync_summary, targeted_sync
+
+        self.root.after(0, self.sync_status.set, "Syncing changes...")
+        try:
+            summary = targeted_sync(
+                self.strapi_url,
+                self.frontend_dir,
+                slugs,
+                export=export,
+                full_export=full_export,
+                token=self.get_local_env_value('STRAPI_API_TOKEN'),
+                log=self.log,
+            )
+        except Exception:
+            self.root.after(0, self.sync_status.set, "Targeted sync failed")
+            raise
+        self.log(format_sync_summary(summary))
+        self.root.after(0, self.sync_status.set, "Complete")
+        self.root.after(0, self.update_image_stats)
+
+    def export_products(self):
+        """Export products and site settings from Strapi"""
+        self.sync_status.set("Exporting...")
+
+        def export_thread():
+            if self.run_product_export():
+                self.sync_status.set("Export Complete")
+            else:
+                self.sync_status.set("Export Failed")
+
+        threading.Thread(target=export_thread, daemon=True).start()
+
+    def run_product_export(self):
+        """Write public/products-data.json and site-settings.json (blocking)"""
+        from publishing.export import export_catalog
+        from publishing.strapi import StrapiError
+
+        try:
+            result = export_catalog(
+                self.strapi_url,
+                self.frontend_dir / "public",
+                token=self.get_local_env_value('STRAPI_API_TOKEN'),
+                cache_dir=self.frontend_dir / ".publish-cache" / "export",
+                log=self.log,
+            )
+            self.log(f"📦 Export took {result['seconds']:.1f}s "
+                     f"({result['requests']} requests, {result['bytes'] / 1024:.0f} KB)")
+            return True
+        except StrapiError as e:
+            self.log(f"❌ Failed to export products: {e}")
+            self.log("⚠️ Keeping existing products-data.json")
+        except Exception as e:
+            self.log(f"❌ Product export error: {e}")
+        return False
+
     def get_current_branch(self):
         """Get current git branch"""
         result = self.run_command("git branch --show-current")
@@ -723,38 +987,22 @@ class PublishManager:
 
         def merge_thread():
             self.log("🔄 Merging develop to main...")
-
-            # Switch to main
-            self.run_command("git checkout main 2>/dev/null || git checkout master")
-
-            # Pull latest
-            self.run_command("git pull origin main 2>/dev/null || git pull origin master")
-
-            # Merge develop
-            merge_result = self.run_command("git merge develop")
-            if merge_result and merge_result.returncode == 0:
+            if self.promote_develop_to_main("Merge develop into main"):
                 self.log("✅ Successfully merged develop to main")
-
-                # Push to main
-                push_result = self.run_command("git push origin main 2>/dev/null || git push origin master")
-                if push_result and push_result.returncode == 0:
-                    self.log("✅ Pushed merged changes to main")
-                else:
-                    self.log("⚠️ Merge successful but push failed")
+                self.log("✅ Pushed merged changes to main")
             else:
                 self.log("❌ Failed to merge develop to main - check for conflicts")
 
-            self.get_current_branch()
-
         threading.Thread(target=merge_thread, daemon=True).start()
 
     def develop_workflow(self):
         """Run the develop workflow: sync images, commit to develop, deploy develop"""
         if not messagebox.askyesno("Preview Workflow",
-                                  "This will:\n1. Switch to develop branch\n2. Sync images from Strapi\n3. Commit and push to develop\n4. Deploy to develop\n\nContinue?"):
+                                  "This will:\n1. Switch to develop branch\n2. Sync images and export products from Strapi\n3. Commit and push to develop\n4. Deploy to develop\n\nContinue?"):
             return
 
         def develop_thread():
+            published_at = time.time()
             self.log("=== Starting Preview Workflow ===")
 
             # 1. Switch to develop
@@ -764,17 +1012,18 @@ class PublishManager:
 
             # 2. Sync images
             self.log("Step 2: Syncing images from Strapi...")
-            sync_result = self.run_command("npm run sync-images")
-            if sync_result and sync_result.returncode == 0:
+            if self.run_image_sync():
                 self.log("✅ Images synced successfully")
             else:
                 self.log("⚠️ Image sync may have failed")
 
+            self.log("Exporting product data...")
+            if not self.run_product_export():
+                self.log("⚠️ Product export failed - continuing with existing products-data.json")
+
             # 3. Commit and push to develop
             self.log("Step 3: Committing changes to develop...")
-            self.run_command("git add .")
-            commit_result = self.run_command('git commit -m "Sync images and content updates for develop"')
-            if commit_result and commit_result.returncode == 0:
+            if self.commit_publish_output("Sync images and content updates for develop"):
                 push_result = self.run_command("git push origin develop")
                 if push_result and push_result.returncode == 0:
                     self.log("✅ Changes pushed to develop branch")
@@ -783,9 +1032,9 @@ class PublishManager:
             else:
                 self.log("ℹ️ No changes to commit or already up to date")
 
-            # 4. Deploy to develop
+            # 4. Deploy to develop, unless nothing changed since the last deploy
             self.log("Step 4: Deploying to develop...")
-            self.deploy_develop()
+            self.deploy_develop(if_changed=True, published_at=published_at)
 
             self.log("=== Preview Workflow Complete ===")
             self.log("🔍 Check Vercel dashboard for develop URL!")
@@ -799,16 +1048,22 @@ class PublishManager:
             return
 
         def production_thread():
+            published_at = time.time()
             self.log("=== Starting Production Pipeline ===")
 
+            if not self.run_preflight('production', action='promote'):
+                self.log("❌ Production pipeline stopped - fix the failed checks first")
+                return
+
             # 1. Merge develop to main
             self.log("Step 1: Merging develop to main...")
-            self.merge_develop_to_main()
-            time.sleep(3)  # Wait for merge to complete
+            if not self.promote_develop_to_main("Merge develop into main"):
+                self.log("❌ Production pipeline stopped - main was not updated")
+                return
 
             # 2. Deploy to production
             self.log("Step 2: Deploying to production...")
-            self.deploy_production()
+            self.deploy_production(if_changed=True, published_at=published_at)
 
             self.log("=== Production Pipeline Complete ===")
             self.log("🌍 Your changes are now live at tysondrawsstuff.com!")
@@ -818,29 +1073,7 @@ class PublishManager:
     def update_local_env(self, tunnel_url):
         """Update local .env.local file with tunnel URL"""
         try:
-            env_file = self.frontend_dir / ".env.local"
-
-            # Read existing env file or create new
-            env_lines = []
-            if env_file.exists():
-                with open(env_file, 'r') as f:
-                    env_lines = f.readlines()
-
-            # Update or add NEXT_PUBLIC_STRAPI_URL
-            found = False
-            for i, line in enumerate(env_lines):
-                if line.startswith('NEXT_PUBLIC_STRAPI_URL='):
-                    env_lines[i] = f'NEXT_PUBLIC_STRAPI_URL={tunnel_url}\n'
-                    found = True
-                    break
-
-            if not found:
-                env_lines.append(f'NEXT_PUBLIC_STRAPI_URL={tunnel_url}\n')
-
-            # Write back to file
-            with open(env_file, 'w') as f:
-                f.writelines(env_lines)
-
+            self.env_store.set('NEXT_PUBLIC_STRAPI_URL', tunnel_url)
             self.log(f"✅ Auto-updated local .env.local with tunnel URL")
         except Exception as e:
             self.log(f"⚠️ Could not auto-update .env.local: {e}")
@@ -859,29 +1092,7 @@ class PublishManager:
 
             # 1. Update local .env.local file
             try:
-                env_file = self.frontend_dir / ".env.local"
-
-                # Read existing env file or create new
-                env_lines = []
-                if env_file.exists():
-                    with open(env_file, 'r') as f:
-                        env_lines = f.readlines()
-
-                # Update or add NEXT_PUBLIC_STRAPI_URL
-                found = False
-                for i, line in enumerate(env_lines):
-                    if line.startswith('NEXT_PUBLIC_STRAPI_URL='):
-                        env_lines[i] = f'NEXT_PUBLIC_STRAPI_URL={self.tunnel_url}\n'
-                        found = True
-                        break
-
-                if not found:
-                    env_lines.append(f'NEXT_PUBLIC_STRAPI_URL={self.tunnel_url}\n')
-
-                # Write back to file
-                with open(env_file, 'w') as f:
-                    f.writelines(env_lines)
-
+                self.env_store.set('NEXT_PUBLIC_STRAPI_URL', self.tunnel_url)
                 self.log(f"✅ Updated local .env.local file")
                 success_count += 1
             except Exception as e:
@@ -895,6 +1106,7 @@ class PublishManager:
                 )
                 if result and result.returncode == 0:
                     self.log("✅ Updated Vercel environment variable")
+                    self.env_snapshot_cache.invalidate()
                     success_count += 1
                 else:
                     self.log("❌ Failed to update Vercel (check VERCEL_TOKEN in .env.local)")
@@ -914,8 +1126,13 @@ class PublishManager:
 
         threading.Thread(target=update_thread, daemon=True).start()
 
-    def deploy_develop(self):
-        """Deploy to develop (develop branch)"""
+    def deploy_develop(self, if_changed=False, published_at=None, force=False):
+        """Deploy to develop (develop branch)
+
+        With `if_changed` an unchanged deploy is skipped; otherwise the user is asked,
+        unless `force` (the change is on Vercel, where the fingerprint can't see it).
+        `published_at` is when the publish began, for the publish -> live metric.
+        """
         deploy_hook = self.get_vercel_deploy_hook('develop')
 
         if not deploy_hook:
@@ -926,16 +1143,25 @@ class PublishManager:
             self.log("3. Add VERCEL_DEPLOY_HOOK_PREVIEW=<url> to frontend/.env.local")
             return
 
-        self.deploy_status.set("Deploying Preview...")
-        self.log("🔍 Triggering develop deployment (develop branch)...")
+        snapshot = self.confirm_deploy_needed('develop', if_changed, force)
+        if snapshot is None:
+            return
 
         def develop_deploy_thread():
+            published_at = self.publish_started.pop('develop', None)
+            self.deploy_status.set("Deploying Preview...")
+            self.log("🔍 Triggering develop deployment (develop branch)...")
+            if not self.run_preflight('preview', action='deploy'):
+                self.deploy_status.set("Preflight Failed")
+                return
             try:
+                triggered_at = time.time()
                 response = requests.post(deploy_hook, timeout=10)
                 if response.status_code in [200, 201, 202]:
                     self.deploy_status.set("Preview Triggered")
                     self.log("✅ Preview deployment triggered successfully!")
-                    self.log("Check Vercel dashboard for develop URL")
+                    self.record_deploy('develop', snapshot)
+                    self.watch_deploy('develop', 'develop', "Preview", triggered_at, published_at)
                 else:
                     self.deploy_status.set("Preview Failed")
                     self.log(f"❌ Failed to trigger develop: HTTP {response.status_code}")
@@ -943,10 +1169,15 @@ class PublishManager:
                 self.deploy_status.set("Preview Error")
                 self.log(f"❌ Error triggering develop deployment: {e}")
 
-        threading.Thread(target=develop_deploy_thread, daemon=True).start()
+        self.schedule_deploy('develop', develop_deploy_thread, "Preview", published_at)
+
+    def deploy_production(self, if_changed=False, published_at=None, force=False):
+        """Deploy to production (main branch)
 
-    def deploy_production(self):
-        """Deploy to production (main branch)"""
+        With `if_changed` an unchanged deploy is skipped; otherwise the user is asked,
+        unless `force` (the change is on Vercel, where the fingerprint can't see it).
+        `published_at` is when the publish began, for the publish -> live metric.
+        """
         deploy_hook = self.get_vercel_deploy_hook('production')
 
         if not deploy_hook:
@@ -957,21 +1188,32 @@ class PublishManager:
             self.log("3. Add VERCEL_DEPLOY_HOOK_PRODUCTION=<url> to frontend/.env.local")
             return
 
+        snapshot = self.confirm_deploy_needed('production', if_changed, force)
+        if snapshot is None:
+            return
+
         # Confirm production deployment
         if not messagebox.askyesno("Production Deployment",
                                   "⚠️ This will deploy to LIVE PRODUCTION site!\n\nAre you sure you want to continue?"):
             return
 
-        self.deploy_status.set("Deploying Production...")
-        self.log("🚀 Triggering production deployment (main branch)...")
-
         def production_deploy_thread():
+            published_at = self.publish_started.pop('production', None)
+            self.deploy_status.set("Deploying Production...")
+            self.log("🚀 Triggering production deployment (main branch)...")
+            if not self.run_preflight('production', action='deploy'):
+                self.deploy_status.set("Preflight Failed")
+                return
             try:
+                triggered_at = time.time()
                 response = requests.post(deploy_hook, timeout=10)
                 if response.status_code in [200, 201, 202]:
                     self.deploy_status.set("Production Triggered")
                     self.log("✅ Production deployment triggered successfully!")
+                    self.record_deploy('production', snapshot)
                     self.log("🌍 Your changes will be live at tysondrawsstuff.com in a few minutes")
+                    self.watch_deploy('production', self.production_branch(), "Production",
+                                      triggered_at, published_at)
                 else:
                     self.deploy_status.set("Production Failed")
                     self.log(f"❌ Failed to trigger production: HTTP {response.status_code}")
@@ -979,7 +1221,222 @@ class PublishManager:
                 self.deploy_status.set("Production Error")
                 self.log(f"❌ Error triggering production deployment: {e}")
 
-        threading.Thread(target=production_deploy_thread, daemon=True).start()
+        self.schedule_deploy('production', production_deploy_thread, "Production", published_at)
+
+    def schedule_deploy(self, environment, deploy, label, published_at=None):
+        """Queue `deploy` behind the quiet window; a newer call replaces a queued one"""
+        # A coalesced build is measured from the earliest publish it carries
+        self.publish_started.setdefault(environment, published_at or time.time())
+        try:
+            quiet_seconds = max(0, int(self.deploy_quiet_var.get()))
+        except (tk.TclError, ValueError):
+            quiet_seconds = 0
+        if self.deploy_scheduler.trigger(environment, deploy, quiet_seconds=quiet_seconds):
+            self.deploy_status.set(f"{label} Queued")
+
+    def run_scheduled_deploy(self, environment, deploy, triggers):
+        """DeployScheduler callback: one hook call for every coalesced trigger"""
+        if triggers > 1:
+            self.log(f"🧩 {triggers} {environment} deploy triggers coalesced into one build")
+        deploy()
+
+    def watch_deploy(self, environment, branch, label, triggered_at, published_at=None):
+        """Follow a triggered deployment until it is live and record publish -> live (blocking)"""
+        from publishing.deploy_watch import (READY, DeployMetrics, VercelDeploymentClient,
+                                             format_deploy_metrics, watch_deployment)
+        from publishing.fingerprint import DeployLedger
+        from publishing.stats import format_duration
+
+        token = self.get_local_env_value('VERCEL_TOKEN')
+        project_id = self.get_local_env_value('VERCEL_PROJECT_ID')
+        if not token or not project_id:
+            self.log("ℹ️ Add VERCEL_TOKEN and VERCEL_PROJECT_ID to .env.local to track deploys until live")
+            return
+
+        metrics = DeployMetrics(self.frontend_dir / ".publish-cache" / "deploy-metrics.jsonl")
+        client = VercelDeploymentClient(token, project_id, self.get_local_env_value('VERCEL_TEAM_ID'))
+        try:
+            result = watch_deployment(client, environment, branch, triggered_at, published_at,
+                                      expected=metrics.expected_build_seconds(environment), log=self.log)
+        finally:
+            client.close()
+
+        metrics.record(result)
+        if result['state'] == READY:
+            DeployLedger(self.frontend_dir / ".publish-cache" / "deploys.json").update(
+                environment, liveAt=time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(result['liveAt'])),
+                url=result['url'])
+            self.deploy_status.set(f"{label} Live ({format_duration(result['publishToLive'])})")
+            self.log(f"🌐 {label} live at https://{result['url']} - "
+                     f"{format_duration(result['publishToLive'])} from publish, "
+                     f"{format_duration(result['hookToLive'])} from the deploy hook")
+            if environment == 'production':
+                self.run_cache_warm()
+        else:
+            self.deploy_status.set(f"{label} {result['state'].title()}")
+            self.log(f"❌ {label} deployment ended {result['state']}"
+                     + (f": {result['error']}" if result['error'] else ""))
+        for line in format_deploy_metrics(metrics.summary()).splitlines():
+            self.log(line)
+
+    def warm_cache(self):
+        """Warm the production CDN cache now"""
+        threading.Thread(target=self.run_cache_warm, daemon=True).start()
+
+    def run_cache_warm(self, base_url=None):
+        """Request every sitemap page and image on the live site (blocking)"""
+        from publishing.warm import PRODUCTION_URL, format_warm_report, warm_cache
+
+        try:
+            result = warm_cache(base_url or PRODUCTION_URL, self.frontend_dir / "public",
+                                legacy_map=self.frontend_dir / "image-map.json", log=self.log)
+        except Exception as e:
+            self.log(f"❌ Cache warm-up failed: {e}")
+            return
+        for line in format_warm_report(result, slowest=5).splitlines():
+            self.log(line)
+
+    def load_test(self):
+        """Load test the last `npm run build` on a local server, with Stripe stubbed"""
+        if not messagebox.askyesno("Load Test",
+                                  "This will start the last production build (npm run build) on port 3100 "
+                                  "with Stripe pointed at a local stub, then run 20 users against shop, "
+                                  "category, product and checkout pages for 30 seconds.\n\nContinue?"):
+            return
+
+        def load_test_thread():
+            from publishing.loadtest import (LoadTestHistory, format_load_report, run_load_test,
+                                             start_next_server, stop_next_server)
+            from publishing.stripe_stub import StripeStub
+
+            history = LoadTestHistory(self.frontend_dir / ".publish-cache" / "loadtests.jsonl")
+            try:
+                with StripeStub(latency_seconds=0.15) as stripe:
+                    server = start_next_server(self.frontend_dir, 3100, stripe.url, log=self.log)
+                    try:
+                        run = run_load_test("http://127.0.0.1:3100", self.frontend_dir / "public", log=self.log)
+                    finally:
+                        stop_next_server(server)
+            except Exception as e:
+                self.log(f"❌ Load test failed: {e}")
+                return
+
+            for line in format_load_report(run, history.previous(run)).splitlines():
+                self.log(line)
+            history.record(run)
+
+        threading.Thread(target=load_test_thread, daemon=True).start()
+
+    def webhook_bench(self):
+        """Replay signed Stripe events at the webhook routes of the last local build"""
+        if not messagebox.askyesno("Webhook Bench",
+                                  "This will start the last production build (npm run build) on port 3100 "
+                                  "with Stripe, Strapi and email pointed at local stand-ins, then send 5 signed "
+                                  "checkout events per second to both webhook routes for 30 seconds.\n\nContinue?"):
+            return
+
+        def webhook_bench_thread():
+            from publishing.loadtest import start_next_server, stop_next_server
+            from publishing.smtp_sink import SMTPSink
+            from publishing.standin import StrapiStandIn
+            from publishing.stripe_stub import StripeStub
+            from publishing.webhook_bench import (WebhookBenchHistory, bench_server_env, format_webhook_report,
+                                                  run_webhook_bench)
+
+            # The server is started with the same secret, so a fresh one works when none is configured
+            secret = self.get_local_env_value('STRIPE_WEBHOOK_SECRET') or f"whsec_bench_{os.urandom(16).hex()}"
+            try:
+                with SMTPSink() as sink, StripeStub(latency_seconds=0.15) as stripe, \
+                        StrapiStandIn(self.frontend_dir) as strapi, tempfile.TemporaryDirectory() as scratch:
+                    env = bench_server_env(secret, sink.port, strapi.url, Path(scratch) / "orders.json")
+                    server = start_next_server(self.frontend_dir, 3100, stripe.url, log=self.log, env=env)
+                    try:
+                        run = run_webhook_bench("http://127.0.0.1:3100", secret, self.frontend_dir / "public",
+                                                stripe_stub=stripe, smtp_sink=sink, strapi=strapi, log=self.log)
+                    finally:
+                        stop_next_server(server)
+            except Exception as e:
+                self.log(f"❌ Webhook bench failed: {e}")
+                return
+
+            for line in format_webhook_report(run).splitlines():
+                self.log(line)
+            WebhookBenchHistory(self.frontend_dir / ".publish-cache" / "webhook-bench.jsonl").record(run)
+
+        threading.Thread(target=webhook_bench_thread, daemon=True).start()
+
+    def deploy_queued_now(self):
+        """Skip the rest of the quiet window for every queued deploy"""
+        if not self.deploy_scheduler.flush():
+            self.log("ℹ️ No deploys queued")
+
+    def cancel_queued_deploys(self):
+        """Drop every queued deploy"""
+        dropped = self.deploy_scheduler.cancel()
+        self.publish_started.clear()
+        if dropped:
+            self.deploy_status.set("Ready")
+            self.log(f"🛑 Cancelled {dropped} queued deploy(s)")
+        else:
+            self.log("ℹ️ No deploys queued")
+
+    def production_branch(self):
+        """main, or master for repositories that never renamed it"""
+        from publishing.gitops import production_branch
+
+        return production_branch(self.frontend_dir)
+
+    def confirm_deploy_needed(self, environment, if_changed=False, force=False):
+        """Compare what would be deployed with the last accepted deploy
+
+        Returns (fingerprint, components) to record once the hook succeeds,
+        or None when the deploy should not go ahead. Unchanged deploys are
+        skipped with `if_changed`, go ahead with `force`, otherwise the user decides.
+        """
+        from publishing.fingerprint import DEPLOY_ENV_KEYS, DeployLedger, check_deploy_needed
+        from publishing.gitops import GitError
+
+        ledger = DeployLedger(self.frontend_dir / ".publish-cache" / "deploys.json")
+        env_values = self.env_store.values(DEPLOY_ENV_KEYS)
+        try:
+            needed, fingerprint, components, changes = check_deploy_needed(
+                self.frontend_dir, environment, env_values, ledger)
+        except (GitError, OSError) as e:
+            self.log(f"⚠️ Could not fingerprint the {environment} deploy: {e}")
+            return (None, None)
+
+        if needed:
+            self.log(f"📦 {environment} changes since the last deploy: {', '.join(changes)}")
+            return (fingerprint, components)
+
+        if force:
+            return (fingerprint, components)
+
+        last = ledger.last(environment)
+        self.log(f"ℹ️ Nothing changed since the last {environment} deploy ({last['deployedAt']}, "
+                 f"{components['ref']} {(components['tree'] or '')[:8]})")
+        if if_changed:
+            self.log(f"⏭️ Skipping {environment} deploy")
+            return None
+        if not messagebox.askyesno("Nothing Changed",
+                                   f"The {environment} site was last deployed from exactly this code, "
+                                   f"content and environment ({last['deployedAt']}).\n\nDeploy anyway?"):
+            self.log(f"ℹ️ {environment} deploy cancelled")
+            return None
+        return (fingerprint, components)
+
+    def record_deploy(self, environment, snapshot):
+        """Remember an accepted deploy hook call for confirm_deploy_needed()"""
+        from publishing.fingerprint import DeployLedger
+
+        fingerprint, components = snapshot
+        if fingerprint is None:
+            return
+        try:
+            DeployLedger(self.frontend_dir / ".publish-cache" / "deploys.json").record(
+                environment, fingerprint, components)
+        except OSError as e:
+            self.log(f"⚠️ Could not record the {environment} deploy: {e}")
 
     def trigger_deploy(self):
         """Legacy method - redirect to production deploy"""
@@ -987,21 +1444,16 @@ class PublishManager:
 
     def get_vercel_deploy_hook(self, environment='develop'):
         """Get Vercel Deploy Hook URL from frontend/.env.local"""
-        try:
-            env_file = self.frontend_dir / ".env.local"
-            if not env_file.exists():
-                return None
+        # Look for environment-specific hook first
+        hook_key = f'VERCEL_DEPLOY_HOOK_{environment.upper()}'
+        return self.get_local_env_value(hook_key)
 
-            # Look for environment-specific hook first
-            hook_key = f'VERCEL_DEPLOY_HOOK_{environment.upper()}'
-
-            with open(env_file, 'r') as f:
-                for line in f:
-                    if line.startswith(f'{hook_key}='):
-                        return line.split('=', 1)[1].strip()
+    def get_local_env_value(self, key):
+        """Read a single value from frontend/.env.local"""
+        try:
+            return self.env_store.get(key)
         except Exception as e:
-            self.log(f"⚠️ Error reading deploy hook: {e}")
-
+            self.log(f"⚠️ Error reading {key} from .env.local: {e}")
         return None
 
     def switch_to_develop_from_deploy(self):
@@ -1041,69 +1493,77 @@ class PublishManager:
 
         def promote_thread():
             try:
-                # Check for uncommitted changes first
-                status_result = self.run_command("git status --porcelain", cwd=self.frontend_dir)
-                if status_result and status_result.stdout.strip():
-                    self.log("⚠️ You have uncommitted changes!")
-                    self.log("❌ Please commit or stash your changes before promoting")
-                    self.log("💡 Run 'git status' to see uncommitted files")
-                    return
-
-                # Make sure we're on develop branch
-                self.run_command("git checkout develop", cwd=self.frontend_dir)
-
-                # Pull latest
-                self.run_command("git pull origin develop", cwd=self.frontend_dir)
-
-                # Checkout main
-                result = self.run_command("git checkout main", cwd=self.frontend_dir)
-                if result and result.returncode != 0:
-                    self.log("❌ Failed to checkout main branch")
-                    # Always try to get back to develop
-                    self.run_command("git checkout develop", cwd=self.frontend_dir)
+                # All checks up front, before anything is merged or pushed
+                if not self.run_preflight('production', action='promote'):
+                    self.log("❌ Promotion cancelled - fix the failed checks first")
                     return
 
-                # Pull latest main
-                self.run_command("git pull origin main", cwd=self.frontend_dir)
-
-                # Merge develop into main (use double quotes for Windows compatibility)
-                result = self.run_command('git merge develop -m "Promote develop to production"', cwd=self.frontend_dir)
-                if result and result.returncode != 0:
-                    self.log("❌ Failed to merge develop into main")
-                    self.log("⚠️ You may need to resolve conflicts manually")
-                    # Always switch back to develop
-                    self.run_command("git checkout develop", cwd=self.frontend_dir)
-                    return
-
-                # Push to main
-                result = self.run_command("git push origin main", cwd=self.frontend_dir)
-                if result and result.returncode == 0:
+                # Merge and push without checking out main here
+                if self.promote_develop_to_main("Promote develop to production"):
                     self.log("✅ Successfully promoted to production!")
                     self.log("🚀 Production deployment will start automatically")
                     self.log("📊 Check Vercel dashboard for progress")
                 else:
-                    self.log("❌ Failed to push to main branch")
-
-                # ALWAYS switch back to develop branch, no matter what
-                self.run_command("git checkout develop", cwd=self.frontend_dir)
-                self.log("🔄 Switched back to develop branch")
-
-                # Update branch display
-                self.update_branch_display()
+                    self.log("⚠️ You may need to resolve conflicts manually")
 
             except Exception as e:
                 self.log(f"❌ Error during promotion: {e}")
-                # Even on exception, try to get back to develop
-                try:
-                    self.run_command("git checkout develop", cwd=self.frontend_dir)
-                    self.log("🔄 Switched back to develop branch")
-                    self.update_branch_display()
-                except:
-                    self.log("⚠️ Could not switch back to develop - please check branch manually")
-                    self.update_branch_display()
 
         threading.Thread(target=promote_thread, daemon=True).start()
 
+    def preflight(self):
+        """Show the promotion preflight table without changing anything"""
+        threading.Thread(target=lambda: self.run_preflight('production', action='promote'), daemon=True).start()
+
+    def run_preflight(self, environment, action='promote'):
+        """Run every preflight check at once and show the table; returns True on go (blocking)"""
+        from publishing.preflight import format_preflight, run_preflight, standard_checks
+
+        self.log("✈️ Running preflight checks...")
+        # deploy_develop() reads VERCEL_DEPLOY_HOOK_DEVELOP for the preview hook
+        hook_env = 'develop' if environment == 'preview' else environment
+        result = run_preflight(standard_checks(
+            self.frontend_dir,
+            hook_env,
+            self.get_vercel_deploy_hook(hook_env),
+            self.strapi_url,
+            self.tunnel_url,
+            action=action,
+            target=self.production_branch(),
+        ))
+        table = format_preflight(result)
+        for line in table.splitlines():
+            self.log(line)
+
+        def show_table():
+            self.git_status_text.delete(1.0, tk.END)
+            self.git_status_text.insert(tk.END, table)
+
+        self.root.after(0, show_table)
+        return result['go']
+
+    def promote_develop_to_main(self, message):
+        """Merge develop into main on origin without touching the working tree (blocking)"""
+        from publishing.gitops import GitError, promote_branch
+
+        target = self.production_branch()
+
+        try:
+            result = promote_branch(
+                self.frontend_dir,
+                source='develop',
+                target=target,
+                worktree_dir=self.frontend_dir / ".publish-cache" / "worktrees" / target,
+                message=message,
+                log=self.log,
+            )
+        except GitError as e:
+            self.log(f"❌ Promotion failed: {e}")
+            return False
+        if result['mode'] == 'up-to-date':
+            self.log(f"ℹ️ {target} is already up to date with develop")
+        return True
+
     def view_image_map(self):
         """View current image mapping"""
         try:
@@ -1125,6 +1585,29 @@ class PublishManager:
         except Exception as e:
             self.log(f"Error viewing image map: {e}")
 
+    def find_duplicates(self):
+        """Report near-identical images filed under unrelated products"""
+        from publishing.duplicates import find_near_duplicates, format_duplicate_report
+
+        def show_report(report):
+            self.duplicates_text.delete(1.0, tk.END)
+            self.duplicates_text.insert(1.0, report)
+
+        def duplicates_thread():
+            try:
+                result = find_near_duplicates(self.frontend_dir / "public",
+                                              self.frontend_dir / ".publish-cache" / "images", log=self.log)
+            except (OSError, ValueError) as e:
+                self.log(f"❌ Near-duplicate check failed: {e}")
+                return
+            report = format_duplicate_report(result)
+            suspicious = sum(1 for c in result['clusters'] if c['suspicious'])
+            self.log(f"🔍 Near-duplicate check: {suspicious} suspicious groups")
+            self.root.after(0, lambda: show_report(report))
+
+        self.root.after(0, lambda: show_report("Checking..."))
+        threading.Thread(target=duplicates_thread, daemon=True).start()
+
     def copy_tunnel_url(self):
         """Copy tunnel URL to clipboard"""
         if self.tunnel_url and 'trycloudflare.com' in self.tunnel_url:
@@ -1135,35 +1618,37 @@ class PublishManager:
         else:
             self.log("⚠️ No tunnel URL available to copy")
 
-    def update_image_stats(self):
-        """Update image statistics display"""
-        try:
-            image_map_file = self.frontend_dir / "image-map.json"
-            with open(image_map_file, 'r') as f:
-                data = json.load(f)
+    def start_catalog_watcher(self):
+        """Watch public/products and image-map.json so the stats panel never goes stale"""
+        from publishing.fswatch import CatalogWatcher
 
-            products = data.get('products', {})
-            static = data.get('static', {})
-            last_sync = data.get('lastSync', 'Never')
-
-            total_products = len(products)
-            total_product_images = sum(len(images) for images in products.values())
-            total_static_assets = len(static)
-
-            stats = f"""Image Statistics:
-
-Products: {total_products}
-Product Images: {total_product_images}
-Static Assets: {total_static_assets}
-Total Images: {total_product_images + total_static_assets}
-
-Last Sync: {last_sync}
+        try:
+            self.catalog_watcher = CatalogWatcher(
+                self.frontend_dir,
+                on_change=lambda: self.root.after(0, self.update_image_stats),
+                log=self.log,
+            ).start()
+        except OSError as e:
+            self.log(f"⚠️ Could not watch product images: {e}")
+            return
+        self.log(f"👀 Watching product images ({self.catalog_watcher.backend})")
+        self.update_image_stats()
 
-Recent Products:"""
+    def update_image_stats(self):
+        """Update image statistics display"""
+        from publishing.fswatch import format_disk_stats
+        from publishing.image_map import format_image_stats, load_image_map, summarize_image_map
 
-            # Add last few products
-            for i, (slug, images) in enumerate(list(products.items())[-5:]):
-                stats += f"\n  • {slug} ({len(images)} images)"
+        try:
+            if self.catalog_watcher:
+                # Already current: the watcher reparses only what changed
+                summary = self.catalog_watcher.summary()
+                if summary['map'] is None:
+                    raise ValueError(summary['map_error'])
+                stats = format_image_stats(summary['map']) + "\n\n" + format_disk_stats(summary)
+            else:
+                data = load_image_map(self.frontend_dir / "image-map.json")
+                stats = format_image_stats(summarize_image_map(data))
 
             self.stats_text.delete(1.0, tk.END)
             self.stats_text.insert(tk.END, stats)
@@ -1172,6 +1657,17 @@ Recent Products:"""
             self.stats_text.delete(1.0, tk.END)
             self.stats_text.insert(tk.END, f"Error loading stats: {e}")
 
+    def commit_publish_output(self, message):
+        """Stage and commit only the files publishing wrote; returns True if committed"""
+        from publishing.gitops import GitError, commit_publish_output
+
+        self.log("Staging publish output...")
+        try:
+            return commit_publish_output(self.frontend_dir, message, log=self.log)
+        except GitError as e:
+            self.log(f"❌ Commit failed: {e}")
+            return False
+
     def git_status(self):
         """Show git status"""
         result = self.run_command("git status")
@@ -1191,12 +1687,8 @@ Recent Products:"""
             self.log(f"Committing and pushing changes to {current_branch}...")
 
             def git_thread():
-                # Add all changes
-                self.run_command("git add .")
-
-                # Commit
-                result = self.run_command(f'git commit -m "{commit_msg}"')
-                if result and result.returncode == 0:
+                # Commit only what the publishing stages wrote
+                if self.commit_publish_output(commit_msg):
                     # Push to current branch
                     push_result = self.run_command(f"git push origin {current_branch}")
                     if push_result and push_result.returncode == 0:
@@ -1227,8 +1719,7 @@ Recent Products:"""
 
                     # 3. Sync images
                     self.log("Step 3: Syncing images...")
-                    sync_result = self.run_command("npm run sync-images")
-                    if sync_result and sync_result.returncode == 0:
+                    if self.run_image_sync():
                         self.log("Images synced successfully")
 
                     # 4. Update Vercel (if tunnel URL available)
@@ -1238,9 +1729,7 @@ Recent Products:"""
 
                     # 5. Commit and push
                     self.log("Step 5: Committing changes...")
-                    self.run_command("git add .")
-                    commit_result = self.run_command('git commit -m "Automated image sync and deployment"')
-                    if commit_result and commit_result.returncode == 0:
+                    if self.commit_publish_output("Automated image sync and deployment"):
                         self.run_command("git push")
                         self.log("Changes pushed successfully")
 
@@ -1259,7 +1748,9 @@ Recent Products:"""
         """Save configuration to file"""
         try:
             config = {
-                'tunnel_url': self.tunnel_url if self.tunnel_url else None
+                'tunnel_url': self.tunnel_url if self.tunnel_url else None,
+                'deploy_quiet_seconds': self.deploy_quiet_var.get(),
+                'webhook_port': self.webhook_port_var.get(),
             }
             with open(self.config_file, 'w') as f:
                 json.dump(config, f, indent=2)
@@ -1272,6 +1763,10 @@ Recent Products:"""
             if self.config_file.exists():
                 with open(self.config_file, 'r') as f:
                     config = json.load(f)
+                    if 'deploy_quiet_seconds' in config:
+                        self.deploy_quiet_var.set(config['deploy_quiet_seconds'])
+                    if 'webhook_port' in config:
+                        self.webhook_port_var.set(config['webhook_port'])
                     saved_tunnel_url = config.get('tunnel_url')
                     if saved_tunnel_url:
                         self.tunnel_url = saved_tunnel_url
@@ -1314,24 +1809,79 @@ Recent Products:"""
             self.log(f"❌ Tunnel check failed: {e}")
 
     def launch_bulk_uploader(self):
-        """Launch the bulk image uploader tool"""
-        self.log("📸 Launching Bulk Image Uploader...")
-        uploader_path = self.frontend_dir / "tools" / "bulk-image-uploader.py"
+        """Show the built-in bulk uploader"""
+        self.notebook.select(self.upload_tab)
 
-        if not uploader_path.exists():
-            self.log(f"❌ Bulk uploader not found at: {uploader_path}")
-            return
+    def choose_upload_folder(self):
+        from tkinter import filedialog
+
+        folder = filedialog.askdirectory(title="Folder of artwork to upload")
+        if folder:
+            self.upload_folder_var.set(folder)
+            from publishing.uploader import find_artwork
+            self.upload_status.set(f"{len(find_artwork(folder))} images in folder")
+
+    def start_bulk_upload(self):
+        """Resize and upload every image in the chosen folder"""
+        from publishing.uploader import bulk_upload, format_upload_summary
 
+        folder = self.upload_folder_var.get().strip()
+        if not folder or not Path(folder).is_dir():
+            messagebox.showerror("Bulk Upload", "Choose a folder of images first.")
+            return
+        if self.upload_stop is not None:
+            return
         try:
-            # Launch in background without capturing output
-            import sys
-            python_exe = sys.executable
-            subprocess.Popen([python_exe, str(uploader_path)],
-                           cwd=self.frontend_dir / "tools",
-                           creationflags=subprocess.CREATE_NEW_CONSOLE if os.name == 'nt' else 0)
-            self.log("✅ Bulk Image Uploader launched in new window")
-        except Exception as e:
-            self.log(f"❌ Failed to launch uploader: {e}")
+            max_edge = self.upload_max_edge_var.get()
+            concurrency = self.upload_concurrency_var.get()
+        except tk.TclError:
+            messagebox.showerror("Bulk Upload", "Longest side and parallel uploads must be numbers.")
+            return
+
+        self.upload_stop = threading.Event()
+        self.upload_start_button.config(state=tk.DISABLED)
+        self.upload_status.set("Resizing and uploading...")
+
+        def progress(done, total):
+            def show():
+                self.upload_progress.config(maximum=max(total, 1), value=done)
+                self.upload_status.set(f"{done} of {total} images done")
+            self.root.after(0, show)
+
+        def upload_thread():
+            self.log(f"📸 Uploading images from {folder} to {self.strapi_url}...")
+            try:
+                summary = bulk_upload(
+                    folder,
+                    self.strapi_url,
+                    self.frontend_dir / ".publish-cache" / "uploads",
+                    token=self.get_local_env_value('STRAPI_API_TOKEN'),
+                    max_edge=max_edge,
+                    concurrency=concurrency,
+                    alt_text=self.upload_alt_var.get(),
+                    stop=self.upload_stop,
+                    progress=progress,
+                    log=self.log,
+                )
+                self.log(format_upload_summary(summary))
+                status = format_upload_summary(summary).splitlines()[0]
+            except Exception as e:
+                self.log(f"❌ Bulk upload failed: {e}")
+                status = f"❌ Upload failed: {e}"
+
+            def finish():
+                self.upload_status.set(status)
+                self.upload_start_button.config(state=tk.NORMAL)
+                self.upload_stop = None
+            self.root.after(0, finish)
+
+        threading.Thread(target=upload_thread, daemon=True).start()
+
+    def stop_bulk_upload(self):
+        """Stop after the uploads already in flight"""
+        if self.upload_stop is not None:
+            self.upload_stop.set()
+            self.upload_status.set("Stopping after the current uploads...")
 
     def load_config(self):
         """Load configuration and check initial status"""
@@ -1339,7 +1889,7 @@ Recent Products:"""
         self.log("=" * 50)
         self.load_saved_config()
         self.check_strapi_status()
-        self.update_image_stats()
+        self.start_catalog_watcher()
 
         # Check current git branch and ensure we're on develop for develop workflow
         current_branch = self.get_current_branch()
@@ -1347,8 +1897,47 @@ Recent Products:"""
             self.log(f"⚠️ Currently on '{current_branch}' branch")
             self.log("💡 Switch to 'develop' branch before making changes for develop")
 
-    def refresh_vercel_env(self):
-        """Fetch current environment variables from Vercel"""
+    def refresh_vercel_env(self, force=False):
+        """Show the preview-vs-production env diff, from the cache unless it's stale or `force`"""
+        from publishing.vercel_env import VercelEnvClient, VercelEnvError, fetch_env_snapshot
+
+        token = self.get_local_env_value('VERCEL_TOKEN')
+        project_id = self.get_local_env_value('VERCEL_PROJECT_ID')
+        if not token or not project_id:
+            self.log("ℹ️ Add VERCEL_TOKEN and VERCEL_PROJECT_ID to .env.local for the preview/production diff")
+            self.refresh_vercel_env_cli()
+            return
+
+        snapshot = None if force else self.env_snapshot_cache.fresh()
+        if snapshot:
+            self.show_env_snapshot(snapshot)
+            return
+
+        self.log("🔄 Fetching preview and production environment variables from Vercel...")
+
+        def fetch_thread():
+            try:
+                with VercelEnvClient(token, project_id, self.get_local_env_value('VERCEL_TEAM_ID')) as client:
+                    snapshot = fetch_env_snapshot(client)
+            except VercelEnvError as e:
+                self.root.after(0, lambda err=str(e): self.log(f"❌ Failed to fetch env vars: {err}"))
+                return
+            self.env_snapshot_cache.save(snapshot)
+            self.root.after(0, lambda: self.show_env_snapshot(snapshot))
+            self.root.after(0, lambda: self.log("✅ Fetched preview and production environment variables"))
+
+        threading.Thread(target=fetch_thread, daemon=True).start()
+
+    def show_env_snapshot(self, snapshot):
+        """Render the env diff, colouring keys that differ or are missing"""
+        from publishing.vercel_env import format_env_diff
+
+        self.env_vars_text.delete(1.0, tk.END)
+        for line, status in format_env_diff(snapshot):
+            self.env_vars_text.insert(tk.END, line + "\n", status or ())
+
+    def refresh_vercel_env_cli(self):
+        """List one environment's variables with the Vercel CLI (no API token configured)"""
         env = self.env_selector.get()
         self.log(f"🔄 Fetching {env} environment variables from Vercel...")
 
@@ -1502,6 +2091,9 @@ Recent Products:"""
                 except Exception as e:
                     self.root.after(0, lambda env=env, err=str(e): self.log(f"❌ Error updating {env}: {err}"))
 
+            if success_count:
+                self.env_snapshot_cache.invalidate()
+
             # Summary
             if success_count == len(environments):
                 self.root.after(0, lambda: self.log(f"🎉 Successfully updated {key} on all environments!"))
@@ -1516,6 +2108,63 @@ Recent Products:"""
 
         threading.Thread(target=update_thread, daemon=True).start()
 
+    def bulk_rotate_env(self):
+        """Apply a file of key changes through the Vercel API, then redeploy each target once"""
+        from tkinter import filedialog
+        from publishing.vercel_env import load_rotation_file
+
+        path = filedialog.askopenfilename(
+            title="Rotation file (.json: target -> {KEY: value}, or .env for the checked targets)",
+            initialdir=self.frontend_dir,
+            filetypes=[("Rotation files", "*.json *.env *.env.*"), ("All files", "*.*")])
+        if not path:
+            return
+
+        targets = [t for t, var in (("preview", self.update_preview_var), ("production", self.update_production_var))
+                   if var.get()]
+        try:
+            changes = load_rotation_file(path, targets)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Bulk Rotate", f"Could not read {path}:\n{e}")
+            return
+        if not changes:
+            messagebox.showwarning("Bulk Rotate", "No keys for the selected targets in that file.")
+            return
+
+        token = self.get_local_env_value('VERCEL_TOKEN')
+        project_id = self.get_local_env_value('VERCEL_PROJECT_ID')
+        if not token or not project_id:
+            messagebox.showwarning("Bulk Rotate", "Add VERCEL_TOKEN and VERCEL_PROJECT_ID to .env.local first.")
+            return
+
+        summary = "\n".join(f"{key} → {target}" for key, _, target in sorted(changes, key=lambda c: (c[2], c[0])))
+        if not messagebox.askyesno("Confirm Bulk Rotate",
+                                  f"Set {len(changes)} values on Vercel and redeploy each affected "
+                                  f"environment once?\n\n{summary}"):
+            return
+
+        def rotate_thread():
+            from publishing.vercel_env import VercelEnvClient, VercelEnvError, rotate_env
+
+            try:
+                with VercelEnvClient(token, project_id, self.get_local_env_value('VERCEL_TEAM_ID')) as client:
+                    result = rotate_env(client, changes, log=self.log)
+            except VercelEnvError as e:
+                self.log(f"❌ Bulk rotate failed: {e}")
+                return
+
+            self.env_snapshot_cache.invalidate()
+            if result['ok']:
+                self.log(f"🎉 Rotated {result['keys']} key(s) and verified them")
+            else:
+                self.log("⚠️ Some keys failed or didn't verify - check the log above")
+            # One redeploy per environment, however many keys changed there
+            for target in result['targets']:
+                deploy = self.deploy_production if target == 'production' else self.deploy_develop
+                self.root.after(0, lambda d=deploy: d(force=True))
+
+        threading.Thread(target=rotate_thread, daemon=True).start()
+
     def open_link(self, url):
         """Open a URL in the default browser"""
         import webbrowser
@@ -1524,6 +2173,17 @@ Recent Products:"""
 
     def on_closing(self):
         """Handle application closing"""
+        queued = self.deploy_scheduler.pending()
+        if queued:
+            names = ", ".join(key for key, _, _ in queued)
+            if not messagebox.askyesno("Deploys Queued",
+                                      f"Queued deploys ({names}) will be dropped if you quit.\n\nQuit anyway?"):
+                return
+            self.deploy_scheduler.cancel()
+        if self.webhook_listener:
+            self.webhook_listener.stop()
+        if self.catalog_watcher:
+            self.catalog_watcher.stop()
         if self.strapi_process:
             self.strapi_process.terminate()
         if self.tunnel_process:
@@ -1531,6 +2191,11 @@ Recent Products:"""
         self.root.destroy()
 
 def main():
+    # Headless commands (scaling bench, catalog generator, ...)
+    if len(sys.argv) > 1:
+        from publishing.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
     root = tk.Tk()
 
     # Import for dialog
@@ -0,0 +1,6 @@
+"""
+Support modules for the TysonDrawsStuff Publishing Manager
+
+publish-manager.py is the GUI; everything in here is plain Python that can
+also be driven from the command line (python tools/publish-manager.py --help).
+"""
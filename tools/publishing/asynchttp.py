@@ -0,0 +1,190 @@
+"""
+Minimal asyncio HTTP/1.1 client for the warm-up and load-test stages
+
+Those stages need hundreds of requests in flight with a hard concurrency
+and rate cap, and per-request timings that aren't skewed by thread
+scheduling. The standard library has no asyncio HTTP client, so this is
+just enough of one: keep-alive connection pooling per origin, TLS,
+Content-Length and chunked bodies, a semaphore for concurrency and an
+evenly spaced rate limit. There are no redirects, cookies or compression.
+"""
+
+import asyncio
+import ssl
+import time
+from urllib.parse import urlsplit
+
+USER_AGENT = "tysondrawsstuff-publish-manager"
+
+
+class HTTPError(Exception):
+    """The connection failed, timed out or the response was malformed"""
+
+
+class Response:
+    def __init__(self, status, reason, headers, body, seconds, first_byte):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.seconds = seconds
+        self.first_byte = first_byte
+
+    @property
+    def ok(self):
+        # Redirects aren't followed, so a 3xx never reached the resource
+        return 200 <= self.status < 300
+
+    def text(self):
+        return self.body.decode('utf-8', errors='replace')
+
+
+class RateLimiter:
+    """Space request starts evenly at `rate` per second (None = unlimited)"""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def _read_body(reader, headers, method, status):
+    if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+        return b'', True
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                # Trailers, then the blank line that ends the message
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks), True
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if 'content-length' in headers:
+        return await reader.readexactly(int(headers['content-length'])), True
+    # No framing: the body runs to the end of the connection
+    return await reader.read(), False
+
+
+class AsyncHTTPClient:
+    """Pooled keep-alive client; use as `async with AsyncHTTPClient(...) as client`"""
+
+    def __init__(self, concurrency=8, rate=None, timeout=30, headers=None):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = RateLimiter(rate)
+        self.timeout = timeout
+        self.headers = {'User-Agent': USER_AGENT, 'Accept': '*/*', **(headers or {})}
+        self.idle = {}
+        self.ssl_context = ssl.create_default_context()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        for connections in self.idle.values():
+            for _, writer in connections:
+                writer.close()
+        self.idle.clear()
+
+    async def _connect(self, origin):
+        scheme, host, port = origin
+        if scheme == 'https':
+            return await asyncio.open_connection(host, port, ssl=self.ssl_context, server_hostname=host)
+        return await asyncio.open_connection(host, port)
+
+    async def _exchange(self, reader, writer, method, target, headers, body):
+        lines = [f"{method} {target} HTTP/1.1"] + [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + (body or b''))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before the response")
+        first_byte = time.perf_counter()
+        _, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+        status = int(status)
+        payload, reusable = await _read_body(reader, response_headers, method, status)
+        if response_headers.get('connection', '').lower() == 'close':
+            reusable = False
+        return status, reason, response_headers, payload, first_byte, reusable
+
+    async def request(self, method, url, headers=None, body=None):
+        """Send one request; raises HTTPError on connection failure or timeout"""
+        parts = urlsplit(url)
+        origin = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        default_port = parts.port is None or parts.port == (443 if parts.scheme == 'https' else 80)
+        request_headers = {
+            'Host': parts.hostname if default_port else f"{parts.hostname}:{parts.port}",
+            **self.headers,
+            **(headers or {}),
+        }
+        if body is not None:
+            request_headers['Content-Length'] = str(len(body))
+
+        async with self.semaphore:
+            await self.limiter.wait()
+            start = time.perf_counter()
+            pooled = self.idle.get(origin)
+            connection = pooled.pop() if pooled else None
+            try:
+                for attempt in range(2):
+                    reused = connection is not None
+                    if connection is None:
+                        connection = await asyncio.wait_for(self._connect(origin), self.timeout)
+                    reader, writer = connection
+                    try:
+                        status, reason, response_headers, payload, first_byte, reusable = await asyncio.wait_for(
+                            self._exchange(reader, writer, method, target, request_headers, body),
+                            self.timeout)
+                        break
+                    except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+                        writer.close()
+                        connection = None
+                        # The server may have closed an idle keep-alive connection; retry once on a fresh one
+                        if not reused or attempt:
+                            raise
+            except asyncio.TimeoutError as e:
+                if connection:
+                    connection[1].close()
+                raise HTTPError(f"{method} {url}: timed out after {self.timeout}s") from e
+            except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+                if connection:
+                    connection[1].close()
+                raise HTTPError(f"{method} {url}: {e.__class__.__name__}: {e}") from e
+
+            end = time.perf_counter()
+            if reusable:
+                self.idle.setdefault(origin, []).append(connection)
+            else:
+                connection[1].close()
+        return Response(status, reason, response_headers, payload, end - start, first_byte - start)
+
+    async def get(self, url, headers=None):
+        return await self.request('GET', url, headers=headers)
+
+    async def post(self, url, body, headers=None):
+        return await self.request('POST', url, headers=headers, body=body)
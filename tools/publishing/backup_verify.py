@@ -0,0 +1,303 @@
+"""
+Verify and diff backup snapshots
+
+verify_snapshot() checks that a snapshot can actually be restored. Every
+entry digest in its manifest must resolve to a pack line whose content
+hashes to that digest, so every collection's count must match the entries
+found intact in the packs, and every upload blob must exist (with `deep`,
+its bytes are rehashed too). A snapshot missing collections that failed
+to back up is partial, and never counts as restorable.
+
+diff_snapshots() compares two snapshots entry by entry from their
+manifests alone: added, removed and changed per collection. Entry bodies
+are read from the packs only for the entries that differ, for labels and
+changed field names. A collection that failed in either snapshot can't be
+compared and is listed as such rather than as added or removed.
+
+Packs are streamed one line at a time, several packs and blobs in
+parallel. Memory grows with the number of digests and the size of the
+diff, never with the size of the entries.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from .backup import BackupStore
+from .fsutil import file_sha256
+
+# Fields that name an entry in a diff, in order of preference
+LABEL_FIELDS = ('slug', 'title', 'name', 'orderNumber', 'stripeSessionId')
+
+# Changed entries whose bodies are compared field by field
+DETAIL_LIMIT = 200
+
+
+def resolve_snapshot(store, ref):
+    """Snapshot id for 'latest', 'previous', a full id or a unique id prefix"""
+    ids = store.snapshots()
+    if not ids:
+        raise ValueError(f"No snapshots in {store.root}")
+    if ref in (None, 'latest'):
+        return ids[-1]
+    if ref == 'previous':
+        if len(ids) < 2:
+            raise ValueError("Only one snapshot - nothing to compare with")
+        return ids[-2]
+    matches = [snap_id for snap_id in ids if snap_id.startswith(ref)]
+    if len(matches) != 1:
+        raise ValueError(f"{'No' if not matches else 'More than one'} snapshot matches '{ref}'")
+    return matches[0]
+
+
+def _manifest_digests(manifest):
+    """collection -> set of entry digests (single types under their own name)"""
+    digests = {name: {digest for _, digest in collection['entries'].values()}
+               for name, collection in manifest['collections'].items()}
+    for name, digest in (manifest.get('singleTypes') or {}).items():
+        if digest:
+            digests[name] = {digest}
+    return digests
+
+
+def _scan_pack(store, pack, wanted, keep=None):
+    """(valid digests found, corrupt digests, bodies) for the `wanted` digests in one pack
+
+    Bodies are only kept for digests in `keep`.
+    """
+    found, corrupt, bodies = set(), set(), {}
+    try:
+        for digest, data in store.iter_pack(pack):
+            if digest not in wanted:
+                continue
+            if hashlib.sha256(data).hexdigest() != digest:
+                corrupt.add(digest)
+                continue
+            found.add(digest)
+            if keep and digest in keep:
+                bodies[digest] = json.loads(data)
+    except (OSError, EOFError, ValueError) as e:
+        # A torn or unreadable pack: whatever it was meant to hold is missing
+        return found, corrupt, bodies, f"{pack}: {e}"
+    return found, corrupt, bodies, None
+
+
+def _locate(store, digests, upto, concurrency, keep=None):
+    """Stream the packs holding `digests`: index hits first, then older packs for the rest"""
+    index = store.index()
+    packs = sorted({index[d] for d in digests if d in index})
+    found, corrupt, bodies, errors = set(), set(), {}, []
+
+    def scan(pack_list, wanted):
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for f, c, b, error in pool.map(lambda pack: _scan_pack(store, pack, wanted, keep), pack_list):
+                found.update(f)
+                corrupt.update(c)
+                bodies.update(b)
+                if error:
+                    errors.append(error)
+
+    scan(packs, digests)
+    missing = digests - found - corrupt
+    if missing:
+        # Index out of date or lost: look through every pack up to this snapshot
+        others = []
+        for snap_id in store.snapshots():
+            if snap_id > upto:
+                break
+            pack = store.load_manifest(snap_id).get('pack')
+            if pack and pack not in packs and (store.packs_dir / f"{pack}.jsonl.gz").exists():
+                others.append(pack)
+        scan(others, missing)
+    return found, corrupt, bodies, errors
+
+
+def verify_snapshot(store_dir, ref='latest', deep=False, concurrency=4):
+    """Check one snapshot against its manifest; returns a report dict with 'ok'"""
+    store = BackupStore(store_dir)
+    snap_id = resolve_snapshot(store, ref)
+    manifest = store.load_manifest(snap_id)
+    per_collection = _manifest_digests(manifest)
+    all_digests = set().union(*per_collection.values()) if per_collection else set()
+
+    found, corrupt, _, errors = _locate(store, all_digests, snap_id, concurrency)
+
+    collections = {}
+    for name, digests in per_collection.items():
+        entries = (manifest['collections'].get(name) or {}).get('entries')
+        if entries is None:
+            # Single type: one digest
+            expected, restorable = 1, len(digests & found)
+        else:
+            expected = manifest['collections'][name]['count']
+            restorable = sum(1 for _, digest in entries.values() if digest in found)
+        collections[name] = {
+            'entries': expected,
+            'restorable': restorable,
+            'countOk': restorable == expected,
+            'missing': len(digests - found - corrupt),
+            'corrupt': len(digests & corrupt),
+        }
+
+    uploads = manifest.get('uploads') or {}
+
+    def check_blob(upload):
+        path = store.blob_path(upload['blob'], upload.get('ext') or '')
+        if not path.exists():
+            return 'missing'
+        if deep and file_sha256(path) != upload['blob']:
+            return 'corrupt'
+        return 'ok'
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        blob_states = list(pool.map(check_blob, uploads.values()))
+    upload_report = {
+        'files': len(uploads),
+        'missing': blob_states.count('missing'),
+        'corrupt': blob_states.count('corrupt'),
+        'deep': deep,
+    }
+
+    not_backed_up = sorted(manifest.get('errors') or {})
+    ok = (not errors and not not_backed_up
+          and all(c['countOk'] and not c['missing'] and not c['corrupt'] for c in collections.values())
+          and not upload_report['missing'] and not upload_report['corrupt'])
+    return {
+        'id': snap_id,
+        'createdAt': manifest['createdAt'],
+        'collections': collections,
+        'uploads': upload_report,
+        'notBackedUp': not_backed_up,
+        'partial': bool(not_backed_up),
+        'packErrors': errors,
+        'ok': ok,
+    }
+
+
+def format_verify_report(report):
+    icon = '✅' if report['ok'] else '❌'
+    verdict = 'restorable' if report['ok'] else 'partial' if report.get('partial') else 'NOT fully restorable'
+    lines = [f"{icon} Snapshot {report['id']} ({report['createdAt']}) - {verdict}"]
+    for name, stats in sorted(report['collections'].items()):
+        problems = []
+        if not stats['countOk']:
+            problems.append(f"only {stats['restorable']} of {stats['entries']} entries restorable")
+        if stats['missing']:
+            problems.append(f"{stats['missing']} missing")
+        if stats['corrupt']:
+            problems.append(f"{stats['corrupt']} corrupt")
+        lines.append(f"  {'❌' if problems else '✅'} {name:<12} {stats['entries']:>6} entries"
+                     + (f" - {', '.join(problems)}" if problems else ""))
+    uploads = report['uploads']
+    if uploads['files']:
+        problems = [f"{uploads[k]} {k}" for k in ('missing', 'corrupt') if uploads[k]]
+        lines.append(f"  {'❌' if problems else '✅'} {'uploads':<12} {uploads['files']:>6} files"
+                     f"{' (rehashed)' if uploads['deep'] else ''}" + (f" - {', '.join(problems)}" if problems else ""))
+    for name in report['notBackedUp']:
+        lines.append(f"  ❌ {name} was not backed up in this snapshot")
+    for error in report['packErrors']:
+        lines.append(f"  ❌ Unreadable pack {error}")
+    return "\n".join(lines)
+
+
+def _label(body, key):
+    if body:
+        for field in LABEL_FIELDS:
+            if body.get(field):
+                return str(body[field])
+    return key
+
+
+def diff_snapshots(store_dir, old_ref='previous', new_ref='latest', concurrency=4, detail_limit=DETAIL_LIMIT):
+    """Entry-level differences between two snapshots, per collection"""
+    store = BackupStore(store_dir)
+    old_id, new_id = resolve_snapshot(store, old_ref), resolve_snapshot(store, new_ref)
+    old, new = store.load_manifest(old_id), store.load_manifest(new_id)
+
+    # A collection that failed to back up isn't empty; there is nothing to compare
+    not_compared = {}
+    for snap_id, manifest in ((old_id, old), (new_id, new)):
+        for name in manifest.get('errors') or {}:
+            not_compared.setdefault(name, []).append(snap_id)
+
+    changes = {}
+    for name in sorted(set(old['collections']) | set(new['collections'])):
+        if name in not_compared:
+            continue
+        before = (old['collections'].get(name) or {}).get('entries') or {}
+        after = (new['collections'].get(name) or {}).get('entries') or {}
+        added = sorted(set(after) - set(before))
+        removed = sorted(set(before) - set(after))
+        changed = sorted(key for key in set(before) & set(after) if before[key][1] != after[key][1])
+        if added or removed or changed:
+            changes[name] = {'added': added, 'removed': removed, 'changed': changed,
+                             'before': before, 'after': after}
+
+    # Only the differing entries' bodies are read, for labels and field-level detail
+    wanted = set()
+    detailed = 0
+    for diff in changes.values():
+        wanted.update(diff['after'][key][1] for key in diff['added'])
+        wanted.update(diff['before'][key][1] for key in diff['removed'])
+        for key in diff['changed']:
+            if detailed < detail_limit:
+                wanted.update((diff['before'][key][1], diff['after'][key][1]))
+                detailed += 1
+    upto = max(old_id, new_id)
+    _, _, bodies, _ = _locate(store, wanted, upto, concurrency, keep=wanted)
+
+    result = {'old': old_id, 'new': new_id, 'collections': {}, 'notCompared': not_compared}
+    for name, diff in changes.items():
+        before, after = diff['before'], diff['after']
+        changed = []
+        for key in diff['changed']:
+            old_body, new_body = bodies.get(before[key][1]), bodies.get(after[key][1])
+            fields = None
+            if old_body is not None and new_body is not None:
+                fields = sorted(k for k in set(old_body) | set(new_body)
+                                if k != 'updatedAt' and old_body.get(k) != new_body.get(k))
+            changed.append({'key': key, 'label': _label(new_body or old_body, key), 'fields': fields})
+        result['collections'][name] = {
+            'added': [_label(bodies.get(after[key][1]), key) for key in diff['added']],
+            'removed': [_label(bodies.get(before[key][1]), key) for key in diff['removed']],
+            'changed': changed,
+        }
+
+    old_uploads, new_uploads = old.get('uploads') or {}, new.get('uploads') or {}
+    result['uploads'] = {
+        'added': sorted(new_uploads[k].get('name') or k for k in set(new_uploads) - set(old_uploads)),
+        'removed': sorted(old_uploads[k].get('name') or k for k in set(old_uploads) - set(new_uploads)),
+        'changed': sorted(new_uploads[k].get('name') or k for k in set(old_uploads) & set(new_uploads)
+                          if old_uploads[k].get('blob') != new_uploads[k].get('blob')),
+    }
+    return result
+
+
+def format_snapshot_diff(diff, limit=25):
+    lines = [f"Changes from snapshot {diff['old']} to {diff['new']}:"]
+
+    def listing(prefix, items):
+        out = [f"    {prefix} {item}" for item in items[:limit]]
+        if len(items) > limit:
+            out.append(f"    ... and {len(items) - limit} more")
+        return out
+
+    for name, changes in diff['collections'].items():
+        lines.append(f"  {name}: +{len(changes['added'])} added, -{len(changes['removed'])} removed, "
+                     f"~{len(changes['changed'])} changed")
+        lines += listing('+', changes['added'])
+        lines += listing('-', changes['removed'])
+        lines += listing('~', [f"{c['label']}" + (f" ({', '.join(c['fields'])})" if c['fields'] else "")
+                               for c in changes['changed']])
+    for name, snapshots in sorted(diff.get('notCompared', {}).items()):
+        lines.append(f"  ⚠️ {name}: not compared - not backed up in snapshot {' or '.join(snapshots)}")
+    uploads = diff['uploads']
+    if any(uploads.values()):
+        lines.append(f"  uploads: +{len(uploads['added'])} added, -{len(uploads['removed'])} removed, "
+                     f"~{len(uploads['changed'])} replaced")
+        lines += listing('+', uploads['added'])
+        lines += listing('-', uploads['removed'])
+        lines += listing('~', uploads['changed'])
+    if len(lines) == 1:
+        lines.append("  No differences")
+    return "\n".join(lines)
@@ -0,0 +1,742 @@
+"""
+Command line entry points for the Publishing Manager
+
+Run `python tools/publish-manager.py <command> --help`. With no command the
+GUI starts as before.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# publishing/ lives in frontend/tools
+FRONTEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def cmd_generate_catalog(args):
+    from .synthetic import generate_catalog
+
+    summary = generate_catalog(
+        args.output,
+        products=args.products,
+        images_per_product=args.images,
+        width=args.width,
+        height=args.height,
+        image_format=args.format,
+        seed=args.seed,
+    )
+    print(f"✅ Wrote {summary['products']} products / {summary['images']} images "
+          f"({summary['image_bytes'] / 1024 / 1024:.1f} MB) to {summary['root']}")
+    return 0
+
+
+def cmd_bench_scaling(args):
+    from .scaling import format_scaling_report, run_scaling_bench
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    rows = run_scaling_bench(
+        FRONTEND_DIR,
+        sizes=sizes,
+        images_per_product=args.images,
+        width=args.width,
+        height=args.height,
+        workdir=args.keep,
+        run_sync=not args.no_sync,
+        run_git=not args.no_git,
+    )
+    print()
+    print(format_scaling_report(rows))
+    return 0
+
+
+def cmd_export_products(args):
+    from .export import export_catalog
+    from .strapi import StrapiError
+
+    populate = '*' if args.populate_all else None
+    try:
+        result = export_catalog(
+            args.strapi_url,
+            args.output_dir,
+            token=args.token or os.environ.get('STRAPI_API_TOKEN'),
+            populate=populate,
+            page_size=args.page_size,
+            concurrency=args.concurrency,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            full=args.full,
+            shards=not args.no_shards,
+        )
+    except StrapiError as e:
+        print(f"❌ Failed to export products: {e}")
+        return 1
+    print(f"📦 {result['products']} products ({result['mode']}, {result['changed']} changed, "
+          f"{result['deleted']} deleted) in {result['seconds']:.1f}s "
+          f"({result['requests']} requests, {result['bytes'] / 1024:.0f} KB)")
+    return 0
+
+
+def cmd_hash_images(args):
+    from .hashed_assets import hash_image_filenames
+
+    try:
+        result = hash_image_filenames(args.public_dir, args.cache_dir)
+    except (OSError, ValueError) as e:
+        print(f"❌ Failed to hash image filenames: {e}")
+        return 1
+    print(f"✅ {result['images']} images: {result['renamed']} renamed, {result['unchanged']} unchanged, "
+          f"{result['removed']} old files removed, {result['missing']} missing")
+    return 0
+
+
+def cmd_placeholders(args):
+    from .placeholders import add_placeholders
+
+    try:
+        result = add_placeholders(args.public_dir, args.cache_dir, workers=args.workers)
+    except (OSError, ValueError) as e:
+        print(f"❌ Failed to generate placeholders: {e}")
+        return 1
+    print(f"✅ {result['images']} images: {result['computed']} generated, {result['cached']} cached, "
+          f"{result['missing']} missing")
+    return 0
+
+
+def cmd_find_duplicates(args):
+    from .duplicates import find_near_duplicates, format_duplicate_report
+
+    try:
+        result = find_near_duplicates(args.public_dir, args.cache_dir, phash_threshold=args.phash,
+                                      dhash_threshold=args.dhash, workers=args.workers)
+    except (OSError, ValueError) as e:
+        print(f"❌ Near-duplicate check failed: {e}")
+        return 1
+    print(format_duplicate_report(result, limit=args.limit))
+    return 1 if any(c['suspicious'] for c in result['clusters']) else 0
+
+
+def cmd_shard_image_map(args):
+    from .image_shards import verify_image_map_shards, write_image_map_shards
+
+    public_dir = Path(args.public_dir)
+    if args.verify:
+        problems = verify_image_map_shards(public_dir)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if not problems:
+            print("✅ Image map shards match the manifest")
+        return 1 if problems else 0
+
+    try:
+        result = write_image_map_shards(public_dir, force=args.force)
+    except (OSError, ValueError) as e:
+        print(f"❌ Failed to shard image map: {e}")
+        return 1
+    if result['skipped']:
+        print(f"ℹ️ Image map shards are up to date ({result['products']} products)")
+    else:
+        print(f"✅ Image map shards: {result['changed']} written, {result['removed']} removed "
+              f"({result['products']} products)")
+    return 0
+
+
+def cmd_preflight(args):
+    from .preflight import format_preflight, run_preflight, standard_checks
+
+    hook_key = f"VERCEL_DEPLOY_HOOK_{args.environment.upper()}"
+    result = run_preflight(standard_checks(
+        args.repo_dir,
+        args.environment,
+        os.environ.get(hook_key),
+        args.strapi_url,
+        args.tunnel_url,
+        action=args.action,
+    ))
+    print(format_preflight(result))
+    return 0 if result['go'] else 1
+
+
+def cmd_deploy_status(args):
+    from .fingerprint import DEPLOY_ENV_KEYS, DeployLedger, check_deploy_needed
+
+    ledger = DeployLedger(args.ledger)
+    env_values = {key: os.environ.get(key) for key in DEPLOY_ENV_KEYS}
+    pending = False
+    for environment in args.environment or ["develop", "production"]:
+        needed, fingerprint, _, changes = check_deploy_needed(args.repo_dir, environment, env_values, ledger)
+        last = ledger.last(environment)
+        since = f" since {last['deployedAt']}" if last else ""
+        if needed:
+            pending = True
+            print(f"📦 {environment}: {fingerprint[:12]} - changed{since}: {', '.join(changes)}")
+        else:
+            print(f"✅ {environment}: {fingerprint[:12]} - unchanged{since}")
+    return 1 if pending else 0
+
+
+def cmd_watch_deploy(args):
+    from .deploy_watch import (READY, DeployMetrics, SimulatedDeploymentClient, VercelDeploymentClient,
+                               format_deploy_metrics, watch_deployment)
+
+    metrics = DeployMetrics(args.metrics)
+    if args.report:
+        print(format_deploy_metrics(metrics.summary()))
+        return 0
+
+    branch = args.branch or ('main' if args.environment == 'production' else 'develop')
+    if args.simulate:
+        client = SimulatedDeploymentClient(branch=branch)
+    else:
+        token = os.environ.get('VERCEL_TOKEN')
+        project_id = os.environ.get('VERCEL_PROJECT_ID')
+        if not token or not project_id:
+            print("❌ Missing VERCEL_TOKEN or VERCEL_PROJECT_ID (or use --simulate)")
+            return 1
+        client = VercelDeploymentClient(token, project_id, os.environ.get('VERCEL_TEAM_ID'))
+
+    triggered_at = time.time() - args.since
+    try:
+        result = watch_deployment(client, args.environment, branch, triggered_at,
+                                  expected=metrics.expected_build_seconds(args.environment), timeout=args.timeout)
+    finally:
+        client.close()
+    if not args.simulate:
+        metrics.record(result)
+    print(format_deploy_metrics(metrics.summary()))
+    return 0 if result['state'] == READY else 1
+
+
+def cmd_warm_cache(args):
+    from .site_standin import SiteStandIn
+    from .warm import format_warm_report, warm_cache
+
+    public_dir = Path(args.public_dir)
+    options = dict(legacy_map=public_dir.parent / "image-map.json", include_images=not args.no_images,
+                   concurrency=args.concurrency, rate=args.rate or None, timeout=args.timeout)
+    if args.standin:
+        with SiteStandIn(public_dir.parent, render_seconds=args.render_ms / 1000) as site:
+            result = warm_cache(site.url, public_dir, **options)
+    else:
+        result = warm_cache(args.base_url, public_dir, **options)
+    print(format_warm_report(result))
+    return 1 if any(r['error'] for r in result['results']) else 0
+
+
+def _parse_weights(text):
+    from .loadtest import DEFAULT_WEIGHTS
+
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in filter(None, (text or '').split(',')):
+        group, _, weight = item.partition('=')
+        weights[group.strip()] = float(weight)
+    return weights
+
+
+def cmd_load_test(args):
+    from .loadtest import (LoadTestHistory, format_load_report, run_load_test, start_next_server,
+                           stop_next_server)
+    from .site_standin import SiteStandIn
+    from .stripe_stub import StripeStub
+
+    public_dir = Path(args.public_dir)
+    options = dict(concurrency=args.concurrency, duration=args.duration, weights=_parse_weights(args.weights),
+                   timeout=args.timeout, seed=args.seed)
+    try:
+        if args.standin:
+            with SiteStandIn(public_dir.parent, render_seconds=args.render_ms / 1000) as site:
+                site.route_post('/api/checkout/', lambda headers, body: (
+                    200, 'application/json', b'{"url":"https://checkout.stripe.com/c/pay/cs_test_standin"}'))
+                run = run_load_test(site.url, public_dir, **options)
+        elif args.start_server:
+            with StripeStub(latency_seconds=args.stripe_latency_ms / 1000) as stripe:
+                server = start_next_server(FRONTEND_DIR, args.port, stripe.url)
+                try:
+                    run = run_load_test(f"http://127.0.0.1:{args.port}", public_dir, **options)
+                finally:
+                    stop_next_server(server)
+                print(f"ℹ️ Stripe stub created {stripe.sessions} checkout sessions")
+        else:
+            run = run_load_test(args.base_url, public_dir, **options)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"❌ Load test failed: {e}")
+        return 1
+
+    history = LoadTestHistory(args.history)
+    print(format_load_report(run, history.previous(run)))
+    if not args.no_record:
+        history.record(run)
+    return 0 if run['total']['errors'] == 0 else 1
+
+
+def cmd_webhook_bench(args):
+    from .loadtest import start_next_server, stop_next_server
+    from .site_standin import SiteStandIn
+    from .smtp_sink import SMTPSink
+    from .standin import StrapiStandIn
+    from .stripe_stub import StripeStub
+    from .webhook_bench import (WEBHOOK_ROUTES, WebhookBenchHistory, bench_server_env, format_webhook_report,
+                                run_webhook_bench, standin_webhook_handler)
+
+    secret = args.secret or os.environ.get('STRIPE_WEBHOOK_SECRET')
+    if not secret and (args.start_server or args.standin):
+        # The local server is started with whatever secret we sign with
+        secret = f"whsec_bench_{os.urandom(16).hex()}"
+    if not secret:
+        print("❌ No webhook secret - pass --secret or set STRIPE_WEBHOOK_SECRET")
+        return 1
+
+    public_dir = Path(args.public_dir)
+    routes = args.route or list(WEBHOOK_ROUTES)
+    options = dict(routes=routes, event_types=[e.strip() for e in args.events.split(',') if e.strip()],
+                   rate=args.rate, duration=args.duration)
+    try:
+        with SMTPSink() as sink:
+            if args.standin:
+                with SiteStandIn(public_dir.parent) as site, StrapiStandIn(public_dir.parent) as strapi:
+                    for route, path in WEBHOOK_ROUTES.items():
+                        site.route_post(path, standin_webhook_handler(route, secret, sink.port, strapi))
+                    run = run_webhook_bench(site.url, secret, public_dir, smtp_sink=sink, strapi=strapi, **options)
+            elif args.start_server:
+                with StripeStub(latency_seconds=args.stripe_latency_ms / 1000) as stripe, \
+                        StrapiStandIn(FRONTEND_DIR) as strapi, tempfile.TemporaryDirectory() as scratch:
+                    env = bench_server_env(secret, sink.port, strapi.url, Path(scratch) / "orders.json")
+                    server = start_next_server(FRONTEND_DIR, args.port, stripe.url, env=env)
+                    try:
+                        run = run_webhook_bench(f"http://127.0.0.1:{args.port}", secret, public_dir,
+                                                stripe_stub=stripe, smtp_sink=sink, strapi=strapi, **options)
+                    finally:
+                        stop_next_server(server)
+                    print(f"ℹ️ Stripe stub served {stripe.retrieved} session lookups")
+            else:
+                run = run_webhook_bench(args.base_url, secret, public_dir, **options)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"❌ Webhook bench failed: {e}")
+        return 1
+
+    print(format_webhook_report(run))
+    if not args.no_record:
+        WebhookBenchHistory(args.history).record(run)
+    return 0 if run['total']['failures'] == 0 else 1
+
+
+def cmd_rotate_env(args):
+    import requests
+
+    from .vercel_env import (DEPLOY_HOOK_KEYS, VercelEnvClient, VercelEnvError, load_rotation_file,
+                             plan_rotation, rotate_env)
+
+    try:
+        changes = load_rotation_file(args.file, args.target or ["preview", "production"])
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read {args.file}: {e}")
+        return 1
+    token = os.environ.get('VERCEL_TOKEN')
+    project_id = os.environ.get('VERCEL_PROJECT_ID')
+    if not token or not project_id:
+        print("❌ Set VERCEL_TOKEN and VERCEL_PROJECT_ID")
+        return 1
+
+    with VercelEnvClient(token, project_id, os.environ.get('VERCEL_TEAM_ID'), concurrency=args.concurrency,
+                         api_url=args.api_url) as client:
+        try:
+            if args.dry_run:
+                existing = client.list_env()
+                branches = {e['id']: e.get('gitBranch') for e in existing}
+                for key, ops in plan_rotation(existing, changes).items():
+                    for op, env_id, fields in ops:
+                        branch = fields.get('gitBranch') or branches.get(env_id)
+                        print(f"  {op:<6} {key} -> {', '.join(fields['target'])}"
+                              + (f" [{branch}]" if branch else "")
+                              + (" (value changes)" if 'value' in fields else ""))
+                return 0
+            result = rotate_env(client, changes)
+        except VercelEnvError as e:
+            print(f"❌ Rotation failed: {e}")
+            return 1
+
+    if not args.no_redeploy:
+        for target in result['targets']:
+            hook = os.environ.get(DEPLOY_HOOK_KEYS[target])
+            if not hook:
+                print(f"⚠️ {DEPLOY_HOOK_KEYS[target]} not set - redeploy {target} yourself")
+                continue
+            try:
+                response = requests.post(hook, timeout=10)
+                print(f"{'✅' if response.ok else '❌'} {target} redeploy: HTTP {response.status_code}")
+            except requests.exceptions.RequestException as e:
+                print(f"❌ {target} redeploy failed: {e}")
+    return 0 if result['ok'] else 1
+
+
+def cmd_env_diff(args):
+    from .vercel_env import (EnvSnapshotCache, VercelEnvClient, VercelEnvError, fetch_env_snapshot,
+                             format_env_diff)
+
+    cache = EnvSnapshotCache(args.cache, ttl=args.ttl)
+    snapshot = None if args.refresh else cache.fresh()
+    if snapshot is None:
+        token = os.environ.get('VERCEL_TOKEN')
+        project_id = os.environ.get('VERCEL_PROJECT_ID')
+        if not token or not project_id:
+            print("❌ Set VERCEL_TOKEN and VERCEL_PROJECT_ID")
+            return 1
+        try:
+            with VercelEnvClient(token, project_id, os.environ.get('VERCEL_TEAM_ID'), api_url=args.api_url) as client:
+                snapshot = fetch_env_snapshot(client)
+        except VercelEnvError as e:
+            print(f"❌ Could not fetch env vars: {e}")
+            return 1
+        cache.save(snapshot)
+    for line, _ in format_env_diff(snapshot):
+        print(line)
+    return 0
+
+
+def cmd_backup(args):
+    from .backup import create_snapshot, format_snapshot_summary
+    from .strapi import StrapiError
+
+    try:
+        manifest = create_snapshot(
+            args.strapi_url,
+            args.store,
+            token=args.token or os.environ.get('STRAPI_API_TOKEN'),
+            include_uploads=not args.no_uploads,
+            full=args.full,
+            concurrency=args.concurrency,
+        )
+    except (StrapiError, OSError) as e:
+        print(f"❌ Backup failed: {e}")
+        return 1
+    print(format_snapshot_summary(manifest))
+    return 1 if manifest['partial'] else 0
+
+
+def cmd_backup_verify(args):
+    from .backup_verify import format_verify_report, verify_snapshot
+
+    try:
+        report = verify_snapshot(args.store, args.snapshot, deep=args.deep, concurrency=args.concurrency)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(format_verify_report(report))
+    return 0 if report['ok'] else 1
+
+
+def cmd_backup_diff(args):
+    from .backup_verify import diff_snapshots, format_snapshot_diff
+
+    try:
+        diff = diff_snapshots(args.store, args.old, args.new, concurrency=args.concurrency)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(format_snapshot_diff(diff, limit=args.limit))
+    return 0
+
+
+def cmd_strapi_listen(args):
+    from .strapi_webhooks import StrapiWebhookListener, format_sync_summary, targeted_sync
+
+    frontend_dir = Path(args.frontend_dir)
+    token = args.token or os.environ.get('STRAPI_API_TOKEN')
+
+    def sync(slugs, export, full_export):
+        summary = targeted_sync(args.strapi_url, frontend_dir, slugs, export=export, full_export=full_export,
+                                token=token, concurrency=args.concurrency)
+        print(format_sync_summary(summary))
+
+    secret = args.secret or os.environ.get('STRAPI_WEBHOOK_SECRET')
+    if not secret:
+        print("❌ No webhook secret - pass --secret or set STRAPI_WEBHOOK_SECRET")
+        return 1
+
+    try:
+        listener = StrapiWebhookListener(sync, frontend_dir / "public", secret=secret,
+                                         host=args.host, port=args.port, quiet_seconds=args.quiet)
+    except OSError as e:
+        print(f"❌ Could not listen on {args.host}:{args.port}: {e}")
+        return 1
+    with listener:
+        print(f"🪝 Listening for Strapi webhooks at {listener.url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\n{listener.received} webhooks received, {listener.syncs} syncs run")
+    return 0
+
+
+def cmd_upload_images(args):
+    from .uploader import bulk_upload, format_upload_summary
+
+    try:
+        summary = bulk_upload(
+            args.folder,
+            args.strapi_url,
+            args.cache_dir,
+            token=args.token or os.environ.get('STRAPI_API_TOKEN'),
+            max_edge=args.max_edge,
+            quality=args.quality,
+            workers=args.workers,
+            concurrency=args.concurrency,
+            alt_text=args.alt_from_name,
+        )
+    except OSError as e:
+        print(f"❌ Upload failed: {e}")
+        return 1
+    print(format_upload_summary(summary))
+    return 1 if summary['failed'] else 0
+
+
+def cmd_image_stats(args):
+    from .fswatch import CatalogWatcher, format_disk_stats
+    from .image_map import format_image_stats
+
+    def show():
+        summary = watcher.summary()
+        print(format_image_stats(summary['map']) if summary['map'] else f"⚠️ {summary['map_error']}")
+        print()
+        print(format_disk_stats(summary))
+
+    watcher = CatalogWatcher(args.frontend_dir, on_change=(lambda: (print("\n" + "-" * 40), show())),
+                             force_polling=args.poll)
+    with watcher:
+        show()
+        if not args.watch:
+            return 0
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\n{watcher.events} filesystem events, image map read {watcher.map_reads} times")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="publish-manager.py",
+        description="TysonDrawsStuff Publishing Manager (run without a command for the GUI)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate-catalog", help="Write a synthetic catalog for scaling tests")
+    gen.add_argument("output", help="Directory to write (laid out like frontend/)")
+    gen.add_argument("--products", type=int, default=100)
+    gen.add_argument("--images", default="1", help="Images per product, e.g. 2 or 1-4")
+    gen.add_argument("--width", type=int, default=96)
+    gen.add_argument("--height", type=int, default=128)
+    gen.add_argument("--format", default="png", choices=["png", "jpg", "webp"])
+    gen.add_argument("--seed", type=int, default=0)
+    gen.set_defaults(func=cmd_generate_catalog)
+
+    bench = commands.add_parser("bench-scaling", help="Time publishing steps at growing catalog sizes")
+    bench.add_argument("--sizes", default="100,1000,10000", help="Comma separated product counts")
+    bench.add_argument("--images", default="1", help="Images per product, e.g. 2 or 1-4")
+    bench.add_argument("--width", type=int, default=64)
+    bench.add_argument("--height", type=int, default=64)
+    bench.add_argument("--keep", metavar="DIR", help="Keep generated catalogs in DIR")
+    bench.add_argument("--no-sync", action="store_true", help="Skip sync-images.js")
+    bench.add_argument("--no-git", action="store_true", help="Skip git add")
+    bench.set_defaults(func=cmd_bench_scaling)
+
+    export = commands.add_parser("export-products", help="Export products-data.json and site-settings.json")
+    export.add_argument("--strapi-url", default=os.environ.get('NEXT_PUBLIC_STRAPI_URL', 'http://localhost:1339'))
+    export.add_argument("--token", help="Strapi API token (default: $STRAPI_API_TOKEN)")
+    export.add_argument("--output-dir", default=str(FRONTEND_DIR / "public"))
+    export.add_argument("--page-size", type=int, default=100)
+    export.add_argument("--concurrency", type=int, default=4)
+    export.add_argument("--populate-all", action="store_true",
+                        help="Use populate=* instead of the trimmed field selection")
+    export.add_argument("--cache-dir", default=str(FRONTEND_DIR / ".publish-cache" / "export"),
+                        help="Product cache used for delta exports")
+    export.add_argument("--no-cache", action="store_true", help="Always download every product")
+    export.add_argument("--full", action="store_true", help="Refetch everything and rebuild the cache")
+    export.add_argument("--no-shards", action="store_true", help="Skip public/products-data/ shards")
+    export.set_defaults(func=cmd_export_products)
+
+    hashed = commands.add_parser("hash-images", help="Rename synced images to content-hashed filenames")
+    hashed.add_argument("--public-dir", default=str(FRONTEND_DIR / "public"))
+    hashed.add_argument("--cache-dir", default=str(FRONTEND_DIR / ".publish-cache" / "images"))
+    hashed.set_defaults(func=cmd_hash_images)
+
+    blur = commands.add_parser("placeholders", help="Add blur placeholders to public/image-map.json")
+    blur.add_argument("--public-dir", default=str(FRONTEND_DIR / "public"))
+    blur.add_argument("--cache-dir", default=str(FRONTEND_DIR / ".publish-cache" / "images"))
+    blur.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    blur.set_defaults(func=cmd_placeholders)
+
+    dups = commands.add_parser("find-duplicates", help="Report near-identical images across products")
+    dups.add_argument("--public-dir", default=str(FRONTEND_DIR / "public"))
+    dups.add_argument("--cache-dir", default=str(FRONTEND_DIR / ".publish-cache" / "images"))
+    dups.add_argument("--phash", type=int, default=6, help="Max pHash Hamming distance")
+    dups.add_argument("--dhash", type=int, default=10, help="Max dHash Hamming distance")
+    dups.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    dups.add_argument("--limit", type=int, default=50, help="Suspicious groups to list")
+    dups.set_defaults(func=cmd_find_duplicates)
+
+    shard = commands.add_parser("shard-image-map", help="Split public/image-map.json into per-product files")
+    shard.add_argument("--public-dir", default=str(FRONTEND_DIR / "public"))
+    shard.add_argument("--force", action="store_true", help="Rewrite even if image-map.json is unchanged")
+    shard.add_argument("--verify", action="store_true", help="Check shards against the manifest instead")
+    shard.set_defaults(func=cmd_shard_image_map)
+
+    pre = commands.add_parser("preflight", help="Run the promote/deploy go/no-go checks")
+    pre.add_argument("--action", choices=["promote", "deploy"], default="promote")
+    pre.add_argument("--environment", choices=["production", "develop"], default="production",
+                     help="Which VERCEL_DEPLOY_HOOK_* to expect in the environment")
+    pre.add_argument("--repo-dir", default=str(FRONTEND_DIR))
+    pre.add_argument("--strapi-url", default="http://localhost:1339")
+    pre.add_argument("--tunnel-url", default=os.environ.get('NEXT_PUBLIC_STRAPI_URL'))
+    pre.set_defaults(func=cmd_preflight)
+
+    status = commands.add_parser("deploy-status", help="Show which environments have changes since their last deploy")
+    status.add_argument("--environment", action="append", choices=["develop", "production"],
+                        help="Repeatable (default: both)")
+    status.add_argument("--repo-dir", default=str(FRONTEND_DIR))
+    status.add_argument("--ledger", default=str(FRONTEND_DIR / ".publish-cache" / "deploys.json"))
+    status.set_defaults(func=cmd_deploy_status)
+
+    watch = commands.add_parser("watch-deploy", help="Follow the latest deployment until it is live")
+    watch.add_argument("--environment", choices=["develop", "production"], default="develop")
+    watch.add_argument("--branch", help="Git branch the deployment builds (default: develop or main)")
+    watch.add_argument("--since", type=float, default=60,
+                       help="Look for deployments created up to this many seconds ago")
+    watch.add_argument("--timeout", type=float, default=1800)
+    watch.add_argument("--metrics", default=str(FRONTEND_DIR / ".publish-cache" / "deploy-metrics.jsonl"))
+    watch.add_argument("--simulate", action="store_true", help="Use a scripted local deployment instead of Vercel")
+    watch.add_argument("--report", action="store_true", help="Only print the recorded publish -> live stats")
+    watch.set_defaults(func=cmd_watch_deploy)
+
+    warm = commands.add_parser("warm-cache", help="Request every sitemap page and image after a deploy")
+    warm.add_argument("--base-url", default="https://tysondrawsstuff.com")
+    warm.add_argument("--public-dir", default=str(FRONTEND_DIR / "public"),
+                      help="Where to read the image maps and listing manifest")
+    warm.add_argument("--concurrency", type=int, default=8)
+    warm.add_argument("--rate", type=float, default=20, help="Max requests per second (0 = no cap)")
+    warm.add_argument("--timeout", type=float, default=30)
+    warm.add_argument("--no-images", action="store_true", help="Only warm pages")
+    warm.add_argument("--standin", action="store_true",
+                      help="Warm a local stand-in serving --public-dir instead of --base-url")
+    warm.add_argument("--render-ms", type=float, default=0, help="Stand-in page render delay")
+    warm.set_defaults(func=cmd_warm_cache)
+
+    load = commands.add_parser("load-test", help="Drive concurrent users at shop, category, product and checkout")
+    load.add_argument("--base-url", default="http://localhost:3000")
+    load.add_argument("--start-server", action="store_true",
+                      help="Run `next start` (existing build) with Stripe pointed at a local stub")
+    load.add_argument("--port", type=int, default=3100, help="Port for --start-server")
+    load.add_argument("--standin", action="store_true", help="Test a local stand-in instead of a Next.js build")
+    load.add_argument("--render-ms", type=float, default=0, help="Stand-in page render delay")
+    load.add_argument("--stripe-latency-ms", type=float, default=150, help="Stripe stub response delay")
+    load.add_argument("--public-dir", default=str(FRONTEND_DIR / "public"), help="Catalog to draw targets from")
+    load.add_argument("--concurrency", type=int, default=20)
+    load.add_argument("--duration", type=float, default=30, help="Seconds")
+    load.add_argument("--weights", help="Request mix, e.g. shop=2,category=2,product=4,checkout=1")
+    load.add_argument("--timeout", type=float, default=30)
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("--history", default=str(FRONTEND_DIR / ".publish-cache" / "loadtests.jsonl"))
+    load.add_argument("--no-record", action="store_true", help="Don't add this run to the history")
+    load.set_defaults(func=cmd_load_test)
+
+    hooks = commands.add_parser("webhook-bench", help="Replay signed Stripe events at the webhook routes")
+    hooks.add_argument("--base-url", default="http://localhost:3000")
+    hooks.add_argument("--start-server", action="store_true",
+                       help="Run `next start` (existing build) against a local Stripe stub, Strapi stand-in and SMTP sink")
+    hooks.add_argument("--port", type=int, default=3100, help="Port for --start-server")
+    hooks.add_argument("--standin", action="store_true", help="Bench stand-in handlers instead of a Next.js build")
+    hooks.add_argument("--route", action="append", choices=["stripe-webhook", "webhooks/stripe"],
+                       help="Route to target (repeatable, default both)")
+    hooks.add_argument("--rate", type=float, default=5, help="Events per second")
+    hooks.add_argument("--duration", type=float, default=30, help="Seconds")
+    hooks.add_argument("--events", default="checkout.session.completed",
+                       help="Comma-separated event types, sent round-robin")
+    hooks.add_argument("--secret", help="Signing secret (default $STRIPE_WEBHOOK_SECRET)")
+    hooks.add_argument("--stripe-latency-ms", type=float, default=150, help="Stripe stub response delay")
+    hooks.add_argument("--public-dir", default=str(FRONTEND_DIR / "public"), help="Catalog to build events from")
+    hooks.add_argument("--history", default=str(FRONTEND_DIR / ".publish-cache" / "webhook-bench.jsonl"))
+    hooks.add_argument("--no-record", action="store_true", help="Don't add this run to the history")
+    hooks.set_defaults(func=cmd_webhook_bench)
+
+    rotate = commands.add_parser("rotate-env", help="Set many Vercel env vars at once, then redeploy once per target")
+    rotate.add_argument("file", help="target -> {KEY: value} .json, or a .env file applied to every --target")
+    rotate.add_argument("--target", action="append", choices=["preview", "production"],
+                        help="Targets for a .env file (repeatable, default both)")
+    rotate.add_argument("--concurrency", type=int, default=6)
+    rotate.add_argument("--dry-run", action="store_true", help="Only print the API calls that would be made")
+    rotate.add_argument("--no-redeploy", action="store_true", help="Don't call the deploy hooks afterwards")
+    rotate.add_argument("--api-url", help=argparse.SUPPRESS)
+    rotate.set_defaults(func=cmd_rotate_env)
+
+    diff = commands.add_parser("env-diff", help="Compare preview and production env vars by digest")
+    diff.add_argument("--refresh", action="store_true", help="Ignore the cached snapshot")
+    diff.add_argument("--ttl", type=float, default=600, help="Seconds a cached snapshot stays fresh")
+    diff.add_argument("--cache", default=str(FRONTEND_DIR / ".publish-cache" / "vercel-env.json"))
+    diff.add_argument("--api-url", help=argparse.SUPPRESS)
+    diff.set_defaults(func=cmd_env_diff)
+
+    backup = commands.add_parser("backup", help="Incremental, deduplicated snapshot of Strapi content and uploads")
+    backup.add_argument("--strapi-url", default=os.environ.get('NEXT_PUBLIC_STRAPI_URL', 'http://localhost:1339'))
+    backup.add_argument("--token", help="Strapi API token (default $STRAPI_API_TOKEN; orders need one)")
+    backup.add_argument("--store", default=str(FRONTEND_DIR.parent / "backend" / "backups" / "store"))
+    backup.add_argument("--full", action="store_true",
+                        help="Refetch every entry (picks up relation edits that don't bump updatedAt)")
+    backup.add_argument("--no-uploads", action="store_true", help="Skip media files")
+    backup.add_argument("--concurrency", type=int, default=4)
+    backup.set_defaults(func=cmd_backup)
+
+    verify = commands.add_parser("backup-verify", help="Check a backup snapshot against its manifest")
+    verify.add_argument("snapshot", nargs="?", default="latest", help="Snapshot id, id prefix, latest or previous")
+    verify.add_argument("--store", default=str(FRONTEND_DIR.parent / "backend" / "backups" / "store"))
+    verify.add_argument("--deep", action="store_true", help="Rehash every upload file too")
+    verify.add_argument("--concurrency", type=int, default=4)
+    verify.set_defaults(func=cmd_backup_verify)
+
+    bdiff = commands.add_parser("backup-diff", help="Entries added, removed and changed between two snapshots")
+    bdiff.add_argument("old", nargs="?", default="previous")
+    bdiff.add_argument("new", nargs="?", default="latest")
+    bdiff.add_argument("--store", default=str(FRONTEND_DIR.parent / "backend" / "backups" / "store"))
+    bdiff.add_argument("--limit", type=int, default=25, help="Entries listed per change type")
+    bdiff.add_argument("--concurrency", type=int, default=4)
+    bdiff.set_defaults(func=cmd_backup_diff)
+
+    listen = commands.add_parser("strapi-listen",
+                                 help="Receive Strapi webhooks and sync only the products they touch")
+    listen.add_argument("--strapi-url", default=os.environ.get('NEXT_PUBLIC_STRAPI_URL', 'http://localhost:1339'))
+    listen.add_argument("--token", help="Strapi API token (default: $STRAPI_API_TOKEN)")
+    listen.add_argument("--secret", help="Expected Authorization header, required (default: $STRAPI_WEBHOOK_SECRET)")
+    listen.add_argument("--host", default="127.0.0.1")
+    listen.add_argument("--port", type=int, default=8788)
+    listen.add_argument("--quiet", type=float, default=3, help="Seconds without webhooks before syncing")
+    listen.add_argument("--frontend-dir", default=str(FRONTEND_DIR))
+    listen.add_argument("--concurrency", type=int, default=4)
+    listen.set_defaults(func=cmd_strapi_listen)
+
+    upload = commands.add_parser("upload-images",
+                                 help="Resize a folder of artwork and upload it to the Strapi media library")
+    upload.add_argument("folder")
+    upload.add_argument("--strapi-url", default=os.environ.get('NEXT_PUBLIC_STRAPI_URL', 'http://localhost:1339'))
+    upload.add_argument("--token", help="Strapi API token (default: $STRAPI_API_TOKEN)")
+    upload.add_argument("--max-edge", type=int, default=2400, help="Longest side in pixels after resizing")
+    upload.add_argument("--quality", type=int, default=88, help="JPEG quality")
+    upload.add_argument("--workers", type=int, help="Resize processes (default: CPU count)")
+    upload.add_argument("--concurrency", type=int, default=4, help="Uploads in flight")
+    upload.add_argument("--alt-from-name", action="store_true", help="Use each file name as its alt text")
+    upload.add_argument("--cache-dir", default=str(FRONTEND_DIR / ".publish-cache" / "uploads"),
+                        help="Upload manifest and resized copies")
+    upload.set_defaults(func=cmd_upload_images)
+
+    istats = commands.add_parser("image-stats", help="Image map and on-disk product image stats")
+    istats.add_argument("--watch", action="store_true", help="Keep printing stats as files change")
+    istats.add_argument("--poll", action="store_true", help="Use stat polling instead of inotify")
+    istats.add_argument("--frontend-dir", default=str(FRONTEND_DIR))
+    istats.set_defaults(func=cmd_image_stats)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,284 @@
+"""
+Watch a triggered deployment until it is live
+
+A deploy hook only answers "job queued", so the GUI used to stop at
+"check the Vercel dashboard". The watcher finds the deployment the hook
+created and follows it to READY, ERROR or CANCELED. Each outcome goes into
+.publish-cache/deploy-metrics.jsonl. The number that matters is publish
+-> live: from the moment a publish started (the Sync & Preview click, not
+the hook call) to the deployment serving traffic.
+
+Polling backs off while nothing changes and snaps back to the fast
+interval on every state change. Once a few builds are on record, it also
+stays slow until the usual build time is nearly up. The deployment source
+is pluggable: VercelDeploymentClient talks to the REST API, and
+SimulatedDeploymentClient plays a scripted timeline for trying the flow
+without a Vercel project.
+"""
+
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .fsutil import append_jsonl, read_jsonl
+from .stats import format_duration, latency_summary, percentile
+
+READY = 'READY'
+ERROR = 'ERROR'
+CANCELED = 'CANCELED'
+TIMEOUT = 'TIMEOUT'
+TERMINAL_STATES = (READY, ERROR, CANCELED)
+
+# A hook's deployment shows up a few seconds after the 2xx
+DISCOVERY_SLACK_SECONDS = 10
+
+
+class DeploymentClientError(Exception):
+    """The deployment API failed or returned something unexpected"""
+
+
+def _normalize(deployment):
+    """Vercel's v6 list and v13 detail payloads -> one small dict (times in epoch seconds)"""
+    created = deployment.get('createdAt') or deployment.get('created')
+    ready = deployment.get('ready')
+    return {
+        'id': deployment.get('uid') or deployment.get('id'),
+        'state': deployment.get('readyState') or deployment.get('state'),
+        'url': deployment.get('url'),
+        'branch': (deployment.get('meta') or {}).get('githubCommitRef'),
+        'createdAt': created / 1000 if created else None,
+        'readyAt': ready / 1000 if ready else None,
+        'error': deployment.get('errorMessage'),
+    }
+
+
+class VercelDeploymentClient:
+    """Deployments of one project through the Vercel REST API"""
+
+    API_URL = "https://api.vercel.com"
+
+    def __init__(self, token, project_id, team_id=None, timeout=10):
+        self.project_id = project_id
+        self.team_id = team_id
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=2))
+        self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def close(self):
+        self.session.close()
+
+    def _get(self, path, params=None):
+        params = dict(params or {})
+        if self.team_id:
+            params['teamId'] = self.team_id
+        url = f"{self.API_URL}{path}"
+        try:
+            response = self.session.get(url, params=params, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise DeploymentClientError(f"{url}: {e}") from e
+        if response.status_code != 200:
+            raise DeploymentClientError(f"HTTP {response.status_code} from {url}: {response.text[:200]}")
+        return response.json()
+
+    def find_deployment(self, target, branch, since):
+        """Newest deployment of `branch` for `target` created after `since`, or None"""
+        data = self._get('/v6/deployments', {
+            'projectId': self.project_id,
+            'target': target,
+            'since': int(since * 1000),
+            'limit': 10,
+        })
+        for deployment in map(_normalize, data.get('deployments', [])):
+            if deployment['branch'] in (None, branch):
+                return deployment
+        return None
+
+    def get_deployment(self, deployment_id):
+        return _normalize(self._get(f'/v13/deployments/{deployment_id}'))
+
+
+class SimulatedDeploymentClient:
+    """Local stand-in that walks one deployment through a scripted timeline
+
+    `timeline` lists (seconds after the hook call, state) pairs. The
+    deployment appears at the first entry. Pass the same `clock` as the
+    watcher to run without waiting.
+    """
+
+    def __init__(self, timeline=((3, 'QUEUED'), (8, 'BUILDING'), (60, READY)), branch=None, clock=time.time):
+        self.timeline = list(timeline)
+        self.branch = branch
+        self.clock = clock
+        self.started = clock()
+        self.requests = 0
+
+    def _state(self):
+        elapsed = self.clock() - self.started
+        state = None
+        for offset, name in self.timeline:
+            if elapsed >= offset:
+                state = name
+        return state
+
+    def _deployment(self):
+        state = self._state()
+        if state is None:
+            return None
+        last_offset = self.timeline[-1][0]
+        return {
+            'id': 'dpl_simulated',
+            'state': state,
+            'url': 'simulated.vercel.app',
+            'branch': self.branch,
+            'createdAt': self.started + self.timeline[0][0],
+            'readyAt': self.started + last_offset if state == READY else None,
+            'error': 'Simulated build failure' if state == ERROR else None,
+        }
+
+    def find_deployment(self, target, branch, since):
+        self.requests += 1
+        return self._deployment()
+
+    def get_deployment(self, deployment_id):
+        self.requests += 1
+        return self._deployment()
+
+    def close(self):
+        pass
+
+
+def next_interval(interval, elapsed, expected=None, initial=2.0, maximum=30.0, backoff=1.6):
+    """Grow the poll interval, but not past the point the build usually finishes"""
+    interval = min(maximum, interval * backoff)
+    if expected:
+        remaining = expected - elapsed
+        if remaining > 0:
+            interval = min(interval, max(initial, remaining))
+        else:
+            # Overdue: stay brisk rather than overshooting by a full max interval
+            interval = min(interval, initial * 2)
+    return interval
+
+
+def watch_deployment(client, environment, branch, triggered_at, published_at=None, expected=None,
+                     timeout=1800, initial=2.0, maximum=30.0, sleep=time.sleep, clock=time.time, log=print):
+    """Poll until the deployment for `branch` reaches a terminal state
+
+    `triggered_at` is when the hook was called and `published_at` when the
+    publish began (defaults to the trigger). `expected` is a typical
+    hook -> live time in seconds, used to pace polling. Returns a metrics
+    record. Its state is TIMEOUT if nothing terminal happened within `timeout`.
+    """
+    target = 'production' if environment == 'production' else 'preview'
+    published_at = published_at or triggered_at
+    deadline = triggered_at + timeout
+    interval = initial
+    deployment = None
+    state = None
+    polls = 0
+    errors = 0
+
+    while clock() < deadline:
+        try:
+            if deployment is None:
+                found = client.find_deployment(target, branch, triggered_at - DISCOVERY_SLACK_SECONDS)
+            else:
+                found = client.get_deployment(deployment['id'])
+            errors = 0
+        except DeploymentClientError as e:
+            found = None
+            errors += 1
+            log(f"⚠️ Deployment status unavailable ({e})")
+            if errors >= 5:
+                break
+        polls += 1
+
+        if found:
+            if deployment is None:
+                log(f"🔎 Found {environment} deployment {found['url'] or found['id']}")
+            deployment = found
+            if found['state'] != state:
+                state = found['state']
+                log(f"📡 {environment} deployment: {state} after {format_duration(clock() - triggered_at)}")
+                interval = initial
+                if state in TERMINAL_STATES:
+                    break
+            else:
+                interval = next_interval(interval, clock() - triggered_at, expected, initial, maximum)
+        else:
+            interval = next_interval(interval, clock() - triggered_at, None, initial, maximum / 3)
+
+        sleep(max(0, min(interval, deadline - clock())))
+
+    observed = clock()
+    finished = state in TERMINAL_STATES
+    live_at = None
+    if state == READY:
+        # Vercel's own ready time, if given, is tighter than our last poll
+        live_at = min(observed, (deployment or {}).get('readyAt') or observed)
+    return {
+        'environment': environment,
+        'branch': branch,
+        'state': state if finished else TIMEOUT,
+        'deploymentId': (deployment or {}).get('id'),
+        'url': (deployment or {}).get('url'),
+        'error': (deployment or {}).get('error'),
+        'publishedAt': published_at,
+        'triggeredAt': triggered_at,
+        'liveAt': live_at,
+        'publishToLive': live_at - published_at if live_at else None,
+        'hookToLive': live_at - triggered_at if live_at else None,
+        'polls': polls,
+        'recordedAt': observed,
+    }
+
+
+class DeployMetrics:
+    """Append-only history of watched deployments"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def record(self, result):
+        append_jsonl(self.path, result)
+
+    def history(self, environment=None):
+        return [r for r in read_jsonl(self.path) if environment is None or r.get('environment') == environment]
+
+    def expected_build_seconds(self, environment, recent=10):
+        """Median hook -> live time of the last few successful deploys, or None"""
+        times = [r['hookToLive'] for r in self.history(environment) if r.get('hookToLive')][-recent:]
+        return percentile(times, 0.5) if len(times) >= 3 else None
+
+    def summary(self):
+        """environment -> deploy counts and publish -> live latency stats"""
+        summary = {}
+        for record in self.history():
+            entry = summary.setdefault(record['environment'], {'deploys': 0, 'ready': 0, 'failed': 0,
+                                                                 'latencies': [], 'last': None})
+            entry['deploys'] += 1
+            entry['last'] = record
+            if record['state'] == READY:
+                entry['ready'] += 1
+                if record.get('publishToLive') is not None:
+                    entry['latencies'].append(record['publishToLive'])
+            else:
+                entry['failed'] += 1
+        for entry in summary.values():
+            entry['latency'] = latency_summary(entry.pop('latencies'))
+        return summary
+
+
+def format_deploy_metrics(summary):
+    if not summary:
+        return "No watched deploys yet"
+    lines = ["Publish → live", f"  {'environment':<12} {'deploys':>7} {'failed':>6} {'p50':>7} {'p95':>7} {'last':>7}"]
+    for environment, entry in sorted(summary.items()):
+        latency = entry['latency']
+        last = entry['last']
+        last_text = format_duration(last.get('publishToLive')) if last['state'] == READY else last['state']
+        lines.append(f"  {environment:<12} {entry['deploys']:>7} {entry['failed']:>6} "
+                     f"{format_duration(latency['p50']):>7} {format_duration(latency['p95']):>7} {last_text:>7}")
+    return "\n".join(lines)
@@ -0,0 +1,260 @@
+"""
+Near-duplicate detection across product images
+
+The same artwork is sold as original art, poster and photo-paper poster,
+so near-identical images under related slugs (leap-original-art,
+leap-poster) are expected. The same image under an unrelated slug usually
+means an upload went to the wrong product.
+
+Each synced image gets a 64-bit pHash (low frequencies of a 32x32 DCT) and
+dHash (horizontal gradient signs). Hashes are computed in batches with
+NumPy, cached by source SHA-256, and looked up through a BK-tree so finding
+every image's neighbours stays well below O(n^2) comparisons.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from .fsutil import atomic_write_json
+from .hashcache import FileHashCache
+
+# Two images match when both hashes are within these Hamming distances
+PHASH_THRESHOLD = 6
+DHASH_THRESHOLD = 10
+
+# Longest first, so "photo-paper-poster" wins over "poster"
+VARIANT_SUFFIXES = ('photo-paper-poster', 'original-art', 'poster', 'postcard')
+
+_DCT_SIZE = 32
+_DCT = np.cos(np.pi * np.outer(np.arange(8), 2 * np.arange(_DCT_SIZE) + 1) / (2 * _DCT_SIZE))
+
+
+def _pack_bits(bits):
+    """(n, 64) bool array -> list of n Python ints"""
+    return [int.from_bytes(row.tobytes(), 'big') for row in np.packbits(bits, axis=1)]
+
+
+def phash_batch(pixels):
+    """pHash of an (n, 32, 32) grayscale float array"""
+    low = np.einsum('kx,nxy,ly->nkl', _DCT, pixels, _DCT).reshape(len(pixels), 64)
+    median = np.median(low[:, 1:], axis=1)
+    return _pack_bits(low > median[:, None])
+
+
+def dhash_batch(pixels):
+    """dHash of an (n, 8, 9) grayscale float array"""
+    return _pack_bits((pixels[:, :, 1:] > pixels[:, :, :-1]).reshape(len(pixels), 64))
+
+
+def _hash_many(paths):
+    """Worker entry point: (dhash, phash) per path, None where an image is unreadable"""
+    small, large, ok = [], [], []
+    for path in paths:
+        try:
+            image = Image.open(path)
+            image.draft('L', (_DCT_SIZE * 2, _DCT_SIZE * 2))
+            gray = image.convert('L')
+        except (OSError, ValueError):
+            ok.append(False)
+            continue
+        large.append(np.asarray(gray.resize((_DCT_SIZE, _DCT_SIZE), Image.BILINEAR), dtype=np.float32))
+        small.append(np.asarray(gray.resize((9, 8), Image.BILINEAR), dtype=np.float32))
+        ok.append(True)
+
+    hashes = iter(zip(dhash_batch(np.stack(small)), phash_batch(np.stack(large)))) if small else iter(())
+    return [next(hashes) if good else None for good in ok]
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes under Hamming distance"""
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value, item):
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def query(self, value, radius):
+        """Yield (distance, item) for every stored item within `radius`"""
+        if self.root is None:
+            return
+        stack = [self.root]
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= radius:
+                for item in items:
+                    yield distance, item
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+
+
+def artwork_name(slug):
+    """Strip a variant suffix: leap-photo-paper-poster -> leap"""
+    for suffix in VARIANT_SUFFIXES:
+        if slug.endswith('-' + suffix):
+            return slug[:-len(suffix) - 1]
+    return slug
+
+
+class PerceptualIndex:
+    """sha256 of a source image -> (dhash, phash), persisted between runs"""
+
+    VERSION = 1
+
+    def __init__(self, cache_file):
+        self.cache_file = Path(cache_file)
+        self.entries = {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.entries = {k: (int(d, 16), int(p, 16)) for k, (d, p) in data['entries'].items()}
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+    def save(self, keep):
+        entries = {k: [f"{d:016x}", f"{p:016x}"] for k, (d, p) in self.entries.items() if k in keep}
+        atomic_write_json(self.cache_file, {'version': self.VERSION, 'entries': entries}, durable=False)
+
+
+def _hash_images(paths, workers):
+    if workers == 1 or len(paths) < 64:
+        return _hash_many(paths)
+    batch = 64
+    batches = [paths[i:i + batch] for i in range(0, len(paths), batch)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [r for chunk in pool.map(_hash_many, batches) for r in chunk]
+
+
+def find_near_duplicates(public_dir, cache_dir, phash_threshold=PHASH_THRESHOLD,
+                         dhash_threshold=DHASH_THRESHOLD, workers=None, log=print):
+    """Cluster near-identical images across products in public/image-map.json
+
+    Returns {'images', 'hashed', 'clusters'}; each cluster is a dict with
+    'products' (sorted slugs), 'images' (urls), 'distance' (largest pHash
+    distance seen) and 'suspicious' (True unless every slug is a variant of
+    the same artwork). Suspicious clusters come first.
+    """
+    public_dir = Path(public_dir)
+    cache_dir = Path(cache_dir)
+    with open(public_dir / "image-map.json", 'r', encoding='utf-8') as f:
+        image_map = json.load(f)
+
+    hashes = FileHashCache(cache_dir / "file-hashes.json")
+    index = PerceptualIndex(cache_dir / "perceptual-index.json")
+
+    images = []       # (slug, url, sha256)
+    todo = {}
+    for slug, entries in image_map.items():
+        for entry in entries:
+            url = entry.get('url', '')
+            try:
+                digest = hashes.sha256(public_dir / url.lstrip('/'))
+            except OSError:
+                continue
+            images.append((slug, url, digest))
+            if digest not in index.entries:
+                todo.setdefault(digest, str(public_dir / url.lstrip('/')))
+
+    if todo:
+        log(f"🔍 Hashing {len(todo)} images...")
+        digests = list(todo)
+        results = _hash_images([todo[d] for d in digests], workers or os.cpu_count() or 1)
+        for digest, result in zip(digests, results):
+            if result is not None:
+                index.entries[digest] = result
+
+    hashes.save()
+    index.save({digest for _, _, digest in images})
+
+    tree = BKTree()
+    hashed = [(slug, url, index.entries[d]) for slug, url, d in images if d in index.entries]
+    for i, (_, _, (_, phash)) in enumerate(hashed):
+        tree.add(phash, i)
+
+    # Union-find over matching pairs from different products
+    parent = list(range(len(hashed)))
+    worst = {}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, (slug, _, (dhash, phash)) in enumerate(hashed):
+        for distance, j in tree.query(phash, phash_threshold):
+            if j <= i or hashed[j][0] == slug:
+                continue
+            if hamming(dhash, hashed[j][2][0]) > dhash_threshold:
+                continue
+            a, b = find(i), find(j)
+            if a != b:
+                parent[b] = a
+                worst[a] = max(worst.get(a, 0), worst.pop(b, 0), distance)
+            else:
+                worst[a] = max(worst.get(a, 0), distance)
+
+    groups = {}
+    for i in range(len(hashed)):
+        groups.setdefault(find(i), []).append(i)
+
+    clusters = []
+    for root, members in groups.items():
+        slugs = sorted({hashed[i][0] for i in members})
+        if len(slugs) < 2:
+            continue
+        clusters.append({
+            'products': slugs,
+            'images': sorted(hashed[i][1] for i in members),
+            'distance': worst.get(root, 0),
+            'suspicious': len({artwork_name(s) for s in slugs}) > 1,
+        })
+    clusters.sort(key=lambda c: (not c['suspicious'], c['products']))
+    return {'images': len(images), 'hashed': len(hashed), 'clusters': clusters}
+
+
+def format_duplicate_report(result, limit=20):
+    """Human-readable summary for the Images tab"""
+    clusters = result['clusters']
+    suspicious = [c for c in clusters if c['suspicious']]
+    variants = len(clusters) - len(suspicious)
+    lines = [f"Images checked: {result['hashed']} of {result['images']}",
+             f"Near-duplicate groups: {len(clusters)} ({len(suspicious)} suspicious, "
+             f"{variants} expected variants)"]
+    if suspicious:
+        lines.append("")
+        lines.append("⚠️ Same image under unrelated products:")
+        for cluster in suspicious[:limit]:
+            lines.append(f"  • {', '.join(cluster['products'])} (distance {cluster['distance']})")
+        if len(suspicious) > limit:
+            lines.append(f"  ... and {len(suspicious) - limit} more")
+    else:
+        lines.append("✅ No suspicious duplicates")
+    return "\n".join(lines)
@@ -0,0 +1,144 @@
+"""
+Cached, atomic .env.local store
+
+Every reader and writer of frontend/.env.local goes through one EnvStore.
+The file is parsed once and parsed again only when its mtime or size
+changes, so deploy hooks, tokens and secrets are dict lookups. Writes
+re-read the current file under a lock, change only the keys they were
+given and keep comments, ordering and every other key. They go through
+atomic_write(), so a crash leaves the old file or the new one, never a
+truncated one. Concurrent threads can't lose each other's keys, and an
+edit made in an editor since the last read is kept too.
+"""
+
+import os
+import re
+import threading
+from pathlib import Path
+
+from .fsutil import atomic_write
+
+_LINE = re.compile(r'^\s*(?:export\s+)?([A-Za-z_][A-Za-z0-9_.-]*)\s*=\s*(.*)$')
+
+
+def _parse_value(raw):
+    """Value as Next.js (dotenv) reads it: quotes stripped, or a trailing # comment dropped"""
+    raw = raw.strip()
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in '"\'`':
+        value = raw[1:-1]
+        return value.replace('\\n', '\n') if raw[0] == '"' else value
+    return raw.split(' #', 1)[0].rstrip()
+
+
+def _format_line(key, value):
+    value = '' if value is None else str(value)
+    if '\n' in value:
+        value = '"' + value.replace('\n', '\\n') + '"'
+    return f"{key}={value}\n"
+
+
+class EnvStore:
+    """Parsed view of one .env file, refreshed when the file changes"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.RLock()
+        self._stamp = None
+        self._lines = []
+        self._values = {}
+
+    def _read(self):
+        """Reparse if the file changed since the last read; caller holds the lock"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._stamp, self._lines, self._values = None, [], {}
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        values = {}
+        for line in lines:
+            match = _LINE.match(line)
+            if match:
+                values[match.group(1)] = _parse_value(match.group(2))
+        self._stamp, self._lines, self._values = stamp, lines, values
+
+    def get(self, key, default=None):
+        """Value of `key`, or `default` if it's missing or empty"""
+        with self.lock:
+            self._read()
+            return self._values.get(key) or default
+
+    def get_int(self, key, default=None):
+        value = self.get(key)
+        try:
+            return int(value) if value is not None else default
+        except ValueError:
+            return default
+
+    def get_bool(self, key, default=False):
+        value = self.get(key)
+        if value is None:
+            return default
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+    def values(self, keys=None):
+        """Copy of every value, or just `keys` (missing ones map to None)"""
+        with self.lock:
+            self._read()
+            if keys is None:
+                return dict(self._values)
+            return {key: self._values.get(key) or None for key in keys}
+
+    def update(self, changes):
+        """Set (or, with a None value, remove) keys and write the file atomically
+
+        Returns the keys whose value actually changed. Nothing is written
+        when none did.
+        """
+        with self.lock:
+            self._read()
+            changed = [key for key, value in changes.items()
+                       if self._values.get(key) != (None if value is None else str(value))]
+            if not changed:
+                return []
+
+            lines, written = [], set()
+            for line in self._lines:
+                match = _LINE.match(line)
+                key = match.group(1) if match else None
+                if key not in changes:
+                    lines.append(line)
+                elif key not in written and changes[key] is not None:
+                    # First definition is replaced in place, later duplicates are dropped
+                    lines.append(_format_line(key, changes[key]))
+                    written.add(key)
+            if lines and not lines[-1].endswith('\n'):
+                lines[-1] += '\n'
+            lines += [_format_line(key, value) for key, value in changes.items()
+                      if value is not None and key not in written]
+
+            with atomic_write(self.path) as f:
+                f.writelines(lines)
+            self._stamp = None
+            self._read()
+            return changed
+
+    def set(self, key, value):
+        return bool(self.update({key: value}))
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def env_store(path):
+    """The shared EnvStore for `path`, so every caller uses one cache and one lock"""
+    path = Path(path).resolve()
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = EnvStore(path)
+        return _stores[path]
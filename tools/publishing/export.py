@@ -0,0 +1,295 @@
+"""
+Native product export stage
+
+Replaces scripts/export-products.js for the publishing workflow: pages
+through /api/products concurrently instead of one pagination[limit]=1000
+request, and streams products-data.json to disk as pages arrive so memory
+stays flat however big the catalog gets. Both output files are swapped in
+atomically, and a failed export leaves the previous files in place rather
+than writing an empty catalog.
+
+Given a cache directory the export is incremental: a fields-only listing
+detects new, changed and deleted products, and only the changed ones are
+fetched in full (filters[updatedAt][$gt]=<last export>).
+"""
+
+import json
+import time
+from pathlib import Path
+
+from .fsutil import atomic_write, atomic_write_json
+from .shards import SHARD_DIR_NAME, write_catalog_shards
+from .strapi import MAX_PAGE_SIZE, StrapiClient, StrapiError, populate_params
+
+# Only what the storefront reads (see Product / StrapiImage in src/lib/api.ts).
+# Image `formats` are the bulk of a populate=* payload and are never used.
+DEFAULT_POPULATE = {
+    'images': ['url', 'alternativeText', 'width', 'height'],
+    'category': None,
+    'currentShow': None,
+}
+
+
+def write_products_stream(path, products, log=print):
+    """Stream products into a slug-keyed JSON object, atomically
+
+    Output matches JSON.stringify(productsBySlug, null, 2). Returns the number
+    of products written.
+    """
+    seen = set()
+    duplicates = False
+    count = 0
+    with atomic_write(path) as f:
+        f.write('{')
+        for product in products:
+            slug = product.get('slug')
+            if not slug:
+                log(f"⚠️ Product missing slug: {product.get('title') or product.get('id')}")
+                continue
+            if slug in seen:
+                log(f"⚠️ Duplicate slug {slug} (id {product.get('id')}) - keeping the last, like export-products.js")
+                duplicates = True
+            seen.add(slug)
+
+            body = json.dumps(product, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            f.write(f'{"," if count else ""}\n  {json.dumps(slug, ensure_ascii=False)}: {body}')
+            count += 1
+        f.write('\n}' if count else '}')
+
+    if duplicates:
+        # Rare, so collapse in memory: json.load keeps the first key's position
+        # and the last value, exactly as productsBySlug[slug] = product does
+        with open(path, 'r', encoding='utf-8') as f:
+            products_by_slug = json.load(f)
+        return write_products_stream(path, products_by_slug.values(), log=log)
+    return count
+
+
+def export_site_settings(client, output_file):
+    """Write site-settings.json from the Strapi global single type"""
+    global_data = client.get_json('global').get('data') or {}
+    settings = {'posterPrice': global_data.get('posterPrice') or None}
+    atomic_write_json(output_file, settings)
+    return settings
+
+
+class ProductCache:
+    """Per-product JSON files keyed by Strapi id, plus an index of updatedAt
+
+    Lives in .publish-cache/export/ so a delta export can rebuild
+    products-data.json without re-downloading unchanged products.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.products_dir = self.cache_dir / "products"
+        self.index_file = self.cache_dir / "index.json"
+
+    def load_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if index.get('version') != self.VERSION:
+            return None
+        index['products'] = {int(k): v for k, v in index.get('products', {}).items()}
+        return index
+
+    def save_index(self, index):
+        index = dict(index, version=self.VERSION)
+        index['products'] = {str(k): v for k, v in index['products'].items()}
+        atomic_write_json(self.index_file, index)
+
+    def write(self, product):
+        self.products_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.products_dir / f"{product['id']}.json", product, durable=False)
+
+    def remove(self, product_id):
+        try:
+            (self.products_dir / f"{product_id}.json").unlink()
+        except FileNotFoundError:
+            pass
+
+    def missing(self, ids):
+        """Ids whose cached product file is gone (deleted by hand, or a torn cache)"""
+        return {product_id for product_id in ids
+                if not (self.products_dir / f"{product_id}.json").exists()}
+
+    def iter_products(self, ids):
+        """Yield cached products one at a time, in the given order"""
+        for product_id in ids:
+            with open(self.products_dir / f"{product_id}.json", 'r', encoding='utf-8') as f:
+                yield json.load(f)
+
+
+def _cached_stream(products, cache, listing):
+    """Pass products through while writing each one to the cache"""
+    for product in products:
+        cache.write(product)
+        listing[product['id']] = product.get('updatedAt')
+        yield product
+
+
+def _export_products_delta(client, products_file, cache, params, populate_key, full, page_size,
+                           concurrency, log):
+    """Refresh the product cache with only what changed, then rebuild products-data.json
+
+    Relation edits (a renamed category, say) don't bump a product's
+    updatedAt, so run with full=True after changing categories or shows.
+    """
+    index = cache.load_index()
+    if full or index is None or index.get('populate') != populate_key:
+        log("📦 Full export (no usable product cache)" if not full else "📦 Full export requested")
+        listing = {}
+        count = write_products_stream(
+            products_file,
+            _cached_stream(client.iter_entries('products', params, page_size=page_size,
+                                               concurrency=concurrency), cache, listing),
+            log=log,
+        )
+        stale_ids = set((index or {}).get('products', {})) - set(listing)
+        for product_id in stale_ids:
+            cache.remove(product_id)
+        return listing, {'mode': 'full', 'products': count, 'changed': count, 'deleted': 0}
+
+    cached = index['products']
+
+    # Cheap listing: Strapi returns id/documentId plus the one field asked for
+    listing_params = {'fields[0]': 'updatedAt', 'sort[0]': 'id:asc'}
+    listing = {entry['id']: entry.get('updatedAt')
+               for entry in client.iter_entries('products', listing_params, page_size=page_size,
+                                                concurrency=concurrency)}
+
+    deleted = set(cached) - set(listing)
+    stale = {product_id for product_id, updated in listing.items() if cached.get(product_id) != updated}
+    # Cache files that went missing are refetched like changed products
+    lost = cache.missing(set(listing) - stale)
+    if lost:
+        log(f"⚠️ {len(lost)} cached products missing - refetching them")
+        stale |= lost
+    changed = 0
+
+    if stale and index.get('lastUpdatedAt'):
+        since_params = dict(params)
+        since_params['filters[updatedAt][$gt]'] = index['lastUpdatedAt']
+        for product in client.iter_entries('products', since_params, page_size=page_size,
+                                           concurrency=concurrency):
+            cache.write(product)
+            listing[product['id']] = product.get('updatedAt')
+            stale.discard(product['id'])
+            changed += 1
+
+    # Anything the updatedAt filter missed (restored entries, clock skew)
+    stale_ids = sorted(stale)
+    for start in range(0, len(stale_ids), 50):
+        chunk_params = dict(params)
+        for i, product_id in enumerate(stale_ids[start:start + 50]):
+            chunk_params[f'filters[id][$in][{i}]'] = product_id
+        for product in client.iter_entries('products', chunk_params, page_size=page_size,
+                                           concurrency=concurrency):
+            cache.write(product)
+            listing[product['id']] = product.get('updatedAt')
+            stale.discard(product['id'])
+            changed += 1
+
+    # Listed but gone by the time we asked for it
+    for product_id in stale:
+        listing.pop(product_id, None)
+        deleted.add(product_id)
+
+    for product_id in deleted:
+        cache.remove(product_id)
+
+    ids = sorted(listing)
+    if changed or deleted or not products_file.exists():
+        count = write_products_stream(products_file, cache.iter_products(ids), log=log)
+    else:
+        count = len(ids)
+        log("ℹ️ No product changes since last export")
+
+    return listing, {'mode': 'delta', 'products': count, 'changed': changed, 'deleted': len(deleted)}
+
+
+def export_catalog(strapi_url, output_dir, token=None, populate=None, page_size=MAX_PAGE_SIZE,
+                   concurrency=4, cache_dir=None, full=False, shards=True, log=print):
+    """Export products-data.json and site-settings.json into `output_dir`
+
+    With a `cache_dir` only products whose updatedAt moved since the last
+    successful export are downloaded. With `shards` the per-page and
+    per-product files from publishing.shards are refreshed too. Returns a
+    summary dict; raises StrapiError if the product export failed.
+    """
+    output_dir = Path(output_dir)
+    products_file = output_dir / "products-data.json"
+    settings_file = output_dir / "site-settings.json"
+    populate = DEFAULT_POPULATE if populate is None else populate
+    params = {'sort[0]': 'id:asc'}
+    params.update(populate_params(populate))
+
+    start = time.perf_counter()
+    with StrapiClient(strapi_url, token=token, pool_size=concurrency) as client:
+        log(f"📦 Exporting products from {strapi_url}...")
+        if cache_dir is None:
+            count = write_products_stream(
+                products_file,
+                client.iter_entries('products', params, page_size=page_size, concurrency=concurrency),
+                log=log,
+            )
+            summary = {'mode': 'full', 'products': count, 'changed': count, 'deleted': 0}
+            cache = listing = None
+        else:
+            cache = ProductCache(cache_dir)
+            populate_key = json.dumps(populate, sort_keys=True)
+            listing, summary = _export_products_delta(
+                client, products_file, cache, params, populate_key, full, page_size, concurrency, log)
+            # Only recorded once products-data.json is safely written
+            cache.save_index({
+                'populate': populate_key,
+                'lastUpdatedAt': max((u for u in listing.values() if u), default=None),
+                'lastExport': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'products': listing,
+            })
+
+        if summary['mode'] == 'delta':
+            log(f"✅ Exported {summary['products']} products to {products_file} "
+                f"({summary['changed']} changed, {summary['deleted']} deleted)")
+        else:
+            log(f"✅ Exported {summary['products']} products to {products_file}")
+
+        if shards:
+            shard_manifest = output_dir / SHARD_DIR_NAME / "manifest.json"
+            if summary['changed'] or summary['deleted'] or not shard_manifest.exists():
+                if cache is not None:
+                    products = cache.iter_products(sorted(listing))
+                else:
+                    with open(products_file, 'r', encoding='utf-8') as f:
+                        products = json.load(f).values()
+                result = write_catalog_shards(output_dir, products, log=log)
+                log(f"✅ Product shards: {result['changed']} written, {result['removed']} removed "
+                    f"({result['files']} total)")
+
+        settings_ok = True
+        try:
+            settings = export_site_settings(client, settings_file)
+            log(f"✅ Exported site settings to {settings_file}")
+            if settings['posterPrice']:
+                log(f"   Poster price: ${settings['posterPrice']}")
+        except StrapiError as e:
+            settings_ok = False
+            log(f"❌ Failed to export site settings: {e}")
+            if not settings_file.exists():
+                log("⚠️ Creating default site settings file")
+                atomic_write_json(settings_file, {'posterPrice': None})
+            else:
+                log("⚠️ Keeping existing site-settings.json")
+
+        return dict(
+            summary,
+            settings_exported=settings_ok,
+            requests=client.request_count,
+            bytes=client.bytes_received,
+            seconds=time.perf_counter() - start,
+        )
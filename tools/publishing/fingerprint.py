@@ -0,0 +1,143 @@
+"""
+Deploy fingerprints
+
+A Vercel build is a function of the branch's git tree, the published data
+files committed in it and the environment variables the app reads. Every
+part is read from the branch Vercel builds, not the working tree, so local
+edits that haven't been pushed don't change it. Hashing those together
+gives a fingerprint of what a deploy would produce. It is recorded per
+environment when a deploy hook is accepted, so a second trigger with
+nothing new can be skipped instead of paying for an identical build.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+from .fsutil import atomic_write_json
+from .gitops import git, production_branch, rev_parse
+
+# Every variable src/ and scripts/ read that changes what a deployment serves
+DEPLOY_ENV_KEYS = (
+    'NEXT_PUBLIC_STRAPI_URL',
+    'STRAPI_API_TOKEN',
+    'NEXT_PUBLIC_STRIPE_PUBLISHABLE_KEY',
+    'STRIPE_SECRET_KEY',
+    'STRIPE_WEBHOOK_SECRET',
+    'NEXT_PUBLIC_GA_ID',
+    'GA_API_SECRET',
+    'SMTP_HOST',
+    'SMTP_PORT',
+    'SMTP_USER',
+    'SMTP_PASS',
+    'EMAIL_FROM',
+    'EMAIL_TO',
+)
+
+# Published data files reported separately from the rest of the tree
+DEPLOY_FILES = ('products-data.json', 'image-map.json')
+
+
+def value_digest(value):
+    """Short SHA-256 of a secret, safe to store and display"""
+    if value is None:
+        return None
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:12]
+
+
+def deploy_branch(repo_dir, environment, remote='origin'):
+    """Branch the `environment` deploy hook builds"""
+    if environment == 'production':
+        return production_branch(repo_dir, remote)
+    return environment
+
+
+def deploy_fingerprint(repo_dir, environment, env_values, branch=None, remote='origin'):
+    """Return (fingerprint, components) for deploying `environment`
+
+    The tree and the DEPLOY_FILES blobs come from the remote-tracking
+    branch when there is one, because that is what Vercel checks out.
+    `env_values` maps the DEPLOY_ENV_KEYS to their values. Only digests end
+    up in the components.
+    """
+    repo_dir = Path(repo_dir)
+    branch = branch or deploy_branch(repo_dir, environment, remote)
+    ref = f'refs/remotes/{remote}/{branch}'
+    if rev_parse(repo_dir, ref) is None:
+        ref = f'refs/heads/{branch}'
+    tree = git(repo_dir, 'rev-parse', f'{ref}^{{tree}}', check=False).stdout.strip() or None
+
+    files = {}
+    for name in DEPLOY_FILES:
+        blob = git(repo_dir, 'rev-parse', '--verify', '--quiet', f'{ref}:public/{name}', check=False)
+        files[name] = blob.stdout.strip() or None
+
+    components = {
+        'ref': ref,
+        'tree': tree,
+        'files': files,
+        'env': {key: value_digest(env_values.get(key)) for key in DEPLOY_ENV_KEYS},
+    }
+    digest = hashlib.sha256()
+    digest.update(f"tree:{tree}\n".encode())
+    for name, value in sorted(files.items()):
+        digest.update(f"file:{name}:{value}\n".encode())
+    for key, value in sorted(components['env'].items()):
+        digest.update(f"env:{key}:{value}\n".encode())
+    return digest.hexdigest(), components
+
+
+def describe_changes(old, new):
+    """What differs between two components dicts, as short strings"""
+    if not old:
+        return ["no previous deploy recorded"]
+    changes = []
+    if old.get('tree') != new.get('tree'):
+        changes.append(f"code/content ({(old.get('tree') or '-')[:8]} → {(new.get('tree') or '-')[:8]})")
+    for name, value in new['files'].items():
+        if old.get('files', {}).get(name) != value:
+            changes.append(name)
+    for key, value in new['env'].items():
+        if old.get('env', {}).get(key) != value:
+            changes.append(f"env {key}")
+    return changes
+
+
+class DeployLedger:
+    """Last accepted deploy per environment, in .publish-cache/deploys.json"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def last(self, environment):
+        return self.load().get(environment)
+
+    def record(self, environment, fingerprint, components, **extra):
+        data = self.load()
+        data[environment] = dict(extra, fingerprint=fingerprint, components=components,
+                                 deployedAt=time.strftime('%Y-%m-%dT%H:%M:%S'))
+        atomic_write_json(self.path, data)
+
+    def update(self, environment, **fields):
+        """Merge fields into the environment's last record, if there is one"""
+        data = self.load()
+        if environment in data:
+            data[environment].update(fields)
+            atomic_write_json(self.path, data)
+
+
+def check_deploy_needed(repo_dir, environment, env_values, ledger, branch=None):
+    """Return (needed, fingerprint, components, changes) against the ledger"""
+    fingerprint, components = deploy_fingerprint(repo_dir, environment, env_values, branch=branch)
+    last = ledger.last(environment)
+    if last and last.get('fingerprint') == fingerprint:
+        return False, fingerprint, components, []
+    return True, fingerprint, components, describe_changes((last or {}).get('components'), components)
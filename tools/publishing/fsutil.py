@@ -0,0 +1,124 @@
+"""
+Small filesystem helpers shared by the publishing stages
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def _new_file_mode(path):
+    """Keep an existing file's permissions, otherwise honour the umask"""
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextmanager
+def atomic_write(path, mode='w', encoding='utf-8', durable=True):
+    """Write to a temp file next to `path` and rename it into place
+
+    Readers see either the old file or the complete new one, never a
+    truncated write. If the block raises, `path` is left untouched.
+    durable=False skips the fsync, for caches that can be rebuilt.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        if 'b' in mode:
+            f = os.fdopen(fd, mode)
+        else:
+            f = os.fdopen(fd, mode, encoding=encoding, newline='\n')
+        with f:
+            yield f
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_name, _new_file_mode(path))
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_json(path, data, indent=2, durable=True):
+    """json.dump through atomic_write, formatted like JSON.stringify(data, null, 2)"""
+    with atomic_write(path, durable=durable) as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+
+
+def write_text_if_changed(path, text):
+    """Atomically write `text` unless the file already holds it; returns True if written
+
+    Unchanged files keep their mtime, so git and the CDN don't see churn.
+    """
+    path = Path(path)
+    try:
+        if path.read_text(encoding='utf-8') == text:
+            return False
+    except FileNotFoundError:
+        pass
+    with atomic_write(path) as f:
+        f.write(text)
+    return True
+
+
+def remove_stale_files(directory, keep, pattern="*.json"):
+    """Delete files under `directory` not in `keep`, then any empty subdirectories
+
+    Returns the number of files removed.
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return 0
+    removed = 0
+    for path in sorted(directory.rglob(pattern)):
+        if path not in keep:
+            path.unlink()
+            removed += 1
+    for subdir in sorted((p for p in directory.rglob("*") if p.is_dir()), reverse=True):
+        if not any(subdir.iterdir()):
+            subdir.rmdir()
+    return removed
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Hex SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def append_jsonl(path, record):
+    """Append one JSON record as a line, creating the file if needed"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8', newline='\n') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def read_jsonl(path):
+    """Every record in a JSON lines file; a torn last line is skipped"""
+    records = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
@@ -0,0 +1,450 @@
+"""
+Live catalog stats from filesystem events
+
+The Images tab used to refresh only when a sync finished, by reparsing the
+whole image map. Deleted folders, garbage-collected hashes and files written
+by other scripts didn't show up until the next sync. CatalogWatcher keeps an
+in-memory index of public/products instead:
+
+    slug -> {file name: (bytes, format)}
+
+plus running totals of files, bytes and files per format. The index is
+built once by scanning, then patched one path at a time from filesystem
+events. image-map.json is reparsed only when it actually changes. Keeping
+the panel current costs work proportional to what changed, not to the
+size of the catalog.
+
+On Linux the events come from inotify, through ctypes, with one watch per
+product directory. Elsewhere, or when inotify is unavailable or out of
+watches, a polling fallback compares stat snapshots. It stats each
+product directory and rescans only those whose mtime moved. Adding,
+removing or renaming a file bumps that mtime, and every publishing stage
+writes files that way.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from .image_map import summarize_image_map
+
+POLL_INTERVAL = 2.0
+# Change callbacks are coalesced to at most one per this many seconds
+NOTIFY_INTERVAL = 0.5
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT = struct.Struct('iIII')
+_FILE_EVENTS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_DIR_EVENTS = _FILE_EVENTS | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+
+def _format_of(name):
+    ext = os.path.splitext(name)[1].lower().lstrip('.')
+    return 'jpg' if ext == 'jpeg' else ext or 'other'
+
+
+class ProductIndex:
+    """File counts, bytes and formats per product directory, with running totals"""
+
+    def __init__(self, products_dir):
+        self.products_dir = Path(products_dir)
+        self.lock = threading.Lock()
+        self.products = {}
+        self.files = 0
+        self.bytes = 0
+        self.formats = Counter()
+        self.format_bytes = Counter()
+
+    def _add(self, entry):
+        size, fmt = entry
+        self.files += 1
+        self.bytes += size
+        self.formats[fmt] += 1
+        self.format_bytes[fmt] += size
+
+    def _drop(self, entry):
+        size, fmt = entry
+        self.files -= 1
+        self.bytes -= size
+        self.formats[fmt] -= 1
+        self.format_bytes[fmt] -= size
+        if not self.formats[fmt]:
+            del self.formats[fmt]
+            del self.format_bytes[fmt]
+
+    def _read_dir(self, slug):
+        entries = {}
+        try:
+            with os.scandir(self.products_dir / slug) as it:
+                for item in it:
+                    if item.name.startswith('.'):
+                        continue
+                    try:
+                        if item.is_file():
+                            entries[item.name] = (item.stat().st_size, _format_of(item.name))
+                    except FileNotFoundError:
+                        continue
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return entries
+
+    def scan(self):
+        """Full rebuild; only at start-up and after an event queue overflow"""
+        try:
+            slugs = [item.name for item in os.scandir(self.products_dir) if item.is_dir()]
+        except FileNotFoundError:
+            slugs = []
+        with self.lock:
+            self.products, self.files, self.bytes = {}, 0, 0
+            self.formats, self.format_bytes = Counter(), Counter()
+        for slug in slugs:
+            self.rescan_dir(slug)
+
+    def rescan_dir(self, slug):
+        """Re-read one product directory; returns True if anything changed"""
+        entries = self._read_dir(slug)
+        with self.lock:
+            old = self.products.get(slug)
+            if entries == old:
+                return False
+            for entry in (old or {}).values():
+                self._drop(entry)
+            if entries is None:
+                self.products.pop(slug, None)
+            else:
+                for entry in entries.values():
+                    self._add(entry)
+                self.products[slug] = entries
+            return True
+
+    def remove_dir(self, slug):
+        with self.lock:
+            old = self.products.pop(slug, None)
+            for entry in (old or {}).values():
+                self._drop(entry)
+            return old is not None
+
+    def update_file(self, slug, name):
+        """Re-stat one file after an event for it; returns True if the index changed"""
+        if name.startswith('.'):
+            return False
+        try:
+            size = os.stat(self.products_dir / slug / name).st_size
+            entry = (size, _format_of(name))
+        except (FileNotFoundError, NotADirectoryError):
+            entry = None
+        with self.lock:
+            files = self.products.setdefault(slug, {})
+            old = files.get(name)
+            if old == entry:
+                return False
+            if old:
+                self._drop(old)
+                del files[name]
+            if entry:
+                self._add(entry)
+                files[name] = entry
+            return True
+
+    def summary(self):
+        with self.lock:
+            return {
+                'directories': len(self.products),
+                'empty': sum(1 for files in self.products.values() if not files),
+                'files': self.files,
+                'bytes': self.bytes,
+                'formats': {fmt: (count, self.format_bytes[fmt]) for fmt, count in self.formats.most_common()},
+            }
+
+
+class _Inotify:
+    """Minimal inotify binding; raises OSError where inotify isn't available"""
+
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is Linux-only")
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("libc has no inotify")
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+
+    def add(self, path, mask):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(path)), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch {path}: {os.strerror(errno)}")
+        self.paths[wd] = Path(path)
+        return wd
+
+    def read(self, timeout):
+        """[(watched path, mask, name)] for events within `timeout` seconds"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return []
+        events, offset = [], 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            path = self.paths.get(wd)
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+            events.append((path, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class CatalogWatcher:
+    """Keeps a ProductIndex and the image map summary current from filesystem events
+
+    `on_change()` is called from the watcher thread, at most every
+    NOTIFY_INTERVAL seconds, whenever the index or the map changed.
+    `backend` is 'inotify' or 'polling'.
+    """
+
+    def __init__(self, frontend_dir, on_change=None, poll_interval=POLL_INTERVAL, force_polling=False, log=print):
+        self.frontend_dir = Path(frontend_dir)
+        self.public_dir = self.frontend_dir / "public"
+        self.products_dir = self.public_dir / "products"
+        self.map_file = self.frontend_dir / "image-map.json"
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.force_polling = force_polling
+        self.log = log
+        self.index = ProductIndex(self.products_dir)
+        self.backend = None
+        self.events = 0
+        self.map_reads = 0
+        self._map_stamp = None
+        self._map_summary = None
+        self._map_error = None
+        self._stop = threading.Event()
+        self._dirty = False
+        self._last_notify = 0.0
+        self._polled = {}
+        self.thread = None
+
+    # Shared by both backends
+
+    def _reload_map(self):
+        """Reparse image-map.json if its mtime or size moved; returns True if it did"""
+        try:
+            stat = os.stat(self.map_file)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self._map_stamp:
+            return False
+        self._map_stamp = stamp
+        self.map_reads += 1
+        if stamp is None:
+            self._map_summary, self._map_error = None, f"{self.map_file.name} not found"
+            return True
+        try:
+            with open(self.map_file, 'r', encoding='utf-8') as f:
+                self._map_summary, self._map_error = summarize_image_map(json.load(f)), None
+        except (OSError, ValueError) as e:
+            # Caught mid-write by a non-atomic writer; the next event reparses it
+            self._map_stamp, self._map_error = None, str(e)
+        return True
+
+    def _changed(self):
+        self._dirty = True
+
+    def _maybe_notify(self, force=False):
+        now = time.monotonic()
+        if self._dirty and (force or now - self._last_notify >= NOTIFY_INTERVAL):
+            self._dirty = False
+            self._last_notify = now
+            if self.on_change:
+                try:
+                    self.on_change()
+                except Exception as e:
+                    self.log(f"⚠️ Image stats update failed: {e}")
+
+    def summary(self):
+        """Image map summary (None if unreadable) plus what's on disk"""
+        return {
+            'map': self._map_summary,
+            'map_error': self._map_error,
+            'disk': self.index.summary(),
+            'backend': self.backend,
+        }
+
+    def start(self):
+        # Snapshot before scanning, so a change made during the scan is seen as a change
+        self._polled = self._snapshot()
+        self.index.scan()
+        self._reload_map()
+        inotify = None
+        if not self.force_polling:
+            try:
+                inotify = self._start_inotify()
+            except OSError as e:
+                self.log(f"ℹ️ inotify unavailable ({e}) - polling for image changes every {self.poll_interval:g}s")
+        self.backend = 'inotify' if inotify else 'polling'
+        target = (lambda: self._run_inotify(inotify)) if inotify else self._run_polling
+        self.thread = threading.Thread(target=target, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # inotify backend
+
+    def _start_inotify(self):
+        inotify = _Inotify()
+        try:
+            inotify.add(self.frontend_dir, IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE | IN_ONLYDIR)
+            inotify.add(self.public_dir, IN_CREATE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE | IN_ONLYDIR)
+            self._watch_products(inotify)
+        except OSError:
+            inotify.close()
+            raise
+        return inotify
+
+    def _watch_products(self, inotify):
+        if not self.products_dir.is_dir():
+            return
+        inotify.add(self.products_dir, _DIR_EVENTS)
+        for slug in list(self.index.products):
+            inotify.add(self.products_dir / slug, _DIR_EVENTS)
+
+    def _handle(self, inotify, path, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            # Events were dropped: the only safe answer is a rescan
+            self.index.scan()
+            self._reload_map()
+            self._changed()
+            return
+        if path is None:
+            return
+        if path == self.frontend_dir:
+            if name == self.map_file.name and self._reload_map():
+                self._changed()
+        elif path == self.public_dir:
+            if name == self.products_dir.name:
+                self.index.scan()
+                self._watch_products(inotify)
+                self._changed()
+        elif path == self.products_dir:
+            if not mask & IN_ISDIR:
+                return
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                # Watch first, then read, so files created in between aren't missed
+                try:
+                    inotify.add(self.products_dir / name, _DIR_EVENTS)
+                except OSError:
+                    pass
+                if self.index.rescan_dir(name):
+                    self._changed()
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                if self.index.remove_dir(name):
+                    self._changed()
+        elif path.parent == self.products_dir and path.name in self.index.products:
+            # Only directories still known under this name (a renamed one is re-added by its new name)
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if self.index.remove_dir(path.name):
+                    self._changed()
+            elif name and not mask & IN_ISDIR and self.index.update_file(path.name, name):
+                self._changed()
+
+    def _run_inotify(self, inotify):
+        try:
+            while not self._stop.is_set():
+                for path, mask, name in inotify.read(NOTIFY_INTERVAL):
+                    self.events += 1
+                    self._handle(inotify, path, mask, name)
+                self._maybe_notify()
+            self._maybe_notify(force=True)
+        finally:
+            inotify.close()
+
+    # Stat-snapshot backend
+
+    def _snapshot(self):
+        """slug -> directory mtime_ns, from one scandir of public/products"""
+        snapshot = {}
+        try:
+            with os.scandir(self.products_dir) as it:
+                for item in it:
+                    try:
+                        if item.is_dir():
+                            snapshot[item.name] = item.stat().st_mtime_ns
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    def _run_polling(self):
+        previous = self._polled
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            for slug in previous.keys() - current.keys():
+                if self.index.remove_dir(slug):
+                    self._changed()
+            for slug, mtime in current.items():
+                if previous.get(slug) != mtime and self.index.rescan_dir(slug):
+                    self.events += 1
+                    self._changed()
+            previous = current
+            if self._reload_map():
+                self._changed()
+            self._maybe_notify(force=True)
+
+
+def format_disk_stats(summary):
+    """Lines appended to the Image Statistics panel"""
+    disk = summary['disk']
+    lines = [f"On Disk ({summary['backend'] or 'not watching'}):",
+             f"  {disk['files']} files in {disk['directories']} product folders, "
+             f"{disk['bytes'] / 1024 / 1024:.1f} MB"]
+    if disk['empty']:
+        lines.append(f"  {disk['empty']} empty folders")
+    for fmt, (count, size) in disk['formats'].items():
+        lines.append(f"  • {fmt}: {count} files, {size / 1024 / 1024:.1f} MB")
+    return "\n".join(lines)
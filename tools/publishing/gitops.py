@@ -0,0 +1,208 @@
+"""
+Git operations for the publishing workflow
+
+Publishing only ever changes a known set of generated files, so staging
+is scoped to them. `git add .` has to stat every file in the working
+tree and picks up stray edits. Here one `git status` limited to the
+publish paths finds what changed, and one `git update-index --stdin`
+stages exactly those files, additions and deletions alike.
+
+Promotion (develop -> main) never checks out another branch in the
+user's working tree. A fast-forward is a plain push of develop's commit.
+A real merge is built with `git merge-tree --write-tree` (git 2.38+),
+or in a persistent detached worktree under .publish-cache/ on older git,
+and only the resulting commit is pushed.
+"""
+
+import subprocess
+from pathlib import Path
+
+# Everything sync-images and the export/image stages write, relative to frontend/
+PUBLISH_PATHS = (
+    'image-map.json',
+    'public/image-map.json',
+    'public/image-map',
+    'public/products',
+    'public/products-data.json',
+    'public/products-data',
+    'public/site-settings.json',
+    'public/static',
+)
+
+
+class GitError(Exception):
+    """A git command exited non-zero"""
+
+
+def git(repo_dir, *args, input=None, check=True, timeout=None):
+    """Run git in `repo_dir`; raises GitError on failure when `check` is set"""
+    try:
+        result = subprocess.run(
+            ['git', *args], cwd=repo_dir, input=input, timeout=timeout,
+            capture_output=True, text=True, encoding='utf-8', errors='replace',
+        )
+    except subprocess.TimeoutExpired as e:
+        raise GitError(f"git {' '.join(args)}: timed out after {timeout}s") from e
+    if check and result.returncode != 0:
+        raise GitError(f"git {' '.join(args)}: {(result.stderr or result.stdout).strip()}")
+    return result
+
+
+def publish_changes(repo_dir, paths=PUBLISH_PATHS):
+    """List (status, path) for every changed or untracked file under `paths`"""
+    output = git(repo_dir, 'status', '--porcelain=v1', '-z', '--untracked-files=all', '--no-renames',
+                 '--', *paths).stdout
+    changes = []
+    for entry in output.split('\0'):
+        if entry:
+            changes.append((entry[:2], entry[3:]))
+    return changes
+
+
+def stage_paths(repo_dir, paths):
+    """Stage additions, modifications and deletions of `paths` in one git call"""
+    if paths:
+        git(repo_dir, 'update-index', '--add', '--remove', '-z', '--stdin',
+            input=''.join(f"{path}\0" for path in paths))
+
+
+def stage_publish_output(repo_dir, paths=PUBLISH_PATHS):
+    """Stage whatever changed under the publish paths; returns the (status, path) list"""
+    changes = publish_changes(repo_dir, paths)
+    stage_paths(repo_dir, [path for _, path in changes])
+    return changes
+
+
+def commit_publish_output(repo_dir, message, paths=PUBLISH_PATHS, log=print):
+    """Stage and commit only publish output; returns True if a commit was made
+
+    Anything else the user has staged stays staged and out of this commit.
+    """
+    changes = stage_publish_output(repo_dir, paths)
+    if not changes:
+        log("ℹ️ No publish output changed - nothing to commit")
+        return False
+
+    added = sum(1 for status, _ in changes if status == '??' or 'A' in status)
+    deleted = sum(1 for status, _ in changes if 'D' in status)
+    log(f"📦 Staged {len(changes)} publish files ({added} new, {deleted} deleted, "
+        f"{len(changes) - added - deleted} modified)")
+
+    touched = sorted({p for p in paths if any(path == p or path.startswith(p + '/') for _, path in changes)})
+    git(repo_dir, 'commit', '-m', message, '--', *touched)
+    return True
+
+
+def rev_parse(repo_dir, rev):
+    """Commit id for `rev`, or None if it doesn't exist"""
+    result = git(repo_dir, 'rev-parse', '--verify', '-q', f'{rev}^{{commit}}', check=False)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def production_branch(repo_dir, remote='origin'):
+    """main, or master for repositories that never renamed it"""
+    if not rev_parse(repo_dir, f'refs/remotes/{remote}/main') and \
+            rev_parse(repo_dir, f'refs/remotes/{remote}/master'):
+        return 'master'
+    return 'main'
+
+
+def is_ancestor(repo_dir, ancestor, descendant):
+    return git(repo_dir, 'merge-base', '--is-ancestor', ancestor, descendant, check=False).returncode == 0
+
+
+def ahead_behind(repo_dir, left, right):
+    """(commits only in `left`, commits only in `right`)"""
+    output = git(repo_dir, 'rev-list', '--left-right', '--count', f'{left}...{right}').stdout.split()
+    return int(output[0]), int(output[1])
+
+
+def checked_out_branches(repo_dir):
+    """Branches checked out in any worktree of the repository"""
+    output = git(repo_dir, 'worktree', 'list', '--porcelain').stdout
+    return {line[len('branch refs/heads/'):] for line in output.splitlines()
+            if line.startswith('branch refs/heads/')}
+
+
+def _merge_commit_tree(repo_dir, base, source, message):
+    """Merge without any checkout via merge-tree; None if this git is too old"""
+    result = git(repo_dir, 'merge-tree', '--write-tree', '--messages', base, source, check=False)
+    if result.returncode not in (0, 1) or not result.stdout.strip():
+        return None
+    tree, _, details = result.stdout.partition('\n')
+    if result.returncode == 1:
+        raise GitError(f"Merge conflicts:\n{details.strip()}")
+    return git(repo_dir, 'commit-tree', tree.strip(), '-p', base, '-p', source, '-m', message).stdout.strip()
+
+
+def _merge_in_worktree(repo_dir, worktree_dir, base, source, message):
+    """Merge in a persistent detached worktree, so the user's checkout is untouched"""
+    worktree_dir = Path(worktree_dir)
+    if not (worktree_dir / '.git').exists():
+        git(repo_dir, 'worktree', 'prune')
+        worktree_dir.parent.mkdir(parents=True, exist_ok=True)
+        git(repo_dir, 'worktree', 'add', '--detach', str(worktree_dir), base)
+    else:
+        # Only files that differ from the last promotion get rewritten
+        git(worktree_dir, 'reset', '--hard', '-q', base)
+
+    result = git(worktree_dir, 'merge', '--no-ff', '--no-edit', '-m', message, source, check=False)
+    if result.returncode != 0:
+        git(worktree_dir, 'merge', '--abort', check=False)
+        raise GitError(f"Merge conflicts:\n{(result.stdout or result.stderr).strip()}")
+    return git(worktree_dir, 'rev-parse', 'HEAD').stdout.strip()
+
+
+def promote_branch(repo_dir, source='develop', target='main', remote='origin', worktree_dir=None,
+                   message="Promote develop to production", log=print):
+    """Bring `target` on the remote up to `source` without touching the working tree
+
+    Returns {'mode': 'up-to-date' | 'fast-forward' | 'merge', 'commit': sha}.
+    Raises GitError if the branches can't be merged cleanly or the push fails.
+    """
+    repo_dir = Path(repo_dir)
+    log(f"📡 Fetching {source} and {target} from {remote}...")
+    git(repo_dir, 'fetch', remote, source, target)
+
+    local = rev_parse(repo_dir, f'refs/heads/{source}')
+    upstream = rev_parse(repo_dir, f'refs/remotes/{remote}/{source}')
+    base = rev_parse(repo_dir, f'refs/remotes/{remote}/{target}')
+    if base is None:
+        raise GitError(f"{remote}/{target} does not exist")
+
+    # Promote whichever of local/remote develop contains the other, like a pull would
+    if local is None or (upstream and is_ancestor(repo_dir, local, upstream)):
+        source_commit = upstream
+    elif upstream is None or is_ancestor(repo_dir, upstream, local):
+        source_commit = local
+    else:
+        raise GitError(f"Local {source} and {remote}/{source} have diverged - pull {source} first")
+    if source_commit is None:
+        raise GitError(f"Branch {source} not found")
+
+    if is_ancestor(repo_dir, source_commit, base):
+        log(f"ℹ️ {target} already contains {source}")
+        return {'mode': 'up-to-date', 'commit': base}
+
+    if is_ancestor(repo_dir, base, source_commit):
+        mode, commit = 'fast-forward', source_commit
+        log(f"⏩ Fast-forwarding {target} to {source} ({commit[:8]})")
+    else:
+        mode = 'merge'
+        commit = _merge_commit_tree(repo_dir, base, source_commit, message)
+        if commit is None:
+            if worktree_dir is None:
+                raise GitError("git merge-tree --write-tree needs git 2.38+ and no worktree was given")
+            log("ℹ️ Merging in the promotion worktree")
+            commit = _merge_in_worktree(repo_dir, worktree_dir, base, source_commit, message)
+        log(f"🔀 Merged {source} into {target} ({commit[:8]})")
+
+    # Always a fast-forward of the fetched tip; rejected if someone pushed meanwhile
+    git(repo_dir, 'push', remote, f'{commit}:refs/heads/{target}')
+
+    # Keep the local branch in step when nobody has it checked out
+    local_target = rev_parse(repo_dir, f'refs/heads/{target}')
+    if target not in checked_out_branches(repo_dir) and (
+            local_target is None or is_ancestor(repo_dir, local_target, commit)):
+        git(repo_dir, 'update-ref', f'refs/heads/{target}', commit)
+    return {'mode': mode, 'commit': commit}
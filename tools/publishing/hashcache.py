@@ -0,0 +1,66 @@
+"""
+Content hashes for synced images, remembered across runs
+
+Image stages key their caches by the SHA-256 of each source file. Hashing
+every image on every sync would mean reading the whole catalog from disk,
+so the hash is remembered alongside the file's size and mtime and only
+recomputed when either changes.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from .fsutil import atomic_write_json, file_sha256
+
+
+class FileHashCache:
+    """path -> sha256, reused while a file's size and mtime are unchanged"""
+
+    VERSION = 1
+
+    def __init__(self, cache_file):
+        self.cache_file = Path(cache_file)
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.entries = data.get('files', {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def sha256(self, path):
+        """Hex SHA-256 of `path`; raises FileNotFoundError if it is missing"""
+        path = Path(path)
+        st = os.stat(path)
+        key = str(path.resolve())
+        entry = self.entries.get(key)
+        if entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns:
+            return entry['sha256']
+
+        digest = file_sha256(path)
+        self.entries[key] = {'size': st.st_size, 'mtime': st.st_mtime_ns, 'sha256': digest}
+        self.dirty = True
+        return digest
+
+    def moved(self, old_path, new_path):
+        """Carry a remembered hash over a rename (os.replace keeps size and mtime)"""
+        entry = self.entries.pop(str(Path(old_path).resolve()), None)
+        if entry is not None:
+            self.entries[str(Path(new_path).resolve())] = entry
+            self.dirty = True
+
+    def prune(self, keep):
+        """Forget every path not in `keep`"""
+        keep = {str(Path(p).resolve()) for p in keep}
+        for key in list(self.entries):
+            if key not in keep:
+                del self.entries[key]
+                self.dirty = True
+
+    def save(self):
+        if self.dirty:
+            atomic_write_json(self.cache_file, {'version': self.VERSION, 'files': self.entries}, durable=False)
+            self.dirty = False
@@ -0,0 +1,138 @@
+"""
+Content-hashed product image filenames
+
+Product images live at /products/<slug>/image-<n>.<hash>.<ext>, where
+<hash> is the first HASH_LENGTH hex digits of the file's SHA-256, so a
+replaced artwork gets a new URL and a URL can never serve different bytes.
+next.config.ts marks matching paths immutable (IMMUTABLE_CACHE_CONTROL).
+sync-images.js saves files under these names itself, so prebuild and
+dev:fresh produce the same map as the publishing tool. This stage renames
+anything still under a plain image-<n>.<ext> name, such as a map synced by
+an older sync-images.js or by hand, and points the image map at the new
+name.
+
+The stage is idempotent. An unchanged re-download is dropped in favour of
+the hashed file that is already there, and already-hashed entries are
+left alone.
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+from .fsutil import atomic_write_json
+from .hashcache import FileHashCache
+
+HASH_LENGTH = 10
+
+HASHED_NAME = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[A-Za-z0-9]+)$' % HASH_LENGTH)
+
+# The header next.config.ts sends for hashed names (checked by tests/test_hashed_assets.py)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def hashed_name(name, digest):
+    """image-1.png + sha256 -> image-1.<hash>.png"""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def hash_image_filenames(public_dir, cache_dir, log=print):
+    """Rename synced product images to content-hashed names and update image-map.json
+
+    Files in a product's directory that the map no longer references are
+    removed. Returns a summary dict with images, renamed, unchanged,
+    missing, removed and written.
+    """
+    public_dir = Path(public_dir)
+    map_file = public_dir / "image-map.json"
+    with open(map_file, 'r', encoding='utf-8') as f:
+        image_map = json.load(f)
+
+    hashes = FileHashCache(Path(cache_dir) / "file-hashes.json")
+    summary = {'images': 0, 'renamed': 0, 'unchanged': 0, 'missing': 0, 'removed': 0, 'written': False}
+    referenced = {}
+
+    for slug, images in image_map.items():
+        for image in images:
+            url = image.get('url', '')
+            path = public_dir / url.lstrip('/')
+            summary['images'] += 1
+
+            if HASHED_NAME.match(path.name) and path.exists():
+                summary['unchanged'] += 1
+                referenced.setdefault(path.parent, set()).add(path.name)
+                continue
+
+            try:
+                digest = hashes.sha256(path)
+            except OSError:
+                summary['missing'] += 1
+                log(f"⚠️ Missing image for {slug}: {url}")
+                continue
+
+            target = path.with_name(hashed_name(path.name, digest))
+            if target.exists():
+                # Same bytes as the hashed copy from an earlier sync
+                path.unlink()
+                summary['unchanged'] += 1
+            else:
+                os.replace(path, target)
+                hashes.moved(path, target)
+                summary['renamed'] += 1
+
+            image['url'] = url.rsplit('/', 1)[0] + '/' + target.name
+            summary['written'] = True
+            referenced.setdefault(target.parent, set()).add(target.name)
+
+    # Old hashed versions and stray downloads
+    for slug in image_map:
+        product_dir = public_dir / "products" / slug
+        if not product_dir.is_dir():
+            continue
+        keep = referenced.get(product_dir, set())
+        for path in product_dir.iterdir():
+            if path.is_file() and path.name not in keep:
+                path.unlink()
+                summary['removed'] += 1
+
+    if summary['written']:
+        atomic_write_json(map_file, image_map)
+    hashes.save()
+    return summary
+
+
+def write_legacy_image_map(map_file, image_map):
+    """Refresh the root image-map.json the Images tab reads
+
+    Product entries are rebuilt from public/image-map.json, so `static`
+    holds the hashed path. The `static` section for show assets is kept.
+    Returns False without touching the file if no product entry changed.
+    """
+    map_file = Path(map_file)
+    try:
+        with open(map_file, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+    except (FileNotFoundError, ValueError):
+        legacy = {}
+
+    products = {
+        slug: [{
+            'original': image.get('originalUrl'),
+            'static': image.get('url'),
+            'alt': image.get('alternativeText', ''),
+            'width': image.get('width'),
+            'height': image.get('height'),
+        } for image in images]
+        for slug, images in image_map.items()
+    }
+    if legacy.get('products') == products:
+        return False
+
+    legacy['products'] = products
+    legacy.setdefault('static', {})
+    legacy['lastSync'] = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+    atomic_write_json(map_file, legacy)
+    return True
@@ -0,0 +1,55 @@
+"""
+Helpers for reading image-map.json and summarising it for the Images tab
+"""
+
+import json
+
+
+def load_image_map(image_map_file):
+    """Load image-map.json from disk"""
+    with open(image_map_file, 'r') as f:
+        return json.load(f)
+
+
+def summarize_image_map(data, recent=5):
+    """Count products, images and static assets in an image map"""
+    products = data.get('products', {})
+    static = data.get('static', {})
+
+    total_product_images = sum(len(images) for images in products.values())
+
+    # Only the tail is shown, so avoid copying every item into a list
+    recent_products = []
+    if recent:
+        for slug in reversed(products):
+            recent_products.append((slug, len(products[slug])))
+            if len(recent_products) == recent:
+                break
+        recent_products.reverse()
+
+    return {
+        'products': len(products),
+        'product_images': total_product_images,
+        'static_assets': len(static),
+        'last_sync': data.get('lastSync', 'Never'),
+        'recent_products': recent_products,
+    }
+
+
+def format_image_stats(summary):
+    """Render a summary as the text shown in the Image Statistics panel"""
+    stats = f"""Image Statistics:
+
+Products: {summary['products']}
+Product Images: {summary['product_images']}
+Static Assets: {summary['static_assets']}
+Total Images: {summary['product_images'] + summary['static_assets']}
+
+Last Sync: {summary['last_sync']}
+
+Recent Products:"""
+
+    for slug, count in summary['recent_products']:
+        stats += f"\n  • {slug} ({count} images)"
+
+    return stats
@@ -0,0 +1,104 @@
+"""
+Per-product image-map shards
+
+scripts/sync-images.js writes public/image-map.json as one object keyed by
+product slug, which every page used to bundle whole. After each sync it is
+split so a page only reads the entry it renders:
+
+    public/image-map/<slug>.json      that product's LocalImage list
+    public/image-map/manifest.json    source hash, slug -> {hash, images}
+
+public/image-map.json itself is left in place as the fallback src/lib/image-map.ts
+reads when a shard is missing. scripts/write-image-map-shards.js writes the
+same files for sync-images.js, so shards never lag a map the Node sync wrote.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from .fsutil import file_sha256, remove_stale_files, write_text_if_changed
+from .shards import SAFE_SLUG
+
+SHARD_DIR_NAME = "image-map"
+
+
+def _dump(data):
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def load_image_shard_manifest(public_dir):
+    """Return public/image-map/manifest.json, or None if it is missing or unreadable"""
+    try:
+        with open(Path(public_dir) / SHARD_DIR_NAME / "manifest.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_image_map_shards(public_dir, force=False, log=print):
+    """Split public/image-map.json into per-product shards; returns a summary dict
+
+    Does nothing when the manifest already records the current image-map.json
+    hash, unless `force` is set. Only shards whose contents changed are
+    rewritten, and shards for products no longer in the map are removed.
+    """
+    public_dir = Path(public_dir)
+    map_file = public_dir / "image-map.json"
+    shard_dir = public_dir / SHARD_DIR_NAME
+    source_hash = file_sha256(map_file)
+
+    manifest = load_image_shard_manifest(public_dir)
+    if not force and manifest and manifest.get('source') == source_hash:
+        return {'products': len(manifest.get('products', {})), 'changed': 0, 'removed': 0, 'skipped': True}
+
+    with open(map_file, 'r', encoding='utf-8') as f:
+        image_map = json.load(f)
+
+    written = set()
+    changed = 0
+    entries = {}
+    for slug, images in sorted(image_map.items()):
+        if not SAFE_SLUG.match(slug):
+            log(f"⚠️ Skipping image shard for unsafe slug: {slug!r}")
+            continue
+        path = shard_dir / f"{slug}.json"
+        text = _dump(images)
+        written.add(path)
+        changed += write_text_if_changed(path, text)
+        entries[slug] = {
+            'hash': hashlib.sha256(text.encode('utf-8')).hexdigest(),
+            'images': len(images),
+        }
+
+    manifest_path = shard_dir / "manifest.json"
+    written.add(manifest_path)
+    write_text_if_changed(manifest_path, _dump({'version': 1, 'source': source_hash, 'products': entries}))
+
+    removed = remove_stale_files(shard_dir, written)
+    return {'products': len(entries), 'changed': changed, 'removed': removed, 'skipped': False}
+
+
+def verify_image_map_shards(public_dir):
+    """Compare shards on disk with the manifest; returns a list of problem strings"""
+    public_dir = Path(public_dir)
+    manifest = load_image_shard_manifest(public_dir)
+    if manifest is None:
+        return ["image-map/manifest.json is missing"]
+
+    problems = []
+    try:
+        if manifest.get('source') != file_sha256(public_dir / "image-map.json"):
+            problems.append("image-map.json changed since the shards were written")
+    except FileNotFoundError:
+        problems.append("image-map.json is missing")
+
+    for slug, entry in manifest.get('products', {}).items():
+        try:
+            digest = file_sha256(public_dir / SHARD_DIR_NAME / f"{slug}.json")
+        except FileNotFoundError:
+            problems.append(f"{slug}: shard missing")
+            continue
+        if digest != entry.get('hash'):
+            problems.append(f"{slug}: shard hash mismatch")
+    return problems
@@ -0,0 +1,232 @@
+"""
+Storefront load test
+
+Drives a fixed number of concurrent virtual users at a running build (a
+local `next start`, a preview URL or SiteStandIn) for a set duration.
+Each user picks a request from a weighted mix: /shop and its pagination
+pages, category pages, product pages, and POST /api/checkout. The report
+gives throughput, errors and p50/p95/p99 latency per group and overall.
+Targets use the trailing-slash URLs the site serves (trailingSlash: true),
+and a redirect counts as an error, reported separately, since it means
+the test measured a 308 rather than the page.
+Each run is appended to .publish-cache/loadtests.jsonl, so a release can
+be compared with the one before it.
+
+Checkout creates a Stripe session on every call. start_next_server()
+launches the local build with STRIPE_API_BASE pointing at StripeStub, so
+the test never reaches Stripe.
+"""
+
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import time
+from pathlib import Path
+
+import requests
+
+from .asynchttp import AsyncHTTPClient, HTTPError
+from .fsutil import append_jsonl, read_jsonl
+from .stats import latency_summary
+from .stripe_stub import STUB_SECRET_KEY
+from .warm import with_trailing_slash
+
+# Relative share of requests per group
+DEFAULT_WEIGHTS = {'shop': 2, 'category': 2, 'product': 4, 'checkout': 1}
+
+GROUPS = ('shop', 'category', 'product', 'checkout')
+
+
+def build_targets(public_dir):
+    """group -> [(method, path, body bytes or None)] from the exported catalog"""
+    public_dir = Path(public_dir)
+    with open(public_dir / "products-data.json", 'r', encoding='utf-8') as f:
+        products = json.load(f)
+    try:
+        with open(public_dir / "products-data" / "manifest.json", 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+
+    shop_pages = (manifest.get('shop') or {}).get('pageCount', 1)
+    categories = manifest.get('categories') or {
+        slug: {} for slug in {(p.get('category') or {}).get('slug') for p in products.values()} if slug}
+
+    targets = {
+        'shop': [('GET', '/shop', None)] + [('GET', f'/shop/page/{n}', None) for n in range(2, shop_pages + 1)],
+        'category': [('GET', f'/category/{slug}', None) for slug in sorted(categories)],
+        'product': [('GET', f'/shop/{slug}', None) for slug in products],
+        'checkout': [('POST', '/api/checkout', json.dumps({'productSlug': slug, 'variant': 'original'}).encode())
+                     for slug, product in products.items() if not product.get('sold')],
+    }
+    return {group: [(method, with_trailing_slash(path), body) for method, path, body in entries]
+            for group, entries in targets.items() if entries}
+
+
+async def _user(client, base_url, targets, weights, deadline, samples, rng):
+    groups = [g for g in targets if weights.get(g)]
+    group_weights = [weights[g] for g in groups]
+    while time.perf_counter() < deadline:
+        group = rng.choices(groups, group_weights)[0]
+        method, path, body = rng.choice(targets[group])
+        headers = {'Content-Type': 'application/json'} if body is not None else None
+        try:
+            response = await client.request(method, base_url + path, headers=headers, body=body)
+            samples.append((group, response.status, response.seconds, None))
+        except HTTPError as e:
+            samples.append((group, None, None, str(e)))
+
+
+async def run_load_async(base_url, targets, weights=None, concurrency=20, duration=30, timeout=30, seed=0):
+    weights = weights or DEFAULT_WEIGHTS
+    base_url = base_url.rstrip('/')
+    samples = []
+    start = time.perf_counter()
+    deadline = start + duration
+    async with AsyncHTTPClient(concurrency=concurrency, timeout=timeout) as client:
+        await asyncio.gather(*(
+            _user(client, base_url, targets, weights, deadline, samples, random.Random(seed + i))
+            for i in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+def summarize_samples(samples, seconds):
+    def summarize(rows):
+        ok = [s for _, status, s, _ in rows if status is not None and 200 <= status < 300]
+        statuses = {}
+        for _, status, _, error in rows:
+            key = str(status) if status is not None else 'error'
+            statuses[key] = statuses.get(key, 0) + 1
+        return {
+            'requests': len(rows),
+            'errors': len(rows) - len(ok),
+            'redirects': sum(1 for _, status, _, _ in rows if status is not None and 300 <= status < 400),
+            'rps': len(rows) / seconds if seconds else 0,
+            'latency': latency_summary(ok),
+            'statuses': statuses,
+        }
+
+    groups = {group: summarize([s for s in samples if s[0] == group])
+              for group in GROUPS if any(s[0] == group for s in samples)}
+    errors = [error for _, _, _, error in samples if error]
+    return {'total': summarize(samples), 'groups': groups, 'sampleErrors': errors[:5]}
+
+
+def run_load_test(base_url, public_dir, concurrency=20, duration=30, weights=None, timeout=30, seed=0, log=print):
+    """Blocking load test; returns a run record (see LoadTestHistory)"""
+    targets = build_targets(public_dir)
+    log(f"🏋️ Load testing {base_url} with {concurrency} users for {duration:g}s "
+        f"({', '.join(f'{g}: {len(t)}' for g, t in targets.items())} targets)...")
+    samples, seconds = asyncio.run(run_load_async(base_url, targets, weights, concurrency, duration, timeout, seed))
+    return {
+        'recordedAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'baseUrl': base_url,
+        'concurrency': concurrency,
+        'duration': seconds,
+        'weights': weights or DEFAULT_WEIGHTS,
+        **summarize_samples(samples, seconds),
+    }
+
+
+class LoadTestHistory:
+    """Append-only record of load test runs"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def record(self, run):
+        append_jsonl(self.path, run)
+
+    def runs(self):
+        return read_jsonl(self.path)
+
+    def previous(self, run):
+        """Last recorded run against the same URL at the same concurrency, or None"""
+        for earlier in reversed(self.runs()):
+            if earlier.get('baseUrl') == run['baseUrl'] and earlier.get('concurrency') == run['concurrency']:
+                return earlier
+        return None
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:.0f}" if seconds is not None else '-'
+
+
+def format_load_report(run, previous=None):
+    lines = [f"Load test: {run['baseUrl']} - {run['concurrency']} users, {run['duration']:.1f}s",
+             f"  {'group':<9} {'reqs':>6} {'err':>5} {'req/s':>7} {'p50':>6} {'p95':>6} {'p99':>6}  (ms)"]
+    rows = list(run['groups'].items()) + [('total', run['total'])]
+    for group, stats in rows:
+        latency = stats['latency']
+        lines.append(f"  {group:<9} {stats['requests']:>6} {stats['errors']:>5} {stats['rps']:>7.1f} "
+                     f"{_ms(latency['p50']):>6} {_ms(latency['p95']):>6} {_ms(latency['p99']):>6}")
+    for group, stats in run['groups'].items():
+        odd = {k: v for k, v in stats['statuses'].items() if not k.startswith(('2', '3'))}
+        if odd:
+            lines.append(f"  ⚠️ {group}: " + ", ".join(f"{k} × {v}" for k, v in sorted(odd.items())))
+        if stats.get('redirects'):
+            lines.append(f"  ↪️ {group}: {stats['redirects']} redirects counted as errors - check the target URLs")
+    for error in run.get('sampleErrors', []):
+        lines.append(f"  ❌ {error}")
+
+    if previous:
+        before, after = previous['total'], run['total']
+        if before['latency']['p95'] and after['latency']['p95']:
+            change = (after['latency']['p95'] / before['latency']['p95'] - 1) * 100
+            lines.append(f"  vs {previous['recordedAt']}: p95 {_ms(before['latency']['p95'])} → "
+                         f"{_ms(after['latency']['p95'])} ms ({change:+.0f}%), "
+                         f"{before['rps']:.1f} → {after['rps']:.1f} req/s")
+    return "\n".join(lines)
+
+
+def start_next_server(frontend_dir, port, stripe_url, log=print, ready_timeout=90, env=None):
+    """`next start` on `port` with Stripe pointed at `stripe_url`; returns the Popen
+
+    Needs an existing `npm run build`. `env` adds or overrides server
+    environment variables. Raises RuntimeError if the server doesn't
+    answer within `ready_timeout` seconds.
+    """
+    frontend_dir = Path(frontend_dir)
+    if not (frontend_dir / ".next" / "BUILD_ID").exists():
+        raise RuntimeError("No production build found - run `npm run build` first")
+
+    # Never hand the real key to a load test
+    env = dict(os.environ, **(env or {}), STRIPE_API_BASE=stripe_url, STRIPE_SECRET_KEY=STUB_SECRET_KEY,
+               PORT=str(port))
+    log(f"🚀 Starting next start on port {port}...")
+    process = subprocess.Popen(
+        f"npm run start -- -p {port}", shell=True, cwd=frontend_dir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL,
+        start_new_session=os.name != 'nt',
+        creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0,
+    )
+
+    deadline = time.time() + ready_timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"next start exited with code {process.returncode}")
+        try:
+            requests.get(f"http://127.0.0.1:{port}/", timeout=2)
+            return process
+        except requests.exceptions.RequestException:
+            time.sleep(0.5)
+    stop_next_server(process)
+    raise RuntimeError(f"next start did not answer on port {port} within {ready_timeout}s")
+
+
+def stop_next_server(process):
+    """Stop the server and the node process npm spawned under it"""
+    if process.poll() is not None:
+        return
+    if os.name == 'nt':
+        subprocess.run(f"taskkill /F /T /PID {process.pid}", shell=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
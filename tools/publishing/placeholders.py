@@ -0,0 +1,225 @@
+"""
+Blur placeholders for synced product images
+
+Adds two fields to every entry in public/image-map.json after sync-images:
+
+    blurDataURL   base64 PNG micro-thumbnail, used as next/image's blurDataURL
+    blurhash      BlurHash string (https://blurha.sh) for anything that
+                  decodes placeholders itself
+
+Both come from one small downsample of the source, so the cost per image is
+dominated by decoding it. Images are processed across a process pool and
+results are cached by the source file's SHA-256, so a re-sync only pays for
+images that actually changed.
+"""
+
+import base64
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from .fsutil import atomic_write_json
+from .hashcache import FileHashCache
+
+# Long edge of the embedded thumbnail, in pixels
+THUMBNAIL_SIZE = 16
+
+# Long edge of the sample the BlurHash DCT runs over
+SAMPLE_SIZE = 32
+
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+# Pool start-up costs more than decoding a handful of images inline
+MIN_POOL_JOBS = 8
+
+_SRGB_TO_LINEAR = np.where(
+    np.arange(256) / 255 <= 0.04045,
+    np.arange(256) / 255 / 12.92,
+    ((np.arange(256) / 255 + 0.055) / 1.055) ** 2.4,
+)
+
+
+def _encode83(value, length):
+    return ''.join(BASE83[(int(value) // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def _linear_to_srgb(values):
+    v = np.clip(values, 0, 1)
+    srgb = np.where(v <= 0.0031308, v * 12.92, 1.055 * v ** (1 / 2.4) - 0.055)
+    return np.floor(srgb * 255 + 0.5).astype(int)
+
+
+def blurhash_encode(pixels, components_x=4, components_y=3):
+    """BlurHash of an (height, width, 3) uint8 RGB array"""
+    height, width = pixels.shape[:2]
+    linear = _SRGB_TO_LINEAR[pixels]
+
+    # Separable cosine basis: factors[j, i] = sum_yx cos_y[j, y] * cos_x[i, x] * linear[y, x]
+    cos_x = np.cos(np.pi * np.outer(np.arange(components_x), np.arange(width)) / width)
+    cos_y = np.cos(np.pi * np.outer(np.arange(components_y), np.arange(height)) / height)
+    factors = np.einsum('jy,ix,yxc->jic', cos_y, cos_x, linear) / (width * height)
+    factors[1:] *= 2
+    factors[0, 1:] *= 2
+    factors = factors.reshape(-1, 3)
+
+    dc, ac = factors[0], factors[1:]
+    result = _encode83((components_x - 1) + (components_y - 1) * 9, 1)
+
+    if len(ac):
+        quantised_max = int(max(0, min(82, np.floor(np.abs(ac).max() * 166 - 0.5))))
+        max_value = (quantised_max + 1) / 166
+    else:
+        quantised_max, max_value = 0, 1
+    result += _encode83(quantised_max, 1)
+
+    r, g, b = _linear_to_srgb(dc)
+    result += _encode83((r << 16) + (g << 8) + b, 4)
+
+    scaled = ac / max_value
+    quantised = np.clip(np.floor(np.sign(scaled) * np.abs(scaled) ** 0.5 * 9 + 9.5), 0, 18).astype(int)
+    for qr, qg, qb in quantised:
+        result += _encode83(qr * 19 * 19 + qg * 19 + qb, 2)
+    return result
+
+
+def _open_rgb(path, size):
+    image = Image.open(path)
+    image.draft('RGB', (size * 2, size * 2))
+    if image.mode in ('RGBA', 'LA', 'P'):
+        # Transparent artwork sits on the page background, which is white
+        rgba = image.convert('RGBA')
+        image = Image.new('RGB', rgba.size, (255, 255, 255))
+        image.paste(rgba, mask=rgba.getchannel('A'))
+    else:
+        image = image.convert('RGB')
+    image.thumbnail((size, size), Image.BILINEAR)
+    return image
+
+
+def compute_placeholder(path):
+    """Return {'blurDataURL', 'blurhash'} for one image file"""
+    sample = _open_rgb(path, SAMPLE_SIZE)
+
+    thumbnail = sample.copy()
+    thumbnail.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.BILINEAR)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, format='PNG', optimize=True)
+
+    components_x, components_y = (4, 3) if sample.width >= sample.height else (3, 4)
+    return {
+        'blurDataURL': 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii'),
+        'blurhash': blurhash_encode(np.asarray(sample), components_x, components_y),
+    }
+
+
+def _compute_many(paths):
+    """Worker entry point: placeholders for a batch, None where an image is unreadable"""
+    results = []
+    for path in paths:
+        try:
+            results.append(compute_placeholder(path))
+        except (OSError, ValueError):
+            results.append(None)
+    return results
+
+
+class PlaceholderCache:
+    """sha256 of a source image -> its placeholder fields"""
+
+    VERSION = 1
+
+    def __init__(self, cache_file):
+        self.cache_file = Path(cache_file)
+        self.settings = {'thumbnail': THUMBNAIL_SIZE, 'sample': SAMPLE_SIZE}
+        self.entries = {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION and data.get('settings') == self.settings:
+                self.entries = data.get('entries', {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def save(self, keep):
+        entries = {digest: self.entries[digest] for digest in keep if digest in self.entries}
+        atomic_write_json(self.cache_file, {'version': self.VERSION, 'settings': self.settings,
+                                            'entries': entries}, durable=False)
+
+
+def add_placeholders(public_dir, cache_dir, workers=None, log=print):
+    """Add blurDataURL/blurhash to every image in public/image-map.json
+
+    Rewrites the map only if a placeholder changed. Returns a summary dict
+    with images, computed, cached, missing and written.
+    """
+    public_dir = Path(public_dir)
+    cache_dir = Path(cache_dir)
+    map_file = public_dir / "image-map.json"
+    with open(map_file, 'r', encoding='utf-8') as f:
+        image_map = json.load(f)
+
+    hashes = FileHashCache(cache_dir / "file-hashes.json")
+    cache = PlaceholderCache(cache_dir / "placeholders.json")
+
+    entries = []      # (image entry, sha256)
+    todo = {}         # sha256 -> path
+    missing = 0
+    for images in image_map.values():
+        for image in images:
+            path = public_dir / image.get('url', '').lstrip('/')
+            try:
+                digest = hashes.sha256(path)
+            except OSError:
+                missing += 1
+                continue
+            entries.append((image, digest))
+            if digest not in cache.entries:
+                todo.setdefault(digest, path)
+
+    if todo:
+        log(f"🖼️ Generating placeholders for {len(todo)} images...")
+        digests = list(todo)
+        paths = [str(todo[d]) for d in digests]
+        if len(paths) < MIN_POOL_JOBS or workers == 1:
+            results = _compute_many(paths)
+        else:
+            workers = workers or os.cpu_count() or 1
+            batch = max(1, min(32, len(paths) // (workers * 4)))
+            batches = [paths[i:i + batch] for i in range(0, len(paths), batch)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = [r for chunk in pool.map(_compute_many, batches) for r in chunk]
+        for digest, result in zip(digests, results):
+            if result is None:
+                log(f"⚠️ Could not read {todo[digest]}")
+            else:
+                cache.entries[digest] = result
+
+    changed = False
+    for image, digest in entries:
+        placeholder = cache.entries.get(digest)
+        if placeholder is None:
+            continue
+        for key, value in placeholder.items():
+            if image.get(key) != value:
+                image[key] = value
+                changed = True
+
+    if changed:
+        atomic_write_json(map_file, image_map)
+    hashes.prune(public_dir / image.get('url', '').lstrip('/')
+                 for images in image_map.values() for image in images)
+    hashes.save()
+    cache.save({digest for _, digest in entries})
+
+    return {
+        'images': len(entries),
+        'computed': sum(1 for d in todo if d in cache.entries),
+        'cached': len(entries) - sum(1 for _, d in entries if d in todo),
+        'missing': missing,
+        'written': changed,
+    }
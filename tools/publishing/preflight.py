@@ -0,0 +1,179 @@
+"""
+Preflight checks before promoting or deploying
+
+Every check runs at once on its own thread, and the slowest one (usually
+the git fetch) sets the total time. The result is one go/no-go table
+shown before anything is merged, pushed or deployed. Problems no longer
+surface one by one, minutes into a run.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from .gitops import GitError, ahead_behind, git, production_branch, rev_parse
+from .image_shards import verify_image_map_shards
+
+OK = 'ok'
+WARN = 'warn'
+FAIL = 'fail'
+
+ICONS = {OK: '✅', WARN: '⚠️', FAIL: '❌'}
+
+# The fetch gets longest; everything else is local or a single HTTP probe.
+# A slow remote falls back to the cached refs rather than holding up the table.
+FETCH_TIMEOUT = 3
+HTTP_TIMEOUT = 2
+
+
+def check_working_tree(repo_dir, strict=True):
+    output = git(repo_dir, 'status', '--porcelain').stdout.splitlines()
+    if not output:
+        return OK, "clean"
+    return (FAIL if strict else WARN), f"{len(output)} uncommitted changes"
+
+
+def check_branches(repo_dir, source='develop', target='main', remote='origin'):
+    """One fetch, then ahead/behind of source vs its upstream and vs target"""
+    notes = []
+    status = OK
+    try:
+        git(repo_dir, 'fetch', '-q', remote, source, target, timeout=FETCH_TIMEOUT)
+    except GitError as e:
+        status = WARN
+        notes.append(f"fetch failed, using cached refs ({e})")
+
+    upstream = f'{remote}/{source}'
+    has_local = rev_parse(repo_dir, f'refs/heads/{source}') is not None
+    has_upstream = rev_parse(repo_dir, f'refs/remotes/{upstream}') is not None
+    if not has_local and not has_upstream:
+        return FAIL, f"no {source} branch"
+
+    # Promotion uses whichever of the two contains the other (see gitops.promote_branch)
+    promoted = source if has_local else upstream
+    if has_local and has_upstream:
+        ahead, behind = ahead_behind(repo_dir, source, upstream)
+        if ahead and behind:
+            return FAIL, f"{source} and {upstream} have diverged ({ahead} ahead, {behind} behind)"
+        if ahead:
+            status = WARN
+            notes.append(f"{ahead} unpushed commits on {source}")
+        elif behind:
+            promoted = upstream
+            notes.append(f"{source} is {behind} behind {upstream} (the remote tip will be used)")
+
+    if rev_parse(repo_dir, f'refs/remotes/{remote}/{target}'):
+        pending, hotfixes = ahead_behind(repo_dir, promoted, f'{remote}/{target}')
+        notes.append(f"{pending} commits to promote" if pending else f"{target} already has {source}")
+        if hotfixes:
+            notes.append(f"{target} has {hotfixes} commits not on {source} (merge needed)")
+    else:
+        status = FAIL
+        notes.append(f"{remote}/{target} not found")
+    return status, "; ".join(notes)
+
+
+def check_deploy_hook(hook_url, environment, required=True):
+    if not hook_url:
+        return (FAIL if required else WARN), f"VERCEL_DEPLOY_HOOK_{environment.upper()} missing from .env.local"
+    if not hook_url.startswith('https://api.vercel.com/'):
+        return WARN, "hook URL doesn't look like a Vercel deploy hook"
+    return OK, "configured"
+
+
+def check_http(url, name):
+    """Any HTTP response means the server is up, as in check_strapi_status()"""
+    if not url:
+        return WARN, f"no {name} URL"
+    start = time.perf_counter()
+    try:
+        response = requests.get(f"{url.rstrip('/')}/api", timeout=HTTP_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        return WARN, f"unreachable ({e.__class__.__name__})"
+    elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code >= 500:
+        return WARN, f"HTTP {response.status_code} in {elapsed:.0f} ms"
+    return OK, f"up ({elapsed:.0f} ms)"
+
+
+def check_image_map(public_dir):
+    """Every mapped image exists, and the shards match image-map.json"""
+    public_dir = Path(public_dir)
+    try:
+        with open(public_dir / "image-map.json", 'r', encoding='utf-8') as f:
+            image_map = json.load(f)
+    except FileNotFoundError:
+        return FAIL, "public/image-map.json missing"
+    except ValueError as e:
+        return FAIL, f"public/image-map.json unreadable: {e}"
+
+    images = [image.get('url', '') for entries in image_map.values() for image in entries]
+    missing = [url for url in images if not (public_dir / url.lstrip('/')).is_file()]
+    if missing:
+        return FAIL, f"{len(missing)} of {len(images)} mapped images missing (e.g. {missing[0]})"
+
+    problems = verify_image_map_shards(public_dir)
+    if problems:
+        return WARN, f"{len(images)} images OK; shards: {problems[0]}"
+    return OK, f"{len(images)} images across {len(image_map)} products"
+
+
+def run_preflight(checks, max_workers=8):
+    """Run (name, callable) checks concurrently; returns a result dict
+
+    Each callable returns (status, detail). A check that raises counts as a
+    failure. `go` is False if any check failed.
+    """
+    start = time.perf_counter()
+
+    def timed(check):
+        t0 = time.perf_counter()
+        try:
+            status, detail = check()
+        except Exception as e:
+            status, detail = FAIL, f"check crashed: {e}"
+        return status, detail, time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [(name, pool.submit(timed, check)) for name, check in checks]
+        rows = [(name, *future.result()) for name, future in futures]
+
+    return {
+        'go': all(status != FAIL for _, status, _, _ in rows),
+        'rows': rows,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def standard_checks(repo_dir, environment, deploy_hook, strapi_url, tunnel_url, action='promote', target=None):
+    """Checks for `action` ('promote' or 'deploy'); `environment` names the deploy hook key
+
+    Promotion refuses a dirty tree but not a missing hook, since pushing
+    main deploys through the Git integration anyway. A deploy is the reverse.
+    `target` is the production branch, main or master when not given.
+    """
+    promote = action == 'promote'
+    target = target or production_branch(repo_dir)
+    return [
+        ("Working tree", lambda: check_working_tree(repo_dir, strict=promote)),
+        ("Branches", lambda: check_branches(repo_dir, target=target)),
+        ("Deploy hook", lambda: check_deploy_hook(deploy_hook, environment, required=not promote)),
+        ("Strapi", lambda: check_http(strapi_url, "Strapi")),
+        ("Tunnel", lambda: check_http(tunnel_url, "tunnel")),
+        ("Image map", lambda: check_image_map(Path(repo_dir) / "public")),
+    ]
+
+
+def format_preflight(result):
+    rows = result['rows']
+    warnings = sum(1 for _, status, _, _ in rows if status == WARN)
+    verdict = "GO" if result['go'] else "NO-GO"
+    lines = [f"Preflight: {verdict}" + (f" ({warnings} warnings)" if warnings else "")
+             + f" in {result['seconds']:.1f}s"]
+    width = max(len(name) for name, _, _, _ in rows)
+    for name, status, detail, seconds in rows:
+        lines.append(f"  {ICONS[status]} {name.ljust(width)}  {detail}  [{seconds * 1000:.0f} ms]")
+    return "\n".join(lines)
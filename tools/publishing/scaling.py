@@ -0,0 +1,190 @@
+"""
+Scaling bench for the publishing tools
+
+Generates synthetic catalogs at increasing sizes and times the same code
+paths the GUI runs (Images tab stats, View Image Map, sync-images.js against
+a local Strapi stand-in, and git add) so superlinear steps show up before the
+real catalog gets there.
+"""
+
+import json
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from .image_map import format_image_stats, load_image_map, summarize_image_map
+from .standin import StrapiStandIn
+from .synthetic import generate_catalog
+
+# A step is flagged when doubling the catalog more than doubles its time
+# by this margin (exponent of the fitted power law)
+SUPERLINEAR_EXPONENT = 1.15
+# Below this the timings are mostly noise
+MIN_SIGNIFICANT_SECONDS = 0.05
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def bench_image_stats(root):
+    """What update_image_stats does: parse image-map.json and summarise it"""
+    def run():
+        data = load_image_map(Path(root) / "image-map.json")
+        return format_image_stats(summarize_image_map(data))
+    return _timed(run)[0]
+
+
+def bench_view_image_map(root):
+    """What view_image_map does before handing the text to Tk"""
+    def run():
+        data = load_image_map(Path(root) / "image-map.json")
+        return json.dumps(data, indent=2)
+    return _timed(run)[0]
+
+
+def bench_git_add(root):
+    """Time `git add .` over a freshly initialised repo"""
+    env = dict(os.environ, GIT_AUTHOR_NAME='bench', GIT_AUTHOR_EMAIL='bench@localhost',
+               GIT_COMMITTER_NAME='bench', GIT_COMMITTER_EMAIL='bench@localhost')
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True, env=env)
+    elapsed, result = _timed(lambda: subprocess.run(
+        ["git", "add", "."], cwd=root, capture_output=True, text=True, env=env))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return elapsed
+
+
+# sync-images.js and the modules it requires
+SYNC_SCRIPTS = ('sync-images.js', 'write-image-map-shards.js', 'write-product-shards.js')
+
+
+def bench_sync_engine(root, frontend_dir):
+    """Run scripts/sync-images.js against a stand-in Strapi serving the catalog
+
+    Returns (seconds, products synced) - the second number shows truncation.
+    """
+    scripts_dir = Path(root) / "scripts"
+    scripts_dir.mkdir(exist_ok=True)
+    for name in SYNC_SCRIPTS:
+        shutil.copy2(Path(frontend_dir) / "scripts" / name, scripts_dir / name)
+
+    with StrapiStandIn(root) as strapi:
+        env = dict(os.environ, NEXT_PUBLIC_STRAPI_URL=strapi.url)
+        env.pop('STRAPI_API_TOKEN', None)
+        elapsed, result = _timed(lambda: subprocess.run(
+            ["node", str(scripts_dir / "sync-images.js")], cwd=root, env=env,
+            capture_output=True, text=True, encoding='utf-8', errors='replace'))
+
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or result.stdout.strip())
+
+    with open(Path(root) / "public" / "image-map.json", 'r') as f:
+        synced = len(json.load(f))
+    return elapsed, synced
+
+
+def scaling_exponent(n1, t1, n2, t2):
+    """Exponent k in t ~ n^k between two measurements"""
+    if t1 <= 0 or t2 <= 0 or n1 == n2:
+        return None
+    return math.log(t2 / t1) / math.log(n2 / n1)
+
+
+def run_scaling_bench(frontend_dir, sizes=(100, 1000, 10000), images_per_product=1,
+                      width=64, height=64, workdir=None, run_sync=True, run_git=True,
+                      log=print):
+    """Generate a catalog per size and time each step; returns one row per size"""
+    cleanup = workdir is None
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="tds-scaling-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    if run_sync and not shutil.which("node"):
+        log("⚠️ node not found - skipping sync engine step")
+        run_sync = False
+    if run_git and not shutil.which("git"):
+        log("⚠️ git not found - skipping git add step")
+        run_git = False
+
+    rows = []
+    try:
+        for size in sizes:
+            root = workdir / f"catalog-{size}"
+            if root.exists():
+                shutil.rmtree(root)
+
+            log(f"📦 Generating {size} products...")
+            generate_time, summary = _timed(lambda: generate_catalog(
+                root, products=size, images_per_product=images_per_product,
+                width=width, height=height, log=log))
+
+            row = {
+                'products': summary['products'],
+                'images': summary['images'],
+                'generate': generate_time,
+                'image_stats': bench_image_stats(root),
+                'view_image_map': bench_view_image_map(root),
+            }
+            # git add before sync: sync-images.js prunes directories it didn't fetch
+            if run_git:
+                row['git_add'] = bench_git_add(root)
+            if run_sync:
+                row['sync'], row['synced_products'] = bench_sync_engine(root, frontend_dir)
+
+            rows.append(row)
+            log(f"✅ {size} products: " + ", ".join(
+                f"{k}={v:.3f}s" for k, v in row.items() if isinstance(v, float)))
+    finally:
+        if cleanup:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return rows
+
+
+def find_superlinear_steps(rows):
+    """List (step, from size, to size, exponent) for steps that grow faster than linear"""
+    flagged = []
+    for previous, current in zip(rows, rows[1:]):
+        for step, value in current.items():
+            if step in ('products', 'images', 'synced_products') or step not in previous:
+                continue
+            if value < MIN_SIGNIFICANT_SECONDS:
+                continue
+            k = scaling_exponent(previous['products'], previous[step], current['products'], value)
+            if k is not None and k > SUPERLINEAR_EXPONENT:
+                flagged.append((step, previous['products'], current['products'], k))
+    return flagged
+
+
+def format_scaling_report(rows):
+    """Plain-text table of the bench results"""
+    steps = [k for k in rows[0] if k not in ('products', 'images', 'synced_products')] if rows else []
+    header = f"{'products':>9} {'images':>8} " + " ".join(f"{s:>15}" for s in steps)
+    if rows and 'synced_products' in rows[0]:
+        header += f" {'synced':>8}"
+
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        line = f"{row['products']:>9} {row['images']:>8} " + " ".join(f"{row[s]:>14.3f}s" for s in steps)
+        if 'synced_products' in row:
+            line += f" {row['synced_products']:>8}"
+        lines.append(line)
+
+    flagged = find_superlinear_steps(rows)
+    if flagged:
+        lines.append("")
+        lines.append("Superlinear steps:")
+        for step, n1, n2, k in flagged:
+            lines.append(f"  ⚠️ {step}: {n1} → {n2} products grows as n^{k:.2f}")
+
+    truncated = [row for row in rows if row.get('synced_products', row['products']) < row['products']]
+    for row in truncated:
+        lines.append(f"  ⚠️ sync only picked up {row['synced_products']}/{row['products']} products")
+
+    return "\n".join(lines)
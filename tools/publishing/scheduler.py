@@ -0,0 +1,99 @@
+"""
+Debounced deploy triggers
+
+Every "Sync & Preview" run used to call the deploy hook straight away, so
+a content session with several syncs queued several Vercel builds, each
+one obsolete before it finished. Deploys now go through a scheduler that
+waits for a quiet window per environment. A newer trigger cancels the one
+queued before it and restarts the window, so a burst of publishes ends in
+one hook call carrying the latest state. A cap on the total wait keeps a
+long session from postponing the deploy forever.
+"""
+
+import threading
+import time
+
+DEFAULT_QUIET_SECONDS = 60
+DEFAULT_MAX_WAIT_SECONDS = 600
+
+
+class DeployScheduler:
+    """Coalesce deploy triggers per key (environment) behind a quiet window
+
+    `fire(key, payload, triggers)` runs on a timer thread once a key has
+    been quiet for the window. `payload` is whatever the newest trigger
+    passed and `triggers` is how many were coalesced into this call.
+    """
+
+    def __init__(self, fire, quiet_seconds=DEFAULT_QUIET_SECONDS,
+                 max_wait_seconds=DEFAULT_MAX_WAIT_SECONDS, log=print):
+        self.fire = fire
+        self.quiet_seconds = quiet_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.log = log
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._generation = 0
+
+    def trigger(self, key, payload=None, quiet_seconds=None):
+        """Queue a deploy for `key`, superseding any queued one; returns seconds until it fires"""
+        window = self.quiet_seconds if quiet_seconds is None else quiet_seconds
+        now = time.monotonic()
+        with self._lock:
+            previous = self._pending.pop(key, None)
+            if previous:
+                previous['timer'].cancel()
+                first, triggers = previous['first'], previous['triggers'] + 1
+            else:
+                first, triggers = now, 1
+            delay = max(0, min(window, first + self.max_wait_seconds - now))
+
+            self._generation += 1
+            timer = threading.Timer(delay, self._fire, args=(key, self._generation))
+            timer.daemon = True
+            self._pending[key] = {
+                'timer': timer, 'payload': payload, 'generation': self._generation,
+                'first': first, 'due': now + delay, 'triggers': triggers,
+            }
+            timer.start()
+
+        if previous:
+            self.log(f"⏳ {key} deploy re-queued ({triggers} triggers coalesced), fires in {delay:.0f}s")
+        elif delay:
+            self.log(f"⏳ {key} deploy queued, fires after {delay:.0f}s without new triggers")
+        return delay
+
+    def _fire(self, key, generation):
+        with self._lock:
+            entry = self._pending.get(key)
+            # A newer trigger or a cancel got here first
+            if entry is None or entry['generation'] != generation:
+                return
+            del self._pending[key]
+        self.fire(key, entry['payload'], entry['triggers'])
+
+    def flush(self, key=None):
+        """Fire queued deploys now instead of waiting out the window"""
+        with self._lock:
+            keys = [key] if key else list(self._pending)
+            entries = [(k, self._pending.pop(k)) for k in keys if k in self._pending]
+        for k, entry in entries:
+            entry['timer'].cancel()
+            threading.Thread(target=self.fire, args=(k, entry['payload'], entry['triggers']), daemon=True).start()
+        return len(entries)
+
+    def cancel(self, key=None):
+        """Drop queued deploys; returns how many were dropped"""
+        with self._lock:
+            keys = [key] if key else list(self._pending)
+            entries = [self._pending.pop(k) for k in keys if k in self._pending]
+        for entry in entries:
+            entry['timer'].cancel()
+        return len(entries)
+
+    def pending(self):
+        """[(key, triggers, seconds until it fires)] for every queued deploy"""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, entry['triggers'], max(0, entry['due'] - now))
+                    for key, entry in sorted(self._pending.items())]
@@ -0,0 +1,123 @@
+"""
+Precomputed product shards for the storefront
+
+Written next to products-data.json at export time so pages and API routes
+can read just the slice they render instead of parsing the whole catalog:
+
+    public/products-data/index.json                   slug -> compact summary
+    public/products-data/by-slug/<slug>.json          one product
+    public/products-data/shop/page-<n>.json           /shop/page/[pageNumber]
+    public/products-data/category/<slug>/page-<n>.json
+    public/products-data/posters/page-<n>.json
+    public/products-data/manifest.json                page counts per listing
+
+Page files have the same shape fetchProductsPaginated() returns. Listings
+are sorted newest first, like the Strapi queries in src/lib/api.ts.
+"""
+
+import json
+import re
+from pathlib import Path
+
+from .fsutil import remove_stale_files, write_text_if_changed
+
+# Every paginated route in src/app uses 16 products per page
+PAGE_SIZE = 16
+
+SHARD_DIR_NAME = "products-data"
+
+# Slugs that are safe to use as file names (Strapi uid characters)
+SAFE_SLUG = re.compile(r'^[A-Za-z0-9_~-][A-Za-z0-9._~-]*$')
+
+
+def _dump(data):
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def _write_if_changed(path, text, written):
+    written.add(path)
+    return write_text_if_changed(path, text)
+
+
+def _write_pages(shard_dir, listing_dir, slugs, written, page_size):
+    """Write page-<n>.json files for one listing; returns its manifest entry"""
+    total = len(slugs)
+    page_count = -(-total // page_size)
+    changed = 0
+    for page in range(1, page_count + 1):
+        products = []
+        for slug in slugs[(page - 1) * page_size:page * page_size]:
+            with open(shard_dir / "by-slug" / f"{slug}.json", 'r', encoding='utf-8') as f:
+                products.append(json.load(f))
+        changed += _write_if_changed(listing_dir / f"page-{page}.json", _dump({
+            'products': products,
+            'pagination': {'page': page, 'pageSize': page_size, 'pageCount': page_count, 'total': total},
+        }), written)
+    return {'pageCount': page_count, 'total': total}, changed
+
+
+def write_catalog_shards(output_dir, products, page_size=PAGE_SIZE, log=print):
+    """Write every shard for an iterable of products; returns a summary dict
+
+    Products are streamed: each one goes straight to its by-slug file and
+    only a compact index is kept in memory while the pages are assembled.
+    A duplicate slug keeps the last product, as products-data.json does.
+    """
+    shard_dir = Path(output_dir) / SHARD_DIR_NAME
+    written = set()
+    changed = 0
+
+    index = {}
+    for product in products:
+        slug = product.get('slug')
+        if not slug:
+            continue
+        if not SAFE_SLUG.match(slug):
+            log(f"⚠️ Skipping shard for unsafe slug: {slug!r}")
+            continue
+        changed += _write_if_changed(shard_dir / "by-slug" / f"{slug}.json", _dump(product), written)
+        category = product.get('category') or {}
+        show = product.get('currentShow') or {}
+        index[slug] = {
+            'id': product.get('id'),
+            'title': product.get('title'),
+            'price': product.get('price'),
+            'category': category.get('slug'),
+            'show': show.get('slug'),
+            'hasPoster': product.get('hasPoster') is True,
+            'featured': product.get('featured') is True,
+            'sold': product.get('sold') is True,
+            'createdAt': product.get('createdAt'),
+            'updatedAt': product.get('updatedAt'),
+        }
+
+    # Newest first; sorted() is stable so ties keep export order like Array.sort
+    newest_first = sorted(index, key=lambda s: index[s]['createdAt'] or '', reverse=True)
+
+    manifest = {'pageSize': page_size, 'products': len(index), 'categories': {}}
+    manifest['shop'], n = _write_pages(shard_dir, shard_dir / "shop", newest_first, written, page_size)
+    changed += n
+
+    posters = [s for s in newest_first if index[s]['hasPoster']]
+    manifest['posters'], n = _write_pages(shard_dir, shard_dir / "posters", posters, written, page_size)
+    changed += n
+
+    categories = {}
+    for slug in newest_first:
+        if index[slug]['category']:
+            categories.setdefault(index[slug]['category'], []).append(slug)
+    for category, slugs in sorted(categories.items()):
+        if not SAFE_SLUG.match(category):
+            log(f"⚠️ Skipping shards for unsafe category slug: {category!r}")
+            continue
+        manifest['categories'][category], n = _write_pages(
+            shard_dir, shard_dir / "category" / category, slugs, written, page_size)
+        changed += n
+
+    changed += _write_if_changed(shard_dir / "index.json", _dump(index), written)
+    changed += _write_if_changed(shard_dir / "manifest.json", _dump(manifest), written)
+
+    # Drop shards for products, pages and categories that no longer exist
+    removed = remove_stale_files(shard_dir, written)
+
+    return {'files': len(written), 'changed': changed, 'removed': removed}
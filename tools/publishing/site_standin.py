@@ -0,0 +1,146 @@
+"""
+Local storefront stand-in
+
+Serves a frontend-shaped directory (see publishing.synthetic) the way the
+deployed site is laid out: sitemap.xml like src/app/sitemap.ts, an HTML
+page for every product, category, show and pagination route, and the
+files under public/. It lets the cache warmer and load tests run without
+a Next.js build. `render_seconds` adds a fixed delay to page responses, to
+imitate server rendering.
+
+Like next.config.ts (trailingSlash: true), a request for a page or route
+without its trailing slash is answered with a 308 to the slashed URL, so
+benches that forget the slash measure redirects, as they would against
+the real site.
+"""
+
+import json
+import mimetypes
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from .warm import with_trailing_slash
+
+# src/app/sitemap.ts always writes production URLs
+SITEMAP_BASE_URL = 'https://tysondrawsstuff.com'
+
+STATIC_PAGES = ('/', '/shop', '/about', '/shows', '/posters')
+
+
+class SiteStandIn:
+    """Threaded HTTP server impersonating the deployed storefront"""
+
+    def __init__(self, root, host='127.0.0.1', port=0, render_seconds=0.0):
+        self.public_dir = Path(root) / "public"
+        self.render_seconds = render_seconds
+        self.lock = threading.Lock()
+        self.requests = []
+        self.post_handlers = {}
+
+        with open(self.public_dir / "products-data.json", 'r', encoding='utf-8') as f:
+            self.products = json.load(f)
+        self.categories = sorted({(p.get('category') or {}).get('slug') for p in self.products.values()} - {None})
+        self.pages = set(STATIC_PAGES)
+        self.pages.update(f'/shop/{slug}' for slug in self.products)
+        self.pages.update(f'/category/{slug}' for slug in self.categories)
+        self.page_prefixes = ('/shop/page/', '/posters/page/', '/category/', '/shows/')
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def route_post(self, path, handler):
+        """Serve POST `path` with handler(headers, body) -> (status, content_type, body bytes)"""
+        self.post_handlers[path] = handler
+
+    def sitemap(self):
+        locs = [SITEMAP_BASE_URL + ('' if page == '/' else page) for page in ('/', '/shop', '/about', '/shows')]
+        locs += [f"{SITEMAP_BASE_URL}/shop/{slug}" for slug in self.products]
+        locs += [f"{SITEMAP_BASE_URL}/shop?category={slug}" for slug in self.categories]
+        entries = "".join(f"<url><loc>{loc}</loc></url>" for loc in locs)
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>').encode()
+
+    def handle_get(self, path):
+        """Return (status, content_type, body bytes) for a GET request"""
+        if path == '/sitemap.xml':
+            return 200, 'application/xml', self.sitemap()
+
+        local = (self.public_dir / unquote(path).lstrip('/')).resolve()
+        if path != '/' and local.is_file() and self.public_dir.resolve() in local.parents:
+            content_type = mimetypes.guess_type(local.name)[0] or 'application/octet-stream'
+            return 200, content_type, local.read_bytes()
+
+        page = path.rstrip('/') or '/'
+        if page in self.pages or (page.startswith(self.page_prefixes) and page.count('/') <= 4):
+            if self.render_seconds:
+                time.sleep(self.render_seconds)
+            return 200, 'text/html; charset=utf-8', f"<!doctype html><title>{path}</title>".encode()
+        return 404, 'text/html; charset=utf-8', b"<!doctype html><title>404</title>"
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _send(self, status, content_type, body, location=None):
+                self.send_response(status)
+                if location:
+                    self.send_header('Location', location)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with standin.lock:
+                    standin.requests.append((self.command, self.path, status))
+
+            def _redirected(self):
+                location = with_trailing_slash(self.path)
+                if location == self.path:
+                    return False
+                self._send(308, 'text/plain; charset=utf-8', location.encode(), location=location)
+                return True
+
+            def do_GET(self):
+                if not self._redirected():
+                    self._send(*standin.handle_get(urlsplit(self.path).path))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if self._redirected():
+                    return
+                handler = standin.post_handlers.get(urlsplit(self.path).path)
+                if handler is None:
+                    self._send(405, 'application/json', b'{"error":"Method Not Allowed"}')
+                else:
+                    self._send(*handler(self.headers, body))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
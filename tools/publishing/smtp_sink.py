@@ -0,0 +1,141 @@
+"""
+Local SMTP sink
+
+Stands in for Gmail when the webhook bench makes the order-confirmation
+route send mail. It speaks enough SMTP for nodemailer: EHLO, AUTH
+PLAIN/LOGIN (any credentials are accepted), MAIL, RCPT and DATA. Messages
+are counted and timestamped, never delivered. asyncio runs it on its own
+thread, because smtpd left the standard library in Python 3.12.
+"""
+
+import asyncio
+import threading
+import time
+from email.parser import BytesHeaderParser
+
+
+class SMTPSink:
+    """Accept and record every message sent to host:port"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.lock = threading.Lock()
+        self.messages = []
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._ready.wait(10)
+        return self
+
+    def stop(self):
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(asyncio.start_server(self._session, self.host, self.port))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            self.loop.close()
+
+    def count(self):
+        with self.lock:
+            return len(self.messages)
+
+    def wait_for(self, count, timeout=10):
+        """Wait until at least `count` messages arrived; returns how many did"""
+        deadline = time.time() + timeout
+        while self.count() < count and time.time() < deadline:
+            time.sleep(0.05)
+        return self.count()
+
+    async def _session(self, reader, writer):
+        def reply(line):
+            writer.write(line.encode('ascii') + b"\r\n")
+
+        reply("220 localhost publish-manager SMTP sink")
+        sender, recipients = None, []
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode('utf-8', errors='replace').strip().partition(' ')
+                command = command.upper()
+                if command == 'EHLO':
+                    reply("250-localhost")
+                    reply("250-AUTH PLAIN LOGIN")
+                    reply("250-8BITMIME")
+                    reply("250 SIZE 26214400")
+                elif command == 'HELO':
+                    reply("250 localhost")
+                elif command == 'AUTH':
+                    mechanism, _, initial = argument.partition(' ')
+                    if mechanism.upper() == 'LOGIN':
+                        for prompt in ("334 VXNlcm5hbWU6", "334 UGFzc3dvcmQ6"):
+                            reply(prompt)
+                            await writer.drain()
+                            await reader.readline()
+                    elif not initial:
+                        reply("334 ")
+                        await writer.drain()
+                        await reader.readline()
+                    reply("235 2.7.0 Authentication successful")
+                elif command == 'MAIL':
+                    sender, recipients = argument, []
+                    reply("250 OK")
+                elif command == 'RCPT':
+                    recipients.append(argument)
+                    reply("250 OK")
+                elif command == 'DATA':
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    lines = []
+                    while True:
+                        data = await reader.readline()
+                        if data in (b".\r\n", b".\n", b""):
+                            break
+                        lines.append(data[1:] if data.startswith(b"..") else data)
+                    raw = b"".join(lines)
+                    headers = BytesHeaderParser().parsebytes(raw)
+                    with self.lock:
+                        self.messages.append({
+                            'receivedAt': time.time(),
+                            'from': sender,
+                            'to': recipients,
+                            'subject': headers.get('Subject'),
+                            'bytes': len(raw),
+                        })
+                    reply("250 OK queued")
+                elif command in ('RSET', 'NOOP'):
+                    if command == 'RSET':
+                        sender, recipients = None, []
+                    reply("250 OK")
+                elif command == 'QUIT':
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    reply("502 Command not implemented")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,389 @@
+"""
+Local Strapi stand-in
+
+Serves a catalog written by publishing.synthetic (or any frontend-shaped
+directory with public/products-data.json) over HTTP, speaking enough of the
+Strapi v5 REST API for sync-images.js, the export stage and the scaling
+bench to run without a real backend. Orders POSTed by the Stripe webhook
+routes are kept in memory, so benches never write to a real Strapi.
+"""
+
+import json
+import threading
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+# Strapi's default api.rest.maxLimit
+MAX_PAGE_SIZE = 100
+DEFAULT_PAGE_SIZE = 25
+
+RELATIONS = ('images', 'category', 'currentShow')
+
+
+def _now_stamp():
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def _parse_filters(query):
+    """Turn filters[a][b][$op]=v query keys into (path, op, values) triples
+
+    filters[id][$in][0]=1&filters[id][$in][1]=2 collapses into one $in triple.
+    """
+    grouped = {}
+    for key, values in query.items():
+        if not key.startswith('filters['):
+            continue
+        parts = key[len('filters'):].strip('[]').split('][')
+        if parts[-1].isdigit():
+            parts = parts[:-1]
+        if len(parts) < 2 or not parts[-1].startswith('$'):
+            continue
+        grouped.setdefault((tuple(parts[:-1]), parts[-1]), []).extend(values)
+    return [(path, op, values) for (path, op), values in grouped.items()]
+
+
+def _coerce(value, like):
+    """Convert a query string value to the type of the field it's compared with"""
+    if isinstance(like, bool):
+        return value.lower() == 'true'
+    if isinstance(like, (int, float)):
+        try:
+            return type(like)(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _matches(entry, filters):
+    for path, op, values in filters:
+        value = entry
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+        if value is None:
+            if op != '$null':
+                return False
+            continue
+        if op == '$in':
+            if str(value) not in {v for raw in values for v in raw.split(',')}:
+                return False
+            continue
+        expected = _coerce(values[0], value)
+        if op == '$eq' and value != expected:
+            return False
+        if op == '$ne' and value == expected:
+            return False
+        if op == '$gt' and not value > expected:
+            return False
+        if op == '$gte' and not value >= expected:
+            return False
+        if op == '$lt' and not value < expected:
+            return False
+    return True
+
+
+def _populated_fields(query):
+    """Which relations a request asked Strapi to populate
+
+    Returns relation -> list of fields to keep (None for all fields).
+    """
+    populate = query.get('populate', [None])[0]
+    if populate == '*':
+        return {relation: None for relation in RELATIONS}
+    wanted = {}
+    if populate:
+        wanted.update((p.strip(), None) for p in populate.split(','))
+    for key, values in query.items():
+        if not key.startswith('populate['):
+            continue
+        parts = key[len('populate'):].strip('[]').split('][')
+        if parts[0].isdigit():
+            # populate[0]=images
+            wanted.update((value, None) for value in values)
+        elif len(parts) >= 2 and parts[1] == 'fields':
+            # populate[images][fields][0]=url
+            fields = wanted.get(parts[0]) or []
+            wanted[parts[0]] = fields + values
+        else:
+            # populate[images]=true
+            wanted.setdefault(parts[0], None)
+    return wanted
+
+
+def _select(value, fields):
+    """Apply a populate fields selection to a relation value"""
+    if not fields or value is None:
+        return value
+    keep = ['id', 'documentId'] + fields
+    if isinstance(value, list):
+        return [{k: item.get(k) for k in keep if k in item} for item in value]
+    return {k: value.get(k) for k in keep if k in value}
+
+
+class StrapiStandIn:
+    """Threaded HTTP server impersonating Strapi for one catalog directory"""
+
+    def __init__(self, catalog_root, host='127.0.0.1', port=0):
+        self.catalog_root = Path(catalog_root)
+        self.lock = threading.Lock()
+        self.bytes_sent = 0
+        self.requests = []
+
+        public_dir = self.catalog_root / "public"
+        with open(public_dir / "products-data.json", 'r') as f:
+            products = json.load(f)
+        self.products = sorted(products.values(), key=lambda p: p['id'])
+
+        settings_file = public_dir / "site-settings.json"
+        self.site_settings = {'posterPrice': None}
+        if settings_file.exists():
+            with open(settings_file, 'r') as f:
+                self.site_settings = json.load(f)
+
+        # Map /uploads/<file> back onto the product image it was exported as
+        self.uploads = {}
+        self.upload_files = []
+        # Files POSTed to /api/upload, kept in memory
+        self.uploaded = {}
+        # Each sold original starts with the order that sold it; the
+        # Stripe webhook routes POST more to /api/orders
+        self.orders = []
+        for product in self.products:
+            if product.get('sold'):
+                self.orders.append(self._new_order({
+                    'stripeSessionId': f"cs_standin_{product['id']}",
+                    'customerEmail': f"buyer{product['id']}@standin.invalid",
+                    'orderTotal': product.get('price'),
+                    'currency': 'cad',
+                    'paymentStatus': 'paid',
+                    'product': product['id'],
+                    'productSnapshot': {'productId': str(product['id']), 'productSlug': product['slug'],
+                                        'productTitle': product.get('title')},
+                }))
+        for product in self.products:
+            for index, image in enumerate(product.get('images') or []):
+                extension = Path(image['url']).suffix
+                local = public_dir / "products" / product['slug'] / f"image-{index + 1}{extension}"
+                self.uploads[image['url']] = local
+                self.upload_files.append({
+                    'id': image.get('id') or len(self.upload_files) + 1,
+                    'name': Path(image['url']).name,
+                    'hash': Path(image['url']).stem,
+                    'ext': extension,
+                    'mime': f"image/{extension.lstrip('.').replace('jpg', 'jpeg')}",
+                    'size': round(local.stat().st_size / 1000, 2) if local.exists() else None,
+                    'url': image['url'],
+                    'width': image.get('width'),
+                    'height': image.get('height'),
+                    'updatedAt': product.get('updatedAt'),
+                })
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self):
+        with self.lock:
+            self.bytes_sent = 0
+            self.requests = []
+
+    # Catalog mutations, for exercising incremental code paths
+
+    def touch(self, slug, **changes):
+        """Update a product in place and bump its updatedAt"""
+        with self.lock:
+            for product in self.products:
+                if product['slug'] == slug:
+                    product.update(changes)
+                    product['updatedAt'] = _now_stamp()
+                    return product
+        raise KeyError(slug)
+
+    def delete(self, slug):
+        with self.lock:
+            self.products = [p for p in self.products if p['slug'] != slug]
+
+    def add(self, product):
+        with self.lock:
+            product.setdefault('id', max((p['id'] for p in self.products), default=0) + 1)
+            product.setdefault('updatedAt', _now_stamp())
+            self.products.append(product)
+            return product
+
+    # Request handling
+
+    def _list(self, entries, query):
+        filters = _parse_filters(query)
+        with self.lock:
+            matched = [e for e in entries if _matches(e, filters)]
+
+        sort = query.get('sort', query.get('sort[0]', ['id:asc']))[0]
+        field, _, direction = sort.partition(':')
+        matched.sort(key=lambda e: (e.get(field) is None, e.get(field)), reverse=direction == 'desc')
+
+        if 'pagination[start]' in query or 'pagination[limit]' in query:
+            start = int(query.get('pagination[start]', ['0'])[0])
+            limit = min(int(query.get('pagination[limit]', [DEFAULT_PAGE_SIZE])[0]), MAX_PAGE_SIZE)
+            page_entries = matched[start:start + limit]
+            pagination = {'start': start, 'limit': limit, 'total': len(matched)}
+        else:
+            page = max(1, int(query.get('pagination[page]', ['1'])[0]))
+            page_size = min(int(query.get('pagination[pageSize]', [DEFAULT_PAGE_SIZE])[0]), MAX_PAGE_SIZE)
+            page_entries = matched[(page - 1) * page_size:page * page_size]
+            pagination = {
+                'page': page,
+                'pageSize': page_size,
+                'pageCount': -(-len(matched) // page_size),
+                'total': len(matched),
+            }
+
+        fields = [values[0] for key, values in query.items() if key.startswith('fields[')]
+        populated = _populated_fields(query)
+        data = []
+        for entry in page_entries:
+            if fields:
+                item = {k: entry.get(k) for k in ['id', 'documentId'] + fields}
+            else:
+                item = {k: v for k, v in entry.items() if k not in RELATIONS}
+            for relation, relation_fields in populated.items():
+                if relation in entry:
+                    item[relation] = _select(entry[relation], relation_fields)
+            data.append(item)
+
+        return {'data': data, 'meta': {'pagination': pagination}}
+
+    def handle_get(self, path, query):
+        """Return (status, content_type, body bytes) for a GET request"""
+        if path in ('/api', '/api/'):
+            return 404, 'application/json', b'{"data":null,"error":{"status":404}}'
+        if path == '/api/products':
+            return 200, 'application/json', json.dumps(self._list(self.products, query)).encode()
+        if path == '/api/orders':
+            return 200, 'application/json', json.dumps(self._list(self.orders, query)).encode()
+        if path == '/api/global':
+            return 200, 'application/json', json.dumps({'data': self.site_settings}).encode()
+        if path == '/api/upload/files':
+            return 200, 'application/json', json.dumps(self.upload_files).encode()
+        if path in ('/api/shows', '/api/categories'):
+            return 200, 'application/json', json.dumps({'data': [], 'meta': {}}).encode()
+        if path.startswith('/uploads/'):
+            if path in self.uploaded:
+                return 200, 'application/octet-stream', self.uploaded[path]
+            local = self.uploads.get(path)
+            if local and local.exists():
+                return 200, 'application/octet-stream', local.read_bytes()
+        return 404, 'application/json', b'{"data":null,"error":{"status":404,"name":"NotFoundError"}}'
+
+    def handle_upload(self, content_type, body):
+        """Accept a multipart /api/upload like Strapi; returns (status, body bytes)"""
+        message = BytesParser(policy=default_policy).parsebytes(
+            b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + body)
+        if not message.is_multipart():
+            return 400, b'{"data":null,"error":{"status":400,"name":"ValidationError"}}'
+        created = []
+        for part in message.iter_parts():
+            if part.get_param('name', header='content-disposition') != 'files':
+                continue
+            name = part.get_filename() or 'upload'
+            data = part.get_payload(decode=True) or b''
+            stem, extension = Path(name).stem, Path(name).suffix
+            with self.lock:
+                file_id = max((f['id'] for f in self.upload_files), default=0) + 1
+                url = f"/uploads/{stem}_{file_id:06x}{extension}"
+                self.uploaded[url] = data
+                entry = {
+                    'id': file_id,
+                    'name': name,
+                    'hash': Path(url).stem,
+                    'ext': extension,
+                    'mime': part.get_content_type(),
+                    'size': round(len(data) / 1000, 2),
+                    'url': url,
+                    'updatedAt': _now_stamp(),
+                }
+                self.upload_files.append(entry)
+            created.append(entry)
+        return 201, json.dumps(created).encode()
+
+    def _new_order(self, data):
+        order_id = max((o['id'] for o in self.orders), default=0) + 1
+        stamp = _now_stamp()
+        return {'id': order_id, 'documentId': f"order{order_id:08d}", **data, 'createdAt': stamp, 'updatedAt': stamp}
+
+    def handle_create_order(self, body):
+        """Create an order from a Strapi-style {'data': {...}} body; returns (status, body bytes)"""
+        try:
+            data = json.loads(body or b'{}').get('data')
+        except (ValueError, AttributeError):
+            data = None
+        if not isinstance(data, dict):
+            return 400, b'{"data":null,"error":{"status":400,"name":"ValidationError"}}'
+        with self.lock:
+            order = self._new_order(data)
+            self.orders.append(order)
+        return 200, json.dumps({'data': order, 'meta': {}}).encode()
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query)
+                status, content_type, body = standin.handle_get(parts.path, query)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with standin.lock:
+                    standin.bytes_sent += len(body)
+                    standin.requests.append(self.path)
+
+            def do_POST(self):
+                parts = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if parts.path == '/api/upload':
+                    status, payload = standin.handle_upload(self.headers.get('Content-Type', ''), body)
+                elif parts.path == '/api/orders':
+                    status, payload = standin.handle_create_order(body)
+                else:
+                    status, payload = 405, b'{"data":null,"error":{"status":405}}'
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                with standin.lock:
+                    standin.requests.append(f"POST {self.path}")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,38 @@
+"""
+Latency statistics shared by the deploy watcher and the HTTP benches
+"""
+
+import math
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of `values` (fraction in 0..1); None if empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(values):
+    """count, mean, p50, p95, p99 and max of a list of seconds"""
+    if not values:
+        return {'count': 0, 'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99),
+        'max': max(values),
+    }
+
+
+def format_duration(seconds):
+    """12.3s, 4m05s; '-' for None"""
+    if seconds is None:
+        return '-'
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}m{seconds:02d}s"
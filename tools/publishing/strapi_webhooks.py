@@ -0,0 +1,461 @@
+"""
+Webhook-driven targeted sync
+
+Getting a content edit into preview used to mean "Sync All Images", which
+re-downloads every image of every product, followed by a product export.
+StrapiWebhookListener is a small local HTTP endpoint for Strapi's webhooks
+(Settings > Webhooks, URL http://localhost:<port>/strapi-webhook). It only
+syncs what an event touched:
+
+    entry.* on product           that product's slug
+    entry.* on category / show   every product (relation edits don't bump
+                                 a product's updatedAt), export only
+    entry.* on global            site settings, export only
+    media.update / media.delete  the products whose images use that file
+
+Events are collected for a short quiet window by a DeployScheduler, so a
+save that fires several webhooks is one sync. sync_products() then fetches
+only the affected slugs and updates their entries in public/image-map.json
+in place. Images whose Strapi URL didn't change keep their hashed file. A
+deleted, unpublished or renamed product loses its entry and directory. The
+usual hash / placeholder / shard stages run over the map, and the delta
+export refreshes products-data.json.
+
+Slugs from a payload become directory names under public/products, so any
+slug that isn't a plain path segment (shards.SAFE_SLUG) is dropped, and the
+listener won't start without a secret or accept a body that isn't JSON.
+"""
+
+import hmac
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+
+from .fsutil import atomic_write, atomic_write_json
+from .scheduler import DeployScheduler
+from .shards import SAFE_SLUG
+from .strapi import StrapiClient, StrapiError, populate_params
+
+WEBHOOK_PATH = "/strapi-webhook"
+DEFAULT_PORT = 8788
+DEFAULT_QUIET_SECONDS = 3
+MAX_WAIT_SECONDS = 30
+
+PRODUCT_MODEL = 'product'
+# Models whose edits show up inside products without changing their updatedAt
+RELATION_MODELS = ('category', 'show')
+SETTINGS_MODELS = ('global',)
+
+IMAGE_POPULATE = {'images': ['url', 'alternativeText', 'width', 'height']}
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+# Products fetched per request when a sync covers many slugs
+SLUG_BATCH = 50
+
+
+def _image_extension(url):
+    """Same rule as getImageExtension() in sync-images.js"""
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    if url.startswith('/'):
+        return ext or '.jpg'
+    return ext if ext in IMAGE_EXTENSIONS else '.jpg'
+
+
+def _safe_slugs(slugs):
+    return {slug for slug in slugs if isinstance(slug, str) and SAFE_SLUG.match(slug)}
+
+
+def _product_dir(public_dir, slug):
+    """public/products/<slug>, refusing anything that would land outside it"""
+    products_dir = (Path(public_dir) / "products").resolve()
+    path = (products_dir / slug).resolve()
+    if not SAFE_SLUG.match(slug) or path.parent != products_dir:
+        raise ValueError(f"Unsafe product slug: {slug!r}")
+    return path
+
+
+def load_slug_index(public_dir):
+    """documentId and id -> slug from the last exported products-data.json"""
+    try:
+        with open(Path(public_dir) / "products-data.json", 'r', encoding='utf-8') as f:
+            products = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    index = {}
+    for slug, product in products.items():
+        for key in ('documentId', 'id'):
+            if product.get(key) is not None:
+                index[str(product[key])] = slug
+    return index
+
+
+def affected_by(payload, image_map, slug_index):
+    """(slugs, export, full_export) for one webhook payload
+
+    `export` is False for events that can't change the catalog (orders,
+    uploads no product uses yet).
+    """
+    event = payload.get('event') or ''
+    model = payload.get('model') or ''
+    entry = payload.get('entry') or {}
+
+    if event.startswith('media.'):
+        media = payload.get('media') or entry
+        url, media_id = media.get('url'), media.get('id')
+        slugs = {slug for slug, images in image_map.items()
+                 if any((url and image.get('originalUrl') == url) or
+                        (media_id is not None and image.get('id') == media_id) for image in images)}
+        slugs = _safe_slugs(slugs)
+        return slugs, bool(slugs), False
+
+    if model == PRODUCT_MODEL:
+        slugs = set()
+        if entry.get('slug'):
+            slugs.add(entry['slug'])
+        # A rename or a delete payload without the slug: fall back to the last export
+        for key in ('documentId', 'id'):
+            known = slug_index.get(str(entry.get(key)))
+            if known:
+                slugs.add(known)
+        return _safe_slugs(slugs), True, False
+    if model in RELATION_MODELS:
+        return set(), True, True
+    if model in SETTINGS_MODELS:
+        return set(), True, False
+    return set(), False, False
+
+
+def _fetch_products(client, slugs, concurrency):
+    params = {'sort[0]': 'id:asc', 'fields[0]': 'slug', 'fields[1]': 'title'}
+    params.update(populate_params(IMAGE_POPULATE))
+    ordered = sorted(slugs)
+    products = []
+    for start in range(0, len(ordered), SLUG_BATCH):
+        batch_params = dict(params)
+        for i, slug in enumerate(ordered[start:start + SLUG_BATCH]):
+            batch_params[f'filters[slug][$in][{i}]'] = slug
+        products.extend(client.iter_entries('products', batch_params, concurrency=concurrency))
+    return products
+
+
+def _download(client, url, path):
+    full_url = url if url.startswith('http') else f"{client.base_url}{url}"
+    response = client.session.get(full_url, timeout=client.timeout, stream=True)
+    try:
+        if response.status_code != 200:
+            raise StrapiError(f"HTTP {response.status_code} from {full_url}")
+        with atomic_write(path, 'wb', durable=False) as f:
+            for chunk in response.iter_content(64 * 1024):
+                f.write(chunk)
+    finally:
+        response.close()
+
+
+def sync_products(strapi_url, public_dir, slugs, token=None, concurrency=4, log=print):
+    """Refresh public/image-map.json and product images for `slugs` only
+
+    Slugs Strapi no longer returns (deleted, unpublished, renamed) are
+    removed from the map along with their image directory. Slugs that
+    aren't safe directory names are skipped. Returns a summary dict; raises
+    StrapiError if the products can't be fetched.
+    """
+    public_dir = Path(public_dir)
+    unsafe = set(slugs) - _safe_slugs(slugs)
+    if unsafe:
+        log(f"⚠️ Skipping unsafe slugs: {', '.join(sorted(map(repr, unsafe)))}")
+    slugs = _safe_slugs(slugs)
+    map_file = public_dir / "image-map.json"
+    try:
+        with open(map_file, 'r', encoding='utf-8') as f:
+            image_map = json.load(f)
+    except FileNotFoundError:
+        image_map = {}
+
+    summary = {'updated': [], 'removed': [], 'downloaded': 0, 'reused': 0, 'failed': 0}
+    if not slugs:
+        return summary
+    with StrapiClient(strapi_url, token=token, pool_size=concurrency) as client:
+        products = _fetch_products(client, slugs, concurrency)
+
+        downloads = []
+        new_entries = {}
+        for product in products:
+            slug = product.get('slug')
+            if slug not in slugs:
+                continue
+            previous = {image.get('originalUrl'): image for image in image_map.get(slug, [])}
+            product_dir = _product_dir(public_dir, slug)
+            entries = []
+            for i, image in enumerate(product.get('images') or []):
+                url = image.get('url') or ''
+                kept = previous.get(url)
+                if kept and (public_dir / kept['url'].lstrip('/')).exists():
+                    # Strapi upload URLs carry a content hash: same URL, same bytes
+                    entry = dict(kept, id=image.get('id'), alternativeText=image.get('alternativeText') or '')
+                    summary['reused'] += 1
+                else:
+                    file_name = f"image-{i + 1}{_image_extension(url)}"
+                    entry = {
+                        'id': image.get('id'),
+                        'url': f"/products/{slug}/{file_name}",
+                        'alternativeText': image.get('alternativeText') or '',
+                        'width': image.get('width') or 800,
+                        'height': image.get('height') or 600,
+                        'originalUrl': url,
+                    }
+                    downloads.append((slug, url, product_dir / file_name, entry))
+                entries.append(entry)
+            new_entries[slug] = entries
+
+        def fetch(job):
+            slug, url, path, entry = job
+            try:
+                _download(client, url, path)
+                return None
+            except (OSError, StrapiError, requests.exceptions.RequestException) as e:
+                return f"{slug}: {os.path.basename(url)}: {e}"
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for job, error in zip(downloads, pool.map(fetch, downloads)):
+                if error:
+                    summary['failed'] += 1
+                    log(f"❌ Failed to download {error}")
+                    new_entries[job[0]].remove(job[3])
+                else:
+                    summary['downloaded'] += 1
+
+    for slug, entries in new_entries.items():
+        image_map[slug] = entries
+        summary['updated'].append(slug)
+    for slug in sorted(slugs - set(new_entries)):
+        product_dir = _product_dir(public_dir, slug)
+        if image_map.pop(slug, None) is not None or product_dir.exists():
+            shutil.rmtree(product_dir, ignore_errors=True)
+            summary['removed'].append(slug)
+
+    if summary['updated'] or summary['removed']:
+        atomic_write_json(map_file, image_map)
+    return summary
+
+
+def refresh_image_outputs(frontend_dir, log=print):
+    """Hashed names, legacy map, blur placeholders and shards, as after a full sync"""
+    from .hashed_assets import hash_image_filenames, write_legacy_image_map
+    from .image_shards import write_image_map_shards
+    from .placeholders import add_placeholders
+
+    frontend_dir = Path(frontend_dir)
+    public_dir = frontend_dir / "public"
+    image_cache = frontend_dir / ".publish-cache" / "images"
+
+    hash_image_filenames(public_dir, image_cache, log=log)
+    with open(public_dir / "image-map.json", 'r', encoding='utf-8') as f:
+        write_legacy_image_map(frontend_dir / "image-map.json", json.load(f))
+    add_placeholders(public_dir, image_cache, log=log)
+    write_image_map_shards(public_dir, log=log)
+
+
+def targeted_sync(strapi_url, frontend_dir, slugs, export=True, full_export=False, token=None,
+                  concurrency=4, log=print):
+    """Sync images for `slugs`, then run the delta export; returns a summary dict"""
+    from .export import export_catalog
+
+    frontend_dir = Path(frontend_dir)
+    summary = {'images': None, 'export': None}
+    if slugs:
+        images = sync_products(strapi_url, frontend_dir / "public", slugs, token=token,
+                               concurrency=concurrency, log=log)
+        summary['images'] = images
+        if images['updated'] or images['removed']:
+            try:
+                refresh_image_outputs(frontend_dir, log=log)
+            except (OSError, ValueError) as e:
+                log(f"⚠️ Could not refresh image map outputs: {e}")
+    if export:
+        summary['export'] = export_catalog(
+            strapi_url,
+            frontend_dir / "public",
+            token=token,
+            cache_dir=frontend_dir / ".publish-cache" / "export",
+            full=full_export,
+            concurrency=concurrency,
+            log=log,
+        )
+    return summary
+
+
+class StrapiWebhookListener:
+    """Local endpoint for Strapi webhooks that runs debounced targeted syncs
+
+    `sync(slugs, export, full_export)` runs on a timer thread once events
+    have been quiet for `quiet_seconds`; runs never overlap. Requests must
+    send `secret` in the Authorization header (as-is or as a Bearer token),
+    which Strapi's webhook settings can add, with a JSON Content-Type, so a
+    web page can't post to it with a simple cross-origin request.
+    """
+
+    def __init__(self, sync, public_dir, secret, host='127.0.0.1', port=DEFAULT_PORT,
+                 quiet_seconds=DEFAULT_QUIET_SECONDS, log=print):
+        if not secret:
+            raise ValueError("A webhook secret is required (set STRAPI_WEBHOOK_SECRET)")
+        self.sync = sync
+        self.public_dir = Path(public_dir)
+        self.secret = secret
+        self.log = log
+        self.lock = threading.Lock()
+        self.run_lock = threading.Lock()
+        self.received = 0
+        self.ignored = 0
+        self.syncs = 0
+        self._slugs = set()
+        self._export = False
+        self._full = False
+        self._events = 0
+
+        self.scheduler = DeployScheduler(self._fire, quiet_seconds=quiet_seconds,
+                                         max_wait_seconds=MAX_WAIT_SECONDS, log=lambda message: None)
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{WEBHOOK_PATH}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.scheduler.cancel()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _authorized(self, header):
+        header = header or ''
+        if header.startswith('Bearer '):
+            header = header[len('Bearer '):]
+        return hmac.compare_digest(header.encode(), self.secret.encode())
+
+    def queue(self, payload):
+        """Record one webhook payload; returns True if it will trigger a sync"""
+        try:
+            with open(self.public_dir / "image-map.json", 'r', encoding='utf-8') as f:
+                image_map = json.load(f)
+        except (FileNotFoundError, ValueError):
+            image_map = {}
+        slugs, export, full = affected_by(payload, image_map, load_slug_index(self.public_dir))
+
+        with self.lock:
+            self.received += 1
+            if not slugs and not export:
+                self.ignored += 1
+                return False
+            self._slugs |= slugs
+            self._export = self._export or export
+            self._full = self._full or full
+            self._events += 1
+        label = ", ".join(sorted(slugs)) or payload.get('model') or 'catalog'
+        self.log(f"🪝 {payload.get('event')} ({label}) - sync queued")
+        self.scheduler.trigger('strapi-sync')
+        return True
+
+    def _fire(self, key, payload, triggers):
+        with self.run_lock:
+            with self.lock:
+                slugs, export, full, events = self._slugs, self._export, self._full, self._events
+                self._slugs, self._export, self._full, self._events = set(), False, False, 0
+            if not events:
+                return
+            try:
+                self.sync(slugs, export, full)
+                with self.lock:
+                    self.syncs += 1
+            except Exception as e:
+                # Put the work back so the next event retries it
+                with self.lock:
+                    self._slugs |= slugs
+                    self._export = self._export or export
+                    self._full = self._full or full
+                    self._events += events
+                self.log(f"❌ Targeted sync failed ({e}) - will retry with the next webhook")
+
+    def flush(self):
+        """Run a queued sync now instead of waiting out the window"""
+        return self.scheduler.flush()
+
+    def _handler_class(self):
+        listener = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if urlsplit(self.path).path != WEBHOOK_PATH:
+                    self._reply(404, {'error': 'not found'})
+                    return
+                with listener.lock:
+                    status = {'received': listener.received, 'ignored': listener.ignored,
+                              'syncs': listener.syncs, 'pending': listener._events}
+                self._reply(200, status)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length)
+                if urlsplit(self.path).path != WEBHOOK_PATH:
+                    self._reply(404, {'error': 'not found'})
+                    return
+                if not listener._authorized(self.headers.get('Authorization')):
+                    self._reply(401, {'error': 'bad secret'})
+                    return
+                if self.headers.get_content_type() != 'application/json':
+                    self._reply(415, {'error': 'expected application/json'})
+                    return
+                try:
+                    payload = json.loads(body or b'{}')
+                except ValueError:
+                    self._reply(400, {'error': 'invalid JSON'})
+                    return
+                queued = listener.queue(payload) if isinstance(payload, dict) else False
+                self._reply(202, {'queued': queued})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def format_sync_summary(summary):
+    lines = []
+    images = summary.get('images')
+    if images:
+        lines.append(f"✅ Targeted image sync: {len(images['updated'])} products updated, "
+                     f"{len(images['removed'])} removed ({images['downloaded']} downloaded, "
+                     f"{images['reused']} unchanged, {images['failed']} failed)")
+    export = summary.get('export')
+    if export:
+        lines.append(f"📦 Export took {export['seconds']:.1f}s ({export['requests']} requests)")
+    return "\n".join(lines)
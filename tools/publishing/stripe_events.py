@@ -0,0 +1,111 @@
+"""
+Synthetic, correctly signed Stripe webhook events
+
+Events are shaped like the ones the webhook routes read and signed the
+way stripe.webhooks.constructEvent() checks them: the Stripe-Signature
+header is `t=<unix time>,v1=<HMAC-SHA256 of "<t>.<payload>" keyed with the
+endpoint secret>`.
+"""
+
+import hashlib
+import hmac
+import json
+import time
+import uuid
+
+API_VERSION = '2025-08-27.basil'
+
+EVENT_TYPES = ('checkout.session.completed', 'payment_intent.succeeded', 'payment_intent.payment_failed')
+
+
+def sign_payload(payload, secret, timestamp=None):
+    """Stripe-Signature header value for `payload` bytes"""
+    timestamp = int(timestamp if timestamp is not None else time.time())
+    signed = f"{timestamp}.".encode() + payload
+    signature = hmac.new(secret.encode('utf-8'), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def verify_signature(payload, header, secret, tolerance=300):
+    """True if `header` is a valid, recent Stripe-Signature for `payload` (what constructEvent() accepts)"""
+    parts = [item.partition('=') for item in (header or '').split(',')]
+    timestamps = [value for key, _, value in parts if key == 't']
+    signatures = [value for key, _, value in parts if key == 'v1']
+    if not timestamps or not signatures or not timestamps[0].isdigit():
+        return False
+    if abs(time.time() - int(timestamps[0])) > tolerance:
+        return False
+    expected = sign_payload(payload, secret, int(timestamps[0])).rpartition('v1=')[2]
+    return any(hmac.compare_digest(expected, signature) for signature in signatures)
+
+
+def checkout_session(product, variant='original'):
+    """A completed Checkout Session for `product`, with the metadata /api/checkout sets"""
+    session_id = f"cs_test_{uuid.uuid4().hex}"
+    price = product.get('price') or 0
+    return {
+        'id': session_id,
+        'object': 'checkout.session',
+        'amount_total': int(round(price * 100)),
+        'currency': 'cad',
+        'customer': None,
+        'customer_email': None,
+        'customer_details': {
+            'name': 'Bench Customer',
+            'email': 'bench.customer@example.com',
+            'phone': '+15555550100',
+            'address': {'line1': '1 Test Street', 'line2': None, 'city': 'Toronto', 'state': 'ON',
+                        'postal_code': 'M5V 1A1', 'country': 'CA'},
+        },
+        'custom_fields': [{'key': 'order_notes', 'text': {'value': 'Webhook bench order'}}],
+        'livemode': False,
+        'metadata': {
+            'productId': product.get('documentId', ''),
+            'productSlug': product.get('slug', ''),
+            'productTitle': product.get('title', ''),
+            'productPrice': str(price),
+            'variant': variant,
+            'products': json.dumps([{'item_id': product.get('slug', ''), 'item_name': product.get('title', ''),
+                                     'item_variant': variant, 'price': price, 'quantity': 1}]),
+        },
+        'mode': 'payment',
+        'payment_status': 'paid',
+        'status': 'complete',
+    }
+
+
+def payment_intent(amount, status):
+    return {
+        'id': f"pi_{uuid.uuid4().hex[:24]}",
+        'object': 'payment_intent',
+        'amount': amount,
+        'currency': 'cad',
+        'livemode': False,
+        'status': status,
+    }
+
+
+def build_event(event_type, product):
+    """(event dict, checkout session or None) for one synthetic event"""
+    session = None
+    if event_type == 'checkout.session.completed':
+        session = checkout_session(product)
+        data = session
+    elif event_type == 'payment_intent.succeeded':
+        data = payment_intent(int(round((product.get('price') or 0) * 100)), 'succeeded')
+    elif event_type == 'payment_intent.payment_failed':
+        data = payment_intent(int(round((product.get('price') or 0) * 100)), 'requires_payment_method')
+    else:
+        raise ValueError(f"Unsupported event type: {event_type}")
+    event = {
+        'id': f"evt_{uuid.uuid4().hex[:24]}",
+        'object': 'event',
+        'api_version': API_VERSION,
+        'created': int(time.time()),
+        'livemode': False,
+        'pending_webhooks': 1,
+        'request': {'id': None, 'idempotency_key': None},
+        'type': event_type,
+        'data': {'object': data},
+    }
+    return event, session
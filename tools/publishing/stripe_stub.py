@@ -0,0 +1,131 @@
+"""
+Local Stripe API stub
+
+Answers the Stripe calls the storefront makes, so checkout and the
+webhook handlers can run against a local build under load without
+touching Stripe. Those calls are POST /v1/checkout/sessions and
+GET /v1/checkout/sessions/<id>. Start `next start` with STRIPE_API_BASE
+pointing here and any sk_test_ key (see src/lib/stripe.ts).
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+STUB_SECRET_KEY = 'sk_test_publish_manager_stub'
+
+
+class StripeStub:
+    """Threaded HTTP server that creates fake Checkout Sessions
+
+    `latency_seconds` imitates Stripe's response time, so a load test
+    measures a realistic share of time spent waiting on Stripe.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency_seconds=0.0):
+        self.latency_seconds = latency_seconds
+        self.lock = threading.Lock()
+        self.sessions = 0
+        self.retrieved = 0
+        self.known_sessions = {}
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def create_checkout_session(self, form):
+        session_id = f"cs_test_{uuid.uuid4().hex}"
+        with self.lock:
+            self.sessions += 1
+        return {
+            'id': session_id,
+            'object': 'checkout.session',
+            'created': int(time.time()),
+            'livemode': False,
+            'mode': form.get('mode', ['payment'])[0],
+            'payment_status': 'unpaid',
+            'status': 'open',
+            'success_url': form.get('success_url', [None])[0],
+            'cancel_url': form.get('cancel_url', [None])[0],
+            'url': f"https://checkout.stripe.com/c/pay/{session_id}",
+        }
+
+    def add_session(self, session):
+        """Serve `session` from GET /v1/checkout/sessions/<id>, e.g. one a replayed event refers to"""
+        with self.lock:
+            self.known_sessions[session['id']] = session
+
+    def retrieve_checkout_session(self, session_id):
+        with self.lock:
+            self.retrieved += 1
+            session = self.known_sessions.get(session_id)
+        return session
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Request-Id', f"req_{uuid.uuid4().hex[:14]}")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                form = parse_qs(self.rfile.read(length).decode('utf-8'))
+                if stub.latency_seconds:
+                    time.sleep(stub.latency_seconds)
+                if self.path.split('?')[0] == '/v1/checkout/sessions':
+                    self._send(200, stub.create_checkout_session(form))
+                else:
+                    self._send(404, {'error': {'type': 'invalid_request_error',
+                                               'message': f"Unrecognized request URL (POST: {self.path})"}})
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if stub.latency_seconds:
+                    time.sleep(stub.latency_seconds)
+                if path.startswith('/v1/checkout/sessions/'):
+                    session = stub.retrieve_checkout_session(path.rsplit('/', 1)[1])
+                    if session:
+                        self._send(200, session)
+                        return
+                    self._send(404, {'error': {'type': 'invalid_request_error', 'code': 'resource_missing',
+                                               'message': f"No such checkout.session: '{path.rsplit('/', 1)[1]}'"}})
+                    return
+                self._send(404, {'error': {'type': 'invalid_request_error',
+                                           'message': f"Unrecognized request URL (GET: {self.path})"}})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
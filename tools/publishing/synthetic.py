@@ -0,0 +1,263 @@
+"""
+Synthetic catalog generator
+
+Writes a frontend-shaped tree - image-map.json, public/image-map.json,
+public/products-data.json, public/site-settings.json and
+public/products/<slug>/image-N.<ext> - so the publishing tools can be
+exercised at catalog sizes we don't have yet.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from PIL import Image, ImageEnhance, ImageOps
+
+# Same categories the live shop uses
+CATEGORIES = [
+    {'name': 'Original Art', 'slug': 'original-art', 'sortOrder': 1},
+    {'name': 'Posters', 'slug': 'posters', 'sortOrder': 2},
+    {'name': 'Prints', 'slug': 'prints', 'sortOrder': 3},
+    {'name': 'Postcards', 'slug': 'postcards', 'sortOrder': 4},
+    {'name': 'Books', 'slug': 'books', 'sortOrder': 5},
+]
+
+# Every artwork is sold as one or more of these, the same way the real
+# catalog has leap-original-art / leap-poster etc.
+VARIANTS = [
+    # (slug suffix, title suffix, category slug, price range)
+    ('original-art', 'Original Art', 'original-art', (150, 900)),
+    ('poster', 'Poster', 'posters', (25, 45)),
+    ('photo-paper-poster', 'Photo Paper Poster', 'prints', (35, 60)),
+    ('postcard', 'Postcard', 'postcards', (3, 8)),
+]
+
+WORDS = [
+    'leap', 'standoff', 'blinky', 'shocked', 'chummy', 'glint', 'krampus',
+    'batlady', 'handy', 'harles', 'jokes', 'dent', 'rob', 'cats', 'bats',
+    'controller', 'disguise', 'fun', 'gal', 'miss', 'lady', 'monster',
+    'puppet', 'goblin', 'robot', 'ghoul', 'witch', 'comet', 'moth', 'owl',
+]
+
+IMAGE_FORMATS = {'png': '.png', 'jpg': '.jpg', 'jpeg': '.jpg', 'webp': '.webp'}
+
+
+def _token(rng, nbytes):
+    """Seeded stand-in for secrets.token_hex so output is reproducible"""
+    return f"{rng.getrandbits(nbytes * 8):0{nbytes * 2}x}"
+
+
+def _stamp(when):
+    """ISO timestamp in Strapi's format (2024-01-01T00:00:00.000Z)"""
+    return when.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def parse_count_range(value):
+    """Parse "3" or "1-3" into a (min, max) tuple"""
+    if isinstance(value, (tuple, list)):
+        low, high = value
+    elif isinstance(value, int):
+        low = high = value
+    else:
+        parts = str(value).split('-', 1)
+        low = int(parts[0])
+        high = int(parts[1]) if len(parts) > 1 else low
+
+    if low < 0 or high < low:
+        raise ValueError(f"Invalid range: {value}")
+    return low, high
+
+
+def _artwork_names(count, rng):
+    """Unique, slug-friendly artwork names"""
+    names = []
+    seen = set()
+    while len(names) < count:
+        words = rng.sample(WORDS, 2)
+        name = '-'.join(words)
+        if name in seen:
+            name = f"{name}-{len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def _base_artwork(width, height, rng):
+    """A noisy two-tone image so files compress like real scans, not flat fills"""
+    noise = Image.effect_noise((width, height), rng.randint(40, 90))
+    dark = tuple(rng.randint(0, 90) for _ in range(3))
+    light = tuple(rng.randint(150, 255) for _ in range(3))
+    return ImageOps.colorize(noise, dark, light)
+
+
+def _variant_image(base, variant_index, image_index, rng):
+    """Derive a near-identical image for another variant of the same artwork"""
+    if variant_index == 0 and image_index == 0:
+        return base
+
+    img = base
+    if image_index:
+        # Extra gallery images are crops/rotations of the artwork
+        img = img.rotate(90 * image_index, expand=True).resize(base.size)
+    if variant_index:
+        # Posters are re-exports: slightly different tone and scale
+        img = ImageEnhance.Brightness(img).enhance(1 + rng.uniform(-0.08, 0.08))
+    return img
+
+
+def generate_catalog(root, products=100, images_per_product=1, width=96, height=128,
+                     image_format='png', seed=0, write_images=True, log=print):
+    """Write a synthetic catalog of `products` products under `root`
+
+    `root` is laid out like the frontend directory. Returns a summary dict.
+    """
+    root = Path(root)
+    public_dir = root / "public"
+    products_dir = public_dir / "products"
+    products_dir.mkdir(parents=True, exist_ok=True)
+
+    extension = IMAGE_FORMATS[image_format.lower()]
+    image_range = parse_count_range(images_per_product)
+    rng = random.Random(seed)
+
+    # Roughly 1.6 products per artwork, matching the real catalog's mix
+    artwork_count = max(1, (products * 5) // 8)
+    artworks = _artwork_names(artwork_count, rng)
+
+    categories = {}
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for i, category in enumerate(CATEGORIES, start=1):
+        categories[category['slug']] = {
+            'id': i,
+            'documentId': _token(rng, 12),
+            'name': category['name'],
+            'slug': category['slug'],
+            'description': None,
+            'sortOrder': category['sortOrder'],
+            'createdAt': _stamp(created),
+            'updatedAt': _stamp(created),
+            'publishedAt': _stamp(created),
+        }
+
+    products_data = {}
+    public_map = {}
+    root_map = {}
+    image_id = 0
+    total_images = 0
+    total_bytes = 0
+
+    product_id = 0
+    artwork_index = 0
+    while product_id < products:
+        artwork = artworks[artwork_index % len(artworks)]
+        if artwork_index >= len(artworks):
+            artwork = f"{artwork}-{artwork_index // len(artworks) + 1}"
+        artwork_index += 1
+
+        title_base = ' '.join(word.capitalize() for word in artwork.split('-'))
+        variant_count = min(rng.choice([1, 1, 2, 2, 3]), products - product_id)
+        base = _base_artwork(width, height, rng) if write_images else None
+
+        for variant_index, (suffix, title_suffix, category_slug, price_range) in enumerate(VARIANTS[:variant_count]):
+            product_id += 1
+            slug = f"{artwork}-{suffix}"
+            title = f"{title_base} - {title_suffix}"
+
+            when = created + timedelta(minutes=product_id * 37)
+            stamp = _stamp(when)
+
+            product_dir = products_dir / slug
+            product_dir.mkdir(exist_ok=True)
+
+            strapi_images = []
+            local_images = []
+            mapped_images = []
+            for image_index in range(rng.randint(*image_range)):
+                image_id += 1
+                upload_name = f"{slug.replace('-', '_')}_{image_index}_{_token(rng, 5)}{extension}"
+                original_url = f"/uploads/{upload_name}"
+                file_name = f"image-{image_index + 1}{extension}"
+                public_path = f"/products/{slug}/{file_name}"
+
+                if write_images:
+                    img = _variant_image(base, variant_index, image_index, rng)
+                    image_path = product_dir / file_name
+                    img.save(image_path)
+                    total_bytes += image_path.stat().st_size
+                total_images += 1
+
+                strapi_images.append({
+                    'id': image_id,
+                    'url': original_url,
+                    'alternativeText': title,
+                    'width': width,
+                    'height': height,
+                })
+                local_images.append({
+                    'id': image_id,
+                    'url': public_path,
+                    'alternativeText': '',
+                    'width': width,
+                    'height': height,
+                    'originalUrl': original_url,
+                })
+                mapped_images.append({
+                    'original': original_url,
+                    'static': public_path,
+                    'alt': title,
+                    'width': width,
+                    'height': height,
+                })
+
+            products_data[slug] = {
+                'id': product_id,
+                'documentId': _token(rng, 12),
+                'title': title,
+                'price': rng.randint(*price_range),
+                'description': f"<p>{title} by Tyson.</p>",
+                'slug': slug,
+                'featured': rng.random() < 0.05,
+                'sold': suffix == 'original-art' and rng.random() < 0.2,
+                'hasPoster': variant_index == 0 and variant_count > 1,
+                'images': strapi_images,
+                'category': categories[category_slug],
+                'currentShow': None,
+                'showPrice': None,
+                'createdAt': stamp,
+                'updatedAt': stamp,
+                'publishedAt': stamp,
+            }
+            public_map[slug] = local_images
+            root_map[slug] = mapped_images
+
+        if product_id // 1000 > (product_id - variant_count) // 1000:
+            log(f"  ... {product_id}/{products} products")
+
+    with open(root / "image-map.json", 'w') as f:
+        json.dump({
+            'products': root_map,
+            'static': {
+                '/uploads/tysondrawsstuff_web_logo.png': {
+                    'static': '/static/logo.png',
+                    'description': 'Site logo',
+                },
+            },
+            'lastSync': _stamp(datetime.now(timezone.utc)),
+        }, f, indent=2)
+
+    with open(public_dir / "image-map.json", 'w') as f:
+        json.dump(public_map, f, indent=2)
+
+    with open(public_dir / "products-data.json", 'w') as f:
+        json.dump(products_data, f, indent=2)
+
+    with open(public_dir / "site-settings.json", 'w') as f:
+        json.dump({'posterPrice': 35}, f, indent=2)
+
+    return {
+        'root': str(root),
+        'products': len(products_data),
+        'images': total_images,
+        'image_bytes': total_bytes,
+    }
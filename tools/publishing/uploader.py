@@ -0,0 +1,316 @@
+"""
+Bulk artwork uploader
+
+Uploads a folder of scans to Strapi's media library (/api/upload) from
+inside the Publishing Manager, instead of launching a separate
+bulk-image-uploader.py script.
+
+Each file is first normalized in a process pool:
+  - EXIF orientation is applied and metadata stripped.
+  - The image is converted to sRGB through its embedded ICC profile, so
+    Adobe RGB and CMYK scans keep their colours once the profile is gone.
+    CMYK without a profile gets Pillow's plain conversion. 16-bit and
+    floating-point grayscale is scaled down to 8 bits first, since a plain
+    conversion clips everything above 255 to white.
+  - The longest edge is capped at `max_edge`.
+  - Opaque images become JPEG and transparent ones stay PNG.
+
+Scans straight off the scanner are often 10-50 MB, and Strapi would only
+shrink them again after a slow upload. Normalized files are kept by
+source SHA-256 in the cache directory until they're uploaded, so a
+rerun doesn't resize them again.
+
+Uploads go over one pooled session, `concurrency` at a time. Every
+finished upload is appended to a JSON lines manifest, keyed by the source
+file's SHA-256 and the Strapi URL. An interrupted run of hundreds of scans
+resumes with the files that hadn't finished. A renamed or moved file that
+was already uploaded isn't sent twice.
+"""
+
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import requests
+from PIL import Image, ImageCms, ImageOps
+
+from .fsutil import append_jsonl, atomic_write, file_sha256, read_jsonl
+from .strapi import StrapiClient, StrapiError
+
+SOURCE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.tif', '.tiff', '.webp', '.bmp')
+
+DEFAULT_MAX_EDGE = 2400
+DEFAULT_QUALITY = 88
+DEFAULT_CONCURRENCY = 4
+UPLOAD_ATTEMPTS = 3
+
+# Scans are huge; the resize workers let Pillow open them instead of
+# treating them as decompression bombs (set per worker, see _normalize_job)
+MAX_SCAN_PIXELS = 400_000_000
+
+
+def find_artwork(folder):
+    """Image files directly in `folder`, sorted by name"""
+    return sorted(path for path in Path(folder).iterdir()
+                  if path.is_file() and path.suffix.lower() in SOURCE_SUFFIXES and not path.name.startswith('.'))
+
+
+def _has_alpha(image):
+    if image.mode in ('RGBA', 'LA'):
+        return image.getchannel('A').getextrema()[0] < 255
+    return image.mode == 'P' and 'transparency' in image.info
+
+
+def _to_8bit(image):
+    """Scale 16-bit (I;16*, I) and float (F) grayscale into L; other modes pass through
+
+    16-bit values are divided by 257 (65535 -> 255). Float images in 0-1
+    are multiplied by 255, anything larger is taken as 16-bit.
+    """
+    if image.mode.startswith('I;16'):
+        image = image.convert('I')
+    if image.mode == 'I':
+        return image.point(lambda v: v / 257).convert('L')
+    if image.mode == 'F':
+        scale = 255 if image.getextrema()[1] <= 1 else 1 / 257
+        return image.point(lambda v: v * scale).convert('L')
+    return image
+
+
+def _to_srgb(image, icc_profile, transparent):
+    """Convert to RGB(A) in sRGB, applying the embedded ICC profile when there is one"""
+    mode = 'RGBA' if transparent else 'RGB'
+    image = _to_8bit(image)
+    if icc_profile:
+        if image.mode not in ('RGB', 'RGBA', 'CMYK', 'L'):
+            image = image.convert(mode)
+        try:
+            source_profile = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+            return ImageCms.profileToProfile(image, source_profile, ImageCms.createProfile('sRGB'),
+                                             outputMode=mode)
+        except (ImageCms.PyCMSError, OSError):
+            # Damaged profile, or one that doesn't match the pixel data
+            pass
+    return image.convert(mode)
+
+
+def normalize_image(source, output_dir, max_edge=DEFAULT_MAX_EDGE, quality=DEFAULT_QUALITY):
+    """Write a resized, web-ready copy of `source` into `output_dir`
+
+    Runs in worker processes. Returns {'path', 'width', 'height', 'bytes',
+    'mime'} for the copy.
+    """
+    source = Path(source)
+    with Image.open(source) as original:
+        icc_profile = original.info.get('icc_profile')
+        image = ImageOps.exif_transpose(original)
+        transparent = _has_alpha(image)
+        image = _to_srgb(image, icc_profile, transparent)
+        if max(image.size) > max_edge:
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+    if transparent:
+        path, fmt, options, mime = output_dir / f"{source.stem}.png", 'PNG', {'optimize': True}, 'image/png'
+    else:
+        path, fmt = output_dir / f"{source.stem}.jpg", 'JPEG'
+        options, mime = {'quality': quality, 'optimize': True, 'progressive': True}, 'image/jpeg'
+    with atomic_write(path, 'wb', durable=False) as f:
+        image.save(f, format=fmt, **options)
+    return {'path': str(path), 'width': image.width, 'height': image.height,
+            'bytes': path.stat().st_size, 'mime': mime}
+
+
+def _normalize_job(job):
+    """Worker entry point: (sha256, result or error message)"""
+    digest, source, output_dir, max_edge, quality = job
+    output_dir = Path(output_dir)
+    Image.MAX_IMAGE_PIXELS = MAX_SCAN_PIXELS
+    try:
+        return digest, normalize_image(source, output_dir, max_edge, quality)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        return digest, f"{Path(source).name}: {e}"
+
+
+class UploadManifest:
+    """Append-only record of finished uploads, keyed by (strapi url, source sha256)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.done = {}
+        for record in read_jsonl(self.path):
+            self.done[(record.get('strapi'), record.get('sha256'))] = record
+
+    def get(self, strapi_url, digest):
+        return self.done.get((strapi_url, digest))
+
+    def record(self, record):
+        with self.lock:
+            append_jsonl(self.path, record)
+            self.done[(record['strapi'], record['sha256'])] = record
+
+
+def upload_file(client, path, mime, alt_text=None):
+    """POST one file to /api/upload; returns Strapi's file entry"""
+    url = f"{client.base_url}/api/upload"
+    data = {}
+    if alt_text:
+        data['fileInfo'] = json.dumps({'alternativeText': alt_text})
+    last_error = None
+    for attempt in range(UPLOAD_ATTEMPTS):
+        try:
+            with open(path, 'rb') as f:
+                # The session's JSON Content-Type would override the multipart boundary
+                response = client.session.post(url, files={'files': (Path(path).name, f, mime)}, data=data,
+                                               headers={'Content-Type': None}, timeout=client.timeout)
+        except requests.exceptions.RequestException as e:
+            last_error = StrapiError(f"{url}: {e}")
+        else:
+            client.request_count += 1
+            if response.status_code in (200, 201):
+                try:
+                    body = response.json()
+                except ValueError as e:
+                    raise StrapiError(f"Failed to parse JSON from {url}: {e}") from e
+                return body[0] if isinstance(body, list) else body
+            last_error = StrapiError(f"HTTP {response.status_code} from {url}: {response.text[:200]}")
+            if response.status_code < 500 and response.status_code != 429:
+                break
+        time.sleep(2 ** attempt)
+    raise last_error
+
+
+def bulk_upload(folder, strapi_url, cache_dir, token=None, max_edge=DEFAULT_MAX_EDGE,
+                quality=DEFAULT_QUALITY, workers=None, concurrency=DEFAULT_CONCURRENCY, alt_text=False,
+                stop=None, progress=None, log=print):
+    """Normalize and upload every image in `folder`, skipping ones already uploaded
+
+    The manifest and normalized copies live in `cache_dir`.
+    `alt_text` uses each file name (dashes and underscores as spaces) as the
+    alternative text. `stop` is an optional threading.Event checked between
+    files, and `progress(done, total)` is called as files finish. Returns a
+    summary dict.
+    """
+    cache_dir = Path(cache_dir)
+    manifest = UploadManifest(cache_dir / "manifest.jsonl")
+    sources = find_artwork(folder)
+    start = time.perf_counter()
+    summary = {'files': len(sources), 'skipped': 0, 'uploaded': 0, 'failed': 0,
+               'source_bytes': 0, 'upload_bytes': 0, 'stopped': False, 'errors': []}
+    if not sources:
+        log(f"⚠️ No images found in {folder}")
+        summary['seconds'] = 0.0
+        return summary
+
+    with ThreadPoolExecutor(max_workers=concurrency) as io_pool:
+        digests = list(io_pool.map(file_sha256, sources))
+
+    todo, queued = [], set()
+    for source, digest in zip(sources, digests):
+        # Already uploaded, or a byte-identical copy earlier in this folder
+        if manifest.get(strapi_url, digest) or digest in queued:
+            summary['skipped'] += 1
+        else:
+            todo.append((source, digest))
+            queued.add(digest)
+    if summary['skipped']:
+        log(f"ℹ️ {summary['skipped']} of {len(sources)} files already uploaded - resuming with {len(todo)}")
+
+    done = summary['skipped']
+    if progress:
+        progress(done, len(sources))
+    lock = threading.Lock()
+
+    def finished(ok):
+        nonlocal done
+        with lock:
+            done += 1
+            summary['uploaded' if ok else 'failed'] += 1
+            if progress:
+                progress(done, len(sources))
+
+    with StrapiClient(strapi_url, token=token, pool_size=concurrency, timeout=120) as client, \
+            ThreadPoolExecutor(max_workers=concurrency) as upload_pool, \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as resize_pool:
+
+        def send(source, digest, normalized):
+            if stop is not None and stop.is_set():
+                return
+            alt = source.stem.replace('-', ' ').replace('_', ' ').strip() if alt_text else None
+            try:
+                entry = upload_file(client, normalized['path'], normalized['mime'], alt)
+            except StrapiError as e:
+                log(f"❌ {source.name}: {e}")
+                summary['errors'].append(f"{source.name}: {e}")
+                finished(False)
+                return
+            manifest.record({
+                'strapi': strapi_url,
+                'sha256': digest,
+                'source': source.name,
+                'id': entry.get('id'),
+                'url': entry.get('url'),
+                'width': normalized['width'],
+                'height': normalized['height'],
+                'bytes': normalized['bytes'],
+                'uploadedAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            })
+            # Only files still waiting to upload are worth keeping
+            shutil.rmtree(Path(normalized['path']).parent, ignore_errors=True)
+            with lock:
+                summary['source_bytes'] += source.stat().st_size
+                summary['upload_bytes'] += normalized['bytes']
+            log(f"✅ {source.name} -> {entry.get('url')} ({normalized['bytes'] / 1024:.0f} KB)")
+            finished(True)
+
+        jobs = {}
+        for source, digest in todo:
+            output_dir = cache_dir / "normalized" / f"{digest[:16]}-{max_edge}-{quality}"
+            cached = next((p for p in output_dir.glob(f"{source.stem}.*")), None) if output_dir.is_dir() else None
+            if cached:
+                # Resized on an earlier, interrupted run
+                with Image.open(cached) as image:
+                    normalized = {'path': str(cached), 'width': image.width, 'height': image.height,
+                                  'bytes': cached.stat().st_size,
+                                  'mime': 'image/png' if cached.suffix == '.png' else 'image/jpeg'}
+                upload_pool.submit(send, source, digest, normalized)
+                continue
+            job = (digest, str(source), str(output_dir), max_edge, quality)
+            jobs[resize_pool.submit(_normalize_job, job)] = (source, digest)
+
+        for future in as_completed(jobs):
+            source, digest = jobs[future]
+            if stop is not None and stop.is_set():
+                summary['stopped'] = True
+                for pending in jobs:
+                    pending.cancel()
+                break
+            _, result = future.result()
+            if isinstance(result, str):
+                log(f"❌ Could not read {result}")
+                summary['errors'].append(result)
+                finished(False)
+                continue
+            upload_pool.submit(send, source, digest, result)
+
+    if stop is not None and stop.is_set():
+        summary['stopped'] = True
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def format_upload_summary(summary):
+    lines = [f"{'⏹️' if summary['stopped'] else '✅' if not summary['failed'] else '⚠️'} "
+             f"Uploaded {summary['uploaded']} of {summary['files']} images in {summary['seconds']:.1f}s "
+             f"({summary['skipped']} already uploaded, {summary['failed']} failed)"]
+    if summary['upload_bytes']:
+        lines.append(f"   {summary['source_bytes'] / 1024 / 1024:.1f} MB of scans sent as "
+                     f"{summary['upload_bytes'] / 1024 / 1024:.1f} MB")
+    if summary['stopped']:
+        lines.append("   Stopped - run again to resume where it left off")
+    return "\n".join(lines)
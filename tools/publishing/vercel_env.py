@@ -0,0 +1,388 @@
+"""
+Bulk Vercel environment variable rotation
+
+Rotating a key through the Vercel CLI costs a `vercel env rm` and a
+`vercel env add` per key per environment. Each call starts the CLI again
+and they run one after another. This module applies a whole set of
+(key, value, target) changes through the Vercel REST API instead. One
+pooled session does all of it, keys are worked on concurrently, and the
+changes to any one key run in order. Each result is read back to verify
+it. The caller then triggers one redeploy per affected environment.
+
+Vercel stores a variable as one entry that can cover several targets.
+When a rotation gives targets of a shared entry different values, the
+entry is narrowed and new entries are created, so no other target
+changes. A preview entry can also be limited to one Git branch
+(gitBranch). Each branch's entries are rotated alongside the general
+ones, so no branch is left deploying with the old value.
+
+fetch_env_snapshot() reads both environments in one pass and keeps only
+a digest of each value. EnvSnapshotCache holds the snapshot in
+.publish-cache with a TTL, so the Settings tab can show a preview-vs-
+production diff without calling Vercel on every refresh.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .envstore import EnvStore
+from .fingerprint import value_digest
+from .fsutil import atomic_write_json
+
+TARGETS = ('preview', 'production')
+
+# Seconds a cached snapshot is shown without asking Vercel again
+SNAPSHOT_TTL_SECONDS = 600
+
+# The deploy hook that rebuilds each target (preview builds come from develop)
+DEPLOY_HOOK_KEYS = {'preview': 'VERCEL_DEPLOY_HOOK_DEVELOP', 'production': 'VERCEL_DEPLOY_HOOK_PRODUCTION'}
+
+
+class VercelEnvError(Exception):
+    """The env API failed or returned something unexpected"""
+
+
+class VercelEnvClient:
+    """Environment variables of one project through the Vercel REST API"""
+
+    API_URL = "https://api.vercel.com"
+
+    def __init__(self, token, project_id, team_id=None, concurrency=6, timeout=15, api_url=None):
+        self.project_id = project_id
+        self.team_id = team_id
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.api_url = (api_url or self.API_URL).rstrip('/')
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, method, path, params=None, body=None):
+        params = dict(params or {})
+        if self.team_id:
+            params['teamId'] = self.team_id
+        url = f"{self.api_url}{path}"
+        try:
+            response = self.session.request(method, url, params=params, json=body, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise VercelEnvError(f"{method} {path}: {e}") from e
+        if not 200 <= response.status_code < 300:
+            raise VercelEnvError(f"HTTP {response.status_code} from {method} {path}: {response.text[:200]}")
+        return response.json() if response.content else {}
+
+    def list_env(self):
+        """Every env entry of the project (values of encrypted entries are not included)"""
+        return self._request('GET', f'/v10/projects/{self.project_id}/env').get('envs', [])
+
+    def get_value(self, env_id):
+        """Decrypted value of one entry (None for sensitive entries, which can't be read back)"""
+        return self._request('GET', f'/v1/projects/{self.project_id}/env/{env_id}').get('value')
+
+    def create_env(self, key, value, targets, env_type='encrypted', git_branch=None):
+        body = {'key': key, 'value': value, 'type': env_type, 'target': list(targets)}
+        if git_branch:
+            body['gitBranch'] = git_branch
+        return self._request('POST', f'/v10/projects/{self.project_id}/env', body=body)
+
+    def edit_env(self, env_id, **fields):
+        return self._request('PATCH', f'/v9/projects/{self.project_id}/env/{env_id}', body=fields)
+
+
+def load_rotation_file(path, targets=TARGETS):
+    """[(key, value, target)] from a rotation file
+
+    A .json file maps target -> {key: value}. Any other file is read as a
+    .env file, and each of its keys applies to every target in `targets`.
+    """
+    path = Path(path)
+    if path.suffix == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        changes = [(key, value, target) for target, values in data.items() for key, value in values.items()]
+    else:
+        changes = [(key, value, target) for key, value in EnvStore(path).values().items() for target in targets]
+    unknown = sorted({target for _, _, target in changes} - set(TARGETS))
+    if unknown:
+        raise ValueError(f"Unknown target(s) {', '.join(unknown)} - expected {' or '.join(TARGETS)}")
+    return changes
+
+
+def _entry_targets(entry):
+    targets = entry.get('target') or []
+    return [targets] if isinstance(targets, str) else list(targets)
+
+
+def plan_rotation(existing, changes):
+    """key -> ordered [(op, env_id or None, fields)] turning `existing` entries into `changes`
+
+    Entries are edited in place where that changes no other target. Every
+    gitBranch scope of a key is planned separately and gets the same
+    values. New entries are only created for targets no entry serves.
+    """
+    desired = {}
+    for key, value, target in changes:
+        desired.setdefault(key, {})[target] = str(value)
+
+    plan = {}
+    for key, wanted in desired.items():
+        scopes = {None: []}
+        for entry in existing:
+            if entry.get('key') == key:
+                scopes.setdefault(entry.get('gitBranch') or None, []).append(entry)
+
+        ops = []
+        for branch in [None] + sorted(b for b in scopes if b is not None):
+            remaining = dict(wanted)
+            extra = {'gitBranch': branch} if branch else {}
+            for entry in scopes[branch]:
+                entry_targets = _entry_targets(entry)
+                covered = [t for t in entry_targets if t in remaining]
+                if not covered:
+                    continue
+                kept = [t for t in entry_targets if t not in remaining]
+                by_value = {}
+                for target in covered:
+                    by_value.setdefault(remaining.pop(target), []).append(target)
+                env_type = entry.get('type') if entry.get('type') in ('encrypted', 'sensitive', 'plain') else 'encrypted'
+                if kept:
+                    # The entry still serves targets outside this rotation: narrow it, keep its value
+                    ops.append(('edit', entry['id'], {'target': kept}))
+                else:
+                    value, targets = next(iter(by_value.items()))
+                    del by_value[value]
+                    ops.append(('edit', entry['id'], {'value': value, 'target': targets}))
+                ops += [('create', None, {'value': value, 'target': targets, 'type': env_type, **extra})
+                        for value, targets in by_value.items()]
+            if branch:
+                # A branch only overrides targets it already had
+                continue
+            # Nor is a target that only branch entries serve widened to every branch
+            branch_only = {t for b, entries in scopes.items() if b for e in entries for t in _entry_targets(e)}
+            by_value = {}
+            for target, value in remaining.items():
+                if target not in branch_only:
+                    by_value.setdefault(value, []).append(target)
+            ops += [('create', None, {'value': value, 'target': targets, 'type': 'encrypted'})
+                    for value, targets in by_value.items()]
+        plan[key] = ops
+    return plan
+
+
+def _apply_key(client, key, ops):
+    for op, env_id, fields in ops:
+        if op == 'edit':
+            client.edit_env(env_id, **fields)
+        else:
+            client.create_env(key, fields['value'], fields['target'], fields['type'], fields.get('gitBranch'))
+
+
+# Worst first: one bad entry decides the status of its (key, target)
+VERIFY_SEVERITY = ('missing', 'mismatch', 'unreadable', 'ok')
+
+
+def verify_rotation(client, changes):
+    """(key, target) -> 'ok', 'mismatch', 'missing' or 'unreadable' (sensitive entries)
+
+    Every entry serving the target is read back, branch-scoped ones
+    included, and the worst result counts.
+    """
+    entries = client.list_env()
+    lookups = []
+    results = {}
+    for key, value, target in changes:
+        matching = [e for e in entries if e.get('key') == key and target in _entry_targets(e)]
+        if not matching:
+            results[(key, target)] = 'missing'
+        lookups += [(key, str(value), target, entry) for entry in matching]
+
+    def check(item):
+        key, value, target, entry = item
+        actual = client.get_value(entry['id']) if entry.get('type') != 'sensitive' else None
+        if actual is None:
+            return (key, target), 'unreadable'
+        return (key, target), 'ok' if actual == value else 'mismatch'
+
+    with ThreadPoolExecutor(max_workers=client.concurrency) as pool:
+        for key_target, status in pool.map(check, lookups):
+            current = results.get(key_target, 'ok')
+            results[key_target] = min(current, status, key=VERIFY_SEVERITY.index)
+    return results
+
+
+def rotate_env(client, changes, log=print):
+    """Apply `changes` concurrently per key, then verify them; returns a result dict
+
+    The result lists the targets that changed, so the caller can redeploy
+    each one exactly once.
+    """
+    existing = client.list_env()
+    plan = plan_rotation(existing, changes)
+    log(f"🔑 Rotating {len(plan)} key(s) on {', '.join(sorted({t for _, _, t in changes}))} "
+        f"({sum(len(ops) for ops in plan.values())} API calls, {client.concurrency} at a time)...")
+
+    lock = threading.Lock()
+    failed = {}
+
+    def apply(key):
+        try:
+            _apply_key(client, key, plan[key])
+            log(f"✅ {key}")
+        except VercelEnvError as e:
+            with lock:
+                failed[key] = str(e)
+            log(f"❌ {key}: {e}")
+
+    with ThreadPoolExecutor(max_workers=client.concurrency) as pool:
+        list(pool.map(apply, plan))
+
+    verified = verify_rotation(client, [c for c in changes if c[0] not in failed])
+    for (key, target), status in sorted(verified.items()):
+        if status == 'unreadable':
+            log(f"ℹ️ {key} on {target} is a sensitive variable - set, but its value can't be read back")
+        elif status != 'ok':
+            log(f"❌ {key} on {target}: {status} after rotation")
+    bad = {kt for kt, status in verified.items() if status in ('mismatch', 'missing')}
+    return {
+        'keys': len(plan),
+        'failed': failed,
+        'verified': verified,
+        'ok': not failed and not bad,
+        'targets': sorted({target for key, _, target in changes if key not in failed}),
+    }
+
+
+def _value_mode(value):
+    """'test' / 'live' for Stripe keys - the one thing about a value worth showing in clear"""
+    for prefix in ('sk_', 'pk_', 'rk_'):
+        if value.startswith(prefix + 'test_'):
+            return 'test'
+        if value.startswith(prefix + 'live_'):
+            return 'live'
+    return None
+
+
+def fetch_env_snapshot(client, targets=TARGETS):
+    """target -> {key: {digest, mode, type, updatedAt}}, values read concurrently and never kept"""
+    entries = [e for e in client.list_env()
+               if set([e['target']] if isinstance(e.get('target'), str) else e.get('target') or []) & set(targets)]
+
+    def describe(entry):
+        value = entry.get('value') if entry.get('type') == 'plain' else None
+        if value is None and entry.get('type') != 'sensitive':
+            value = client.get_value(entry['id'])
+        return entry, {
+            'digest': value_digest(value),
+            'mode': _value_mode(value) if value else None,
+            'type': entry.get('type'),
+            'updatedAt': (entry.get('updatedAt') or entry.get('createdAt') or 0) / 1000 or None,
+        }
+
+    snapshot = {'fetchedAt': time.time(), 'targets': {target: {} for target in targets}}
+    with ThreadPoolExecutor(max_workers=client.concurrency) as pool:
+        for entry, info in pool.map(describe, entries):
+            entry_targets = entry['target'] if isinstance(entry['target'], list) else [entry['target']]
+            for target in entry_targets:
+                if target in snapshot['targets']:
+                    snapshot['targets'][target][entry['key']] = info
+    return snapshot
+
+
+class EnvSnapshotCache:
+    """Last env snapshot on disk, considered fresh for `ttl` seconds"""
+
+    def __init__(self, path, ttl=SNAPSHOT_TTL_SECONDS):
+        self.path = Path(path)
+        self.ttl = ttl
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def fresh(self):
+        """The cached snapshot if it is younger than the TTL, else None"""
+        snapshot = self.load()
+        if snapshot and time.time() - snapshot.get('fetchedAt', 0) < self.ttl:
+            return snapshot
+        return None
+
+    def save(self, snapshot):
+        atomic_write_json(self.path, snapshot, durable=False)
+
+    def invalidate(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def diff_snapshot(snapshot, left='preview', right='production'):
+    """[(key, status, left info, right info)] with status same / differs / missing-left / missing-right
+
+    Values that can't be read back (sensitive) compare as 'unknown'.
+    """
+    a = snapshot['targets'].get(left, {})
+    b = snapshot['targets'].get(right, {})
+    rows = []
+    for key in sorted(set(a) | set(b)):
+        ia, ib = a.get(key), b.get(key)
+        if ia is None:
+            status = 'missing-left'
+        elif ib is None:
+            status = 'missing-right'
+        elif ia['digest'] is None or ib['digest'] is None:
+            status = 'unknown'
+        elif ia['digest'] == ib['digest']:
+            status = 'same'
+        else:
+            status = 'differs'
+        rows.append((key, status, ia, ib))
+    return rows
+
+
+def _describe(info):
+    if info is None:
+        return '—'
+    text = info['digest'] or info.get('type') or '?'
+    return f"{text} ({info['mode']})" if info.get('mode') else text
+
+
+def format_env_diff(snapshot, left='preview', right='production'):
+    """Side-by-side digest table; returns [(line, status)] so a widget can colour each row"""
+    age = time.time() - snapshot['fetchedAt']
+    lines = [(f"Fetched {time.strftime('%H:%M:%S', time.localtime(snapshot['fetchedAt']))} "
+              f"({age:.0f}s ago) - values shown as SHA-256 digests", None),
+             (f"{'KEY':<38} {left:<22} {right:<22}", None)]
+    rows = diff_snapshot(snapshot, left, right)
+    for key, status, ia, ib in rows:
+        marker = {'same': ' ', 'differs': '≠', 'unknown': '?', 'missing-left': '✗', 'missing-right': '✗'}[status]
+        lines.append((f"{marker} {key:<36} {_describe(ia):<22} {_describe(ib):<22}", status))
+    missing = [key for key, status, _, _ in rows if status.startswith('missing')]
+    if missing:
+        lines.append((f"✗ Missing on one side: {', '.join(missing)}", 'missing-left'))
+    # Live Stripe keys on preview take real payments; test keys on production take none
+    crossed = [key for key, _, ia, ib in rows
+               if (ia and ia.get('mode') == 'live' and left == 'preview')
+               or (ib and ib.get('mode') == 'test' and right == 'production')]
+    if crossed:
+        lines.append((f"⚠️ Wrong Stripe mode: {', '.join(crossed)}", 'differs'))
+    return lines
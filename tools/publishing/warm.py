@@ -0,0 +1,199 @@
+"""
+Post-deploy cache warmer
+
+A fresh production deployment starts with a cold CDN. The first visitor
+to each product, category and pagination page pays for the server render,
+and the first visitor to each image pays for the origin fetch. This stage
+requests all of them right after the deploy goes live. It uses the
+deployment's sitemap.xml, plus the pagination and category routes the
+sitemap leaves out (read from public/products-data/manifest.json), plus
+every image in the image maps. Page URLs are requested in their
+trailing-slash form (next.config.ts sets trailingSlash: true) - the sitemap
+writes them without one - and a redirect counts as a failure, since it
+warms the 308 rather than the page.
+
+Requests go through the asyncio client with a concurrency cap and a rate
+cap, so warming never looks like an attack to Vercel's edge. Every URL's
+status, latency and x-vercel-cache result are reported.
+"""
+
+import asyncio
+import json
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from .asynchttp import AsyncHTTPClient, HTTPError
+from .stats import latency_summary
+
+PRODUCTION_URL = 'https://tysondrawsstuff.com'
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+
+def parse_sitemap(xml_bytes):
+    """Every <loc> in a sitemap (or the child sitemaps of a sitemap index)"""
+    root = ET.fromstring(xml_bytes)
+    return [loc.text.strip() for loc in root.iter(f'{SITEMAP_NS}loc') if loc.text]
+
+
+def with_trailing_slash(url):
+    """`url` (or a path) in the form next.config.ts's trailingSlash serves without a redirect
+
+    Paths whose last segment has a file extension (sitemap.xml, images) are
+    served as-is; every other path ends in a slash. The query is kept.
+    """
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if not path.endswith('/') and '.' not in path.rsplit('/', 1)[-1]:
+        path += '/'
+    return urlunsplit(parts._replace(path=path))
+
+
+def rebase_url(url, base_url):
+    """Point a sitemap URL at `base_url`; sitemap.ts always writes the production domain"""
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return with_trailing_slash(urlunsplit((base.scheme, base.netloc, parts.path, parts.query, '')))
+
+
+def listing_paths(public_dir):
+    """Pagination and category routes from the products-data shard manifest"""
+    try:
+        with open(Path(public_dir) / "products-data" / "manifest.json", 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return []
+
+    def pages(prefix, listing):
+        return [f"{prefix}/"] + [f"{prefix}/page/{n}/" for n in range(2, (listing or {}).get('pageCount', 1) + 1)]
+
+    paths = pages('/shop', manifest.get('shop')) + pages('/posters', manifest.get('posters'))
+    for slug, listing in sorted(manifest.get('categories', {}).items()):
+        paths += pages(f'/category/{slug}', listing)
+    return paths
+
+
+def image_paths(public_dir, legacy_map=None):
+    """Every product image in public/image-map.json plus the static assets in image-map.json"""
+    paths = []
+    try:
+        with open(Path(public_dir) / "image-map.json", 'r', encoding='utf-8') as f:
+            paths += [image['url'] for images in json.load(f).values() for image in images if image.get('url')]
+    except (FileNotFoundError, ValueError):
+        pass
+    if legacy_map:
+        try:
+            with open(legacy_map, 'r', encoding='utf-8') as f:
+                paths += [entry['static'] for entry in json.load(f).get('static', {}).values() if entry.get('static')]
+        except (FileNotFoundError, ValueError):
+            pass
+    return paths
+
+
+async def _fetch(client, url, kind):
+    try:
+        response = await client.get(url)
+    except HTTPError as e:
+        return {'url': url, 'kind': kind, 'status': None, 'seconds': None, 'bytes': 0, 'cache': None,
+                'error': str(e)}
+    error = None
+    if not response.ok:
+        error = f"HTTP {response.status}"
+        if response.headers.get('location'):
+            error += f" → {response.headers['location']}"
+    return {
+        'url': url,
+        'kind': kind,
+        'status': response.status,
+        'seconds': response.seconds,
+        'bytes': len(response.body),
+        'cache': response.headers.get('x-vercel-cache'),
+        'error': error,
+    }
+
+
+async def warm_async(base_url, public_dir, legacy_map=None, include_images=True,
+                     concurrency=8, rate=20, timeout=30, log=print):
+    """Fetch the sitemap, then every page and asset under the caps; returns a result dict"""
+    base_url = base_url.rstrip('/')
+    start = time.perf_counter()
+    async with AsyncHTTPClient(concurrency=concurrency, rate=rate, timeout=timeout) as client:
+        sitemap_error = None
+        locs = []
+        try:
+            response = await client.get(f"{base_url}/sitemap.xml")
+            if response.ok:
+                locs = parse_sitemap(response.body)
+            else:
+                sitemap_error = f"HTTP {response.status}"
+        except (HTTPError, ET.ParseError) as e:
+            sitemap_error = str(e)
+        if sitemap_error:
+            log(f"⚠️ Could not read sitemap.xml ({sitemap_error}) - warming known routes only")
+
+        targets = {}
+        for url in locs:
+            targets.setdefault(rebase_url(url, base_url), 'page')
+        for path in listing_paths(public_dir):
+            targets.setdefault(base_url + path, 'page')
+        if include_images:
+            for path in image_paths(public_dir, legacy_map):
+                targets.setdefault(base_url + path, 'image')
+
+        cap = f"≤{rate:g}/s" if rate else "no rate cap"
+        log(f"🔥 Warming {len(targets)} URLs ({concurrency} at a time, {cap})...")
+        results = await asyncio.gather(*(_fetch(client, url, kind) for url, kind in targets.items()))
+
+    return {
+        'baseUrl': base_url,
+        'sitemapUrls': len(locs),
+        'sitemapError': sitemap_error,
+        'results': results,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def warm_cache(base_url, public_dir, **options):
+    """Blocking wrapper around warm_async() for threads and the CLI"""
+    return asyncio.run(warm_async(base_url, public_dir, **options))
+
+
+def summarize_warm(result):
+    results = result['results']
+    failed = [r for r in results if r['error']]
+    summary = {'urls': len(results), 'failed': len(failed), 'seconds': result['seconds'], 'kinds': {}}
+    for kind in ('page', 'image'):
+        times = [r['seconds'] for r in results if r['kind'] == kind and r['seconds'] is not None]
+        summary['kinds'][kind] = latency_summary(times)
+    cache = {}
+    for r in results:
+        if r['cache']:
+            cache[r['cache']] = cache.get(r['cache'], 0) + 1
+    summary['cache'] = cache
+    return summary
+
+
+def format_warm_report(result, slowest=10, failures=20):
+    summary = summarize_warm(result)
+    lines = [f"Warmed {summary['urls']} URLs in {summary['seconds']:.1f}s - {summary['failed']} failed"]
+    for kind, stats in summary['kinds'].items():
+        if stats['count']:
+            lines.append(f"  {kind + 's':<7} {stats['count']:>5}  p50 {stats['p50'] * 1000:.0f} ms  "
+                         f"p95 {stats['p95'] * 1000:.0f} ms  max {stats['max'] * 1000:.0f} ms")
+    if summary['cache']:
+        lines.append("  x-vercel-cache: " + ", ".join(f"{k} {v}" for k, v in sorted(summary['cache'].items())))
+
+    timed = sorted((r for r in result['results'] if r['seconds'] is not None), key=lambda r: -r['seconds'])
+    if timed and slowest:
+        lines.append("Slowest:")
+        lines += [f"  {r['seconds'] * 1000:7.0f} ms  {r['url']}" for r in timed[:slowest]]
+
+    failed = [r for r in result['results'] if r['error']]
+    if failed:
+        lines.append("Failures:")
+        lines += [f"  ❌ {r['url']} - {r['error']}" for r in failed[:failures]]
+        if len(failed) > failures:
+            lines.append(f"  ... and {len(failed) - failures} more")
+    return "\n".join(lines)
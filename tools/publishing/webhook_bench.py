@@ -0,0 +1,245 @@
+"""
+Stripe webhook replay bench
+
+Fires correctly signed synthetic Stripe events at the webhook routes of
+a running build, at a fixed rate for a fixed duration. It measures
+handler latency and failure rate per route, and whether every
+checkout.session.completed turned into an order email. A drop is a
+burst of sales, and the order emails go out inside the request, so this
+shows whether the handlers keep up.
+
+/api/stripe-webhook answers 200 with an `error` field when processing
+fails (to stop Stripe retrying), so a response counts as a failure if
+its status isn't 2xx or its body has an error. With start_next_server()
+the build talks to StripeStub and SMTPSink instead of Stripe and Gmail,
+and /api/webhooks/stripe looks up products and creates orders in a
+StrapiStandIn through the runtime STRAPI_URL. A build from before that
+route read STRAPI_URL still calls the Strapi it was built against, so the
+report counts the orders the stand-in received and flags the route when
+they fall short. Orders that /api/stripe-webhook logs locally go to a
+temporary ORDERS_FILE instead of /tmp/orders.json.
+"""
+
+import asyncio
+import itertools
+import json
+import smtplib
+import time
+from pathlib import Path
+
+from .asynchttp import AsyncHTTPClient, HTTPError, RateLimiter
+from .fsutil import append_jsonl, read_jsonl
+from .stats import latency_summary
+from .stripe_events import build_event, sign_payload, verify_signature
+
+# trailingSlash: true answers the unslashed paths with a 308
+WEBHOOK_ROUTES = {
+    'stripe-webhook': '/api/stripe-webhook/',
+    'webhooks/stripe': '/api/webhooks/stripe/',
+}
+
+# Only this route sends the order-confirmation email
+EMAIL_ROUTE = 'stripe-webhook'
+# Only this route creates Strapi orders
+ORDER_ROUTE = 'webhooks/stripe'
+
+
+def bench_server_env(webhook_secret, smtp_port, strapi_url=None, orders_file=None):
+    """Extra env for a benched `next start`: local SMTP and Strapi, no GA4 calls, no /tmp/orders.json"""
+    env = {
+        'STRIPE_WEBHOOK_SECRET': webhook_secret,
+        'SMTP_HOST': '127.0.0.1',
+        'SMTP_PORT': str(smtp_port),
+        'SMTP_USER': 'bench',
+        'SMTP_PASS': 'bench',
+        'EMAIL_TO': 'orders@bench.invalid',
+        'EMAIL_FROM': 'shop@bench.invalid',
+        'GA_API_SECRET': '',
+        'STRAPI_API_TOKEN': 'webhook-bench-no-writes',
+    }
+    if strapi_url:
+        env['STRAPI_URL'] = strapi_url
+    if orders_file:
+        env['ORDERS_FILE'] = str(orders_file)
+    return env
+
+
+def standin_webhook_handler(route, secret, smtp_port=None, strapi=None):
+    """SiteStandIn POST handler imitating `route`: check the signature, mail or record completed checkouts
+
+    Lets the bench itself be exercised without a Next.js build.
+    """
+    def handle(headers, body):
+        if not verify_signature(body, headers.get('Stripe-Signature'), secret):
+            return 400, 'application/json', b'{"error":"Invalid signature"}'
+        event = json.loads(body)
+        if route == EMAIL_ROUTE and smtp_port and event['type'] == 'checkout.session.completed':
+            session = event['data']['object']
+            message = (f"Subject: New order {session['metadata']['productTitle']}\r\n"
+                       f"From: shop@bench.invalid\r\nTo: orders@bench.invalid\r\n\r\n{session['id']}\r\n")
+            with smtplib.SMTP('127.0.0.1', smtp_port, timeout=10) as smtp:
+                smtp.login('bench', 'bench')
+                smtp.sendmail('shop@bench.invalid', ['orders@bench.invalid'], message.encode('utf-8'))
+        if route == ORDER_ROUTE and strapi and event['type'] == 'checkout.session.completed':
+            session = event['data']['object']
+            strapi.handle_create_order(json.dumps({'data': {'stripeSessionId': session['id']}}).encode())
+        return 200, 'application/json', b'{"received":true}'
+
+    return handle
+
+
+def _load_products(public_dir):
+    with open(Path(public_dir) / "products-data.json", 'r', encoding='utf-8') as f:
+        products = [p for p in json.load(f).values() if not p.get('sold')]
+    if not products:
+        raise ValueError("No unsold products in products-data.json to build events from")
+    return products
+
+
+async def _deliver(client, limiter, url, route, event_type, payload, secret):
+    # Sign at send time, like Stripe, so long runs stay inside the signature tolerance
+    await limiter.wait()
+    headers = {'Content-Type': 'application/json', 'Stripe-Signature': sign_payload(payload, secret)}
+    try:
+        response = await client.post(url, payload, headers=headers)
+    except HTTPError as e:
+        return {'route': route, 'type': event_type, 'status': None, 'seconds': None, 'error': str(e)}
+    error = None
+    if not 200 <= response.status < 300:
+        error = f"HTTP {response.status}"
+    try:
+        body = json.loads(response.body or b'{}')
+        if isinstance(body, dict) and body.get('error'):
+            error = f"{body['error']}" + (f": {body.get('details')}" if body.get('details') else "")
+    except ValueError:
+        pass
+    return {'route': route, 'type': event_type, 'status': response.status, 'seconds': response.seconds,
+            'error': error}
+
+
+async def replay_async(base_url, secret, products, routes, event_types, rate=5, duration=30,
+                       max_in_flight=64, timeout=30, stripe_stub=None):
+    """Send rate x duration events round-robin over routes and event types"""
+    base_url = base_url.rstrip('/')
+    total = max(1, int(rate * duration))
+    plan = itertools.cycle([(route, event_type) for route in routes for event_type in event_types])
+    product_cycle = itertools.cycle(products)
+
+    start = time.perf_counter()
+    limiter = RateLimiter(rate)
+    async with AsyncHTTPClient(concurrency=max_in_flight, timeout=timeout) as client:
+        tasks = []
+        for _ in range(total):
+            route, event_type = next(plan)
+            event, session = build_event(event_type, next(product_cycle))
+            if session and stripe_stub:
+                stripe_stub.add_session(session)
+            payload = json.dumps(event).encode()
+            tasks.append(_deliver(client, limiter, base_url + WEBHOOK_ROUTES[route], route, event_type, payload, secret))
+        results = await asyncio.gather(*tasks)
+    return results, time.perf_counter() - start
+
+
+def summarize_replay(results, seconds):
+    def summarize(rows):
+        ok = [r['seconds'] for r in rows if not r['error']]
+        return {
+            'events': len(rows),
+            'failures': len(rows) - len(ok),
+            'failureRate': (len(rows) - len(ok)) / len(rows) if rows else 0,
+            'rps': len(rows) / seconds if seconds else 0,
+            'latency': latency_summary(ok),
+        }
+
+    routes = sorted({r['route'] for r in results})
+    errors = {}
+    for r in results:
+        if r['error']:
+            errors[r['error']] = errors.get(r['error'], 0) + 1
+    return {
+        'total': summarize(results),
+        'routes': {route: summarize([r for r in results if r['route'] == route]) for route in routes},
+        'errors': dict(sorted(errors.items(), key=lambda item: -item[1])[:5]),
+    }
+
+
+def run_webhook_bench(base_url, secret, public_dir, routes=tuple(WEBHOOK_ROUTES),
+                      event_types=('checkout.session.completed',), rate=5, duration=30,
+                      stripe_stub=None, smtp_sink=None, strapi=None, log=print):
+    """Blocking bench; returns a run record (see WebhookBenchHistory)
+
+    `strapi` is the StrapiStandIn the server was pointed at, if any.
+    """
+    if not secret:
+        raise ValueError("STRIPE_WEBHOOK_SECRET is not configured")
+    products = _load_products(public_dir)
+    log(f"🪝 Replaying {int(rate * duration)} signed events at {rate:g}/s to {', '.join(routes)}...")
+    emails_before = smtp_sink.count() if smtp_sink else 0
+    orders_before = len(strapi.orders) if strapi else 0
+    results, seconds = asyncio.run(replay_async(base_url, secret, products, routes, event_types, rate=rate,
+                                                duration=duration, stripe_stub=stripe_stub))
+    run = {
+        'recordedAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'baseUrl': base_url,
+        'rate': rate,
+        'duration': seconds,
+        'eventTypes': list(event_types),
+        **summarize_replay(results, seconds),
+    }
+    if smtp_sink:
+        expected = sum(1 for r in results if r['route'] == EMAIL_ROUTE
+                       and r['type'] == 'checkout.session.completed' and not r['error'])
+        run['emails'] = {'expected': expected,
+                         'received': smtp_sink.wait_for(emails_before + expected, timeout=10) - emails_before}
+    if strapi and ORDER_ROUTE in routes:
+        # The route swallows Strapi errors, so the stand-in's count is the only evidence
+        expected = sum(1 for r in results if r['route'] == ORDER_ROUTE
+                       and r['type'] == 'checkout.session.completed' and not r['error'])
+        run['orders'] = {'expected': expected, 'received': len(strapi.orders) - orders_before}
+    elif ORDER_ROUTE in routes:
+        run['orders'] = None
+    return run
+
+
+class WebhookBenchHistory:
+    """Append-only record of webhook bench runs"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def record(self, run):
+        append_jsonl(self.path, run)
+
+    def runs(self):
+        return read_jsonl(self.path)
+
+
+def format_webhook_report(run):
+    def ms(seconds):
+        return f"{seconds * 1000:.0f}" if seconds is not None else '-'
+
+    lines = [f"Webhook bench: {run['baseUrl']} - {run['rate']:g} events/s for {run['duration']:.1f}s",
+             f"  {'route':<16} {'events':>6} {'failed':>6} {'fail %':>6} {'p50':>6} {'p95':>6} {'p99':>6}  (ms)"]
+    for route, stats in list(run['routes'].items()) + [('total', run['total'])]:
+        latency = stats['latency']
+        lines.append(f"  {route:<16} {stats['events']:>6} {stats['failures']:>6} {stats['failureRate'] * 100:>5.1f}% "
+                     f"{ms(latency['p50']):>6} {ms(latency['p95']):>6} {ms(latency['p99']):>6}")
+    if 'emails' in run:
+        emails = run['emails']
+        icon = '✅' if emails['received'] >= emails['expected'] else '⚠️'
+        lines.append(f"  {icon} Order emails: {emails['received']} of {emails['expected']} reached the SMTP sink")
+    if 'orders' in run:
+        orders = run['orders']
+        if orders is None:
+            lines.append("  ⚠️ /api/webhooks/stripe: Strapi calls not stubbed - orders went to the server's own Strapi")
+        elif orders['received'] >= orders['expected']:
+            lines.append(f"  ✅ Strapi orders: {orders['received']} of {orders['expected']} reached the stand-in")
+        else:
+            lines.append(f"  ⚠️ Strapi orders: {orders['received']} of {orders['expected']} reached the stand-in - "
+                         f"/api/webhooks/stripe Strapi calls not stubbed (rebuild so it reads STRAPI_URL)")
+    for error, count in run['errors'].items():
+        lines.append(f"  ❌ {count} × {error}")
+    achieved = run['total']['rps']
+    if achieved < run['rate'] * 0.9:
+        lines.append(f"  ⚠️ Only {achieved:.1f} events/s completed - the handlers are not keeping up")
+    return "\n".join(lines)
@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from publishing.backup import BackupStore, create_snapshot, format_snapshot_summary
+from publishing.standin import StrapiStandIn
+from publishing.synthetic import generate_catalog
+
+
+def quiet(message):
+    pass
+
+
+class CreateSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.catalog = self.tmp / "catalog"
+        generate_catalog(self.catalog, products=20, width=16, height=16, log=quiet)
+        self.store_dir = self.tmp / "backups"
+        self.strapi = StrapiStandIn(self.catalog).start()
+        self.addCleanup(self.strapi.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def snapshot(self, **kwargs):
+        return create_snapshot(self.strapi.url, self.store_dir, page_size=8, log=quiet, **kwargs)
+
+    def test_stores_only_changes(self):
+        first = self.snapshot()
+        self.assertFalse(first['partial'])
+        self.assertIsNone(first['parent'])
+        self.assertEqual(first['collections']['products']['count'], 20)
+        self.assertEqual(first['stats']['uploadsDownloaded'], len(self.strapi.upload_files))
+        self.assertTrue((self.store_dir / "packs" / f"{first['pack']}.jsonl.gz").exists())
+
+        second = self.snapshot()
+        self.assertEqual(second['parent'], first['id'])
+        self.assertEqual((second['stats']['fetched'], second['stats']['newEntries']), (0, 0))
+        self.assertEqual(second['stats']['uploadsDownloaded'], 0)
+        self.assertIsNone(second['pack'])
+        self.assertEqual(second['collections'], first['collections'])
+
+        touched = self.strapi.touch(self.strapi.products[2]['slug'], title="Retitled")
+        self.strapi.delete(self.strapi.products[4]['slug'])
+        third = self.snapshot()
+        self.assertEqual((third['stats']['fetched'], third['stats']['newEntries']), (1, 1))
+        entries = third['collections']['products']['entries']
+        self.assertEqual(len(entries), 19)
+        self.assertEqual(entries[touched['documentId']][0], touched['updatedAt'])
+
+        self.assertEqual(BackupStore(self.store_dir).snapshots(), [first['id'], second['id'], third['id']])
+
+    def test_partial_snapshot_is_not_a_parent(self):
+        complete = self.snapshot(collections=('products', 'orders'))
+        partial = self.snapshot(collections=('products', 'orders', 'missing'))
+        self.assertTrue(partial['partial'])
+        self.assertIn('missing', partial['errors'])
+        self.assertIn("❌ Partial snapshot", format_snapshot_summary(partial))
+
+        after = self.snapshot(collections=('products', 'orders'))
+        self.assertEqual(after['parent'], complete['id'])
+        self.assertEqual(BackupStore(self.store_dir).latest_manifest(complete=True)['id'], after['id'])
+
+
+if __name__ == '__main__':
+    unittest.main()
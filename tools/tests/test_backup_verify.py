@@ -0,0 +1,92 @@
+import gzip
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from publishing.backup import BackupStore, create_snapshot
+from publishing.backup_verify import diff_snapshots, format_snapshot_diff, format_verify_report, verify_snapshot
+from publishing.standin import StrapiStandIn
+from publishing.synthetic import generate_catalog
+
+
+def quiet(message):
+    pass
+
+
+class BackupVerifyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.catalog = self.tmp / "catalog"
+        generate_catalog(self.catalog, products=15, width=16, height=16, log=quiet)
+        self.store_dir = self.tmp / "backups"
+        self.strapi = StrapiStandIn(self.catalog).start()
+        self.addCleanup(self.strapi.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def snapshot(self, collections=('products', 'orders')):
+        return create_snapshot(self.strapi.url, self.store_dir, collections=collections, log=quiet)
+
+    def test_complete_snapshot_verifies(self):
+        self.snapshot()
+        report = verify_snapshot(self.store_dir, deep=True)
+        self.assertTrue(report['ok'], format_verify_report(report))
+        self.assertEqual(report['collections']['products'],
+                         {'entries': 15, 'restorable': 15, 'countOk': True, 'missing': 0, 'corrupt': 0})
+
+    def test_partial_snapshot_fails(self):
+        self.snapshot(collections=('products', 'missing'))
+        report = verify_snapshot(self.store_dir)
+        self.assertFalse(report['ok'])
+        self.assertEqual(report['notBackedUp'], ['missing'])
+        self.assertIn("- partial", format_verify_report(report))
+
+    def test_tampered_entries_and_blobs_are_counted(self):
+        manifest = self.snapshot()
+        pack = self.store_dir / "packs" / f"{manifest['pack']}.jsonl.gz"
+        with gzip.open(pack, 'rb') as f:
+            lines = [json.loads(line) for line in f]
+        lines[0]['entry']['title'] = "Tampered"
+        with gzip.open(pack, 'wb') as f:
+            f.writelines(json.dumps(line).encode() + b'\n' for line in lines)
+        upload = next(iter(manifest['uploads'].values()))
+        BackupStore(self.store_dir).blob_path(upload['blob'], upload['ext']).unlink()
+
+        report = verify_snapshot(self.store_dir)
+        self.assertFalse(report['ok'])
+        corrupt = sum(c['corrupt'] for c in report['collections'].values())
+        self.assertEqual(corrupt, 1)
+        self.assertEqual(report['uploads']['missing'], 1)
+
+    def test_diff(self):
+        self.snapshot()
+        touched = self.strapi.products[1]['slug']
+        removed = self.strapi.products[3]['slug']
+        self.strapi.touch(touched, title="Retitled")
+        self.strapi.delete(removed)
+        self.strapi.add({'slug': 'new-owl', 'documentId': 'newowl000001', 'title': "New owl"})
+        self.snapshot()
+
+        diff = diff_snapshots(self.store_dir)
+        products = diff['collections']['products']
+        self.assertEqual(products['added'], ['new-owl'])
+        self.assertEqual(products['removed'], [removed])
+        self.assertEqual(products['changed'], [{'key': products['changed'][0]['key'], 'label': touched,
+                                                'fields': ['title']}])
+        self.assertNotIn('orders', diff['collections'])
+        self.assertIn("+1 added, -1 removed, ~1 changed", format_snapshot_diff(diff))
+
+    def test_failed_collection_is_not_compared(self):
+        self.snapshot()
+        newest = self.snapshot(collections=('products', 'orders', 'missing'))
+        diff = diff_snapshots(self.store_dir, 'previous', 'latest')
+        self.assertEqual(diff['notCompared'], {'missing': [newest['id']]})
+        self.assertEqual(diff['collections'], {})
+        self.assertIn("missing: not compared", format_snapshot_diff(diff))
+
+
+if __name__ == '__main__':
+    unittest.main()
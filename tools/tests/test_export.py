@@ -0,0 +1,137 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from publishing.export import export_catalog, write_products_stream
+from publishing.standin import StrapiStandIn
+from publishing.strapi import StrapiError
+from publishing.synthetic import generate_catalog
+
+
+def quiet(message):
+    pass
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class WriteProductsStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.path = self.tmp / "products-data.json"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_matches_json_stringify(self):
+        products = [{'id': 1, 'slug': 'owl', 'title': "Hibou 🦉", 'images': [{'url': '/uploads/a.jpg'}]},
+                    {'id': 2, 'slug': 'fox', 'category': None}]
+        self.assertEqual(write_products_stream(self.path, products, log=quiet), 2)
+        expected = json.dumps({p['slug']: p for p in products}, indent=2, ensure_ascii=False)
+        self.assertEqual(self.path.read_text(encoding='utf-8'), expected)
+
+        self.assertEqual(write_products_stream(self.path, [], log=quiet), 0)
+        self.assertEqual(self.path.read_text(encoding='utf-8'), '{}')
+
+    def test_duplicate_slug_keeps_the_last(self):
+        products = [{'id': 1, 'slug': 'owl'}, {'id': 2, 'slug': 'fox'}, {'id': 3, 'slug': 'owl'},
+                    {'id': 4, 'title': 'No slug'}]
+        self.assertEqual(write_products_stream(self.path, products, log=quiet), 2)
+        written = read_json(self.path)
+        self.assertEqual(list(written), ['owl', 'fox'])
+        self.assertEqual(written['owl']['id'], 3)
+
+
+class ExportCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.catalog = self.tmp / "catalog"
+        generate_catalog(self.catalog, products=45, width=16, height=16, write_images=False, log=quiet)
+        self.output_dir = self.tmp / "public"
+        self.output_dir.mkdir()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_pages_through_every_product(self):
+        with StrapiStandIn(self.catalog) as strapi:
+            summary = export_catalog(strapi.url, self.output_dir, page_size=10, concurrency=3, log=quiet)
+            slugs = {p['slug'] for p in strapi.products}
+        self.assertEqual((summary['mode'], summary['products']), ('full', 45))
+        self.assertTrue(summary['settings_exported'])
+        self.assertEqual(set(read_json(self.output_dir / "products-data.json")), slugs)
+        self.assertIn('posterPrice', read_json(self.output_dir / "site-settings.json"))
+        self.assertEqual(read_json(self.output_dir / "products-data" / "manifest.json")['products'], 45)
+
+    def test_failed_export_keeps_previous_files(self):
+        products_file = self.output_dir / "products-data.json"
+        products_file.write_text('{"owl": {"slug": "owl"}}', encoding='utf-8')
+        with self.assertRaises(StrapiError):
+            export_catalog("http://127.0.0.1:9", self.output_dir, log=quiet)
+        self.assertEqual(read_json(products_file), {'owl': {'slug': 'owl'}})
+
+
+class DeltaExportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.catalog = self.tmp / "catalog"
+        generate_catalog(self.catalog, products=30, width=16, height=16, write_images=False, log=quiet)
+        self.output_dir = self.tmp / "public"
+        self.output_dir.mkdir()
+        self.cache_dir = self.tmp / "cache"
+        self.strapi = StrapiStandIn(self.catalog).start()
+        self.addCleanup(self.strapi.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def export(self, **kwargs):
+        return export_catalog(self.strapi.url, self.output_dir, page_size=10, cache_dir=self.cache_dir,
+                              log=quiet, **kwargs)
+
+    def exported(self):
+        return read_json(self.output_dir / "products-data.json")
+
+    def test_only_changes_are_fetched(self):
+        first = self.export()
+        self.assertEqual(first['mode'], 'full')
+        full = self.exported()
+
+        summary = self.export()
+        self.assertEqual((summary['mode'], summary['changed'], summary['deleted']), ('delta', 0, 0))
+        self.assertLess(summary['bytes'], first['bytes'] / 2)
+        self.assertEqual(self.exported(), full)
+
+        touched = self.strapi.products[3]['slug']
+        deleted = self.strapi.products[5]['slug']
+        self.strapi.touch(touched, title="Retitled")
+        self.strapi.delete(deleted)
+        summary = self.export()
+        self.assertEqual((summary['mode'], summary['changed'], summary['deleted']), ('delta', 1, 1))
+        exported = self.exported()
+        self.assertEqual(exported[touched]['title'], "Retitled")
+        self.assertNotIn(deleted, exported)
+        self.assertEqual(len(exported), 29)
+
+    def test_lost_cache_file_is_refetched(self):
+        self.export()
+        lost = self.strapi.products[0]
+        (self.cache_dir / "products" / f"{lost['id']}.json").unlink()
+        summary = self.export()
+        self.assertEqual((summary['changed'], summary['deleted']), (1, 0))
+        self.assertIn(lost['slug'], self.exported())
+        self.assertTrue((self.cache_dir / "products" / f"{lost['id']}.json").exists())
+
+    def test_full_rebuilds_the_cache(self):
+        self.export()
+        summary = self.export(full=True)
+        self.assertEqual((summary['mode'], summary['products']), ('full', 30))
+        self.assertEqual(len(list((self.cache_dir / "products").iterdir())), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from publishing.fingerprint import DeployLedger, check_deploy_needed, deploy_branch, deploy_fingerprint
+
+GIT_ENV = {'GIT_AUTHOR_NAME': 'Test', 'GIT_AUTHOR_EMAIL': 'test@example.invalid',
+           'GIT_COMMITTER_NAME': 'Test', 'GIT_COMMITTER_EMAIL': 'test@example.invalid',
+           'GIT_CONFIG_GLOBAL': os.devnull, 'GIT_CONFIG_NOSYSTEM': '1'}
+
+ENV = {'NEXT_PUBLIC_STRAPI_URL': 'https://cms.example.invalid', 'STRIPE_SECRET_KEY': 'sk_test_1'}
+
+
+def run(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+class DeployFingerprintTest(unittest.TestCase):
+    """A clone whose origin has `production` and develop, each with public/products-data.json"""
+
+    def make_repo(self, production='main'):
+        root = Path(self.tmp.name) / production
+        remote, repo = root / "origin.git", root / "frontend"
+        root.mkdir()
+        run(root, 'init', '-q', '--bare', '-b', production, str(remote))
+        run(root, 'clone', '-q', str(remote), str(repo))
+        run(repo, 'checkout', '-q', '-b', production)
+        self.commit(repo, '{"owl": {}}', 'Publish')
+        run(repo, 'push', '-q', 'origin', production)
+        run(repo, 'checkout', '-q', '-b', 'develop')
+        self.commit(repo, '{"owl": {}, "fox": {}}', 'Publish fox')
+        run(repo, 'push', '-q', '-u', 'origin', 'develop')
+        return repo
+
+    def commit(self, repo, products, message):
+        (repo / "public").mkdir(exist_ok=True)
+        (repo / "public" / "products-data.json").write_text(products, encoding='utf-8')
+        run(repo, 'add', 'public')
+        run(repo, 'commit', '-q', '-m', message)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.dict(os.environ, GIT_ENV)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_deploy_branch(self):
+        self.assertEqual(deploy_branch(self.make_repo('main'), 'production'), 'main')
+        master = self.make_repo('master')
+        self.assertEqual(deploy_branch(master, 'production'), 'master')
+        self.assertEqual(deploy_branch(master, 'develop'), 'develop')
+
+    def test_production_fingerprint_on_master(self):
+        repo = self.make_repo('master')
+        _, components = deploy_fingerprint(repo, 'production', ENV)
+        self.assertEqual(components['ref'], 'refs/remotes/origin/master')
+        self.assertEqual(components['tree'], run(repo, 'rev-parse', 'origin/master^{tree}'))
+        self.assertEqual(components['files']['products-data.json'],
+                         run(repo, 'rev-parse', 'origin/master:public/products-data.json'))
+        self.assertIsNone(components['files']['image-map.json'])
+
+    def test_reads_the_branch_not_the_working_tree(self):
+        repo = self.make_repo()
+        production, _ = deploy_fingerprint(repo, 'production', ENV)
+        develop, components = deploy_fingerprint(repo, 'develop', ENV)
+        self.assertNotEqual(production, develop)
+
+        # Uncommitted and unpushed edits aren't what Vercel builds
+        (repo / "public" / "products-data.json").write_text('{"local": {}}', encoding='utf-8')
+        self.assertEqual(deploy_fingerprint(repo, 'develop', ENV)[0], develop)
+        run(repo, 'commit', '-q', '-am', 'Local only')
+        self.assertEqual(deploy_fingerprint(repo, 'develop', ENV)[0], develop)
+
+        run(repo, 'push', '-q')
+        changed, new_components = deploy_fingerprint(repo, 'develop', ENV)
+        self.assertNotEqual(changed, develop)
+        self.assertNotEqual(new_components['files']['products-data.json'],
+                            components['files']['products-data.json'])
+
+    def test_check_deploy_needed(self):
+        repo = self.make_repo()
+        ledger = DeployLedger(Path(self.tmp.name) / "deploys.json")
+        needed, fingerprint, components, changes = check_deploy_needed(repo, 'develop', ENV, ledger)
+        self.assertTrue(needed)
+        self.assertEqual(changes, ["no previous deploy recorded"])
+        ledger.record('develop', fingerprint, components)
+
+        self.assertFalse(check_deploy_needed(repo, 'develop', ENV, ledger)[0])
+        needed, _, _, changes = check_deploy_needed(repo, 'develop', dict(ENV, STRIPE_SECRET_KEY='sk_test_2'), ledger)
+        self.assertTrue(needed)
+        self.assertEqual(changes, ["env STRIPE_SECRET_KEY"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from publishing.gitops import GitError, promote_branch, rev_parse
+
+GIT_ENV = {'GIT_AUTHOR_NAME': 'Test', 'GIT_AUTHOR_EMAIL': 'test@example.invalid',
+           'GIT_COMMITTER_NAME': 'Test', 'GIT_COMMITTER_EMAIL': 'test@example.invalid',
+           'GIT_CONFIG_GLOBAL': os.devnull, 'GIT_CONFIG_NOSYSTEM': '1'}
+
+
+def run(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+class PromoteBranchTest(unittest.TestCase):
+    """promote_branch against a bare 'origin' and a clone with main and develop"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, GIT_ENV)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+        self.remote = self.root / "origin.git"
+        run(self.root, 'init', '-q', '--bare', '-b', 'main', str(self.remote))
+        self.repo = self.root / "frontend"
+        run(self.root, 'clone', '-q', str(self.remote), str(self.repo))
+        run(self.repo, 'checkout', '-q', '-b', 'main')
+        self.commit('README.md', 'hello\n', 'Initial commit')
+        run(self.repo, 'push', '-q', 'origin', 'main')
+        run(self.repo, 'checkout', '-q', '-b', 'develop')
+        run(self.repo, 'push', '-q', '-u', 'origin', 'develop')
+
+    def commit(self, name, text, message):
+        (self.repo / name).write_text(text, encoding='utf-8')
+        run(self.repo, 'add', name)
+        run(self.repo, 'commit', '-q', '-m', message)
+        return run(self.repo, 'rev-parse', 'HEAD')
+
+    def remote_tip(self, branch):
+        return run(self.remote, 'rev-parse', f'refs/heads/{branch}')
+
+    def promote(self, **kwargs):
+        return promote_branch(self.repo, worktree_dir=self.root / "promote", log=lambda message: None, **kwargs)
+
+    def test_up_to_date(self):
+        result = self.promote()
+        self.assertEqual(result, {'mode': 'up-to-date', 'commit': self.remote_tip('main')})
+
+    def test_fast_forward_pushes_develop_and_leaves_checkout_alone(self):
+        tip = self.commit('page.txt', 'new page\n', 'Add page')
+        run(self.repo, 'push', '-q', 'origin', 'develop')
+        result = self.promote()
+        self.assertEqual(result, {'mode': 'fast-forward', 'commit': tip})
+        self.assertEqual(self.remote_tip('main'), tip)
+        self.assertEqual(run(self.repo, 'branch', '--show-current'), 'develop')
+        # main isn't checked out anywhere, so the local branch follows
+        self.assertEqual(rev_parse(self.repo, 'refs/heads/main'), tip)
+
+    def test_unpushed_local_commits_are_promoted(self):
+        tip = self.commit('page.txt', 'new page\n', 'Add page')
+        self.assertEqual(self.promote()['commit'], tip)
+        self.assertEqual(self.remote_tip('main'), tip)
+
+    def test_hotfix_on_main_is_merged(self):
+        develop_tip = self.commit('page.txt', 'new page\n', 'Add page')
+        run(self.repo, 'push', '-q', 'origin', 'develop')
+        run(self.repo, 'checkout', '-q', 'main')
+        hotfix = self.commit('hotfix.txt', 'fix\n', 'Hotfix')
+        run(self.repo, 'push', '-q', 'origin', 'main')
+        run(self.repo, 'checkout', '-q', 'develop')
+
+        result = self.promote(message="Promote")
+        self.assertEqual(result['mode'], 'merge')
+        self.assertEqual(self.remote_tip('main'), result['commit'])
+        parents = run(self.repo, 'rev-list', '--parents', '-n', '1', result['commit']).split()[1:]
+        self.assertEqual(parents, [hotfix, develop_tip])
+        self.assertEqual(run(self.repo, 'show', '-s', '--format=%s', result['commit']), 'Promote')
+
+    def test_conflict_raises_and_pushes_nothing(self):
+        self.commit('README.md', 'develop\n', 'Develop edit')
+        run(self.repo, 'push', '-q', 'origin', 'develop')
+        run(self.repo, 'checkout', '-q', 'main')
+        main_tip = self.commit('README.md', 'main\n', 'Main edit')
+        run(self.repo, 'push', '-q', 'origin', 'main')
+        run(self.repo, 'checkout', '-q', 'develop')
+
+        with self.assertRaises(GitError):
+            self.promote()
+        self.assertEqual(self.remote_tip('main'), main_tip)
+
+    def test_diverged_develop_raises(self):
+        self.commit('local.txt', 'local\n', 'Local only')
+        other = self.root / "other"
+        run(self.root, 'clone', '-q', '-b', 'develop', str(self.remote), str(other))
+        (other / 'remote.txt').write_text('remote\n', encoding='utf-8')
+        run(other, 'add', 'remote.txt')
+        run(other, 'commit', '-q', '-m', 'Remote only')
+        run(other, 'push', '-q', 'origin', 'develop')
+
+        with self.assertRaises(GitError) as raised:
+            self.promote()
+        self.assertIn('diverged', str(raised.exception))
+
+    def test_missing_target_raises(self):
+        with self.assertRaises(GitError):
+            self.promote(target='production')
+
+
+if __name__ == '__main__':
+    unittest.main()
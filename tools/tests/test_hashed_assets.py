@@ -0,0 +1,154 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from publishing.hashed_assets import (HASH_LENGTH, HASHED_NAME, IMMUTABLE_CACHE_CONTROL, hash_image_filenames,
+                                      hashed_name)
+from publishing.image_shards import verify_image_map_shards
+from publishing.placeholders import add_placeholders
+from publishing.scaling import SYNC_SCRIPTS
+from publishing.standin import StrapiStandIn
+from publishing.synthetic import generate_catalog
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+NODE = shutil.which('node')
+
+
+def read_map(public_dir):
+    with open(Path(public_dir) / "image-map.json", 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class HeaderRuleTest(unittest.TestCase):
+    """next.config.ts must mark exactly the names hashed_name() produces as immutable"""
+
+    def setUp(self):
+        config = (REPO_DIR / "next.config.ts").read_text(encoding='utf-8')
+        rule = re.search(r"source: '/products/:slug/:file\((?P<pattern>.+)\)',\s*headers: \[\s*"
+                         r"\{ key: 'Cache-Control', value: '(?P<value>[^']+)' \}", config)
+        self.assertIsNotNone(rule, "immutable header rule not found in next.config.ts")
+        self.value = rule.group('value')
+        self.pattern = re.compile(rule.group('pattern').replace('\\\\', '\\') + '$')
+
+    def test_value(self):
+        self.assertEqual(self.value, IMMUTABLE_CACHE_CONTROL)
+
+    def test_pattern_matches_hashed_names_only(self):
+        digest = 'ab' * 32
+        for name in ('image-1.png', 'image-2.jpg', 'image-3.jpeg', 'image-4.webp', 'image-5.gif'):
+            hashed = hashed_name(name, digest)
+            self.assertTrue(HASHED_NAME.match(hashed))
+            self.assertTrue(self.pattern.match(hashed), hashed)
+            self.assertFalse(self.pattern.match(name), name)
+        self.assertFalse(self.pattern.match(f"image-1.{'a' * (HASH_LENGTH - 1)}.png"))
+
+    def test_builds_sync_images_again(self):
+        with open(REPO_DIR / "package.json", 'r', encoding='utf-8') as f:
+            scripts = json.load(f)['scripts']
+        self.assertTrue(scripts['prebuild'].startswith("node scripts/sync-images.js && "))
+        self.assertIn("sync-images", scripts['dev:fresh'])
+
+
+class HashImageFilenamesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.public_dir = self.tmp / "public"
+        product_dir = self.public_dir / "products" / "owl"
+        product_dir.mkdir(parents=True)
+        (product_dir / "image-1.png").write_bytes(b'first')
+        (product_dir / "image-2.jpg").write_bytes(b'second')
+        (product_dir / "stray.jpg").write_bytes(b'stray')
+        with open(self.public_dir / "image-map.json", 'w', encoding='utf-8') as f:
+            json.dump({'owl': [{'url': '/products/owl/image-1.png'}, {'url': '/products/owl/image-2.jpg'},
+                               {'url': '/products/owl/image-3.jpg'}]}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def hash(self):
+        return hash_image_filenames(self.public_dir, self.tmp / "cache", log=lambda message: None)
+
+    def test_renames_once(self):
+        summary = self.hash()
+        self.assertEqual((summary['renamed'], summary['missing'], summary['removed'], summary['written']),
+                         (2, 1, 1, True))
+        urls = [image['url'] for image in read_map(self.public_dir)['owl']]
+        self.assertTrue(all(HASHED_NAME.match(url.rsplit('/', 1)[1]) for url in urls[:2]))
+        self.assertEqual(sorted(p.name for p in (self.public_dir / "products" / "owl").iterdir()),
+                         sorted(url.rsplit('/', 1)[1] for url in urls[:2]))
+
+        summary = self.hash()
+        self.assertEqual((summary['renamed'], summary['unchanged'], summary['written']), (0, 2, False))
+
+
+@unittest.skipUnless(NODE, "node is not installed")
+class SyncImagesHashedNamesTest(unittest.TestCase):
+    """sync-images.js (prebuild, dev:fresh) must write the map the Python stages would"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.catalog = self.tmp / "catalog"
+        generate_catalog(self.catalog, products=10, images_per_product='1-3', width=24, height=24,
+                         log=lambda message: None)
+        self.site = self.tmp / "site"
+        (self.site / "scripts").mkdir(parents=True)
+        for name in SYNC_SCRIPTS:
+            shutil.copy2(REPO_DIR / "scripts" / name, self.site / "scripts" / name)
+        self.public_dir = self.site / "public"
+        self.cache_dir = self.tmp / "cache"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def sync(self, strapi):
+        env = dict(os.environ, NEXT_PUBLIC_STRAPI_URL=strapi.url)
+        env.pop('STRAPI_API_TOKEN', None)
+        subprocess.run([NODE, str(self.site / "scripts" / "sync-images.js")], cwd=self.site, env=env, check=True,
+                       capture_output=True)
+        return read_map(self.public_dir)
+
+    def files(self):
+        return sorted(str(p.relative_to(self.public_dir)) for p in (self.public_dir / "products").rglob('*')
+                      if p.is_file())
+
+    def test_python_stages_have_nothing_to_rename(self):
+        with StrapiStandIn(self.catalog) as strapi:
+            synced = self.sync(strapi)
+        urls = [image['url'] for images in synced.values() for image in images]
+        self.assertTrue(urls)
+        self.assertTrue(all(HASHED_NAME.match(url.rsplit('/', 1)[1]) for url in urls), urls)
+        self.assertEqual(self.files(), sorted(url.lstrip('/') for url in urls))
+
+        summary = hash_image_filenames(self.public_dir, self.cache_dir, log=lambda message: None)
+        self.assertEqual((summary['renamed'], summary['removed'], summary['written']), (0, 0, False))
+
+    def test_resync_keeps_names_and_placeholders(self):
+        with StrapiStandIn(self.catalog) as strapi:
+            self.sync(strapi)
+            add_placeholders(self.public_dir, self.cache_dir, workers=1, log=lambda message: None)
+            published = read_map(self.public_dir)
+            files = self.files()
+
+            self.assertEqual(self.sync(strapi), published)
+            self.assertEqual(self.files(), files)
+            self.assertEqual(verify_image_map_shards(self.public_dir), [])
+
+            # A replaced image gets a new name and the old file goes
+            slug = strapi.products[0]['slug']
+            old_url = published[slug][0]['url']
+            upload = strapi.uploads[strapi.products[0]['images'][0]['url']]
+            upload.write_bytes(upload.read_bytes() + b'\0')
+            resynced = self.sync(strapi)
+        self.assertNotEqual(resynced[slug][0]['url'], old_url)
+        self.assertNotIn('blurDataURL', resynced[slug][0])
+        self.assertFalse(self.public_dir.joinpath(old_url.lstrip('/')).exists())
+        self.assertTrue(self.public_dir.joinpath(resynced[slug][0]['url'].lstrip('/')).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
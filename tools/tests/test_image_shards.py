@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from publishing.image_shards import verify_image_map_shards, write_image_map_shards
+from publishing.scaling import SYNC_SCRIPTS
+from publishing.standin import StrapiStandIn
+from publishing.synthetic import generate_catalog
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+NODE = shutil.which('node')
+
+
+def image_map():
+    return {
+        f"piece-{i}": [{
+            'id': i * 10 + n,
+            'url': f"/products/piece-{i}/image-{n}.0123456789.jpg",
+            'alternativeText': f"Hibou № {i} 🦉",
+            'width': 800,
+            'height': 600,
+            'originalUrl': f"/uploads/piece_{i}_{n}.jpg",
+            'blurDataURL': 'data:image/png;base64,iVBORw0KGgo=',
+            'blurhash': 'LEHV6nWB2yk8pyo0adR*.7kCMdnj',
+        } for n in range(1, 1 + i % 3)]
+        for i in range(1, 12)
+    } | {'../escape': []}
+
+
+def tree(directory):
+    return {str(path.relative_to(directory)): path.read_bytes()
+            for path in sorted(Path(directory).rglob('*')) if path.is_file()}
+
+
+def run_node(script, *args, cwd=None, env=None):
+    return subprocess.run([NODE, str(script), *map(str, args)], cwd=cwd, env=env, check=True,
+                          capture_output=True, text=True, encoding='utf-8', errors='replace')
+
+
+class ImageMapShardsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write_map(self, public_dir, data):
+        public_dir.mkdir(parents=True, exist_ok=True)
+        with open(public_dir / "image-map.json", 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def test_write_and_verify(self):
+        data = image_map()
+        self.write_map(self.tmp, data)
+        summary = write_image_map_shards(self.tmp, log=lambda message: None)
+        self.assertEqual((summary['products'], summary['skipped']), (11, False))
+        self.assertEqual(verify_image_map_shards(self.tmp), [])
+        self.assertTrue(write_image_map_shards(self.tmp)['skipped'])
+
+        del data['piece-3']
+        self.write_map(self.tmp, data)
+        self.assertEqual(verify_image_map_shards(self.tmp), ["image-map.json changed since the shards were written"])
+        self.assertEqual(write_image_map_shards(self.tmp, log=lambda message: None)['removed'], 1)
+        self.assertEqual(verify_image_map_shards(self.tmp), [])
+
+    @unittest.skipUnless(NODE, "node is not installed")
+    def test_node_writer_matches_python(self):
+        script = REPO_DIR / "scripts" / "write-image-map-shards.js"
+        data = image_map()
+        for update in (None, 'piece-5'):
+            if update:
+                del data[update]
+                data['piece-4'][0]['alternativeText'] = 'Renamed'
+            self.write_map(self.tmp / "node", data)
+            self.write_map(self.tmp / "python", data)
+            run_node(script, self.tmp / "node")
+            write_image_map_shards(self.tmp / "python", log=lambda message: None)
+            self.assertEqual(tree(self.tmp / "node" / "image-map"), tree(self.tmp / "python" / "image-map"))
+
+        # The manifest records the same source hash, so neither redoes the other's work
+        self.assertTrue(write_image_map_shards(self.tmp / "node")['skipped'])
+
+
+@unittest.skipUnless(NODE, "node is not installed")
+class SyncImagesShardsTest(unittest.TestCase):
+    """npm run sync-images (also dev:fresh and prebuild) must leave the shards matching the map"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.catalog = self.tmp / "catalog"
+        generate_catalog(self.catalog, products=12, width=24, height=24, log=lambda message: None)
+        self.site = self.tmp / "site"
+        (self.site / "scripts").mkdir(parents=True)
+        for name in SYNC_SCRIPTS:
+            shutil.copy2(REPO_DIR / "scripts" / name, self.site / "scripts" / name)
+        self.public_dir = self.site / "public"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def sync(self, strapi_url):
+        env = dict(os.environ, NEXT_PUBLIC_STRAPI_URL=strapi_url)
+        env.pop('STRAPI_API_TOKEN', None)
+        return run_node(self.site / "scripts" / "sync-images.js", cwd=self.site, env=env)
+
+    def test_sync_rewrites_shards(self):
+        with StrapiStandIn(self.catalog) as strapi:
+            self.sync(strapi.url)
+            self.assertEqual(verify_image_map_shards(self.public_dir), [])
+            with open(self.public_dir / "image-map.json", 'r', encoding='utf-8') as f:
+                self.assertEqual(len(json.load(f)), 12)
+
+            # A stale shard for a product Strapi dropped goes away on the next sync
+            dropped = strapi.products[0]['slug']
+            self.assertTrue((self.public_dir / "image-map" / f"{dropped}.json").exists())
+            strapi.delete(dropped)
+            self.sync(strapi.url)
+            self.assertEqual(verify_image_map_shards(self.public_dir), [])
+            self.assertFalse((self.public_dir / "image-map" / f"{dropped}.json").exists())
+
+    def test_unreachable_strapi_still_leaves_matching_shards(self):
+        self.public_dir.mkdir()
+        with open(self.public_dir / "image-map.json", 'w', encoding='utf-8') as f:
+            json.dump({'old-piece': []}, f)
+        (self.public_dir / "products" / "old-piece").mkdir(parents=True)
+        (self.public_dir / "products" / "old-piece" / "image-1.jpg").write_bytes(b'jpeg')
+
+        self.sync("http://127.0.0.1:9")
+        self.assertEqual(verify_image_map_shards(self.public_dir), [])
+        self.assertTrue((self.public_dir / "image-map" / "old-piece.json").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import requests
+
+from publishing.loadtest import build_targets, format_load_report, run_load_test, summarize_samples
+from publishing.site_standin import SiteStandIn
+from publishing.synthetic import generate_catalog
+
+
+class LoadTestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        generate_catalog(cls.tmp, products=6, write_images=False, log=lambda message: None)
+        cls.public_dir = cls.tmp / "public"
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def test_targets_use_trailing_slashes(self):
+        targets = build_targets(self.public_dir)
+        paths = [path for entries in targets.values() for _, path, _ in entries]
+        self.assertIn('/shop/', paths)
+        self.assertIn('/api/checkout/', paths)
+        self.assertTrue(all(path.endswith('/') for path in paths), paths)
+
+    def test_redirects_are_errors(self):
+        samples = [('shop', 200, 0.01, None), ('shop', 308, 0.001, None), ('product', None, None, 'boom')]
+        run = summarize_samples(samples, 1.0)
+        self.assertEqual(run['total']['errors'], 2)
+        self.assertEqual(run['total']['redirects'], 1)
+        self.assertEqual(run['groups']['shop']['latency']['count'], 1)
+        report = format_load_report({'baseUrl': 'http://x', 'concurrency': 1, 'duration': 1.0, **run})
+        self.assertIn("shop: 1 redirects", report)
+
+    def test_standin_run_has_no_redirects(self):
+        with SiteStandIn(self.tmp) as site:
+            site.route_post('/api/checkout/', lambda headers, body: (200, 'application/json', b'{}'))
+            run = run_load_test(site.url, self.public_dir, concurrency=2, duration=0.3, log=lambda message: None)
+            self.assertGreater(run['total']['requests'], 0)
+            self.assertEqual(run['total']['errors'], 0, json.dumps(run['groups']))
+            self.assertEqual(run['total']['redirects'], 0)
+
+    def test_standin_redirects_unslashed_pages(self):
+        with SiteStandIn(self.tmp) as site:
+            response = requests.get(f"{site.url}/shop?category=x", allow_redirects=False, timeout=5)
+            self.assertEqual(response.status_code, 308)
+            self.assertEqual(response.headers['Location'], '/shop/?category=x')
+            self.assertEqual(requests.get(f"{site.url}/shop/", timeout=5).status_code, 200)
+            self.assertEqual(requests.get(f"{site.url}/sitemap.xml", timeout=5).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
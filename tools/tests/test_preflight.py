@@ -0,0 +1,62 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from publishing.gitops import production_branch
+from publishing.preflight import FAIL, OK, check_branches, standard_checks
+
+GIT_ENV = {'GIT_AUTHOR_NAME': 'Test', 'GIT_AUTHOR_EMAIL': 'test@example.invalid',
+           'GIT_COMMITTER_NAME': 'Test', 'GIT_COMMITTER_EMAIL': 'test@example.invalid',
+           'GIT_CONFIG_GLOBAL': os.devnull, 'GIT_CONFIG_NOSYSTEM': '1'}
+
+
+def run(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+class ProductionBranchTest(unittest.TestCase):
+    """A clone whose origin has `production` and develop one commit ahead of it"""
+
+    def make_repo(self, production):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        remote, repo = root / "origin.git", root / "frontend"
+        run(root, 'init', '-q', '--bare', '-b', production, str(remote))
+        run(root, 'clone', '-q', str(remote), str(repo))
+        run(repo, 'checkout', '-q', '-b', production)
+        run(repo, 'commit', '-q', '--allow-empty', '-m', 'Initial commit')
+        run(repo, 'push', '-q', 'origin', production)
+        run(repo, 'checkout', '-q', '-b', 'develop')
+        run(repo, 'commit', '-q', '--allow-empty', '-m', 'Feature')
+        run(repo, 'push', '-q', '-u', 'origin', 'develop')
+        return repo
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, GIT_ENV)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_production_branch(self):
+        self.assertEqual(production_branch(self.make_repo('main')), 'main')
+        self.assertEqual(production_branch(self.make_repo('master')), 'master')
+
+    def test_standard_checks_use_master_when_there_is_no_main(self):
+        repo = self.make_repo('master')
+        self.assertEqual(check_branches(repo)[0], FAIL)
+        checks = dict(standard_checks(repo, 'production', None, 'http://127.0.0.1:9', 'http://127.0.0.1:9'))
+        self.assertEqual(checks['Branches'](), (OK, "1 commits to promote"))
+
+    def test_explicit_target_wins(self):
+        repo = self.make_repo('master')
+        checks = dict(standard_checks(repo, 'production', None, None, None, target='main'))
+        status, notes = checks['Branches']()
+        self.assertEqual(status, FAIL)
+        self.assertIn('origin/main not found', notes)
+
+
+if __name__ == '__main__':
+    unittest.main()
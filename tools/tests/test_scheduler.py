@@ -0,0 +1,101 @@
+import threading
+import time
+import unittest
+
+from publishing.scheduler import DeployScheduler
+
+
+class Recorder:
+    """fire() callback that remembers every call"""
+
+    def __init__(self):
+        self.calls = []
+        self.fired = threading.Event()
+        self.lock = threading.Lock()
+
+    def __call__(self, key, payload, triggers):
+        with self.lock:
+            self.calls.append((key, payload, triggers))
+        self.fired.set()
+
+    def wait(self, count, timeout=2):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if len(self.calls) >= count:
+                    return list(self.calls)
+            time.sleep(0.005)
+        return list(self.calls)
+
+
+class DeploySchedulerTest(unittest.TestCase):
+    def scheduler(self, recorder, quiet=0.1, max_wait=10):
+        scheduler = DeployScheduler(recorder, quiet_seconds=quiet, max_wait_seconds=max_wait, log=lambda message: None)
+        self.addCleanup(scheduler.cancel)
+        return scheduler
+
+    def test_fires_once_after_quiet_window(self):
+        recorder = Recorder()
+        scheduler = self.scheduler(recorder)
+        scheduler.trigger('preview', 'first')
+        self.assertEqual(recorder.calls, [])
+        self.assertEqual(recorder.wait(1), [('preview', 'first', 1)])
+        self.assertEqual(scheduler.pending(), [])
+
+    def test_burst_coalesces_into_newest_payload(self):
+        recorder = Recorder()
+        scheduler = self.scheduler(recorder)
+        for n in range(5):
+            scheduler.trigger('preview', n)
+            time.sleep(0.02)
+        self.assertEqual(recorder.wait(1), [('preview', 4, 5)])
+        time.sleep(0.15)
+        self.assertEqual(len(recorder.calls), 1)
+
+    def test_keys_are_independent(self):
+        recorder = Recorder()
+        scheduler = self.scheduler(recorder)
+        scheduler.trigger('preview', 'p')
+        scheduler.trigger('production', 'q')
+        self.assertEqual(sorted(recorder.wait(2)), [('preview', 'p', 1), ('production', 'q', 1)])
+
+    def test_max_wait_caps_the_delay(self):
+        recorder = Recorder()
+        scheduler = self.scheduler(recorder, quiet=5, max_wait=0.1)
+        self.assertAlmostEqual(scheduler.trigger('preview'), 0.1, delta=0.01)
+        time.sleep(0.05)
+        # A re-trigger can't push the deploy past the first trigger + max_wait
+        self.assertLess(scheduler.trigger('preview'), 0.1)
+        self.assertEqual(recorder.wait(1), [('preview', None, 2)])
+
+    def test_per_trigger_window(self):
+        recorder = Recorder()
+        scheduler = self.scheduler(recorder, quiet=60)
+        self.assertEqual(scheduler.trigger('preview', 'now', quiet_seconds=0), 0)
+        self.assertEqual(recorder.wait(1), [('preview', 'now', 1)])
+
+    def test_flush_fires_immediately(self):
+        recorder = Recorder()
+        scheduler = self.scheduler(recorder, quiet=60)
+        scheduler.trigger('preview', 'a')
+        scheduler.trigger('preview', 'b')
+        self.assertEqual([(key, triggers) for key, triggers, _ in scheduler.pending()], [('preview', 2)])
+        self.assertEqual(scheduler.flush(), 1)
+        self.assertEqual(recorder.wait(1), [('preview', 'b', 2)])
+        self.assertEqual(scheduler.pending(), [])
+        self.assertEqual(scheduler.flush(), 0)
+
+    def test_cancel_drops_queued_deploys(self):
+        recorder = Recorder()
+        scheduler = self.scheduler(recorder, quiet=0.05)
+        scheduler.trigger('preview')
+        scheduler.trigger('production')
+        self.assertEqual(scheduler.cancel('preview'), 1)
+        self.assertEqual(recorder.wait(1), [('production', None, 1)])
+        time.sleep(0.1)
+        self.assertEqual(len(recorder.calls), 1)
+        self.assertEqual(scheduler.cancel(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from publishing.shards import PAGE_SIZE, write_catalog_shards
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+NODE = shutil.which('node')
+
+
+def make_catalog(count=40):
+    """products-data.json-shaped dict with ties, gaps and awkward values"""
+    products = {}
+    for i in range(1, count + 1):
+        slug = f"piece-{i}"
+        products[slug] = {
+            'id': i,
+            'slug': slug,
+            'title': f"Pièce № {i} 🦉",
+            'price': 120 if i % 3 else 89.5,
+            'createdAt': f"2025-0{1 + i % 9}-01T00:00:00.000Z" if i % 7 else None,
+            'updatedAt': "2025-10-01T00:00:00.000Z",
+            'category': {'slug': ('owls', 'foxes', 'bad/slug')[i % 3]} if i % 5 else None,
+            'currentShow': {'slug': 'fall-show'} if i % 4 == 0 else None,
+            'hasPoster': i % 2 == 0,
+            'featured': i % 6 == 0,
+            'sold': i % 8 == 0,
+        }
+    products['../escape'] = dict(products['piece-1'], slug='../escape')
+    return products
+
+
+def tree(directory):
+    return {str(path.relative_to(directory)): path.read_bytes()
+            for path in sorted(Path(directory).rglob('*')) if path.is_file()}
+
+
+class CatalogShardsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.products = make_catalog()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, products=None):
+        return write_catalog_shards(self.tmp, (products or self.products).values(), log=lambda message: None)
+
+    def read(self, *parts):
+        with open(self.tmp.joinpath("products-data", *parts), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_layout(self):
+        self.write()
+        manifest = self.read("manifest.json")
+        self.assertEqual(manifest['products'], 40)
+        self.assertEqual(manifest['shop'], {'pageCount': 3, 'total': 40})
+        self.assertEqual(sorted(manifest['categories']), ['foxes', 'owls'])
+        self.assertNotIn('../escape', self.read("index.json"))
+        self.assertFalse((self.tmp / "escape.json").exists())
+
+        pages = [self.read("shop", f"page-{n}.json") for n in (1, 2, 3)]
+        self.assertEqual([len(p['products']) for p in pages], [PAGE_SIZE, PAGE_SIZE, 8])
+        created = [p['createdAt'] or '' for page in pages for p in page['products']]
+        self.assertEqual(created, sorted(created, reverse=True))
+        self.assertEqual(pages[1]['pagination'], {'page': 2, 'pageSize': PAGE_SIZE, 'pageCount': 3, 'total': 40})
+        self.assertTrue(all(p['hasPoster'] for p in self.read("posters", "page-1.json")['products']))
+
+    def test_rewrite_is_incremental_and_removes_stale(self):
+        self.write()
+        self.assertEqual(self.write()['changed'], 0)
+
+        del self.products['piece-2']
+        summary = self.write()
+        self.assertGreater(summary['changed'], 0)
+        self.assertGreater(summary['removed'], 0)
+        self.assertFalse((self.tmp / "products-data" / "by-slug" / "piece-2.json").exists())
+
+
+@unittest.skipUnless(NODE, "node is not installed")
+class NodeParityTest(unittest.TestCase):
+    """scripts/write-product-shards.js (prebuild) and shards.py must write identical files"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write_both(self, products):
+        dirs = {}
+        for name in ('node', 'python'):
+            public_dir = self.tmp / name
+            public_dir.mkdir(exist_ok=True)
+            with open(public_dir / "products-data.json", 'w', encoding='utf-8') as f:
+                json.dump(products, f, indent=2, ensure_ascii=False)
+            dirs[name] = public_dir
+        subprocess.run([NODE, str(REPO_DIR / "scripts" / "write-product-shards.js"), str(dirs['node'])],
+                       check=True, capture_output=True)
+        write_catalog_shards(dirs['python'], products.values(), log=lambda message: None)
+        return tree(dirs['node'] / "products-data"), tree(dirs['python'] / "products-data")
+
+    def test_same_files(self):
+        node, python = self.write_both(make_catalog())
+        self.assertEqual(sorted(node), sorted(python))
+        for name in node:
+            self.assertEqual(node[name], python[name], name)
+
+    def test_same_files_after_an_update(self):
+        products = make_catalog()
+        self.write_both(products)
+        for slug in ('piece-3', 'piece-4', 'piece-5'):
+            del products[slug]
+        products['piece-6']['category'] = {'slug': 'new-category'}
+        node, python = self.write_both(products)
+        self.assertEqual(node, python)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import requests
+
+from publishing.standin import StrapiStandIn
+from publishing.strapi_webhooks import StrapiWebhookListener, _product_dir, affected_by, sync_products
+from publishing.synthetic import generate_catalog
+
+TRAVERSAL = {'event': 'entry.delete', 'model': 'product', 'entry': {'slug': '../../victim'}}
+
+
+class AffectedByTest(unittest.TestCase):
+    def test_product_entry(self):
+        payload = {'event': 'entry.update', 'model': 'product', 'entry': {'slug': 'owl', 'id': 3}}
+        self.assertEqual(affected_by(payload, {}, {'3': 'old-owl'}), ({'owl', 'old-owl'}, True, False))
+
+    def test_unsafe_slugs_are_dropped(self):
+        self.assertEqual(affected_by(TRAVERSAL, {}, {}), (set(), True, False))
+        payload = {'event': 'entry.update', 'model': 'product', 'entry': {'slug': '..', 'id': 3}}
+        self.assertEqual(affected_by(payload, {}, {'3': 'a/b'}), (set(), True, False))
+
+    def test_media_event(self):
+        image_map = {'owl': [{'id': 7, 'originalUrl': '/uploads/owl.png'}],
+                     '../x': [{'id': 7, 'originalUrl': '/uploads/owl.png'}],
+                     'fox': [{'id': 8, 'originalUrl': '/uploads/fox.png'}]}
+        payload = {'event': 'media.update', 'media': {'id': 7, 'url': '/uploads/owl.png'}}
+        self.assertEqual(affected_by(payload, image_map, {}), ({'owl'}, True, False))
+
+    def test_relation_and_other_models(self):
+        self.assertEqual(affected_by({'model': 'category'}, {}, {}), (set(), True, True))
+        self.assertEqual(affected_by({'model': 'global'}, {}, {}), (set(), True, False))
+        self.assertEqual(affected_by({'model': 'order'}, {}, {}), (set(), False, False))
+
+
+class SyncProductsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls.catalog = cls.tmp / "catalog"
+        generate_catalog(cls.catalog, products=3, log=lambda message: None)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def setUp(self):
+        self.site = self.tmp / "site"
+        shutil.rmtree(self.site, ignore_errors=True)
+        self.public_dir = self.site / "public"
+        (self.public_dir / "products").mkdir(parents=True)
+        self.victim = self.site / "victim"
+        self.victim.mkdir()
+        (self.victim / "keep.txt").write_text("keep", encoding='utf-8')
+        self.strapi = StrapiStandIn(self.catalog).start()
+        self.slugs = [p['slug'] for p in self.strapi.products]
+
+    def tearDown(self):
+        self.strapi.stop()
+
+    def sync(self, slugs):
+        return sync_products(self.strapi.url, self.public_dir, slugs, log=lambda message: None)
+
+    def test_traversal_slug_touches_nothing(self):
+        summary = self.sync({'../../victim', '../victim'})
+        self.assertEqual(summary['removed'], [])
+        self.assertTrue((self.victim / "keep.txt").exists())
+        self.assertFalse((self.public_dir / "image-map.json").exists())
+
+    def test_updates_and_removes_products(self):
+        slug = self.slugs[0]
+        summary = self.sync({slug})
+        self.assertEqual(summary['updated'], [slug])
+        self.assertTrue(any((self.public_dir / "products" / slug).iterdir()))
+
+        self.strapi.delete(slug)
+        summary = self.sync({slug, '../../victim'})
+        self.assertEqual(summary['removed'], [slug])
+        self.assertFalse((self.public_dir / "products" / slug).exists())
+        self.assertTrue(self.victim.exists())
+        with open(self.public_dir / "image-map.json", 'r', encoding='utf-8') as f:
+            self.assertNotIn(slug, json.load(f))
+
+    def test_product_dir_stays_inside_products(self):
+        self.assertEqual(_product_dir(self.public_dir, 'owl'), (self.public_dir / "products" / "owl").resolve())
+        for slug in ('..', '../victim', 'a/b', '.hidden', ''):
+            with self.assertRaises(ValueError):
+                _product_dir(self.public_dir, slug)
+
+
+class ListenerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.runs = []
+        self.listener = StrapiWebhookListener(lambda *args: self.runs.append(args), self.tmp, secret='s3cret',
+                                              port=0, quiet_seconds=60, log=lambda message: None).start()
+
+    def tearDown(self):
+        self.listener.stop()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def post(self, body, content_type='application/json', secret='s3cret'):
+        headers = {'Content-Type': content_type}
+        if secret:
+            headers['Authorization'] = f"Bearer {secret}"
+        return requests.post(self.listener.url, data=body, headers=headers, timeout=5)
+
+    def test_requires_secret(self):
+        for secret in (None, ''):
+            with self.assertRaises(ValueError):
+                StrapiWebhookListener(lambda *args: None, self.tmp, secret=secret, port=0)
+
+    def test_rejects_missing_or_wrong_secret(self):
+        body = json.dumps({'event': 'entry.update', 'model': 'product', 'entry': {'slug': 'owl'}})
+        self.assertEqual(self.post(body, secret=None).status_code, 401)
+        self.assertEqual(self.post(body, secret='guess').status_code, 401)
+        self.assertEqual(self.listener.received, 0)
+
+    def test_rejects_simple_cross_origin_posts(self):
+        body = json.dumps(TRAVERSAL)
+        for content_type in ('text/plain', 'application/x-www-form-urlencoded'):
+            self.assertEqual(self.post(body, content_type=content_type).status_code, 415)
+        self.assertEqual(self.listener.received, 0)
+
+    def test_queues_json_events(self):
+        body = json.dumps({'event': 'entry.update', 'model': 'product', 'entry': {'slug': 'owl'}})
+        response = self.post(body, content_type='application/json; charset=utf-8')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {'queued': True})
+        self.assertEqual(self.post(json.dumps(TRAVERSAL)).json(), {'queued': True})
+        self.listener.flush()
+        self.assertEqual(self.runs, [({'owl'}, True, False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image, ImageCms, ImageStat
+
+from publishing.standin import StrapiStandIn
+from publishing.synthetic import generate_catalog
+from publishing.uploader import bulk_upload, normalize_image
+
+
+def ramp(mode, high):
+    """256 x 8 horizontal grayscale ramp from 0 to `high` in `mode`"""
+    image = Image.new(mode, (256, 8))
+    image.putdata([x * high / 255 if mode == 'F' else x * high // 255 for x in range(256)] * 8)
+    return image
+
+
+class NormalizeImageTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def normalize(self, image, name, **save):
+        source = self.tmp / name
+        image.save(source, **save)
+        result = normalize_image(source, self.tmp / "out")
+        return result, Image.open(result['path'])
+
+    def assert_mid_gray(self, image):
+        mean = ImageStat.Stat(image.convert('L')).mean[0]
+        self.assertAlmostEqual(mean, 127.5, delta=3)
+
+    def test_16_bit_tiff_ramp_keeps_its_tones(self):
+        result, image = self.normalize(ramp('I;16', 65535), "scan.tif")
+        self.assertEqual(result['mime'], 'image/jpeg')
+        self.assert_mid_gray(image)
+
+    def test_32_bit_and_float_grayscale(self):
+        self.assert_mid_gray(self.normalize(ramp('I', 65535), "scan-i.tif")[1])
+        self.assert_mid_gray(self.normalize(ramp('F', 1.0), "scan-f.tif")[1])
+        self.assert_mid_gray(self.normalize(ramp('F', 65535), "scan-f16.tif")[1])
+
+    def test_16_bit_with_profile(self):
+        profile = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+        _, image = self.normalize(ramp('I;16', 65535), "profiled.tif", tiffinfo={34675: profile})
+        self.assertEqual(image.mode, 'RGB')
+        self.assert_mid_gray(image)
+
+    def test_cmyk_without_profile(self):
+        _, image = self.normalize(Image.new('CMYK', (32, 32), (0, 255, 255, 0)), "cmyk.jpg")
+        red, green, blue = ImageStat.Stat(image).mean
+        self.assertGreater(red, 200)
+        self.assertLess(max(green, blue), 60)
+
+    def test_srgb_profile_keeps_colours(self):
+        profile = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+        _, image = self.normalize(Image.new('RGB', (32, 32), (200, 100, 50)), "srgb.png", icc_profile=profile)
+        for channel, expected in zip(ImageStat.Stat(image).mean, (200, 100, 50)):
+            self.assertAlmostEqual(channel, expected, delta=4)
+
+    def test_transparent_stays_png_and_large_is_capped(self):
+        result, image = self.normalize(Image.new('RGBA', (3000, 1000), (10, 20, 30, 0)), "alpha.png")
+        self.assertEqual(result['mime'], 'image/png')
+        self.assertEqual(image.size, (2400, 800))
+
+
+class BulkUploadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        generate_catalog(self.tmp / "catalog", products=1, write_images=False, log=lambda message: None)
+        self.folder = self.tmp / "scans"
+        self.folder.mkdir()
+        for name, colour in (("owl", 'red'), ("fox", 'blue'), ("owl-copy", 'red')):
+            buffer = io.BytesIO()
+            Image.new('RGB', (64, 48), colour).save(buffer, format='PNG')
+            (self.folder / f"{name}.png").write_bytes(buffer.getvalue())
+        (self.folder / "notes.txt").write_text("not an image", encoding='utf-8')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def upload(self, strapi):
+        return bulk_upload(self.folder, strapi.url, self.tmp / "cache", workers=1, alt_text=True,
+                           log=lambda message: None)
+
+    def test_uploads_once_and_resumes(self):
+        with StrapiStandIn(self.tmp / "catalog") as strapi:
+            summary = self.upload(strapi)
+            self.assertEqual((summary['files'], summary['uploaded'], summary['skipped'], summary['failed']),
+                             (3, 2, 1, 0))
+            self.assertEqual(len(strapi.uploaded), 2)
+
+            summary = self.upload(strapi)
+            self.assertEqual((summary['uploaded'], summary['skipped']), (0, 3))
+            self.assertEqual(len(strapi.uploaded), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import threading
+import unittest
+
+from publishing.vercel_env import plan_rotation, rotate_env, verify_rotation
+
+
+def entry(env_id, key, targets, git_branch=None, env_type='encrypted'):
+    env = {'id': env_id, 'key': key, 'target': targets, 'type': env_type}
+    if git_branch:
+        env['gitBranch'] = git_branch
+    return env
+
+
+class FakeVercel:
+    """In-memory stand-in for VercelEnvClient"""
+
+    concurrency = 4
+
+    def __init__(self, entries, values):
+        self.entries = entries
+        self.values = values
+        self.lock = threading.Lock()
+
+    def list_env(self):
+        with self.lock:
+            return [dict(e) for e in self.entries]
+
+    def get_value(self, env_id):
+        return self.values[env_id]
+
+    def create_env(self, key, value, targets, env_type='encrypted', git_branch=None):
+        with self.lock:
+            env_id = f"new{len(self.entries)}"
+            self.entries.append(entry(env_id, key, list(targets), git_branch, env_type))
+            self.values[env_id] = value
+
+    def edit_env(self, env_id, **fields):
+        with self.lock:
+            env = next(e for e in self.entries if e['id'] == env_id)
+            if 'target' in fields:
+                env['target'] = fields['target']
+            if 'value' in fields:
+                self.values[env_id] = fields['value']
+
+
+class PlanRotationTest(unittest.TestCase):
+    def test_shared_entry_same_value_is_edited_in_place(self):
+        plan = plan_rotation([entry('a', 'KEY', ['preview', 'production'])],
+                             [('KEY', 'new', 'preview'), ('KEY', 'new', 'production')])
+        self.assertEqual(plan, {'KEY': [('edit', 'a', {'value': 'new', 'target': ['preview', 'production']})]})
+
+    def test_shared_entry_split_by_value(self):
+        plan = plan_rotation([entry('a', 'KEY', ['preview', 'production'])],
+                             [('KEY', 'test', 'preview'), ('KEY', 'live', 'production')])
+        self.assertEqual(plan['KEY'], [
+            ('edit', 'a', {'value': 'test', 'target': ['preview']}),
+            ('create', None, {'value': 'live', 'target': ['production'], 'type': 'encrypted'}),
+        ])
+
+    def test_rotating_one_target_narrows_shared_entry(self):
+        plan = plan_rotation([entry('a', 'KEY', ['preview', 'production'], env_type='sensitive')],
+                             [('KEY', 'live', 'production')])
+        self.assertEqual(plan['KEY'], [
+            ('edit', 'a', {'target': ['preview']}),
+            ('create', None, {'value': 'live', 'target': ['production'], 'type': 'sensitive'}),
+        ])
+
+    def test_missing_key_is_created(self):
+        plan = plan_rotation([], [('KEY', 'v', 'preview'), ('KEY', 'v', 'production')])
+        self.assertEqual(plan['KEY'], [('create', None, {'value': 'v', 'target': ['preview', 'production'],
+                                                         'type': 'encrypted'})])
+
+    def test_every_git_branch_scope_is_rotated(self):
+        # The branch entry first, as Vercel may list it
+        existing = [entry('dev', 'KEY', ['preview'], git_branch='develop'), entry('all', 'KEY', ['preview'])]
+        plan = plan_rotation(existing, [('KEY', 'new', 'preview')])
+        self.assertEqual(plan['KEY'], [
+            ('edit', 'all', {'value': 'new', 'target': ['preview']}),
+            ('edit', 'dev', {'value': 'new', 'target': ['preview']}),
+        ])
+
+    def test_branch_split_keeps_git_branch(self):
+        existing = [entry('dev', 'KEY', ['preview', 'development'], git_branch='develop')]
+        plan = plan_rotation(existing, [('KEY', 'a', 'preview'), ('KEY', 'b', 'development')])
+        self.assertEqual(plan['KEY'], [
+            ('edit', 'dev', {'value': 'a', 'target': ['preview']}),
+            ('create', None, {'value': 'b', 'target': ['development'], 'type': 'encrypted', 'gitBranch': 'develop'}),
+        ])
+
+    def test_branch_only_target_is_not_widened_to_all_branches(self):
+        existing = [entry('dev', 'KEY', ['preview'], git_branch='develop'), entry('prod', 'KEY', ['production'])]
+        plan = plan_rotation(existing, [('KEY', 'new', 'preview'), ('KEY', 'new', 'production')])
+        self.assertEqual(plan['KEY'], [
+            ('edit', 'prod', {'value': 'new', 'target': ['production']}),
+            ('edit', 'dev', {'value': 'new', 'target': ['preview']}),
+        ])
+
+    def test_other_keys_are_left_alone(self):
+        plan = plan_rotation([entry('a', 'OTHER', ['preview'])], [('KEY', 'v', 'preview')])
+        self.assertEqual(list(plan), ['KEY'])
+        self.assertEqual([op for op, _, _ in plan['KEY']], ['create'])
+
+
+class VerifyRotationTest(unittest.TestCase):
+    def test_stale_branch_entry_is_a_mismatch(self):
+        client = FakeVercel([entry('all', 'KEY', ['preview']), entry('dev', 'KEY', ['preview'], git_branch='develop')],
+                            {'all': 'new', 'dev': 'old'})
+        self.assertEqual(verify_rotation(client, [('KEY', 'new', 'preview')]), {('KEY', 'preview'): 'mismatch'})
+
+    def test_missing_and_unreadable(self):
+        client = FakeVercel([entry('s', 'SECRET', ['production'], env_type='sensitive')], {'s': None})
+        result = verify_rotation(client, [('SECRET', 'x', 'production'), ('KEY', 'x', 'preview')])
+        self.assertEqual(result, {('SECRET', 'production'): 'unreadable', ('KEY', 'preview'): 'missing'})
+
+
+class RotateEnvTest(unittest.TestCase):
+    def test_rotates_general_and_branch_entries(self):
+        client = FakeVercel([
+            entry('dev', 'STRIPE_SECRET_KEY', ['preview'], git_branch='develop'),
+            entry('all', 'STRIPE_SECRET_KEY', ['preview', 'production']),
+        ], {'dev': 'sk_test_old', 'all': 'sk_test_old'})
+        result = rotate_env(client, [('STRIPE_SECRET_KEY', 'sk_test_new', 'preview'),
+                                     ('STRIPE_SECRET_KEY', 'sk_live_new', 'production')], log=lambda message: None)
+        self.assertTrue(result['ok'])
+        self.assertEqual(result['targets'], ['preview', 'production'])
+        values = {(tuple(e['target']), e.get('gitBranch')): client.values[e['id']] for e in client.entries}
+        self.assertEqual(values, {
+            (('preview',), None): 'sk_test_new',
+            (('preview',), 'develop'): 'sk_test_new',
+            (('production',), None): 'sk_live_new',
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from publishing.asynchttp import AsyncHTTPClient, Response
+from publishing.shards import write_catalog_shards
+from publishing.site_standin import SiteStandIn
+from publishing.synthetic import generate_catalog
+from publishing.warm import listing_paths, rebase_url, summarize_warm, warm_cache, with_trailing_slash
+
+
+class TrailingSlashTest(unittest.TestCase):
+    def test_with_trailing_slash(self):
+        self.assertEqual(with_trailing_slash('/shop'), '/shop/')
+        self.assertEqual(with_trailing_slash('/shop/'), '/shop/')
+        self.assertEqual(with_trailing_slash(''), '/')
+        self.assertEqual(with_trailing_slash('/shop?category=owls'), '/shop/?category=owls')
+        self.assertEqual(with_trailing_slash('/sitemap.xml'), '/sitemap.xml')
+        self.assertEqual(with_trailing_slash('/products/owl/image-1.0123456789.jpg'),
+                         '/products/owl/image-1.0123456789.jpg')
+
+    def test_rebase_url(self):
+        self.assertEqual(rebase_url('https://tysondrawsstuff.com/shop/owl', 'http://127.0.0.1:3000'),
+                         'http://127.0.0.1:3000/shop/owl/')
+        self.assertEqual(rebase_url('https://tysondrawsstuff.com', 'http://127.0.0.1:3000'),
+                         'http://127.0.0.1:3000/')
+
+    def test_redirect_is_not_ok(self):
+        self.assertTrue(Response(200, 'OK', {}, b'', 0, 0).ok)
+        self.assertFalse(Response(308, 'Permanent Redirect', {}, b'', 0, 0).ok)
+        self.assertFalse(Response(404, 'Not Found', {}, b'', 0, 0).ok)
+
+
+class WarmTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        generate_catalog(cls.tmp, products=40, log=lambda message: None)
+        cls.public_dir = cls.tmp / "public"
+        with open(cls.public_dir / "products-data.json", 'r', encoding='utf-8') as f:
+            write_catalog_shards(cls.public_dir, json.load(f).values(), log=lambda message: None)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def test_listing_paths(self):
+        paths = listing_paths(self.public_dir)
+        self.assertIn('/shop/', paths)
+        self.assertIn('/shop/page/2/', paths)
+        self.assertTrue(all(path.endswith('/') for path in paths))
+
+    def test_warm_standin_without_redirects(self):
+        with SiteStandIn(self.tmp) as site:
+            result = warm_cache(site.url, self.public_dir, rate=None, log=lambda message: None)
+            redirected = [c for c, path, status in site.requests if status == 308]
+        self.assertGreater(result['sitemapUrls'], 0)
+        self.assertEqual(redirected, [])
+        self.assertEqual([r for r in result['results'] if r['error']], [])
+        self.assertEqual(summarize_warm(result)['failed'], 0)
+
+    def test_redirect_counts_as_failure(self):
+        async def fetch(url):
+            async with AsyncHTTPClient() as client:
+                return await client.get(url)
+
+        with SiteStandIn(self.tmp) as site:
+            response = asyncio.run(fetch(f"{site.url}/shop"))
+        self.assertEqual(response.status, 308)
+        self.assertFalse(response.ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
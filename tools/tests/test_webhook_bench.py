@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from publishing.site_standin import SiteStandIn
+from publishing.smtp_sink import SMTPSink
+from publishing.standin import StrapiStandIn
+from publishing.synthetic import generate_catalog
+from publishing.webhook_bench import WEBHOOK_ROUTES, run_webhook_bench, standin_webhook_handler
+
+SECRET = 'whsec_test'
+
+
+class WebhookBenchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        generate_catalog(cls.tmp, products=6, write_images=False, log=lambda message: None)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def bench(self, routes):
+        with SMTPSink() as sink, SiteStandIn(self.tmp) as site, StrapiStandIn(self.tmp) as strapi:
+            for route in WEBHOOK_ROUTES:
+                site.route_post(f"/api/{route}/", standin_webhook_handler(route, SECRET, sink.port, strapi))
+            return run_webhook_bench(site.url, SECRET, self.tmp / "public", routes=routes, rate=20, duration=0.5,
+                                     smtp_sink=sink, strapi=strapi, log=lambda message: None)
+
+    def test_routes_match_the_app_router_paths(self):
+        for route, path in WEBHOOK_ROUTES.items():
+            self.assertEqual(path, f"/api/{route}/")
+            self.assertTrue((Path(__file__).resolve().parents[2] / "src" / "app" / "api" / route / "route.ts").exists())
+
+    def test_standin_bench(self):
+        run = self.bench(tuple(WEBHOOK_ROUTES))
+        self.assertEqual(run['total']['events'], 10)
+        self.assertEqual(run['total']['failures'], 0, run['errors'])
+        self.assertEqual(run['emails']['received'], run['emails']['expected'])
+        self.assertEqual(run['orders']['received'], run['orders']['expected'])
+        self.assertGreater(run['orders']['expected'], 0)
+
+    def test_unslashed_route_is_a_failure(self):
+        routes = dict(WEBHOOK_ROUTES)
+        try:
+            WEBHOOK_ROUTES['stripe-webhook'] = '/api/stripe-webhook'
+            run = self.bench(('stripe-webhook',))
+        finally:
+            WEBHOOK_ROUTES.update(routes)
+        self.assertEqual(run['total']['failures'], run['total']['events'])
+        self.assertEqual(list(run['errors']), ['HTTP 308'])
+
+
+if __name__ == '__main__':
+    unittest.main()